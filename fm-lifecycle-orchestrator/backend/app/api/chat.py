@@ -11,6 +11,12 @@ from ..models.onboarding_stage import OnboardingStage
 from ..models.regulatory_classification import RegulatoryClassification
 from ..models.task import Task
 from ..services.ai_service import ai_service
+from ..services.document_index import document_index
+from ..services.chat_sessions import chat_session_store
+from ..services.sla_tracker import sla_tracker
+from ..observability import get_logger, kv, tracer
+
+logger = get_logger(__name__)
 
 router = APIRouter(prefix="/api/chat", tags=["chat"])
 
@@ -19,6 +25,7 @@ class ChatRequest(BaseModel):
     """Request model for chat messages"""
     message: str
     client_id: Optional[int] = None
+    session_id: Optional[str] = None  # Omit to start a new conversation
 
 
 class ChatResponse(BaseModel):
@@ -28,6 +35,8 @@ class ChatResponse(BaseModel):
     topic: str
     timestamp: str
     context: Optional[dict] = None
+    session_id: Optional[str] = None
+    source: Optional[str] = None  # llm, llm_general, simulation or simulation_fallback
 
 
 def fetch_full_client_data(client_id: int, db: Session) -> dict:
@@ -56,7 +65,7 @@ def fetch_full_client_data(client_id: int, db: Session) -> dict:
         "created_date": client.created_date.isoformat() if client.created_date else None,
         "last_updated": client.last_updated.isoformat() if client.last_updated else None,
         "client_attributes": client.client_attributes,
-        "cumulative_tat_hours": client.cumulative_tat_hours,
+        "cumulative_tat_hours": sla_tracker.cumulative_tat_hours(client.tat_total),
         "documents": [],
         "onboarding_stages": [],
         "regulatory_classifications": [],
@@ -136,23 +145,32 @@ def send_chat_message(
     Send a message to the AI chat assistant.
     Optionally include client_id for context-aware responses with RAG.
     """
-    print(f"📨 Chat request received:")
-    print(f"   - Message: {chat_request.message[:50]}...")
-    print(f"   - Client ID: {chat_request.client_id}")
+    logger.info(
+        "Chat request received",
+        extra=kv(client_id=chat_request.client_id, session_id=chat_request.session_id,
+                 message_chars=len(chat_request.message))
+    )
 
     context = {}
     full_client_data = None
 
     # Fetch full client data if client_id is provided (for RAG)
     if chat_request.client_id:
-        print(f"🔍 Fetching full client data for client_id={chat_request.client_id}")
-        full_client_data = fetch_full_client_data(chat_request.client_id, db)
-        if full_client_data:
-            print(f"✅ Client data fetched: {full_client_data.get('name', 'Unknown')}")
-        else:
-            print(f"❌ Client not found for id={chat_request.client_id}")
+        with tracer.span("chat.load_client", **{"client.id": chat_request.client_id}):
+            full_client_data = fetch_full_client_data(chat_request.client_id, db)
+        if not full_client_data:
+            logger.warning("Chat client not found", extra=kv(client_id=chat_request.client_id))
 
         if full_client_data:
+            # Ground the answer in the passages of extracted document text most relevant to the question
+            with tracer.span("document_index.search", **{"client.id": chat_request.client_id}) as span:
+                full_client_data["relevant_passages"] = document_index.search(
+                    chat_request.client_id,
+                    chat_request.message,
+                    db=db
+                )
+                span.set_attribute("passages", len(full_client_data["relevant_passages"]))
+
             # Simple context for backward compatibility
             context = {
                 "client_id": full_client_data["id"],
@@ -161,22 +179,53 @@ def send_chat_message(
                 "onboarding_status": full_client_data["onboarding_status"]
             }
 
+    session = chat_session_store.get_or_create(
+        chat_request.session_id,
+        full_client_data["id"] if full_client_data else None,
+        db
+    )
+
     # Get AI response (will use LLM with RAG if enabled and full_client_data is provided)
     ai_response = ai_service.chat_with_assistant(
         message=chat_request.message,
         context=context,
-        full_client_data=full_client_data
+        full_client_data=full_client_data,
+        session=session
     )
+    chat_session_store.save(session, db)
 
     return ChatResponse(
         message=ai_response["message"],
         suggestions=ai_response["suggestions"],
         topic=ai_response["topic"],
         timestamp=ai_response["timestamp"],
-        context=context if context else None
+        context=context if context else None,
+        session_id=session.session_id,
+        source=ai_response.get("source")
     )
 
 
+@router.get("/sessions/{session_id}", response_model=dict)
+def get_chat_session(session_id: str, db: Session = Depends(get_db)):
+    """
+    Get the recorded state of a chat conversation (recent turns and rolling summary).
+    """
+    session = chat_session_store.get(session_id, db)
+    if not session:
+        raise HTTPException(status_code=404, detail="Chat session not found")
+    return session.to_dict()
+
+
+@router.delete("/sessions/{session_id}")
+def delete_chat_session(session_id: str, db: Session = Depends(get_db)):
+    """
+    End a chat conversation and discard its history.
+    """
+    if not chat_session_store.delete(session_id, db):
+        raise HTTPException(status_code=404, detail="Chat session not found")
+    return {"message": "Chat session deleted successfully"}
+
+
 @router.get("/suggestions", response_model=list[dict])
 def get_chat_suggestions(client_id: Optional[int] = None):
     """
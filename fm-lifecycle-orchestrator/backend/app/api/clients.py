@@ -1,17 +1,36 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional, Dict, Any
+from datetime import datetime
 from ..database import get_db
 from ..models.client import Client, OnboardingStatus
 from ..models.onboarding_stage import OnboardingStage, StageStatus
 from ..models.document import Document, OCRStatus, DocumentCategory
 from ..models.task import Task, TaskStatus
-from ..schemas.client import ClientCreate, ClientUpdate, ClientResponse, ClientListResponse
+from ..schemas.client import (
+    ClientCreate, ClientUpdate, ClientResponse, ClientListResponse,
+    ClientSearchRequest, ClientSearchHit, ClientSearchResponse
+)
 from ..services.ai_service import ai_service
+from ..services.client_search import client_search
+from ..services.outbox import outbox
+from ..services.search_query_parser import search_query_parser
+from ..services.sla_tracker import sla_tracker
 
 router = APIRouter(prefix="/api/clients", tags=["clients"])
 
 
+def _tat_fields(client: Client, now: Optional[datetime] = None) -> Dict[str, Optional[float]]:
+    """Cumulative TAT as of now, from the client's running totals (the stored column is a snapshot)"""
+    hours = sla_tracker.cumulative_tat_hours(client.tat_total, now)
+    return {"cumulative_tat_hours": hours, "cumulative_tat_days": round(hours / 24, 1) if hours is not None else None}
+
+
+def _client_response(client: Client) -> ClientResponse:
+    return ClientResponse.model_validate(client).model_copy(update=_tat_fields(client))
+
+
 @router.get("", response_model=List[ClientListResponse])
 def list_clients(
     status: Optional[OnboardingStatus] = None,
@@ -20,22 +39,20 @@ def list_clients(
     db: Session = Depends(get_db)
 ):
     """List all clients with optional filters"""
-    query = db.query(Client)
+    query = db.query(Client).options(selectinload(Client.tat_total))
 
     if status:
         query = query.filter(Client.onboarding_status == status)
     if country_of_incorporation:
         query = query.filter(Client.country_of_incorporation.ilike(f"%{country_of_incorporation}%"))
     if search:
-        query = query.filter(
-            (Client.name.ilike(f"%{search}%")) |
-            (Client.legal_entity_id.ilike(f"%{search}%"))
-        )
+        query = query.filter(client_search.text_filter(db, search))
 
     clients = query.all()
 
     # Enrich with additional info
     result = []
+    now = datetime.utcnow()
     for client in clients:
         # Find current stage
         in_progress_stage = db.query(OnboardingStage).filter(
@@ -58,7 +75,7 @@ def list_clients(
         ).count()
 
         client_data = ClientListResponse(
-            **client.__dict__,
+            **{**client.__dict__, **_tat_fields(client, now)},
             current_stage=current_stage,
             blocked_tasks_count=blocked_tasks,
             pending_documents_count=pending_docs
@@ -74,7 +91,7 @@ def get_client(client_id: int, db: Session = Depends(get_db)):
     client = db.query(Client).filter(Client.id == client_id).first()
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
-    return client
+    return _client_response(client)
 
 
 @router.post("", response_model=ClientResponse)
@@ -87,9 +104,17 @@ def create_client(client: ClientCreate, db: Session = Depends(get_db)):
 
     db_client = Client(**client.model_dump())
     db.add(db_client)
+    db.flush()
+    # Register the new entity with SX (static data) once the client is committed
+    outbox.enqueue(db, "sx", "client.created", {
+        "legal_entity_id": db_client.legal_entity_id,
+        "name": db_client.name,
+        "country_of_incorporation": db_client.country_of_incorporation,
+        "entity_type": db_client.entity_type
+    }, aggregate_type="client", aggregate_id=db_client.id)
     db.commit()
     db.refresh(db_client)
-    return db_client
+    return _client_response(db_client)
 
 
 @router.put("/{client_id}", response_model=ClientResponse)
@@ -105,7 +130,7 @@ def update_client(client_id: int, client_update: ClientUpdate, db: Session = Dep
 
     db.commit()
     db.refresh(client)
-    return client
+    return _client_response(client)
 
 
 @router.delete("/{client_id}")
@@ -219,19 +244,59 @@ def check_client_consistency(client_id: int, db: Session = Depends(get_db)) -> D
     return consistency_result
 
 
-@router.post("/search")
-def natural_language_search(query_request: dict, db: Session = Depends(get_db)) -> Dict[str, Any]:
+@router.post("/search", response_model=ClientSearchResponse)
+def natural_language_search(search_request: ClientSearchRequest, db: Session = Depends(get_db)):
     """
     Natural language search for clients using AI-powered query parsing.
-    Converts natural language into structured filters.
+    Converts natural language into structured filters, applies them against the client search
+    index and returns one ranked page; pass next_cursor back as cursor for the next page.
     """
-    query = query_request.get("query", "")
-
-    # Parse natural language query
-    parsed_query = ai_service.parse_natural_language_search(query)
-
-    # Note: In a full implementation, we would use the parsed filters to query the database
-    # For demo purposes, we return the parsed query structure
-    # The frontend can use this to display what the AI understood from the query
+    # Parse natural language query (vocabulary includes the countries, entity types and RMs in use)
+    search_query_parser.refresh(db)
+    parsed_query = ai_service.parse_natural_language_search(search_request.query)
+
+    try:
+        page = client_search.search(
+            db, search_request.query, parsed_query["filters"], parsed_query["spans"],
+            cursor=search_request.cursor, limit=search_request.limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # List view info for the page in three grouped queries
+    client_ids = [client.id for client, _, _ in page["hits"]]
+    current_stages: Dict[int, str] = {}
+    for client_id, stage_name in db.query(OnboardingStage.client_id, OnboardingStage.stage_name).filter(
+        OnboardingStage.client_id.in_(client_ids),
+        OnboardingStage.status == StageStatus.IN_PROGRESS
+    ).order_by(OnboardingStage.id):
+        current_stages.setdefault(client_id, stage_name.value)
+    blocked_tasks = dict(db.query(Task.client_id, func.count(Task.id)).filter(
+        Task.client_id.in_(client_ids),
+        Task.status == TaskStatus.PENDING
+    ).group_by(Task.client_id).all())
+    pending_docs = dict(db.query(Document.client_id, func.count(Document.id)).filter(
+        Document.client_id.in_(client_ids),
+        Document.ocr_status == OCRStatus.PENDING
+    ).group_by(Document.client_id).all())
+
+    results = [
+        ClientSearchHit(
+            **client.__dict__,
+            current_stage=current_stages.get(client.id),
+            blocked_tasks_count=blocked_tasks.get(client.id, 0),
+            pending_documents_count=pending_docs.get(client.id, 0),
+            score=score,
+            snippet=snippet
+        )
+        for client, score, snippet in page["hits"]
+    ]
 
-    return parsed_query
+    return ClientSearchResponse(
+        **parsed_query,
+        applied_filters=page["applied_filters"],
+        ignored_filters=page["ignored_filters"],
+        text_terms=page["text_terms"],
+        results=results,
+        next_cursor=page["next_cursor"]
+    )
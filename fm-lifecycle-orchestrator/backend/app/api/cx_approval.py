@@ -5,74 +5,16 @@ from sqlalchemy.orm.attributes import flag_modified
 from typing import Dict, Any
 from ..database import get_db
 from ..models.client import Client, OnboardingStatus
-from ..models.onboarding_stage import OnboardingStage, StageStatus, StageName
 from ..services.classification_engine import ClassificationEngine
+from ..services.regime_applicability import regime_applicability
+from ..services.stage_workflow import stage_workflow, WORKFLOW_STEPS
+from ..services.outbox import outbox
+from ..observability import get_logger, kv
 from datetime import datetime
 
-router = APIRouter(prefix="/api", tags=["cx-approval"])
-
-
-def _get_applicable_regimes(client: Client) -> list[str]:
-    """
-    Determine which regimes are applicable to a client based on their attributes.
-    This prevents evaluation against irrelevant regimes (e.g., US regimes for Indian clients).
-    """
-    client_attrs = client.client_attributes or {}
-    booking_location = client_attrs.get("booking_location", "")
-    country = client.country_of_incorporation or ""
-
-    # Map of regime to applicable booking locations/countries
-    regime_mapping = {
-        # India regimes
-        "RBI": ["India"],
-        "RBI Variation Margin": ["India"],
-        "India NDDC TR": ["India"],
-
-        # Singapore regimes
-        "MAS Margin": ["Singapore"],
-        "MAS Clearing": ["Singapore"],
-        "MAS Transaction Reporting": ["Singapore"],
-        "MAS FAIR Client Classification": ["Singapore"],
-
-        # Hong Kong regimes
-        "HKMA Margin": ["Hong Kong"],
-        "HKMA Clearing": ["Hong Kong"],
-        "HKMA Transaction Reporting": ["Hong Kong"],
-
-        # US regimes
-        "Dodd Frank (US Person - CFTC)": ["United States", "US"],
-        "Dodd Frank (SEC)": ["United States", "US"],
-        "DF Deemed ISDA": ["United States", "US"],
-
-        # EU regimes (can apply to international clients)
-        "MIFID": ["international"],
-        "EMIR": ["international"],
-        "SFTR": ["international"],
-
-        # Australian regimes
-        "ASIC TR": ["Australia"],
-
-        # Other regimes
-        "Canadian Transaction Reporting(CAD)": ["Canada"],
-        "ZAR MR": ["South Africa"],
-        "Indonesia Margin Classification": ["Indonesia"],
-        "Stays Exempt": ["international"],  # Can apply to any client
-    }
-
-    applicable_regimes = []
-
-    for regime, applicable_locations in regime_mapping.items():
-        # Check if regime applies to this client based on booking location or country
-        if "international" in applicable_locations:
-            applicable_regimes.append(regime)
-        else:
-            # Check booking location
-            for location in applicable_locations:
-                if booking_location.startswith(location) or country == location:
-                    applicable_regimes.append(regime)
-                    break
+logger = get_logger(__name__)
 
-    return applicable_regimes
+router = APIRouter(prefix="/api", tags=["cx-approval"])
 
 
 @router.post("/clients/{client_id}/simulate-cx-approval")
@@ -101,27 +43,11 @@ def simulate_cx_product_approval(client_id: int, db: Session = Depends(get_db))
         # Mark the JSON column as modified so SQLAlchemy persists the change
         flag_modified(client, "client_attributes")
 
-    # Step 2: Complete Legal Entity Setup stage
-    legal_setup_stage = db.query(OnboardingStage).filter(
-        OnboardingStage.client_id == client_id,
-        OnboardingStage.stage_name == StageName.LEGAL_ENTITY_SETUP
-    ).first()
-
-    if legal_setup_stage:
-        legal_setup_stage.status = StageStatus.COMPLETED
-        legal_setup_stage.completed_date = datetime.now()
-        legal_setup_stage.calculate_tat()
-        legal_setup_stage.notes = "Completed via CX product approval simulation"
-
-    # Step 3: Start Regulatory Classification stage
-    reg_class_stage = db.query(OnboardingStage).filter(
-        OnboardingStage.client_id == client_id,
-        OnboardingStage.stage_name == StageName.REG_CLASSIFICATION
-    ).first()
-
-    if reg_class_stage:
-        reg_class_stage.status = StageStatus.IN_PROGRESS
-        reg_class_stage.started_date = datetime.now()
+    # Steps 2-3: Complete Legal Entity Setup and start Regulatory Classification in one transition
+    stage_workflow.apply(
+        db, [client_id], WORKFLOW_STEPS["cx_product_approved"],
+        notes="Moved via CX product approval simulation", skip_invalid=True
+    )
 
     # Commit changes and refresh client to ensure classification engine sees updated data
     db.commit()
@@ -131,31 +57,39 @@ def simulate_cx_product_approval(client_id: int, db: Session = Depends(get_db))
     engine = ClassificationEngine(db)
 
     # Intelligently filter regimes based on client's booking location and country
-    applicable_regimes = _get_applicable_regimes(client)
+    # (e.g., no US regimes for Indian clients)
+    applicable_regimes = regime_applicability.for_client(db, client)
 
-    classification_results = {}
-    eligible_regimes = []
+    # All applicable regimes are evaluated from one snapshot and written in one transaction
+    try:
+        classification_results = engine.evaluate_regimes(client_id, applicable_regimes)
+    except Exception:
+        logger.exception("Error evaluating regimes", extra=kv(client_id=client_id))
+        raise HTTPException(status_code=500, detail="Regulatory classification failed")
 
-    for regime in applicable_regimes:
-        try:
-            result = engine.evaluate_client_eligibility(client_id, regime)
-            classification_results[regime] = result
-            if result.get("is_eligible", False):
-                eligible_regimes.append(regime)
-        except Exception as e:
-            print(f"Error evaluating {regime}: {str(e)}")
-            classification_results[regime] = {"error": str(e)}
+    eligible_regimes = []
+    for regime, result in classification_results.items():
+        if "error" in result:
+            logger.error("Error evaluating regime", extra=kv(client_id=client_id, regime=regime, error=result["error"]))
+        elif result.get("is_eligible", False):
+            eligible_regimes.append(regime)
 
-    # Step 5: Update client status
+    # Step 5: Update client status and queue the CX notification in the same transaction
     client.onboarding_status = OnboardingStatus.IN_PROGRESS
-    client.calculate_cumulative_tat()
+    message = outbox.enqueue(db, "cx", "classification.published", {
+        "legal_entity_id": client.legal_entity_id,
+        "product_approval_status": "approved",
+        "regimes_evaluated": len(applicable_regimes),
+        "eligible_regimes": eligible_regimes
+    }, aggregate_type="client", aggregate_id=client_id)
     db.commit()
 
-    # Step 6: Simulate CX integration call
+    # Step 6: CX is notified by the outbox dispatcher, not inline
     cx_sync_result = {
-        "cx_system": "synced",
+        "cx_system": "queued",
         "client_id": client.legal_entity_id,
         "product_approval_status": "approved",
+        "idempotency_key": message.idempotency_key,
         "timestamp": datetime.now().isoformat()
     }
 
@@ -1,15 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from typing import List, Optional
+from sqlalchemy import and_, func, update
+from typing import Any, Dict, List, Literal, Optional
 from datetime import datetime, timedelta
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from ..database import get_db
-from ..models.client import Client
+from ..models.client import Client, OnboardingStatus
 from ..models.document import Document
 from ..models.mandatory_evidence import MandatoryEvidence
 from ..models.regime_eligibility import RegimeEligibility
 from ..models.document_requirement import DocumentRequirement
+from ..models.document_campaign import DocumentCampaign
+from ..services.document_campaign import document_campaign, REQUESTABLE_STATUSES
+from ..services.email_templates import render_document_request
+from ..services.outbox import outbox
 
 router = APIRouter(prefix="/api", tags=["document-requirements"])
 
@@ -74,6 +78,34 @@ class BulkEmailRequest(BaseModel):
     cc_emails: Optional[List[EmailStr]] = []
 
 
+class DocumentCampaignRequest(BaseModel):
+    """
+    Missing-document request emails to every client matching the filters. Each client is emailed
+    at recipients[client_id], else its contact_email, else skipped.
+    """
+    name: Optional[str] = None
+    requested_by: Optional[str] = None
+    statuses: List[Literal[REQUESTABLE_STATUSES]] = ["missing"]
+    client_ids: Optional[List[int]] = Field(default=None, max_length=50000)
+    onboarding_status: Optional[OnboardingStatus] = None
+    country: Optional[str] = None
+    assigned_rm: Optional[str] = None
+    regimes: Optional[List[str]] = None
+    min_days_between_requests: Optional[int] = Field(default=None, ge=0)  # Defaults to the configured value
+    max_reminder_count: Optional[int] = Field(default=None, ge=1)  # Skip requirements asked this often
+    max_clients: Optional[int] = Field(default=None, ge=1)
+    recipients: Dict[int, EmailStr] = {}
+    cc_emails: List[EmailStr] = []
+    dry_run: bool = False  # Count and render a sample without updating or queueing anything
+    background: bool = True  # Return immediately and run the campaign in a background job
+
+    def filters(self) -> Dict[str, Any]:
+        return self.model_dump(
+            mode="json", exclude_none=True,
+            exclude={"name", "requested_by", "recipients", "cc_emails", "dry_run", "background"}
+        )
+
+
 @router.get("/clients/{client_id}/document-requirements")
 def get_client_document_requirements(
     client_id: int,
@@ -326,36 +358,26 @@ def send_document_request_email(
         raise HTTPException(status_code=404, detail="Client not found")
 
     # Mark all requested documents as requested
-    for doc_id in email_request.document_ids:
-        requirement = db.query(DocumentRequirement).filter(
-            and_(
-                DocumentRequirement.id == doc_id,
-                DocumentRequirement.client_id == client_id
-            )
-        ).first()
-
-        if requirement:
-            requirement.requested_date = datetime.utcnow()
-            requirement.last_reminder_date = datetime.utcnow()
-            requirement.reminder_count += 1
+    _mark_requested(db, client_id, email_request.document_ids)
 
-    db.commit()
-
-    # TODO: Integrate with actual email service
-    # For now, just log the email details
     email_log = {
         "to": email_request.to_email,
         "cc": email_request.cc_emails,
         "subject": email_request.subject,
         "body": email_request.body,
         "document_count": len(email_request.document_ids),
-        "sent_at": datetime.utcnow().isoformat(),
-        "status": "simulated_success"
+        "queued_at": datetime.utcnow().isoformat(),
+        "status": "queued"
     }
+    # Delivered by the outbox dispatcher once the tracking update is committed
+    message = outbox.enqueue(
+        db, "email", "document.requested", email_log, aggregate_type="client", aggregate_id=client_id
+    )
+    db.commit()
 
     return {
-        "message": "Email sent successfully (simulated)",
-        "email_log": email_log,
+        "message": "Email queued for delivery",
+        "email_log": {**email_log, "idempotency_key": message.idempotency_key},
         "documents_requested": len(email_request.document_ids)
     }
 
@@ -393,51 +415,85 @@ def send_bulk_document_request(
         return {"message": "No missing mandatory documents found"}
 
     # Build email content
-    doc_list = []
-    for req, evidence in missing_requirements:
-        doc_list.append(f"  - {evidence.evidence_name} ({evidence.category.value}) - {evidence.description or 'Required for ' + req.regime}")
-
-    email_body = f"""
-Dear {client.name} Team,
-
-As part of your onboarding process, we require the following mandatory documents to comply with regulatory requirements:
-
-{chr(10).join(doc_list)}
-
-Please upload these documents at your earliest convenience to avoid any delays in account activation.
-
-If you have any questions, please contact your Relationship Manager: {client.assigned_rm}
-
-Best regards,
-FM Client Readiness Team
-    """.strip()
-
-    subject = f"Action Required: Missing Regulatory Documents for {client.name}"
+    email = render_document_request(client.name, client.assigned_rm, (
+        {
+            "evidence_name": evidence.evidence_name,
+            "category": evidence.category.value,
+            "description": evidence.description or f"Required for {req.regime}"
+        }
+        for req, evidence in missing_requirements
+    ))
 
     # Mark all as requested
-    for req, evidence in missing_requirements:
-        req.requested_date = datetime.utcnow()
-        req.last_reminder_date = datetime.utcnow()
-        req.reminder_count += 1
-
-    db.commit()
+    _mark_requested(db, client_id, [req.id for req, evidence in missing_requirements])
 
     email_log = {
         "to": email_request.to_email,
         "cc": email_request.cc_emails,
-        "subject": subject,
-        "body": email_body,
+        "subject": email["subject"],
+        "body": email["body"],
         "document_count": len(missing_requirements),
-        "sent_at": datetime.utcnow().isoformat(),
-        "status": "simulated_success"
+        "queued_at": datetime.utcnow().isoformat(),
+        "status": "queued"
     }
+    message = outbox.enqueue(
+        db, "email", "document.requested", email_log, aggregate_type="client", aggregate_id=client_id
+    )
+    db.commit()
 
     return {
-        "message": f"Bulk email sent successfully (simulated) - {len(missing_requirements)} documents requested",
-        "email_log": email_log
+        "message": f"Bulk email queued for delivery - {len(missing_requirements)} documents requested",
+        "email_log": {**email_log, "idempotency_key": message.idempotency_key}
     }
 
 
+@router.post("/document-campaigns", status_code=202)
+def create_document_campaign(
+    request: DocumentCampaignRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Request all missing mandatory documents from many clients at once (e.g. a quarterly refresh):
+    one templated email per client, queued for delivery, with the requirements marked requested
+    """
+    recipients = dict(request.recipients)
+    if request.dry_run:
+        return document_campaign.preview(db, request.filters(), recipients, request.cc_emails)
+
+    campaign = document_campaign.create(db, request.filters(), request.name, request.requested_by)
+    if request.background:
+        background_tasks.add_task(document_campaign.run_in_background, campaign.id, recipients, request.cc_emails)
+    else:
+        document_campaign.run(db, campaign, recipients, request.cc_emails)
+    return document_campaign.report(db, campaign)
+
+
+@router.get("/document-campaigns/{campaign_id}")
+def get_document_campaign(campaign_id: int, db: Session = Depends(get_db)) -> Dict[str, Any]:
+    """Counts, throughput and email delivery progress of a document campaign"""
+    campaign = db.get(DocumentCampaign, campaign_id)
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Document campaign not found")
+    return document_campaign.report(db, campaign)
+
+
+def _mark_requested(db: Session, client_id: int, requirement_ids: List[int]):
+    """Mark a client's requirements requested now, in one UPDATE"""
+    if not requirement_ids:
+        return
+    now = datetime.utcnow()
+    db.execute(
+        update(DocumentRequirement).where(
+            DocumentRequirement.client_id == client_id,
+            DocumentRequirement.id.in_(requirement_ids)
+        ).values(
+            requested_date=now, last_reminder_date=now,
+            reminder_count=func.coalesce(DocumentRequirement.reminder_count, 0) + 1
+        ).execution_options(synchronize_session=False)
+    )
+
+
 def _sync_document_requirements(client_id: int, regimes: List[str], db: Session):
     """
     Internal helper to sync document requirements for a client.
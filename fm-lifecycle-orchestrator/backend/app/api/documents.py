@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File, Form
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import os
@@ -13,13 +13,22 @@ from ..schemas.document import (
     DocumentResponse,
     DocumentValidationResult,
     EnhancedValidationResult,
-    DocumentVerifyRequest
+    DocumentVerifyRequest,
+    DocumentImportRequest,
+    DocumentImportBatchResponse
 )
-from ..services.ai_service import ai_service
+from ..services.ai_service import ai_service, EntityExtractionError
 from ..services.document_validator import DocumentValidator
 from ..services.document_coordinates import get_coordinates_for_demo_document, is_demo_document, get_entity_label
+from ..services.document_index import document_index
+from ..services.document_import import (
+    document_import, process_document, refresh_document_index as _refresh_document_index,
+    simulated_internal_document, client_context, CATEGORY_BY_DOCUMENT_TYPE
+)
+from ..models.document_import import DocumentImportBatch
 import fitz  # PyMuPDF
 from ..config import settings
+from ..observability import get_logger, kv, tracer
 
 
 class InternalDocumentUpload(BaseModel):
@@ -30,6 +39,7 @@ class InternalDocumentUpload(BaseModel):
     uploaded_by: str
 
 router = APIRouter(prefix="/api", tags=["documents"])
+logger = get_logger(__name__)
 
 
 @router.get("/clients/{client_id}/documents", response_model=List[DocumentResponse])
@@ -112,43 +122,13 @@ async def upload_document_from_internal_system(
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"{client_id}_{timestamp}_{upload_data.document_name}"
     file_path = os.path.join(upload_dir, filename)
-
-    # Create simulated document content for demo
-    simulated_content = f"""
-INTERNAL DOCUMENT FROM {upload_data.source_system}
-
-Document Type: {upload_data.document_type}
-Source System: {upload_data.source_system}
-Client: {client.name}
-Generated: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
-
-This is a simulated document fetched from the {upload_data.source_system} system.
-In production, this would be the actual document content retrieved from {upload_data.document_url}.
-
-Legal Entity Name: {client.name}
-Country of Incorporation: {client.country_of_incorporation or 'Not specified'}
-Entity Type: {client.entity_type or 'Not specified'}
-    """
-
-    # Write simulated content to file
-    with open(file_path, "w") as f:
-        f.write(simulated_content)
+    with open(file_path, "wb") as f:
+        f.write(simulated_internal_document(
+            client_context(client), upload_data.source_system, upload_data.document_type, upload_data.document_url
+        ))
 
     # Map document type to category
-    category_mapping = {
-        "registration_certificate": DocumentCategory.REGISTRATION_CERTIFICATE,
-        "articles_of_incorporation": DocumentCategory.ARTICLES_OF_INCORPORATION,
-        "board_resolution": DocumentCategory.BOARD_RESOLUTION,
-        "kyc_documentation": DocumentCategory.KYC_DOCUMENTATION,
-        "client_confirmation": DocumentCategory.CLIENT_CONFIRMATION,
-        "product_agreement": DocumentCategory.PRODUCT_AGREEMENT,
-        "due_diligence_report": DocumentCategory.DUE_DILIGENCE_REPORT,
-        "financial_statements": DocumentCategory.FINANCIAL_STATEMENTS,
-        "compliance_certificate": DocumentCategory.COMPLIANCE_CERTIFICATE,
-        "risk_assessment": DocumentCategory.RISK_ASSESSMENT
-    }
-
-    document_category = category_mapping.get(upload_data.document_type, DocumentCategory.OTHER)
+    document_category = CATEGORY_BY_DOCUMENT_TYPE.get(upload_data.document_type, DocumentCategory.OTHER)
 
     # Create document record
     document = Document(
@@ -165,38 +145,51 @@ Entity Type: {client.entity_type or 'Not specified'}
     db.commit()
     db.refresh(document)
 
-    # Automatically trigger OCR/LLM processing
-    try:
-        # Extract text
-        extracted_text = ai_service.extract_text(file_path, "pdf")
-        document.extracted_text = extracted_text
+    # Automatically trigger OCR/LLM processing (a failure returns the document with failed status)
+    process_document(db, document, client)
+    return document
 
-        # Prepare client data for validation
-        client_data = {
-            "legal_entity_name": client.name,
-            "jurisdiction": client.country_of_incorporation or "Not specified",
-            "entity_type": client.entity_type or "Not specified"
-        }
 
-        # Run enhanced validation
-        validation_result = ai_service.enhanced_validate_document(
-            extracted_text=extracted_text,
-            client_data=client_data,
-            document_category=document.document_category.value
-        )
+@router.post("/clients/{client_id}/documents/import", response_model=DocumentImportBatchResponse, status_code=202)
+async def import_documents_from_internal_systems(
+    client_id: int,
+    request: DocumentImportRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    """
+    Import many documents from SX, CX and WX at once (all documents they list for the client
+    when none are given). Documents are fetched concurrently and then extracted and validated
+    in the background; poll GET /api/document-imports/{batch_id} for progress.
+    """
+    client = db.query(Client).filter(Client.id == client_id).first()
+    if not client:
+        raise HTTPException(status_code=404, detail="Client not found")
 
-        document.ai_validation_result = validation_result
-        document.ocr_status = OCRStatus.COMPLETED
+    if request.documents is not None:
+        sources = [source.model_dump() for source in request.documents]
+    else:
+        sources = await document_import.discover(client)
+    if not sources:
+        raise HTTPException(status_code=400, detail="No documents to import")
+    if len(sources) > settings.document_import_max_documents:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.document_import_max_documents} documents can be imported at once"
+        )
 
-        db.commit()
-        db.refresh(document)
+    batch = document_import.create_batch(db, client, sources, request.uploaded_by)
+    background_tasks.add_task(document_import.run, batch.id)
+    return batch
 
-    except Exception as e:
-        document.ocr_status = OCRStatus.FAILED
-        db.commit()
-        # Don't raise exception - return document with failed status
 
-    return document
+@router.get("/document-imports/{batch_id}", response_model=DocumentImportBatchResponse)
+def get_document_import(batch_id: int, db: Session = Depends(get_db)):
+    """Progress of a document import batch and the outcome of each document"""
+    batch = db.query(DocumentImportBatch).filter(DocumentImportBatch.id == batch_id).first()
+    if not batch:
+        raise HTTPException(status_code=404, detail="Document import not found")
+    return batch
 
 
 @router.get("/documents/{document_id}", response_model=DocumentResponse)
@@ -219,8 +212,10 @@ def delete_document(document_id: int, db: Session = Depends(get_db)):
     if os.path.exists(document.file_path):
         os.remove(document.file_path)
 
+    client_id = document.client_id
     db.delete(document)
     db.commit()
+    document_index.remove_document(client_id, document_id)
 
     return {"message": "Document deleted successfully"}
 
@@ -267,6 +262,7 @@ def validate_document(document_id: int, db: Session = Depends(get_db)):
 
         db.commit()
         db.refresh(document)
+        _refresh_document_index(document)
 
         return document
 
@@ -354,15 +350,12 @@ async def enhanced_validate_document(document_id: int, db: Session = Depends(get
 
         db.commit()
         db.refresh(document)
+        _refresh_document_index(document)
 
         return EnhancedValidationResult(**validation_result)
 
     except Exception as e:
-        import traceback
-        print(f"\n=== ENHANCED VALIDATION ERROR ===")
-        print(f"Error: {str(e)}")
-        print(f"Traceback:\n{traceback.format_exc()}")
-        print(f"=================================\n")
+        logger.exception("Enhanced validation failed", extra=kv(document_id=document_id))
         document.ocr_status = OCRStatus.FAILED
         db.commit()
         raise HTTPException(status_code=500, detail=f"Enhanced validation failed: {str(e)}")
@@ -494,10 +487,12 @@ async def annotate_document(document_id: int, db: Session = Depends(get_db)):
         extracted_text = ""
         if document.file_path.lower().endswith('.pdf'):
             try:
-                pdf_doc = fitz.open(document.file_path)
-                for page in pdf_doc:
-                    extracted_text += page.get_text()
-                pdf_doc.close()
+                with tracer.span("documents.extract_text", **{"document.id": document_id}) as span:
+                    pdf_doc = fitz.open(document.file_path)
+                    for page in pdf_doc:
+                        extracted_text += page.get_text()
+                    span.set_attribute("pages", pdf_doc.page_count)
+                    pdf_doc.close()
             except Exception as e:
                 raise HTTPException(status_code=400, detail=f"Failed to extract text from PDF: {str(e)}")
         else:
@@ -565,6 +560,7 @@ async def annotate_document(document_id: int, db: Session = Depends(get_db)):
         # 10. Update document OCR status
         document.ocr_status = OCRStatus.COMPLETED
         db.commit()
+        _refresh_document_index(document)
 
         # 11. Return annotations
         return {
@@ -592,6 +588,8 @@ async def annotate_document(document_id: int, db: Session = Depends(get_db)):
 
     except HTTPException:
         raise
+    except EntityExtractionError as e:
+        raise HTTPException(status_code=502, detail=f"Annotation failed: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Annotation failed: {str(e)}")
 
@@ -685,9 +683,7 @@ def test_llm_connection():
     Test endpoint to verify LLM connection and response parsing.
     This helps debug LLM integration issues without uploading documents.
     """
-    print("\n" + "="*80)
-    print("🧪 LLM Connection Test Started")
-    print("="*80)
+    logger.info("LLM connection test started")
 
     # Test text for entity extraction
     test_text = """
@@ -716,9 +712,7 @@ def test_llm_connection():
             entity_type="Private Limited Company"
         )
 
-        print("="*80)
-        print("✅ LLM Test Completed Successfully")
-        print("="*80 + "\n")
+        logger.info("LLM connection test completed", extra=kv(entity_count=len(result)))
 
         return {
             "status": "success",
@@ -731,9 +725,7 @@ def test_llm_connection():
         }
 
     except Exception as e:
-        print("="*80)
-        print(f"❌ LLM Test Failed: {type(e).__name__}")
-        print("="*80 + "\n")
+        logger.exception("LLM connection test failed")
 
         import traceback
         return {
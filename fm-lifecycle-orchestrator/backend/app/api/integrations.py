@@ -1,46 +1,70 @@
-from fastapi import APIRouter
-from ..integrations import sx_client, cx_client, ex_client, wx_client
+from fastapi import APIRouter, HTTPException
+from typing import Any, Awaitable, Dict
+from ..integrations.async_clients import integration_gateway, IntegrationUnavailable
 
 router = APIRouter(prefix="/api/integrations", tags=["integrations"])
 
 
+async def _lookup(call: Awaitable[Any]) -> Any:
+    """Await a gateway lookup, mapping an unavailable system (with nothing cached) to 503/404"""
+    try:
+        return await call
+    except IntegrationUnavailable as exc:
+        raise HTTPException(status_code=404 if exc.status_code == 404 else 503, detail=str(exc))
+
+
 @router.get("/sx/{entity_id}")
-def get_sx_entity(entity_id: str):
+async def get_sx_entity(entity_id: str):
     """Get legal entity data from SX system (mock)"""
-    return sx_client.get_entity(entity_id)
+    return await _lookup(integration_gateway.get_sx_entity(entity_id))
 
 
 @router.get("/cx/{client_id}")
-def get_cx_client(client_id: str):
+async def get_cx_client(client_id: str):
     """Get client data from CX system (mock)"""
-    return cx_client.get_client(client_id)
+    return await _lookup(integration_gateway.get_cx_client(client_id))
 
 
 @router.get("/cx/{client_id}/products")
-def get_cx_client_products(client_id: str):
+async def get_cx_client_products(client_id: str):
     """Get client products from CX system (mock)"""
-    return {"products": cx_client.get_client_products(client_id)}
+    return {"products": await _lookup(integration_gateway.get_cx_products(client_id))}
 
 
 @router.get("/ex/{request_id}")
-def get_ex_workflow(request_id: str):
+async def get_ex_workflow(request_id: str):
     """Get workflow status from EX system (mock)"""
-    return ex_client.get_workflow_status(request_id)
+    return await _lookup(integration_gateway.get_ex_workflow(request_id))
 
 
 @router.get("/sx/{entity_id}/documents")
-def get_sx_documents(entity_id: str):
+async def get_sx_documents(entity_id: str):
     """Get available documents for entity from SX system (mock)"""
-    return {"documents": sx_client.get_entity_documents(entity_id)}
+    return {"documents": await _lookup(integration_gateway.get_sx_documents(entity_id))}
 
 
 @router.get("/cx/{client_id}/documents")
-def get_cx_documents(client_id: str):
+async def get_cx_documents(client_id: str):
     """Get available documents for client from CX system (mock)"""
-    return {"documents": cx_client.get_client_documents(client_id)}
+    return {"documents": await _lookup(integration_gateway.get_cx_documents(client_id))}
 
 
 @router.get("/wx/{entity_id}/documents")
-def get_wx_documents(entity_id: str):
+async def get_wx_documents(entity_id: str):
     """Get available documents for entity from WX system (mock)"""
-    return {"documents": wx_client.get_available_documents(entity_id)}
+    return {"documents": await _lookup(integration_gateway.get_wx_documents(entity_id))}
+
+
+@router.get("/entities/{entity_id}/documents")
+async def get_entity_documents(entity_id: str) -> Dict[str, Any]:
+    """
+    Documents for an entity from SX, CX and WX, fetched concurrently (about as slow as the
+    slowest system). Each source reports whether it was served from cache or is unavailable.
+    """
+    return await integration_gateway.gather_documents(entity_id)
+
+
+@router.get("/status")
+def get_integration_status() -> Dict[str, Any]:
+    """Per-system base URL and circuit breaker state, and the lookup cache size"""
+    return integration_gateway.status()
@@ -1,11 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime
+from typing import Dict, List
 from ..database import get_db
-from ..models.onboarding_stage import OnboardingStage, StageStatus
 from ..models.client import Client
-from ..schemas.onboarding import OnboardingStageResponse, OnboardingStageUpdate
+from ..models.onboarding_stage import OnboardingStage, StageStatus
+from ..schemas.onboarding import (
+    OnboardingStageResponse, OnboardingStageUpdate, StageTransitionRequest, StageTransitionResult
+)
+from ..services.classification_engine import ClassificationEngine
+from ..services.regime_applicability import regime_applicability
+from ..services.sla_tracker import sla_tracker
+from ..services.stage_workflow import stage_workflow, InvalidStageTransition, WORKFLOW_STEPS
+from ..observability import get_logger, kv
+
+logger = get_logger(__name__)
 
 router = APIRouter(prefix="/api", tags=["onboarding"])
 
@@ -17,17 +25,12 @@ def get_client_onboarding_stages(client_id: int, db: Session = Depends(get_db)):
         OnboardingStage.client_id == client_id
     ).order_by(OnboardingStage.order).all()
 
-    # Calculate TAT for each stage
+    # Calculate TAT for each stage (for the response only; running totals are kept by the
+    # SLA tracker when stages change)
     for stage in stages:
         if stage.status in [StageStatus.IN_PROGRESS, StageStatus.COMPLETED, StageStatus.BLOCKED]:
             stage.calculate_tat()
 
-    # Update cumulative TAT for the client
-    client = db.query(Client).filter(Client.id == client_id).first()
-    if client:
-        client.calculate_cumulative_tat()
-        db.commit()
-
     return stages
 
 
@@ -37,32 +40,74 @@ def update_onboarding_stage(
     stage_update: OnboardingStageUpdate,
     db: Session = Depends(get_db)
 ):
-    """Update an onboarding stage with TAT calculation"""
+    """Update an onboarding stage; status changes go through the stage workflow (409 if not allowed)"""
     stage = db.query(OnboardingStage).filter(OnboardingStage.id == stage_id).first()
     if not stage:
         raise HTTPException(status_code=404, detail="Onboarding stage not found")
 
     update_data = stage_update.model_dump(exclude_unset=True)
+    new_status = update_data.pop("status", None)
 
-    # Auto-set dates based on status changes
-    if "status" in update_data:
-        new_status = update_data["status"]
-        if new_status == StageStatus.IN_PROGRESS and not stage.started_date:
-            update_data["started_date"] = datetime.utcnow()
-        elif new_status == StageStatus.COMPLETED and not stage.completed_date:
-            update_data["completed_date"] = datetime.utcnow()
-
+    # Explicit fields first; the transition only fills dates that are still empty
     for field, value in update_data.items():
         setattr(stage, field, value)
 
-    # Calculate TAT after update
-    stage.calculate_tat()
-
-    # Update cumulative TAT for the client
-    client = db.query(Client).filter(Client.id == stage.client_id).first()
-    if client:
-        client.calculate_cumulative_tat()
+    try:
+        result = stage_workflow.transition(db, [(stage, new_status)] if new_status else [])
+    except InvalidStageTransition as exc:
+        raise HTTPException(status_code=409, detail=_transition_errors(exc))
+    if not result["transitions"]:
+        # No status change: dates or target may still have moved the SLA clock
+        sla_tracker.record(db, stage)
 
     db.commit()
     db.refresh(stage)
     return stage
+
+
+@router.post("/onboarding/transitions", response_model=StageTransitionResult)
+def transition_stages(request: StageTransitionRequest, db: Session = Depends(get_db)):
+    """
+    Move onboarding stages of many clients in one transaction, e.g. after a CX batch approval.
+    Disallowed moves reject the whole request (409) unless skip_invalid is set.
+    """
+    if request.step is not None and request.step not in WORKFLOW_STEPS:
+        raise HTTPException(status_code=400, detail=f"Unknown workflow step; expected one of {sorted(WORKFLOW_STEPS)}")
+    changes = {**WORKFLOW_STEPS.get(request.step, {}), **request.changes}
+    if not changes:
+        raise HTTPException(status_code=400, detail="Provide a workflow step or stage changes")
+
+    try:
+        result = stage_workflow.apply(
+            db, request.client_ids, changes, notes=request.notes,
+            skip_invalid=request.skip_invalid, reopen=request.reopen
+        )
+    except InvalidStageTransition as exc:
+        raise HTTPException(status_code=409, detail=_transition_errors(exc))
+    db.commit()
+
+    eligible_regimes: Dict[int, List[str]] = {}
+    due = result["consumers"].get("classification", {}).get("client_ids", [])
+    if request.evaluate_classification and due:
+        engine = ClassificationEngine(db)
+        for client in db.query(Client).filter(Client.id.in_(due)).order_by(Client.id):
+            try:
+                results = engine.evaluate_regimes(client.id, regime_applicability.for_client(db, client))
+            except Exception:
+                logger.exception("Error evaluating regimes", extra=kv(client_id=client.id))
+                continue
+            eligible_regimes[client.id] = [
+                regime for regime, outcome in results.items() if outcome.get("is_eligible", False)
+            ]
+    return StageTransitionResult(**result, eligible_regimes=eligible_regimes)
+
+
+def _transition_errors(exc: InvalidStageTransition) -> Dict:
+    return {
+        "message": str(exc),
+        "errors": [
+            {**error, "stage_name": error["stage_name"].value, "from_status": error["from_status"].value,
+             "to_status": error["to_status"].value}
+            for error in exc.errors
+        ]
+    }
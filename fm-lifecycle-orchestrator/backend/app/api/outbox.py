@@ -0,0 +1,40 @@
+"""Integration outbox status, manual dispatch and dead-letter retry"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Dict, Any, Optional
+from ..database import get_db
+from ..services.outbox import outbox
+
+router = APIRouter(prefix="/api", tags=["outbox"])
+
+
+@router.get("/outbox/status")
+def get_outbox_status(db: Session = Depends(get_db)) -> Dict[str, Any]:
+    """Message counts per destination and status, and the dispatcher's last result"""
+    return {
+        "running": outbox.is_running,
+        "interval_seconds": outbox.interval_seconds,
+        "batch_size": outbox.batch_size,
+        "max_attempts": outbox.max_attempts,
+        "destinations": sorted(outbox.senders),
+        "last_run": outbox.last_run,
+        **outbox.stats(db)
+    }
+
+
+@router.post("/outbox/dispatch")
+def dispatch_outbox() -> Dict[str, Any]:
+    """Deliver due messages now instead of waiting for the next dispatcher tick"""
+    return outbox.run_once()
+
+
+@router.post("/outbox/retry-dead")
+def retry_dead_messages(
+    destination: Optional[str] = Query(None, description="Only retry messages for this destination"),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """Return dead messages to pending with a fresh attempt budget"""
+    retried = outbox.retry_dead(db, destination)
+    if retried:
+        outbox.wake()
+    return {"retried": retried}
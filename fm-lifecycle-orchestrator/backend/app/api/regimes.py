@@ -17,9 +17,13 @@ from ..schemas.classification import (
     DataQualityResult,
     EvaluationResult,
     RetriggerResult,
-    ClientAttributesUpdate
+    ClientAttributesUpdate,
+    RuleSimulationRequest,
+    RuleSimulationResult
 )
 from ..services.classification_engine import ClassificationEngine
+from ..services.eligibility_simulator import eligibility_simulator
+from ..services.decision_cache import decision_cache
 
 router = APIRouter(prefix="/api", tags=["regimes"])
 
@@ -68,6 +72,27 @@ def create_classification_rule(
     return db_rule
 
 
+@router.post("/regimes/{regime}/rules/simulate", response_model=RuleSimulationResult)
+def simulate_rule_changes(
+    regime: str,
+    request: RuleSimulationRequest,
+    db: Session = Depends(get_db)
+):
+    """Dry-run proposed rule changes across all clients and report who would flip (nothing is saved)"""
+    rules = db.query(ClassificationRule).filter(ClassificationRule.regime == regime).all()
+
+    try:
+        return eligibility_simulator.simulate(
+            db,
+            regime,
+            rules,
+            [change.model_dump(exclude_unset=True) for change in request.changes],
+            request.sample_size
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.put("/regimes/{regime}/rules/{rule_id}", response_model=ClassificationRuleResponse)
 def update_classification_rule(
     regime: str,
@@ -267,6 +292,12 @@ def update_client_attributes(
     }
 
 
+@router.get("/regimes/decision-cache/stats")
+def get_decision_cache_stats():
+    """Hit ratio and size of the eligibility decision cache"""
+    return decision_cache.snapshot()
+
+
 @router.post("/regimes/retrigger-evaluation", response_model=RetriggerResult)
 def retrigger_all_evaluations(
     regime: Optional[str] = Query(None, description="Specific regime to re-evaluate (None = all)"),
@@ -1,14 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
-import uuid
 from ..database import get_db
 from ..models.client import Client
+from ..models.cx_publication import CxPublicationItem, CxPublicationRun
 from ..models.regime_eligibility import RegimeEligibility
 from ..models.regulatory_classification import RegulatoryClassification, ValidationStatus
-from ..integrations import cx_client
+from ..schemas.regulatory import CxPublicationRequest, CxPublicationRunResponse
+from ..services.cx_publication import cx_publication, DEFAULT_DATA_QUALITY_SCORE, DATA_QUALITY_WARNING_BELOW
 
 router = APIRouter(prefix="/api", tags=["regulatory"])
 
@@ -54,108 +56,72 @@ def publish_classification_to_cx(client_id: int, db: Session = Depends(get_db))
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
 
-    # Get all RegimeEligibility records for client
-    eligibility_records = db.query(RegimeEligibility).filter(
+    # Data quality warnings for the response (the payload carries the same list)
+    quality = func.coalesce(RegimeEligibility.data_quality_score, DEFAULT_DATA_QUALITY_SCORE)
+    eligibility_quality = db.query(RegimeEligibility.regime, quality).filter(
         RegimeEligibility.client_id == client_id
-    ).all()
+    ).order_by(RegimeEligibility.regime).all()
 
-    if not eligibility_records:
+    if not eligibility_quality:
         raise HTTPException(
             status_code=400,
             detail="No classification results found for client. Run classification first."
         )
 
-    # Prepare classification data for CX
-    classification_results = []
-    data_quality_warnings = []
-
-    for eligibility in eligibility_records:
-        # Extract data quality info from eligibility record
-        data_quality_score = getattr(eligibility, 'data_quality_score', None) or 85.0
-
-        # Add to warnings if quality issues
-        if data_quality_score < 90:
-            data_quality_warnings.append(f"{eligibility.regime}: Data quality {data_quality_score}%")
-
-        classification_results.append({
-            "regime": eligibility.regime,
-            "is_eligible": eligibility.is_eligible,
-            "eligibility_reason": eligibility.eligibility_reason,
-            "matched_rules": eligibility.matched_rules,
-            "unmatched_rules": eligibility.unmatched_rules,
-            "data_quality_score": data_quality_score,
-            "last_evaluated": eligibility.last_evaluated_date.isoformat()
-        })
+    # Same pipeline as the bulk publication, for one client
+    run = cx_publication.publish(db, client_ids=[client_id])
+    item = db.query(CxPublicationItem).filter(CxPublicationItem.run_id == run.id).first()
+    if item is None or item.status != "synced":
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to publish classification to CX: {item.error if item else run.error}"
+        )
 
-    # Prepare CX payload
-    cx_payload = {
+    return {
+        "message": "Classification published to CX successfully",
         "client_id": client_id,
-        "client_name": client.name,
-        "country_of_incorporation": client.country_of_incorporation,
-        "entity_type": client.entity_type,
-        "classification_results": classification_results,
-        "data_quality_warnings": data_quality_warnings,
-        "published_at": datetime.now().isoformat(),
-        "published_by": "FM Lifecycle Orchestrator",
-        "publication_version": "1.0"
+        "cx_reference_id": item.reference_id,
+        "regimes_published": item.regimes_published,
+        "data_quality_warnings": [
+            f"{regime}: Data quality {score}%" for regime, score in eligibility_quality
+            if score < DATA_QUALITY_WARNING_BELOW
+        ],
+        "publication_status": "success",
+        "published_at": item.published_at.isoformat()
     }
 
-    try:
-        # Simulate CX API call (in production: call actual CX API)
-        cx_reference_id = f"CX-{uuid.uuid4().hex[:8].upper()}"
 
-        # In production, this would be:
-        # cx_response = cx_client.publish_classification(cx_payload)
-        # cx_reference_id = cx_response["reference_id"]
-
-        # Update client CX sync fields
-        client.cx_sync_status = "synced"
-        client.cx_sync_date = datetime.now()
-        client.cx_reference_id = cx_reference_id
-
-        # Add these fields to client_attributes for demo
-        if not client.client_attributes:
-            client.client_attributes = {}
-
-        client.client_attributes.update({
-            "cx_sync_status": "synced",
-            "cx_sync_date": datetime.now().isoformat(),
-            "cx_reference_id": cx_reference_id
-        })
-
-        db.commit()
-        db.refresh(client)
-
-        return {
-            "message": "Classification published to CX successfully",
-            "client_id": client_id,
-            "cx_reference_id": cx_reference_id,
-            "regimes_published": len(classification_results),
-            "data_quality_warnings": data_quality_warnings,
-            "publication_status": "success",
-            "published_at": datetime.now().isoformat()
-        }
-
-    except Exception as e:
-        # Update client sync status to failed
-        client.cx_sync_status = "failed"
-        client.cx_sync_date = datetime.now()
+@router.post("/cx/publications", response_model=CxPublicationRunResponse, status_code=202)
+def publish_classifications_to_cx(
+    request: CxPublicationRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    """
+    Publish classification results of many clients to CX in one run (e.g. end-of-day sync):
+    the given client_ids, or every client whose eligibility changed since its last sync
+    """
+    run = cx_publication.start_run(db)
+    if request.background:
+        background_tasks.add_task(cx_publication.run_in_background, run.id, request.client_ids, request.limit)
+    else:
+        cx_publication.publish(db, request.client_ids, request.limit, run=run)
+    return run
 
-        if not client.client_attributes:
-            client.client_attributes = {}
 
-        client.client_attributes.update({
-            "cx_sync_status": "failed",
-            "cx_sync_date": datetime.now().isoformat(),
-            "cx_sync_error": str(e)
-        })
+@router.get("/cx/publications/export")
+def export_pending_cx_publications(limit: Optional[int] = Query(None, ge=1)):
+    """Stream the payloads that the next publication would send, as NDJSON (nothing is recorded)"""
+    return StreamingResponse(cx_publication.export(limit=limit), media_type="application/x-ndjson")
 
-        db.commit()
 
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to publish classification to CX: {str(e)}"
-        )
+@router.get("/cx/publications/{run_id}", response_model=CxPublicationRunResponse)
+def get_cx_publication(run_id: int, db: Session = Depends(get_db)):
+    """Status and counts of a CX publication run"""
+    run = db.get(CxPublicationRun, run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Publication run not found")
+    return run
 
 
 @router.get("/clients/{client_id}/cx-sync-status")
@@ -171,6 +137,9 @@ def get_cx_sync_status(client_id: int, db: Session = Depends(get_db)) -> Dict[st
     sync_status = getattr(client, 'cx_sync_status', None) or client_attrs.get('cx_sync_status', 'not_synced')
     sync_date = getattr(client, 'cx_sync_date', None) or client_attrs.get('cx_sync_date')
     cx_reference_id = getattr(client, 'cx_reference_id', None) or client_attrs.get('cx_reference_id')
+    last_publication = db.query(CxPublicationItem).filter(
+        CxPublicationItem.client_id == client_id
+    ).order_by(CxPublicationItem.id.desc()).first()
 
     # Get latest classification count
     eligibility_count = db.query(RegimeEligibility).filter(
@@ -182,6 +151,7 @@ def get_cx_sync_status(client_id: int, db: Session = Depends(get_db)) -> Dict[st
         "cx_sync_status": sync_status,
         "cx_sync_date": sync_date,
         "cx_reference_id": cx_reference_id,
+        "cx_sync_error": last_publication.error if last_publication else client_attrs.get('cx_sync_error'),
         "regimes_classified": eligibility_count,
         "last_check": datetime.now().isoformat()
     }
@@ -0,0 +1,54 @@
+"""Onboarding SLA tracking: breaching stages, operations report and per-client TAT"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List
+from ..database import get_db
+from ..models.client import Client
+from ..models.stage_sla import ClientTatTotal, StageEvent, StageSlaClock
+from ..schemas.onboarding import SlaBreachItem, ClientSlaResponse
+from ..services.sla_tracker import sla_tracker
+
+router = APIRouter(prefix="/api", tags=["sla"])
+
+
+@router.get("/sla/breaching", response_model=List[SlaBreachItem])
+def get_breaching_stages(
+    within_hours: float = Query(24.0, ge=0),
+    include_breached: bool = False,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """Open stages whose SLA deadline falls within the next within_hours (soonest first)"""
+    return sla_tracker.breaching(db, within_hours, include_breached=include_breached, limit=limit)
+
+
+@router.get("/sla/report")
+def get_sla_report(
+    within_hours: float = Query(24.0, ge=0),
+    completed_since_days: float = Query(30.0, gt=0, le=3650),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """Operations-wide SLA position per stage: open, breached, breaching soon, and stages completed (late) recently"""
+    return sla_tracker.report(db, within_hours, completed_since_days=completed_since_days)
+
+
+@router.get("/clients/{client_id}/sla", response_model=ClientSlaResponse)
+def get_client_sla(client_id: int, db: Session = Depends(get_db)):
+    """Running TAT totals, stage clocks and SLA event history of a client"""
+    if not db.query(Client.id).filter(Client.id == client_id).first():
+        raise HTTPException(status_code=404, detail="Client not found")
+
+    totals = db.get(ClientTatTotal, client_id)
+    clocks = db.query(StageSlaClock).filter(StageSlaClock.client_id == client_id).order_by(StageSlaClock.started_at).all()
+    events = db.query(StageEvent).filter(StageEvent.client_id == client_id).order_by(
+        StageEvent.occurred_at, StageEvent.id
+    ).all()
+    return ClientSlaResponse(
+        client_id=client_id,
+        cumulative_tat_hours=sla_tracker.cumulative_tat_hours(totals),
+        completed_tat_hours=round(totals.completed_tat_hours, 2) if totals else 0.0,
+        completed_stages=totals.completed_stages if totals else 0,
+        open_stages=totals.open_stages if totals else 0,
+        clocks=clocks,
+        events=events
+    )
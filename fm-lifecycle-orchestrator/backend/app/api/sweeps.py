@@ -0,0 +1,24 @@
+"""Background sweep status and manual trigger"""
+from fastapi import APIRouter
+from typing import Dict, Any
+from ..services.sweep_scheduler import sweep_scheduler
+
+router = APIRouter(prefix="/api", tags=["sweeps"])
+
+
+@router.get("/sweeps/status")
+def get_sweep_status() -> Dict[str, Any]:
+    """Configuration and last result of each background sweep"""
+    return {
+        "running": sweep_scheduler.is_running,
+        "interval_seconds": sweep_scheduler.interval_seconds,
+        "batch_size": sweep_scheduler.batch_size,
+        "sweeps": list(sweep_scheduler.sweeps),
+        "last_run": sweep_scheduler.last_run
+    }
+
+
+@router.post("/sweeps/run")
+def run_sweeps() -> Dict[str, Any]:
+    """Run one tick of every sweep now (each still capped at the batch size)"""
+    return sweep_scheduler.run_once()
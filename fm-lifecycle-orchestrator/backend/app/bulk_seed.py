@@ -0,0 +1,492 @@
+"""
+Bulk loader for large synthetic datasets (performance testing and staging databases)
+
+Generates clients with realistic client_attributes, onboarding stages, tasks, documents,
+regime eligibilities and document requirements, deterministically from a seed. Rows are
+written with executemany in one transaction per batch, with primary keys assigned up front so
+child rows never wait on a flush. On SQLite the rows go straight to the driver with values
+pre-converted per column (shared JSON values serialised once); other databases use Core insert().
+
+Classification runs through a bulk path: each regime's rules are evaluated once per distinct
+attribute profile (and data quality once per distinct set of document categories), then the
+result is applied to every client sharing it. The outcome matches ClassificationEngine.
+
+Usage:
+    python -m app.bulk_seed --clients 100000 --seed 42
+    python -m app.bulk_seed --clients 5000 --append   # Keep existing data and reference rules
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Boolean, DateTime, Enum as SQLEnum, JSON, func, insert, select
+
+from .database import SessionLocal, create_missing_columns, engine
+from .models.client import Client, OnboardingStatus
+from .models.onboarding_stage import OnboardingStage, StageStatus, StageName
+from .models.task import Task, TaskStatus, TaskType
+from .models.document import Document, DocumentCategory, OCRStatus
+from .models.classification_rule import ClassificationRule
+from .models.mandatory_evidence import MandatoryEvidence
+from .models.regime_eligibility import RegimeEligibility
+from .models.document_requirement import DocumentRequirement
+from .services.classification_engine import ClassificationEngine
+
+ACCOUNT_TYPES = [
+    ("subfund", 30), ("trading_entity", 25), ("pooled_account", 15), ("allocation_account", 15),
+    ("private_banking", 8), ("business_banking", 7)
+]
+BOOKING_LOCATIONS = [
+    ("UK/London", 25), ("Singapore/SG", 15), ("Hong Kong/HK", 15), ("US/New York", 12),
+    ("India/HDFC", 6), ("India/ICICI", 5), ("India/SBI", 5), ("India/AXIS", 4),
+    ("Australia/Sydney", 5), ("Luxembourg/LU", 4), ("South Africa/JNB", 2), ("Indonesia/JKT", 2)
+]
+COUNTRIES = {
+    "UK": "United Kingdom", "Singapore": "Singapore", "Hong Kong": "Hong Kong", "US": "United States",
+    "India": "India", "Australia": "Australia", "Luxembourg": "Luxembourg", "South Africa": "South Africa",
+    "Indonesia": "Indonesia"
+}
+ENTITY_TYPES = [
+    "Limited Liability Partnership", "Private Limited Company", "Investment Fund", "Pension Fund",
+    "Insurance Company", "Corporate", "Bank", "Sovereign Wealth Fund"
+]
+PRODUCTS = [
+    ("FX Forwards", "fx", "forward"), ("FX Options", "fx", "option"), ("Interest Rate Swaps", "interest_rate", "swap"),
+    ("Swaptions", "interest_rate", "swaption"), ("Credit Default Swaps", "credit", "swap"),
+    ("Equity Options", "equity", "option"), ("Commodity Swaps", "commodity", "swap")
+]
+PRODUCT_STATUSES = [("approved", 80), ("pending", 15), ("rejected", 5)]
+RELATIONSHIP_MANAGERS = [
+    "Sarah Johnson", "Michael Chen", "Priya Sharma", "David Tan", "Emma Wilson", "Rajesh Kumar",
+    "Olivia Brown", "Wei Ling Goh"
+]
+NAME_PREFIXES = [
+    "Aldgate", "Marina", "Harbour", "Northbridge", "Lion City", "Ganges", "Victoria", "Kowloon",
+    "Thames", "Raffles", "Bombay", "Sentosa", "Canary", "Meridian", "Pacific", "Orchard"
+]
+NAME_SUFFIXES = [
+    "Capital Partners LLP", "Asset Management Pte Ltd", "Global Fund", "Investments Ltd", "Securities",
+    "Treasury Services", "Pension Trust", "Markets Ltd"
+]
+STAGE_TEAMS = [
+    "Entity Management", "Compliance", "FM Operations", "FM Ops - Data", "SSI Team", "Valuation Team"
+]
+TARGET_TAT_HOURS = [120, 240, 360, 240, 360, 240]
+TASK_TITLES = [
+    "Review KYC documentation", "Validate SSI details", "Confirm booking entity", "Chase missing board resolution",
+    "Approve product grid", "Verify legal entity identifier", "Complete regulatory classification",
+    "Set up valuation agreement"
+]
+TASK_STATUSES = [(TaskStatus.PENDING, 50), (TaskStatus.IN_PROGRESS, 30), (TaskStatus.COMPLETED, 20)]
+REQUIREMENT_STATUSES = [("compliant", 45), ("missing", 25), ("uploaded", 10), ("pending_review", 10), ("expired", 10)]
+DOCUMENT_CATEGORIES = [category for category in DocumentCategory if category != DocumentCategory.OTHER]
+
+
+def _weighted(rng: random.Random, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights=weights)[0]
+
+
+def generate_attributes(rng: random.Random) -> Dict[str, Any]:
+    """client_attributes in the shape the classification rules read"""
+    booking_location = _weighted(rng, BOOKING_LOCATIONS)
+    product, category, product_type = rng.choice(PRODUCTS)
+    return {
+        "account_type": _weighted(rng, ACCOUNT_TYPES),
+        "booking_location": booking_location,
+        "product": product,
+        "product_grid": {
+            "product_group": "financial_markets" if rng.random() < 0.95 else "transaction_banking",
+            "product_category": category,
+            "product_type": product_type,
+            "product_status": _weighted(rng, PRODUCT_STATUSES),
+            "bank_entity": booking_location
+        }
+    }
+
+
+def _sqlite_converter(column):
+    """Convert a Python value to what SQLAlchemy would store for this column on SQLite"""
+    column_type = column.type
+    if isinstance(column_type, SQLEnum):
+        return lambda value: value.name if value is not None else None
+    if isinstance(column_type, JSON):
+        return "json"
+    if isinstance(column_type, DateTime):
+        return "datetime"
+    if isinstance(column_type, Boolean):
+        return lambda value: int(value) if value is not None else None
+    return None
+
+
+def _insert_rows(conn, model, rows: List[Dict[str, Any]]):
+    table = model.__table__
+    if conn.dialect.name != "sqlite":
+        conn.execute(insert(table), rows)
+        return
+
+    columns = [column for column in table.columns if column.name in rows[0]]
+    converters = [_sqlite_converter(column) for column in columns]
+    # Eligibility rows of one attribute profile share the same rule lists; serialise each object once
+    serialised: Dict[int, str] = {}
+
+    def to_json(value):
+        if value is None:
+            return None
+        text = serialised.get(id(value))
+        if text is None:
+            text = serialised[id(value)] = json.dumps(value)
+        return text
+
+    # Most timestamps in a batch are the same few values ("now"); format each once
+    formatted: Dict[datetime, str] = {}
+
+    def to_datetime(value):
+        if value is None:
+            return None
+        text = formatted.get(value)
+        if text is None:
+            text = formatted[value] = value.strftime("%Y-%m-%d %H:%M:%S.%f")
+        return text
+
+    special = {"json": to_json, "datetime": to_datetime}
+    converters = [special.get(converter, converter) if isinstance(converter, str) else converter
+                  for converter in converters]
+    names = [column.name for column in columns]
+    params = [
+        tuple(
+            converter(row[name]) if converter else row[name]
+            for name, converter in zip(names, converters)
+        )
+        for row in rows
+    ]
+    quoted = ", ".join(f'"{name}"' for name in names)
+    placeholders = ", ".join("?" for _ in names)
+    conn.exec_driver_sql(f'INSERT INTO "{table.name}" ({quoted}) VALUES ({placeholders})', params)
+
+
+class BulkClassifier:
+    """
+    Classification for many clients at once. Rule outcomes depend only on client_attributes and
+    data quality only on the client's document categories, so each distinct profile is
+    evaluated once and shared.
+    """
+
+    def __init__(self, rules_by_regime: Dict[str, List[ClassificationRule]],
+                 mandatory_by_regime: Dict[str, List[MandatoryEvidence]]):
+        self.rules_by_regime = rules_by_regime
+        self.mandatory_by_regime = mandatory_by_regime
+        self.engine = ClassificationEngine(db=None)  # Rule matching does not touch the session
+        self._rule_cache: Dict[str, Dict[str, Tuple[list, list]]] = {}
+        self._quality_cache: Dict[Tuple[frozenset, str], float] = {}
+
+    @property
+    def profiles(self) -> int:
+        return len(self._rule_cache)
+
+    def match(self, attributes: Dict[str, Any]) -> Dict[str, Tuple[list, list]]:
+        """regime -> (matched_rules, unmatched_rules)"""
+        key = json.dumps(attributes, sort_keys=True)
+        result = self._rule_cache.get(key)
+        if result is None:
+            result = self._rule_cache[key] = {
+                regime: self.engine.match_rules(rules, attributes)
+                for regime, rules in self.rules_by_regime.items()
+            }
+        return result
+
+    def quality_score(self, categories: frozenset, regime: str) -> float:
+        """Same scoring as ClassificationEngine.calculate_data_quality_score"""
+        key = (categories, regime)
+        score = self._quality_cache.get(key)
+        if score is None:
+            evidences = self.mandatory_by_regime.get(regime, [])
+            if not evidences:
+                score = 100.0
+            else:
+                completed = sum(1 for evidence in evidences if evidence.evidence_type in categories)
+                score = round(completed / len(evidences) * 100, 2)
+            self._quality_cache[key] = score
+        return score
+
+
+class BulkSeeder:
+    """Generates and inserts synthetic clients in large batches"""
+
+    def __init__(self, seed: int = 42, batch_size: int = 5000, now: Optional[datetime] = None):
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        # Dates are relative to "now" so dashboards see recent, overdue and upcoming items
+        self.now = now or datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.counts = {"clients": 0, "stages": 0, "tasks": 0, "documents": 0, "eligibilities": 0, "requirements": 0}
+        self.classifier: Optional[BulkClassifier] = None
+        self._next_ids: Dict[str, int] = {}
+        self._evidences_by_regime: Dict[str, List[MandatoryEvidence]] = {}
+
+    def _load_reference(self):
+        db = SessionLocal()
+        try:
+            rules_by_regime: Dict[str, List[ClassificationRule]] = {}
+            for rule in db.query(ClassificationRule).filter(ClassificationRule.is_active == True).order_by(ClassificationRule.id):
+                rules_by_regime.setdefault(rule.regime, []).append(rule)
+
+            mandatory_by_regime: Dict[str, List[MandatoryEvidence]] = {}
+            for evidence in db.query(MandatoryEvidence).filter(MandatoryEvidence.is_active == True).order_by(MandatoryEvidence.id):
+                self._evidences_by_regime.setdefault(evidence.regime, []).append(evidence)
+                if evidence.is_mandatory:
+                    mandatory_by_regime.setdefault(evidence.regime, []).append(evidence)
+
+            db.expunge_all()
+        finally:
+            db.close()
+
+        if not rules_by_regime:
+            raise RuntimeError("No active classification rules; seed reference data first (python -m app.seed_data)")
+        self.classifier = BulkClassifier(rules_by_regime, mandatory_by_regime)
+
+    def _reserve_ids(self, conn):
+        for model in (Client, OnboardingStage, Task, Document, RegimeEligibility, DocumentRequirement):
+            table = model.__table__
+            self._next_ids[table.name] = (conn.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+
+    def _new_id(self, table_name: str) -> int:
+        value = self._next_ids[table_name]
+        self._next_ids[table_name] = value + 1
+        return value
+
+    def run(self, client_count: int) -> Dict[str, Any]:
+        self._load_reference()
+        start = time.perf_counter()
+
+        with engine.connect() as conn:
+            if engine.dialect.name == "sqlite":
+                # Loader connection only: skip fsync per transaction and keep temp b-trees in memory
+                conn.exec_driver_sql("PRAGMA synchronous=OFF")
+                conn.exec_driver_sql("PRAGMA temp_store=MEMORY")
+                conn.commit()
+
+            self._reserve_ids(conn)
+            conn.commit()
+            first_number = self._next_ids["clients"]
+            for offset in range(0, client_count, self.batch_size):
+                size = min(self.batch_size, client_count - offset)
+                rows = self._build_batch(first_number + offset, size)
+                with conn.begin():
+                    for model, table_rows in rows:
+                        if table_rows:
+                            _insert_rows(conn, model, table_rows)
+
+        return {
+            "clients_per_second": round(client_count / max(time.perf_counter() - start, 1e-9), 1),
+            "seconds": round(time.perf_counter() - start, 2),
+            "attribute_profiles": self.classifier.profiles,
+            "generated": dict(self.counts)
+        }
+
+    def _build_batch(self, first_number: int, size: int) -> List[Tuple[Any, List[Dict[str, Any]]]]:
+        rng = self.rng
+        now = self.now
+        clients, stages, tasks, documents, eligibilities, requirements = [], [], [], [], [], []
+
+        for number in range(first_number, first_number + size):
+            client_id = self._new_id("clients")
+            attributes = generate_attributes(rng)
+            created = now - timedelta(days=rng.randint(1, 365), hours=rng.randint(0, 23))
+            completed_stages = rng.choices(range(7), weights=[10, 15, 15, 15, 15, 10, 20])[0]
+            blocked = completed_stages < 6 and rng.random() < 0.12
+            rm = rng.choice(RELATIONSHIP_MANAGERS)
+
+            if completed_stages == 6:
+                status = OnboardingStatus.COMPLETED
+            elif blocked:
+                status = OnboardingStatus.BLOCKED
+            elif completed_stages == 0:
+                status = OnboardingStatus.INITIATED
+            else:
+                status = OnboardingStatus.IN_PROGRESS
+
+            # Onboarding stages, completed in order up to the current one
+            client_stages = []
+            cursor = created
+            total_tat = 0.0
+            for order, stage_name in enumerate(StageName):
+                started = completed = tat_hours = None
+                if order < completed_stages:
+                    started = cursor
+                    cursor = cursor + timedelta(hours=rng.randint(24, 400))
+                    completed = min(cursor, now)
+                    tat_hours = round((completed - started).total_seconds() / 3600, 2)
+                    total_tat += tat_hours
+                    stage_status = StageStatus.COMPLETED
+                elif order == completed_stages:
+                    started = min(cursor, now)
+                    stage_status = StageStatus.BLOCKED if blocked else StageStatus.IN_PROGRESS
+                else:
+                    stage_status = StageStatus.NOT_STARTED
+                stage = {
+                    "id": self._new_id("onboarding_stages"),
+                    "client_id": client_id,
+                    "stage_name": stage_name,
+                    "status": stage_status,
+                    "assigned_team": STAGE_TEAMS[order],
+                    "started_date": started,
+                    "completed_date": completed,
+                    "notes": None,
+                    "order": order,
+                    "tat_hours": tat_hours,
+                    "target_tat_hours": float(TARGET_TAT_HOURS[order])
+                }
+                client_stages.append(stage)
+            stages.extend(client_stages)
+
+            clients.append({
+                "id": client_id,
+                "name": f"{rng.choice(NAME_PREFIXES)} {rng.choice(NAME_SUFFIXES)} {number:06d}",
+                "legal_entity_id": f"SYN{number:08d}",
+                "country_of_incorporation": COUNTRIES[attributes["booking_location"].split("/")[0]],
+                "entity_type": rng.choice(ENTITY_TYPES),
+                "onboarding_status": status,
+                "created_date": created,
+                "last_updated": cursor if completed_stages else created,
+                "assigned_rm": rm,
+                "contact_email": f"documents+SYN{number:08d}@client.example.com",
+                "client_attributes": attributes,
+                "cumulative_tat_hours": round(total_tat, 2) if total_tat else None
+            })
+
+            open_stages = [stage for stage in client_stages if stage["status"] != StageStatus.COMPLETED] or client_stages
+            for _ in range(rng.randint(1, 4)):
+                stage = rng.choice(open_stages)
+                task_status = _weighted(rng, TASK_STATUSES)
+                tasks.append({
+                    "id": self._new_id("tasks"),
+                    "client_id": client_id,
+                    "onboarding_stage_id": stage["id"],
+                    "title": rng.choice(TASK_TITLES),
+                    "description": None,
+                    "assigned_to": rm,
+                    "assigned_team": stage["assigned_team"],
+                    "status": task_status,
+                    "task_type": rng.choice(list(TaskType)),
+                    "due_date": now + timedelta(days=rng.randint(-10, 30)),
+                    "completed_date": now if task_status == TaskStatus.COMPLETED else None,
+                    "created_date": created
+                })
+
+            client_documents = []
+            for _ in range(rng.randint(2, 6)):
+                category = rng.choice(DOCUMENT_CATEGORIES)
+                client_documents.append({
+                    "id": self._new_id("documents"),
+                    "client_id": client_id,
+                    "regulatory_classification_id": None,
+                    "filename": f"{category.value}_SYN{number:08d}.pdf",
+                    "file_path": f"/uploads/synthetic/SYN{number:08d}/{category.value}.pdf",
+                    "file_type": "application/pdf",
+                    "upload_date": created + timedelta(days=rng.randint(0, 30)),
+                    "uploaded_by": rm,
+                    "document_category": category,
+                    "ocr_status": OCRStatus.COMPLETED,
+                    "extracted_text": f"{category.value.replace('_', ' ').title()} for client SYN{number:08d}",
+                    "ai_validation_result": None
+                })
+            documents.extend(client_documents)
+            categories = frozenset(document["document_category"].value for document in client_documents)
+
+            for regime, (matched, unmatched) in self.classifier.match(attributes).items():
+                quality = self.classifier.quality_score(categories, regime)
+                # Engine flags a score below 90 or any missing mandatory evidence, i.e. anything below 100
+                has_exceptions = quality < 100.0
+                is_eligible = not unmatched and bool(matched)
+                eligibilities.append({
+                    "id": self._new_id("regime_eligibilities"),
+                    "client_id": client_id,
+                    "regime": regime,
+                    "is_eligible": is_eligible,
+                    "eligibility_reason": ClassificationEngine.eligibility_reason(
+                        regime, matched, unmatched, len(matched) + len(unmatched), has_exceptions
+                    ),
+                    "matched_rules": matched,
+                    "unmatched_rules": unmatched,
+                    "client_attributes": attributes,
+                    "rule_version": None,
+                    "data_quality_score": quality,
+                    "last_evaluated_date": now,
+                    "created_date": now
+                })
+                if not is_eligible:
+                    continue
+
+                for evidence in self._evidences_by_regime.get(regime, []):
+                    requirement_status = _weighted(rng, REQUIREMENT_STATUSES)
+                    document = rng.choice(client_documents) if requirement_status != "missing" else None
+                    requirements.append({
+                        "id": self._new_id("document_requirements"),
+                        "client_id": client_id,
+                        "regime": regime,
+                        "evidence_id": evidence.id,
+                        "document_id": document["id"] if document else None,
+                        "status": requirement_status,
+                        "requested_date": None,
+                        "received_date": document["upload_date"] if document else None,
+                        "expiry_date": (
+                            document["upload_date"] + timedelta(days=evidence.validity_days or 365)
+                            if document else None
+                        ),
+                        "last_reminder_date": None,
+                        "reminder_count": 0,
+                        "notes": None,
+                        "created_date": now,
+                        "updated_date": now
+                    })
+
+        self.counts["clients"] += len(clients)
+        self.counts["stages"] += len(stages)
+        self.counts["tasks"] += len(tasks)
+        self.counts["documents"] += len(documents)
+        self.counts["eligibilities"] += len(eligibilities)
+        self.counts["requirements"] += len(requirements)
+
+        # Parents before children for foreign keys
+        return [
+            (Client, clients), (OnboardingStage, stages), (Task, tasks), (Document, documents),
+            (RegimeEligibility, eligibilities), (DocumentRequirement, requirements)
+        ]
+
+
+def bulk_seed(client_count: int, seed: int = 42, batch_size: int = 5000, reference: bool = True) -> Dict[str, Any]:
+    """
+    Load client_count synthetic clients. With reference=True the database is first reset
+    and seeded with the demo data and classification rules from app.seed_data.
+    """
+    result: Dict[str, Any] = {"seed": seed, "batch_size": batch_size}
+    if reference:
+        from .seed_data import seed_data
+        start = time.perf_counter()
+        seed_data()
+        result["reference_seconds"] = round(time.perf_counter() - start, 2)
+    else:
+        # Appending to a database created before newer nullable columns
+        create_missing_columns()
+
+    result.update(BulkSeeder(seed=seed, batch_size=batch_size).run(client_count))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-load synthetic clients into the configured database")
+    parser.add_argument("--clients", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=5000, help="Clients per transaction")
+    parser.add_argument("--append", action="store_true", help="Keep existing data instead of resetting and reseeding")
+    args = parser.parse_args()
+
+    result = bulk_seed(args.clients, args.seed, args.batch_size, reference=not args.append)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
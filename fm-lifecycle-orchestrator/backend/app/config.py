@@ -10,6 +10,24 @@ class Settings(BaseSettings):
     llm_enabled: bool = False  # Set to True to use real LLM instead of simulation
     llm_verify_ssl: bool = True  # Set to False to disable SSL verification (for internal/self-signed certs)
     llm_stream: bool = True  # Set to True to use streaming responses
+    llm_json_mode: bool = True  # Request JSON mode (response_format) for structured output
+    llm_json_repair_attempts: int = 2  # Targeted retries when structured output is malformed
+    llm_coalesce_requests: bool = True  # Identical concurrent LLM requests share one call
+    llm_result_cache_ttl_seconds: float = 30.0  # Reuse identical LLM results for this long (0 disables)
+    llm_result_cache_max_entries: int = 256
+
+    # LLM request scheduling (rate limits, retries, priority lanes)
+    llm_requests_per_minute: int = 60
+    llm_tokens_per_minute: int = 90000
+    llm_rate_burst_seconds: float = 5.0  # Budget that may be spent in one burst
+    llm_max_concurrency: int = 4  # Concurrent in-flight LLM requests
+    llm_max_retries: int = 4  # Retries on 429, 5xx and connection errors
+    llm_backoff_base_seconds: float = 0.5
+    llm_backoff_max_seconds: float = 20.0
+    llm_priority_aging_seconds: float = 30.0  # Waiting this long promotes a request by one lane
+    llm_interactive_deadline_seconds: float = 30.0  # Chat
+    llm_standard_deadline_seconds: float = 60.0  # Document validation
+    llm_batch_deadline_seconds: float = 180.0  # Annotation and insights
 
     # Legacy OpenAI fields (kept for backward compatibility)
     openai_api_key: str = ""
@@ -20,6 +38,110 @@ class Settings(BaseSettings):
     upload_dir: str = "./uploads"
     cors_origins: str = "http://localhost:5173"
 
+    # Document retrieval index (chat grounding over extracted document text)
+    document_index_dir: str = "./document_index"
+    document_index_chunk_words: int = 120  # Words per chunk
+    document_index_chunk_overlap: int = 20  # Words shared between consecutive chunks
+    document_index_top_k: int = 5  # Passages added to the chat context per question
+    document_index_embedding_model: str = ""  # Optional local sentence-transformers model path (re-ranking)
+
+    # Multi-turn chat sessions
+    chat_session_max_sessions: int = 500  # In-process LRU capacity
+    chat_session_max_turns: int = 6  # Recent messages sent verbatim; older ones are folded into the summary
+    chat_session_summary_chars: int = 2000  # Upper bound on the rolling summary length
+    chat_session_persist: bool = False  # Also persist sessions to the chat_sessions table
+
+    # Eligibility decision cache (skips re-evaluation when rules, attributes and documents are unchanged)
+    classification_decision_cache_enabled: bool = True
+    classification_decision_cache_max_entries: int = 50000  # (client, regime) decisions kept in process
+
+    # Background sweeps (requirement expiry, periodic review tasks, document reminders)
+    sweep_enabled: bool = True
+    sweep_interval_seconds: float = 300.0
+    sweep_batch_size: int = 500  # Rows processed per sweep per tick
+    sweep_review_lead_days: int = 30  # Queue review tasks this long before next_review_date
+    sweep_reminder_interval_days: int = 7  # Minimum gap between reminders for a requirement
+    sweep_max_reminders: int = 5
+
+    # CX publication (bulk sync of classification results to CX)
+    cx_transport: str = "local"  # local (NDJSON files in cx_export_dir) or http (cx_publish_url)
+    cx_export_dir: str = "./cx_exports"
+    cx_publish_url: str = ""  # CX bulk publication endpoint accepting application/x-ndjson
+    cx_publish_timeout_seconds: float = 300.0
+    cx_verify_ssl: bool = True
+    cx_publication_batch_size: int = 1000  # Eligibility rows fetched per round trip while building payloads
+    cx_publication_max_clients: int = 50000  # Upper bound on clients in one run
+
+    # Integration outbox (CX/SX/EX/email messages written with the business change, delivered in batches)
+    outbox_enabled: bool = True
+    outbox_interval_seconds: float = 1.0
+    outbox_batch_size: int = 200  # Messages claimed and sent per batch
+    outbox_max_attempts: int = 8  # Then the message is dead until retried via the API
+    outbox_backoff_base_seconds: float = 2.0  # Doubles per attempt, with jitter
+    outbox_backoff_max_seconds: float = 600.0
+    outbox_lease_seconds: float = 60.0  # A claimed batch is redelivered after this if never recorded
+    outbox_timeout_seconds: float = 10.0
+    outbox_verify_ssl: bool = True
+    outbox_cx_url: str = ""  # Batch endpoints; empty uses the in-process stand-in
+    outbox_sx_url: str = ""
+    outbox_ex_url: str = ""
+    outbox_email_url: str = ""
+
+    # Integration lookups (async SX/CX/WX/EX reads with caching and circuit breaking)
+    integration_sx_url: str = ""  # Base URLs; empty serves the system from its in-process mock
+    integration_cx_url: str = ""
+    integration_wx_url: str = ""
+    integration_ex_url: str = ""
+    integration_timeout_seconds: float = 5.0
+    integration_connect_timeout_seconds: float = 2.0
+    integration_max_connections: int = 100  # Shared connection pool across all systems
+    integration_max_keepalive_connections: int = 20
+    integration_verify_ssl: bool = True
+    integration_cache_ttl_seconds: float = 300.0  # Unless the system sends Cache-Control max-age
+    integration_cache_max_entries: int = 10000
+    integration_breaker_failure_threshold: int = 5  # Consecutive failures before failing fast
+    integration_breaker_reset_seconds: float = 30.0
+
+    # Document import (bulk fetch of a client's SX/CX/WX documents into the upload store)
+    document_import_max_documents: int = 100  # Per batch
+    document_import_concurrency_per_source: int = 4  # Concurrent fetches per source system
+    document_import_processing_workers: int = 4  # Threads running extraction and validation
+    document_import_chunk_bytes: int = 65536  # Streaming chunk size when writing fetched files
+
+    # Mail transport for outbox email messages when OUTBOX_EMAIL_URL is empty
+    mail_transport: str = "local"  # local (in-process stand-in) or smtp
+    smtp_host: str = "localhost"
+    smtp_port: int = 1025
+    smtp_username: str = ""
+    smtp_password: str = ""
+    smtp_use_tls: bool = False  # STARTTLS after EHLO
+    smtp_timeout_seconds: float = 30.0
+    mail_from: str = "fm-client-readiness@example.com"
+
+    # Document request campaigns (bulk missing-document emails across many clients)
+    campaign_batch_size: int = 2000  # Requirement rows selected, updated and queued per transaction
+    campaign_max_clients: int = 50000  # Upper bound on clients emailed by one campaign
+    campaign_min_days_between_requests: int = 7  # Requirements requested more recently are skipped
+
+    # Client search (full-text index over names, LEIs, RMs, jurisdictions and document text)
+    client_search_page_size: int = 20
+    client_search_max_page_size: int = 100
+    client_search_recent_days: int = 30  # "recent" in a search means updated within this window
+    search_vocabulary_refresh_seconds: float = 60.0  # Max staleness of DB countries/entity types/RMs in the parser
+
+    # Logging and tracing
+    log_level: str = "INFO"
+    log_format: str = "json"  # json or text
+    log_file: str = ""  # Empty logs to stderr
+    log_sample_rate: float = 0.01  # Fraction of high-volume debug events kept
+    log_access_sample_rate: float = 1.0  # Fraction of per-request access log lines kept
+    tracing_enabled: bool = False
+    tracing_exporter: str = "file"  # file (JSONL spans) or otlp (requires opentelemetry-sdk)
+    tracing_file: str = "./traces/spans.jsonl"
+    tracing_otlp_endpoint: str = "http://localhost:4318/v1/traces"
+    tracing_sample_rate: float = 1.0  # Fraction of requests traced
+    metrics_enabled: bool = True  # Prometheus text exposition at /metrics
+
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding='utf-8')
 
     @property
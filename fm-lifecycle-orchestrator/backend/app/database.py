@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
@@ -11,6 +11,43 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+def create_missing_columns():
+    """
+    create_all only creates columns together with new tables; add nullable columns declared on
+    models after their table already existed
+    """
+    existing = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        if not existing.has_table(table.name):
+            continue
+        present = {column["name"] for column in existing.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in present or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=engine.dialect)
+            with engine.begin() as connection:
+                connection.exec_driver_sql(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}')
+
+
+def create_missing_indexes():
+    """
+    create_all only creates indexes together with new tables; add indexes declared on
+    models after their table already existed
+    """
+    existing = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        if not existing.has_table(table.name):
+            continue
+        present = {index["name"] for index in existing.get_indexes(table.name)}
+        missing = [index for index in table.indexes if index.name not in present]
+        for index in missing:
+            index.create(bind=engine)
+        if missing and engine.dialect.name == "sqlite":
+            # Planner statistics, so SQLite picks the selective index among several candidates
+            with engine.begin() as connection:
+                connection.exec_driver_sql(f'ANALYZE "{table.name}"')
+
+
 def get_db():
     db = SessionLocal()
     try:
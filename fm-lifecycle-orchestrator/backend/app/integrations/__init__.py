@@ -2,5 +2,7 @@ from .sx_client import sx_client
 from .cx_client import cx_client
 from .ex_client import ex_client
 from .wx_client import wx_client
+from .cx_transport import cx_transport
+from .async_clients import integration_gateway
 
-__all__ = ["sx_client", "cx_client", "ex_client", "wx_client"]
+__all__ = ["sx_client", "cx_client", "ex_client", "wx_client", "cx_transport", "integration_gateway"]
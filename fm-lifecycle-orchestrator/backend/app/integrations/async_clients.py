@@ -0,0 +1,416 @@
+"""
+Async Integration Clients - SX, CX, WX and EX lookups over one pooled httpx.AsyncClient
+
+Every lookup goes through:
+- a per-system circuit breaker: after breaker_failure_threshold consecutive failures (connection
+  errors, timeouts, 5xx) calls fail fast for breaker_reset_seconds, then one trial call decides
+  whether the system is back
+- a TTL cache per (system, path): fresh entries are served without a call; expired entries are
+  revalidated with If-None-Match, so an unchanged entity costs a 304 instead of a body; when the
+  system is down or the breaker is open, an expired entry is served as stale
+- in-flight coalescing: concurrent lookups of the same path share one call
+
+Systems without a configured URL are served by the in-process mock clients through an httpx
+mock transport (with ETags), so the same caching and breaker code runs in every environment.
+"""
+import asyncio
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+import httpx
+
+from ..config import settings
+from ..observability import get_logger, kv
+from ..observability.metrics import integration_lookups_total, integration_lookup_duration_seconds
+from .cx_client import cx_client
+from .ex_client import ex_client
+from .sx_client import sx_client
+from .wx_client import wx_client
+
+logger = get_logger(__name__)
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+class IntegrationUnavailable(Exception):
+    """A lookup failed and no cached response could stand in for it"""
+
+    def __init__(self, system: str, reason: str, status_code: Optional[int] = None):
+        self.system = system
+        self.reason = reason
+        self.status_code = status_code
+        super().__init__(f"{system.upper()} unavailable: {reason}")
+
+
+class CircuitBreaker:
+    """Closed -> open after consecutive failures -> half-open trial after the reset timeout"""
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_seconds:
+            self.state = "half_open"
+            self._trial_in_flight = False
+        if self.state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                logger.warning("Integration circuit opened", extra=kv(system=self.name, failures=self.failures))
+            self.state = "open"
+            self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def release_trial(self):
+        """Free a half-open trial that ended without an outcome (cancelled, unexpected error)"""
+        if self.state == "half_open":
+            self._trial_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"state": self.state, "failures": self.failures}
+
+
+@dataclass
+class _CacheEntry:
+    value: Any
+    etag: Optional[str]
+    expires_at: float
+
+
+class ResponseCache:
+    """LRU of parsed responses with their ETag and expiry"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], _CacheEntry]" = OrderedDict()
+
+    def get(self, key: Tuple[str, str]) -> Optional[_CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: Tuple[str, str], value: Any, etag: Optional[str], ttl_seconds: float):
+        self._entries[key] = _CacheEntry(value, etag, time.monotonic() + ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, system: str, path_prefix: str = "") -> int:
+        keys = [key for key in self._entries if key[0] == system and key[1].startswith(path_prefix)]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+def _mock_routes() -> Dict[str, List[Tuple[re.Pattern, Callable[[str], Any]]]]:
+    """Paths of the remote SX/CX/WX/EX APIs answered by the mock clients"""
+    def route(pattern: str):
+        return re.compile(f"^{pattern}$")
+    return {
+        "sx": [
+            (route(r"/entities/([^/]+)"), sx_client.get_entity),
+            (route(r"/entities/([^/]+)/documents"), lambda key: {"documents": sx_client.get_entity_documents(key)}),
+        ],
+        "cx": [
+            (route(r"/clients/([^/]+)"), cx_client.get_client),
+            (route(r"/clients/([^/]+)/products"), lambda key: {"products": cx_client.get_client_products(key)}),
+            (route(r"/clients/([^/]+)/documents"), lambda key: {"documents": cx_client.get_client_documents(key)}),
+        ],
+        "wx": [
+            (route(r"/entities/([^/]+)/documents"), lambda key: {"documents": wx_client.get_available_documents(key)}),
+        ],
+        "ex": [
+            (route(r"/workflows/([^/]+)"), ex_client.get_workflow_status),
+        ],
+    }
+
+
+def mock_transport(system: str) -> httpx.MockTransport:
+    """Serves a system's lookups from its mock client, with ETags and 304s like a real API"""
+    routes = _mock_routes()[system]
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        for pattern, lookup in routes:
+            match = pattern.match(request.url.path)
+            if match:
+                body = json.dumps(lookup(match.group(1)), separators=(",", ":")).encode("utf-8")
+                etag = _etag(body)
+                if request.headers.get("If-None-Match") == etag:
+                    return httpx.Response(304, headers={"ETag": etag})
+                return httpx.Response(200, content=body, headers={"ETag": etag, "Content-Type": "application/json"})
+        return httpx.Response(404, json={"detail": "Not found"})
+
+    return httpx.MockTransport(handle)
+
+
+class IntegrationGateway:
+    """Cached, circuit-broken async lookups against SX, CX, WX and EX"""
+
+    def __init__(
+        self,
+        base_urls: Dict[str, str],
+        timeout_seconds: float = 5.0,
+        connect_timeout_seconds: float = 2.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        verify_ssl: bool = True,
+        cache_ttl_seconds: float = 300.0,
+        cache_max_entries: int = 10000,
+        breaker_failure_threshold: int = 5,
+        breaker_reset_seconds: float = 30.0
+    ):
+        # Unconfigured systems get a local base URL routed to their mock transport
+        self.base_urls = {system: (url or f"http://{system}.mock").rstrip("/") for system, url in base_urls.items()}
+        self.mocked = sorted(system for system, url in base_urls.items() if not url)
+        self.timeout = httpx.Timeout(timeout_seconds, connect=connect_timeout_seconds)
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive_connections)
+        self.verify_ssl = verify_ssl
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.cache = ResponseCache(cache_max_entries)
+        self.breakers = {
+            system: CircuitBreaker(system, breaker_failure_threshold, breaker_reset_seconds) for system in self.base_urls
+        }
+        self._http: Optional[httpx.AsyncClient] = None
+        self._inflight: Dict[Tuple[str, str], "asyncio.Future[Dict[str, Any]]"] = {}
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """The shared pooled client, created on first use inside the event loop"""
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                timeout=self.timeout, limits=self.limits, verify=self.verify_ssl,
+                mounts={self.base_urls[system]: mock_transport(system) for system in self.mocked}
+            )
+        return self._http
+
+    async def aclose(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def fetch(self, system: str, path: str, ttl_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """
+        GET a system path through the cache. Returns {"value", "outcome", "elapsed_ms"} where
+        outcome is hit, revalidated, miss or stale. Raises IntegrationUnavailable.
+        """
+        key = (system, path)
+        entry = self.cache.get(key)
+        if entry is not None and entry.expires_at > time.monotonic():
+            integration_lookups_total.inc(system=system, outcome="hit")
+            return {"value": entry.value, "outcome": "hit", "elapsed_ms": 0.0}
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._fetch_remote(system, path, entry, self.cache_ttl_seconds if ttl_seconds is None else ttl_seconds)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Retrieved here so an exception nobody else awaited is not reported as unhandled
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _fetch_remote(
+        self, system: str, path: str, entry: Optional[_CacheEntry], ttl_seconds: float
+    ) -> Dict[str, Any]:
+        breaker = self.breakers[system]
+        if not breaker.allow():
+            return self._stale_or_raise(system, entry, "circuit open")
+        trial = breaker.state == "half_open"
+        try:
+            return await self._request(system, path, entry, ttl_seconds, breaker)
+        finally:
+            # A trial that recorded an outcome already left half-open; any other exit must not
+            # keep the breaker waiting forever on a trial that will never report back
+            if trial:
+                breaker.release_trial()
+
+    async def _request(
+        self, system: str, path: str, entry: Optional[_CacheEntry], ttl_seconds: float, breaker: CircuitBreaker
+    ) -> Dict[str, Any]:
+        key = (system, path)
+        headers = {"If-None-Match": entry.etag} if entry is not None and entry.etag else {}
+        start = time.perf_counter()
+        try:
+            response = await self.http.get(self.base_urls[system] + path, headers=headers)
+        except httpx.HTTPError as exc:
+            breaker.record_failure()
+            return self._stale_or_raise(system, entry, f"{type(exc).__name__}: {exc}")
+        finally:
+            integration_lookup_duration_seconds.observe(time.perf_counter() - start, system=system)
+        elapsed_ms = round((time.perf_counter() - start) * 1000, 2)
+
+        if response.status_code >= 500:
+            breaker.record_failure()
+            return self._stale_or_raise(system, entry, f"HTTP {response.status_code}", response.status_code)
+        breaker.record_success()
+        ttl_seconds = self._ttl(response, ttl_seconds)
+
+        if response.status_code == 304 and entry is not None:
+            self.cache.put(key, entry.value, entry.etag, ttl_seconds)
+            integration_lookups_total.inc(system=system, outcome="revalidated")
+            return {"value": entry.value, "outcome": "revalidated", "elapsed_ms": elapsed_ms}
+        if response.status_code >= 400:
+            integration_lookups_total.inc(system=system, outcome="error")
+            raise IntegrationUnavailable(system, f"HTTP {response.status_code}", response.status_code)
+
+        value = response.json()
+        if ttl_seconds > 0:
+            self.cache.put(key, value, response.headers.get("ETag"), ttl_seconds)
+        integration_lookups_total.inc(system=system, outcome="miss")
+        return {"value": value, "outcome": "miss", "elapsed_ms": elapsed_ms}
+
+    @staticmethod
+    def _ttl(response: httpx.Response, default: float) -> float:
+        """Cache-Control from the system wins over the configured TTL"""
+        cache_control = response.headers.get("Cache-Control", "")
+        if "no-store" in cache_control:
+            return 0.0
+        match = _MAX_AGE.search(cache_control)
+        return float(match.group(1)) if match else default
+
+    @staticmethod
+    def _stale_or_raise(
+        system: str, entry: Optional[_CacheEntry], reason: str, status_code: Optional[int] = None
+    ) -> Dict[str, Any]:
+        if entry is not None:
+            integration_lookups_total.inc(system=system, outcome="stale")
+            logger.warning("Serving stale integration response", extra=kv(system=system, reason=reason))
+            return {"value": entry.value, "outcome": "stale", "elapsed_ms": 0.0}
+        integration_lookups_total.inc(system=system, outcome="error")
+        raise IntegrationUnavailable(system, reason, status_code)
+
+    async def get(self, system: str, path: str, ttl_seconds: Optional[float] = None) -> Any:
+        return (await self.fetch(system, path, ttl_seconds))["value"]
+
+    # Lookups (same shapes as the synchronous mock clients)
+
+    async def get_sx_entity(self, entity_id: str) -> Dict[str, Any]:
+        return await self.get("sx", f"/entities/{quote(entity_id, safe='')}")
+
+    async def get_sx_documents(self, entity_id: str) -> List[Dict[str, Any]]:
+        return (await self.get("sx", f"/entities/{quote(entity_id, safe='')}/documents"))["documents"]
+
+    async def get_cx_client(self, client_id: str) -> Dict[str, Any]:
+        return await self.get("cx", f"/clients/{quote(client_id, safe='')}")
+
+    async def get_cx_products(self, client_id: str) -> List[str]:
+        return (await self.get("cx", f"/clients/{quote(client_id, safe='')}/products"))["products"]
+
+    async def get_cx_documents(self, client_id: str) -> List[Dict[str, Any]]:
+        return (await self.get("cx", f"/clients/{quote(client_id, safe='')}/documents"))["documents"]
+
+    async def get_wx_documents(self, entity_id: str) -> List[Dict[str, Any]]:
+        return (await self.get("wx", f"/entities/{quote(entity_id, safe='')}/documents"))["documents"]
+
+    async def get_ex_workflow(self, request_id: str) -> Dict[str, Any]:
+        # Workflow status moves on quickly; keep it for a fraction of the entity TTL
+        return await self.get("ex", f"/workflows/{quote(request_id, safe='')}", ttl_seconds=min(self.cache_ttl_seconds, 30.0))
+
+    async def gather_documents(self, entity_id: str) -> Dict[str, Any]:
+        """
+        SX, CX and WX documents for one entity, fetched concurrently. A failing system is
+        reported in sources instead of failing the whole lookup.
+        """
+        lookups: Dict[str, Awaitable[Dict[str, Any]]] = {
+            "sx": self.fetch("sx", f"/entities/{quote(entity_id, safe='')}/documents"),
+            "cx": self.fetch("cx", f"/clients/{quote(entity_id, safe='')}/documents"),
+            "wx": self.fetch("wx", f"/entities/{quote(entity_id, safe='')}/documents"),
+        }
+        start = time.perf_counter()
+        results = await asyncio.gather(*lookups.values(), return_exceptions=True)
+        documents: List[Dict[str, Any]] = []
+        sources: Dict[str, Dict[str, Any]] = {}
+        for system, result in zip(lookups, results):
+            if isinstance(result, IntegrationUnavailable):
+                sources[system] = {"status": "unavailable", "error": result.reason}
+                continue
+            if isinstance(result, BaseException):
+                raise result
+            system_documents = result["value"]["documents"]
+            documents.extend({**document, "source_system": system.upper()} for document in system_documents)
+            sources[system] = {
+                "status": "ok", "outcome": result["outcome"], "documents": len(system_documents),
+                "elapsed_ms": result["elapsed_ms"]
+            }
+        return {
+            "entity_id": entity_id,
+            "documents": documents,
+            "sources": sources,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 2)
+        }
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "systems": {
+                system: {"base_url": url, "mocked": system in self.mocked, "breaker": self.breakers[system].snapshot()}
+                for system, url in self.base_urls.items()
+            },
+            "cache_entries": len(self.cache),
+            "cache_ttl_seconds": self.cache_ttl_seconds
+        }
+
+
+def build_integration_gateway() -> IntegrationGateway:
+    return IntegrationGateway(
+        base_urls={
+            "sx": settings.integration_sx_url,
+            "cx": settings.integration_cx_url,
+            "wx": settings.integration_wx_url,
+            "ex": settings.integration_ex_url,
+        },
+        timeout_seconds=settings.integration_timeout_seconds,
+        connect_timeout_seconds=settings.integration_connect_timeout_seconds,
+        max_connections=settings.integration_max_connections,
+        max_keepalive_connections=settings.integration_max_keepalive_connections,
+        verify_ssl=settings.integration_verify_ssl,
+        cache_ttl_seconds=settings.integration_cache_ttl_seconds,
+        cache_max_entries=settings.integration_cache_max_entries,
+        breaker_failure_threshold=settings.integration_breaker_failure_threshold,
+        breaker_reset_seconds=settings.integration_breaker_reset_seconds
+    )
+
+
+# Singleton instance
+integration_gateway = build_integration_gateway()
@@ -0,0 +1,101 @@
+"""CX Publication Transports - deliver classification payloads to CX as NDJSON (one client per line)"""
+import json
+import os
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator
+
+import httpx
+
+from ..config import settings
+
+
+def ndjson_lines(records: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    """Encode records one JSON object per line"""
+    for record in records:
+        yield json.dumps(record, separators=(",", ":"), default=str).encode("utf-8") + b"\n"
+
+
+class CXTransport:
+    """
+    Sends a stream of client payloads to CX in one call.
+
+    publish() returns {"batch_reference": str, "results": {client_id: {"status", "reference_id", "error"}}};
+    clients missing from results were not accepted by CX.
+    """
+
+    name = "base"
+
+    def publish(self, records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class LocalCXTransport(CXTransport):
+    """Stub for environments without CX: writes the NDJSON batch to a file and accepts every client"""
+
+    name = "local"
+
+    def __init__(self, export_dir: str):
+        self.export_dir = export_dir
+
+    def publish(self, records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        os.makedirs(self.export_dir, exist_ok=True)
+        path = os.path.join(self.export_dir, f"cx-publication-{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:6]}.ndjson")
+        results: Dict[int, Dict[str, Any]] = {}
+
+        def accepted():
+            # Simulated CX acceptance: one reference per client, as the CX API would return
+            for record in records:
+                results[record["client_id"]] = {
+                    "status": "synced", "reference_id": f"CX-{uuid.uuid4().hex[:8].upper()}", "error": None
+                }
+                yield record
+
+        with open(path, "wb") as export:
+            for line in ndjson_lines(accepted()):
+                export.write(line)
+        return {"batch_reference": path, "results": results}
+
+
+class HttpCXTransport(CXTransport):
+    """
+    Streams the batch to the CX bulk publication endpoint as a chunked application/x-ndjson body.
+    CX answers with one NDJSON line per client: {"client_id", "status", "reference_id", "error"}.
+    """
+
+    name = "http"
+
+    def __init__(self, url: str, timeout_seconds: float = 300.0, verify_ssl: bool = True):
+        self.url = url
+        self.timeout_seconds = timeout_seconds
+        self.verify_ssl = verify_ssl
+
+    def publish(self, records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        with httpx.Client(timeout=self.timeout_seconds, verify=self.verify_ssl) as http:
+            response = http.post(
+                self.url, content=ndjson_lines(records), headers={"Content-Type": "application/x-ndjson"}
+            )
+            response.raise_for_status()
+        results: Dict[int, Dict[str, Any]] = {}
+        for line in response.text.splitlines():
+            if line.strip():
+                result = json.loads(line)
+                results[int(result["client_id"])] = {
+                    "status": result.get("status", "synced"),
+                    "reference_id": result.get("reference_id"),
+                    "error": result.get("error")
+                }
+        return {"batch_reference": response.headers.get("X-Batch-Id"), "results": results}
+
+
+def build_cx_transport() -> CXTransport:
+    if settings.cx_transport == "http":
+        return HttpCXTransport(
+            settings.cx_publish_url, timeout_seconds=settings.cx_publish_timeout_seconds,
+            verify_ssl=settings.cx_verify_ssl
+        )
+    return LocalCXTransport(settings.cx_export_dir)
+
+
+# Singleton instance
+cx_transport = build_cx_transport()
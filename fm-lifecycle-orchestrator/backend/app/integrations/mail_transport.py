@@ -0,0 +1,132 @@
+"""Mail Transport - sends batches of rendered emails (to, cc, subject, body) over SMTP"""
+import hashlib
+import smtplib
+from email.header import Header
+from email.mime.text import MIMEText
+from email.utils import formatdate
+from typing import Any, Dict, List, Optional
+
+from ..config import settings
+from ..observability import get_logger, kv
+
+logger = get_logger(__name__)
+
+
+class MailTransport:
+    """
+    send_many() sends a batch of emails ({"key", "to", "cc", "subject", "body"}) and returns
+    {key: error or None}. Keys missing from the result count as not sent; raising fails the batch.
+    """
+
+    def send_many(self, emails: List[Dict[str, Any]]) -> Dict[str, Optional[str]]:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+def message_id(key: str, domain: str = "fm-orchestrator") -> str:
+    """Message-ID derived from the idempotency key, so a redelivered email keeps its identity"""
+    return f"<{hashlib.sha1(key.encode()).hexdigest()}@{domain}>"
+
+
+class SmtpMailTransport(MailTransport):
+    """
+    Sends each batch over one SMTP connection (EHLO, optional STARTTLS and login once per batch)
+    instead of a connection per email. A refused recipient fails only that email; a dropped
+    connection keeps the emails already accepted and leaves the rest for the next attempt.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int = 25,
+        sender: str = "",
+        username: str = "",
+        password: str = "",
+        use_tls: bool = False,
+        timeout_seconds: float = 30.0
+    ):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout_seconds = timeout_seconds
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout_seconds)
+        try:
+            smtp.ehlo()
+            if self.use_tls:
+                smtp.starttls()
+                smtp.ehlo()
+            if self.username:
+                smtp.login(self.username, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        return smtp
+
+    @staticmethod
+    def _header(value: str) -> str:
+        return value if value.isascii() else Header(value, "utf-8").encode()
+
+    def build_message(self, email: Dict[str, Any]) -> bytes:
+        # compat32 MIMEText rather than EmailMessage: headers are stored as given instead of being
+        # parsed into structured objects, which dominated the cost of sending a large batch
+        message = MIMEText(email.get("body") or "", "plain", "utf-8")
+        message["From"] = self.sender
+        message["To"] = email["to"]
+        if email.get("cc"):
+            message["Cc"] = ", ".join(email["cc"])
+        message["Subject"] = self._header(email.get("subject") or "")
+        message["Date"] = formatdate(localtime=False, usegmt=True)
+        message["Message-ID"] = message_id(email["key"])
+        return message.as_bytes()
+
+    def send_many(self, emails: List[Dict[str, Any]]) -> Dict[str, Optional[str]]:
+        results: Dict[str, Optional[str]] = {}
+        if not emails:
+            return results
+        smtp = self._connect()
+        try:
+            for email in emails:
+                try:
+                    refused = smtp.sendmail(
+                        self.sender, [email["to"], *(email.get("cc") or [])], self.build_message(email)
+                    )
+                except smtplib.SMTPRecipientsRefused as exc:
+                    results[email["key"]] = f"Recipients refused: {sorted(exc.recipients)}"
+                    continue
+                except (smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as exc:
+                    error = exc.smtp_error.decode(errors="replace") if isinstance(exc.smtp_error, bytes) else exc.smtp_error
+                    results[email["key"]] = f"{exc.smtp_code} {error}"
+                    smtp.rset()
+                    continue
+                except (smtplib.SMTPServerDisconnected, OSError) as exc:
+                    logger.warning("SMTP connection lost mid-batch", extra=kv(
+                        host=self.host, sent=len(results), remaining=len(emails) - len(results), error=str(exc)
+                    ))
+                    break
+                # Accepted for at least one recipient; partially refused CCs are only logged
+                if refused:
+                    logger.warning("SMTP refused some recipients", extra=kv(key=email["key"], refused=sorted(refused)))
+                results[email["key"]] = None
+        finally:
+            try:
+                smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                smtp.close()
+        return results
+
+
+def build_mail_transport() -> Optional[MailTransport]:
+    """The configured SMTP transport, or None when emails go to the in-process stand-in"""
+    if settings.mail_transport == "smtp":
+        return SmtpMailTransport(
+            settings.smtp_host, settings.smtp_port, settings.mail_from, settings.smtp_username,
+            settings.smtp_password, settings.smtp_use_tls, settings.smtp_timeout_seconds
+        )
+    return None
@@ -0,0 +1,139 @@
+"""Outbox Senders - deliver batches of outbox messages to CX, SX, EX and the email service"""
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from ..config import settings
+from ..observability import get_logger, kv
+from .mail_transport import MailTransport, build_mail_transport
+
+logger = get_logger(__name__)
+
+OUTBOX_DESTINATIONS = ("cx", "sx", "ex", "email")
+
+
+class OutboxSender:
+    """
+    send() delivers a batch of messages ({"idempotency_key", "topic", "aggregate_type",
+    "aggregate_id", "payload", "created_at"}) and returns {idempotency_key: error or None}.
+    Keys missing from the result count as not delivered; raising fails the whole batch.
+    """
+
+    def send(self, messages: List[Dict[str, Any]]) -> Dict[str, Optional[str]]:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class HttpOutboxSender(OutboxSender):
+    """
+    POSTs {"messages": [...]} to the integration's batch endpoint over a pooled connection.
+    The receiver answers {"results": [{"idempotency_key", "status", "error"}]} where status is
+    accepted, duplicate (already applied under that key) or rejected.
+    """
+
+    def __init__(self, url: str, timeout_seconds: float = 10.0, verify_ssl: bool = True):
+        self.url = url
+        self._http = httpx.Client(timeout=timeout_seconds, verify=verify_ssl)
+
+    def send(self, messages: List[Dict[str, Any]]) -> Dict[str, Optional[str]]:
+        response = self._http.post(self.url, json={"messages": messages})
+        response.raise_for_status()
+        return {
+            result["idempotency_key"]: (
+                None if result.get("status") in ("accepted", "duplicate")
+                else result.get("error") or f"Rejected: {result.get('status')}"
+            )
+            for result in response.json().get("results", [])
+        }
+
+    def close(self):
+        self._http.close()
+
+
+class LocalOutboxSender(OutboxSender):
+    """
+    In-process stand-in used when no URL is configured: applies each idempotency key once
+    (redeliveries are acknowledged without effect) and logs the message, e.g. simulated emails.
+    """
+
+    def __init__(self, destination: str, remembered_keys: int = 100000):
+        self.destination = destination
+        self.remembered_keys = remembered_keys
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.applied = 0
+
+    def send(self, messages: List[Dict[str, Any]]) -> Dict[str, Optional[str]]:
+        results: Dict[str, Optional[str]] = {}
+        for message in messages:
+            key = message["idempotency_key"]
+            with self._lock:
+                duplicate = key in self._seen
+                if not duplicate:
+                    self._seen[key] = None
+                    if len(self._seen) > self.remembered_keys:
+                        self._seen.popitem(last=False)
+                    self.applied += 1
+            if not duplicate:
+                logger.info("Integration message delivered (simulated)", extra=kv(
+                    destination=self.destination, topic=message["topic"],
+                    aggregate_id=message.get("aggregate_id"), idempotency_key=key
+                ))
+            results[key] = None
+        return results
+
+
+class MailOutboxSender(OutboxSender):
+    """
+    Sends email messages whose payload carries a rendered email (to, cc, subject, body) through
+    a mail transport; payloads without a recipient fail instead of being retried forever quietly.
+    """
+
+    def __init__(self, transport: MailTransport):
+        self.transport = transport
+
+    def send(self, messages: List[Dict[str, Any]]) -> Dict[str, Optional[str]]:
+        results: Dict[str, Optional[str]] = {}
+        emails = []
+        for message in messages:
+            payload = message["payload"] or {}
+            if not payload.get("to"):
+                results[message["idempotency_key"]] = "No recipient address"
+                continue
+            emails.append({
+                "key": message["idempotency_key"], "to": payload["to"], "cc": payload.get("cc") or [],
+                "subject": payload.get("subject"), "body": payload.get("body")
+            })
+        results.update(self.transport.send_many(emails))
+        return results
+
+    def close(self):
+        self.transport.close()
+
+
+def _email_sender() -> OutboxSender:
+    if settings.outbox_email_url:
+        return HttpOutboxSender(settings.outbox_email_url, settings.outbox_timeout_seconds, settings.outbox_verify_ssl)
+    transport = build_mail_transport()
+    return MailOutboxSender(transport) if transport else LocalOutboxSender("email")
+
+
+def build_outbox_senders() -> Dict[str, OutboxSender]:
+    urls = {
+        "cx": settings.outbox_cx_url,
+        "sx": settings.outbox_sx_url,
+        "ex": settings.outbox_ex_url,
+    }
+    senders: Dict[str, OutboxSender] = {
+        destination: (
+            HttpOutboxSender(url, settings.outbox_timeout_seconds, settings.outbox_verify_ssl)
+            if url else LocalOutboxSender(destination)
+        )
+        for destination, url in urls.items()
+    }
+    senders["email"] = _email_sender()
+    return senders
@@ -1,22 +1,58 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from .config import settings
-from .database import engine, Base
-from .api import clients, onboarding, regulatory, documents, tasks, integrations, regimes, document_requirements, chat, insights, cx_approval
+from .database import engine, Base, create_missing_columns, create_missing_indexes
+from .observability import configure_logging, instrument_engine, request_context_middleware, metrics
+from .observability.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from .api import clients, onboarding, regulatory, documents, tasks, integrations, regimes, document_requirements, chat, insights, cx_approval, sweeps, sla, outbox
+from .services.sweep_scheduler import sweep_scheduler
+from .services.outbox import outbox as outbox_dispatcher
+from .integrations.async_clients import integration_gateway
+from .services.client_search import client_search
+from .services.task_inbox import task_inbox
+from .services.sla_tracker import sla_tracker
+from contextlib import asynccontextmanager
 import os
 
-# Create database tables
+# Structured logging, metrics and (optional) tracing of requests and SQL statements
+configure_logging()
+instrument_engine(engine)
+
+# Create database tables (and columns and indexes added to models after their table existed)
 Base.metadata.create_all(bind=engine)
+create_missing_columns()
+create_missing_indexes()
+# Full-text client and task search indexes and the triggers that keep them in sync
+client_search.ensure_index(engine)
+task_inbox.ensure_index(engine)
+# SLA clocks and running TAT totals for stages started before they were tracked
+sla_tracker.ensure_backfilled()
 
 # Ensure uploads directory exists
 os.makedirs("uploads", exist_ok=True)
 os.makedirs("sample_documents", exist_ok=True)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background expiry, review and reminder sweeps
+    if settings.sweep_enabled:
+        sweep_scheduler.start()
+    # Delivery of integration messages written to the outbox
+    if settings.outbox_enabled:
+        outbox_dispatcher.start()
+    yield
+    outbox_dispatcher.stop()
+    await integration_gateway.aclose()
+    sweep_scheduler.stop()
+
+
 app = FastAPI(
     title="FM Client Lifecycle Orchestrator",
     description="Financial Markets Client Onboarding and Regulatory Classification Management",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -26,8 +62,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
 
+# Correlation ID, root span and access log for every request
+app.middleware("http")(request_context_middleware)
+
 # Include routers
 app.include_router(clients.router)
 app.include_router(onboarding.router)
@@ -40,6 +80,9 @@ app.include_router(document_requirements.router)
 app.include_router(chat.router)
 app.include_router(insights.router)
 app.include_router(cx_approval.router)
+app.include_router(sweeps.router)
+app.include_router(sla.router)
+app.include_router(outbox.router)
 
 
 @app.get("/")
@@ -56,6 +99,12 @@ def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint():
+    """Prometheus scrape endpoint"""
+    return Response(content=metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+
 # Mount static file directories for serving uploaded documents and samples
 # This allows the frontend to access PDFs via HTTP
 app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
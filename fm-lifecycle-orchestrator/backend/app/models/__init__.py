@@ -8,6 +8,12 @@ from .classification_rule import ClassificationRule
 from .regime_eligibility import RegimeEligibility
 from .mandatory_evidence import MandatoryEvidence
 from .rule_version_history import RuleVersionHistory
+from .chat_session import ChatSession
+from .stage_sla import StageEvent, StageSlaClock, ClientTatTotal
+from .cx_publication import CxPublicationRun, CxPublicationItem
+from .outbox import OutboxMessage
+from .document_import import DocumentImportBatch, DocumentImportItem
+from .document_campaign import DocumentCampaign
 
 __all__ = [
     "Client",
@@ -19,5 +25,15 @@ __all__ = [
     "ClassificationRule",
     "RegimeEligibility",
     "MandatoryEvidence",
-    "RuleVersionHistory"
+    "RuleVersionHistory",
+    "ChatSession",
+    "StageEvent",
+    "StageSlaClock",
+    "ClientTatTotal",
+    "CxPublicationRun",
+    "CxPublicationItem",
+    "OutboxMessage",
+    "DocumentImportBatch",
+    "DocumentImportItem",
+    "DocumentCampaign"
 ]
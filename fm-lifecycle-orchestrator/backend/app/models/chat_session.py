@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Text
+from datetime import datetime
+from ..database import Base
+
+
+class ChatSession(Base):
+    """
+    Persisted multi-turn chat conversation.
+    Only written when chat session persistence is enabled; the in-process store is authoritative.
+    """
+    __tablename__ = "chat_sessions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(String, nullable=False, unique=True, index=True)
+    client_id = Column(Integer, nullable=True, index=True)
+    summary = Column(Text, nullable=True)  # Rolling summary of turns no longer sent verbatim
+    turns = Column(JSON, nullable=True)  # Recent messages: [{"role": ..., "content": ...}]
+    context_snapshot = Column(Text, nullable=True)  # Client context sent at the start of the session
+    context_sections = Column(JSON, nullable=True)  # Section name -> hash of the context last sent
+    created_date = Column(DateTime, default=datetime.utcnow)
+    updated_date = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
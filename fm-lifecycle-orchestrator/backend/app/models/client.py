@@ -21,16 +21,17 @@ class Client(Base):
     legal_entity_id = Column(String, unique=True, index=True)
     country_of_incorporation = Column(String)
     entity_type = Column(String)
-    onboarding_status = Column(SQLEnum(OnboardingStatus), default=OnboardingStatus.INITIATED)
+    onboarding_status = Column(SQLEnum(OnboardingStatus), default=OnboardingStatus.INITIATED, index=True)
     created_date = Column(DateTime, default=datetime.utcnow)
-    last_updated = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    last_updated = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     assigned_rm = Column(String)
+    contact_email = Column(String, nullable=True)  # Client's document contact: document requests and reminders go here
 
     # Client attributes for classification rules
     client_attributes = Column(JSON, nullable=True)  # Stores account_type, booking_location, product_grid, etc.
 
     # TAT tracking fields
-    cumulative_tat_hours = Column(Float, nullable=True)  # Total end-to-end onboarding TAT
+    cumulative_tat_hours = Column(Float, nullable=True)  # Snapshot at the last stage change; APIs derive the live value from tat_total
     expected_completion_date = Column(DateTime, nullable=True)  # Expected completion based on target TATs
 
     # CX Integration tracking
@@ -44,6 +45,11 @@ class Client(Base):
     documents = relationship("Document", back_populates="client", cascade="all, delete-orphan")
     tasks = relationship("Task", back_populates="client", cascade="all, delete-orphan")
     regime_eligibilities = relationship("RegimeEligibility", back_populates="client", cascade="all, delete-orphan")
+    stage_events = relationship("StageEvent", back_populates="client", cascade="all, delete-orphan")
+    stage_sla_clocks = relationship("StageSlaClock", back_populates="client", cascade="all, delete-orphan")
+    tat_total = relationship("ClientTatTotal", back_populates="client", uselist=False, cascade="all, delete-orphan")
+    cx_publications = relationship("CxPublicationItem", back_populates="client", cascade="all, delete-orphan")
+    document_imports = relationship("DocumentImportBatch", back_populates="client", cascade="all, delete-orphan")
 
     @hybrid_property
     def cumulative_tat_days(self):
@@ -0,0 +1,47 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, Text
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from ..database import Base
+
+
+class CxPublicationRun(Base):
+    """
+    One bulk publication of classification results to CX (e.g. the end-of-day sync).
+    """
+    __tablename__ = "cx_publication_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(String, nullable=False, default="running")  # running, completed, failed
+    transport = Column(String, nullable=False)  # local, http
+    batch_reference = Column(String, nullable=True)  # Export file or CX batch id
+    clients_selected = Column(Integer, nullable=False, default=0)
+    clients_published = Column(Integer, nullable=False, default=0)
+    clients_failed = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    started_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+    items = relationship("CxPublicationItem", back_populates="run", cascade="all, delete-orphan")
+
+
+class CxPublicationItem(Base):
+    """
+    Outcome of publishing one client in a run.
+    """
+    __tablename__ = "cx_publication_items"
+    __table_args__ = (
+        # Latest publication of a client
+        Index("ix_cx_publication_items_client_id_id", "client_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    run_id = Column(Integer, ForeignKey("cx_publication_runs.id"), nullable=False, index=True)
+    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
+    status = Column(String, nullable=False)  # synced, failed
+    reference_id = Column(String, nullable=True)
+    regimes_published = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    published_at = Column(DateTime, default=datetime.utcnow)
+
+    run = relationship("CxPublicationRun", back_populates="items")
+    client = relationship("Client", back_populates="cx_publications")
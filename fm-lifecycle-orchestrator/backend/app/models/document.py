@@ -33,7 +33,7 @@ class Document(Base):
     __tablename__ = "documents"
 
     id = Column(Integer, primary_key=True, index=True)
-    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
+    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False, index=True)
     regulatory_classification_id = Column(Integer, ForeignKey("regulatory_classifications.id"), nullable=True)
     filename = Column(String, nullable=False)
     file_path = Column(String, nullable=False)
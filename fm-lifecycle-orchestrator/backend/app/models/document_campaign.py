@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Float, Text
+from datetime import datetime
+from ..database import Base
+
+
+class DocumentCampaign(Base):
+    """
+    One bulk run of missing-document request emails across the clients matching its filters.
+    Emails are queued in the integration outbox (aggregate_type "document_campaign").
+    """
+    __tablename__ = "document_campaigns"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=True)
+    status = Column(String, nullable=False, default="pending")  # pending, running, completed, failed
+    filters = Column(JSON, nullable=True)  # The request's selection criteria
+    requested_by = Column(String, nullable=True)
+    clients_selected = Column(Integer, nullable=False, default=0)
+    clients_skipped_no_recipient = Column(Integer, nullable=False, default=0)
+    requirements_requested = Column(Integer, nullable=False, default=0)
+    emails_queued = Column(Integer, nullable=False, default=0)
+    batches = Column(Integer, nullable=False, default=0)
+    seconds = Column(Float, nullable=True)  # Wall time of selecting, rendering, updating and queueing
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
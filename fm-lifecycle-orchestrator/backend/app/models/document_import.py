@@ -0,0 +1,51 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Text
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from ..database import Base
+
+
+class DocumentImportBatch(Base):
+    """
+    One bulk import of documents from internal systems (SX, CX, WX) for a client.
+    """
+    __tablename__ = "document_import_batches"
+
+    id = Column(Integer, primary_key=True, index=True)
+    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False, index=True)
+    # pending, fetching, processing, completed, completed_with_errors, failed
+    status = Column(String, nullable=False, default="pending")
+    uploaded_by = Column(String, nullable=True)
+    documents_requested = Column(Integer, nullable=False, default=0)
+    documents_fetched = Column(Integer, nullable=False, default=0)
+    documents_processed = Column(Integer, nullable=False, default=0)
+    documents_failed = Column(Integer, nullable=False, default=0)
+    fetch_seconds = Column(Float, nullable=True)  # Wall time of fetching every document
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    fetched_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    items = relationship("DocumentImportItem", back_populates="batch", cascade="all, delete-orphan",
+                         order_by="DocumentImportItem.id")
+    client = relationship("Client", back_populates="document_imports")
+
+
+class DocumentImportItem(Base):
+    """
+    One source document of an import batch and the Document it became.
+    """
+    __tablename__ = "document_import_items"
+
+    id = Column(Integer, primary_key=True, index=True)
+    batch_id = Column(Integer, ForeignKey("document_import_batches.id"), nullable=False, index=True)
+    source_system = Column(String, nullable=False)  # SX, CX, WX
+    document_url = Column(String, nullable=False)
+    document_type = Column(String, nullable=False)
+    document_name = Column(String, nullable=False)
+    status = Column(String, nullable=False, default="pending")  # pending, fetched, processed, failed
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=True)
+    bytes_fetched = Column(Integer, nullable=True)
+    fetch_ms = Column(Float, nullable=True)
+    error = Column(Text, nullable=True)
+
+    batch = relationship("DocumentImportBatch", back_populates="items")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from ..database import Base
@@ -11,9 +11,14 @@ class DocumentRequirement(Base):
     and actual client documents.
     """
     __tablename__ = "document_requirements"
+    __table_args__ = (
+        # Background sweeps: expiry and reminder selection
+        Index("ix_document_requirements_status_expiry", "status", "expiry_date"),
+        Index("ix_document_requirements_status_reminder", "status", "last_reminder_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
+    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False, index=True)
     regime = Column(String, nullable=False, index=True)
     evidence_id = Column(Integer, ForeignKey("mandatory_evidences.id"), nullable=False)
 
@@ -26,7 +26,7 @@ class OnboardingStage(Base):
     __tablename__ = "onboarding_stages"
 
     id = Column(Integer, primary_key=True, index=True)
-    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
+    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False, index=True)
     stage_name = Column(SQLEnum(StageName), nullable=False)
     status = Column(SQLEnum(StageStatus), default=StageStatus.NOT_STARTED)
     assigned_team = Column(String)
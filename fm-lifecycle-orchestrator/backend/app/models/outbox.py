@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Text, Index, text
+from datetime import datetime
+from ..database import Base
+
+# Messages still to deliver; a literal so SQLite can match the dispatcher query to the partial index
+OUTBOX_PENDING_CONDITION = "status = 'pending'"
+
+
+class OutboxMessage(Base):
+    """
+    Integration message (CX, SX, EX, email) written in the same transaction as the business
+    change that caused it and delivered later by the outbox dispatcher.
+    """
+    __tablename__ = "outbox_messages"
+    __table_args__ = (
+        # Dispatcher: pending messages due for an attempt, oldest first
+        Index(
+            "ix_outbox_messages_pending_due", "next_attempt_at", "id",
+            sqlite_where=text(OUTBOX_PENDING_CONDITION), postgresql_where=text(OUTBOX_PENDING_CONDITION)
+        ),
+        Index("ix_outbox_messages_aggregate", "aggregate_type", "aggregate_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    destination = Column(String, nullable=False)  # cx, sx, ex, email
+    topic = Column(String, nullable=False)  # e.g. classification.published, document.requested
+    aggregate_type = Column(String, nullable=True)  # e.g. client, onboarding_stage
+    aggregate_id = Column(Integer, nullable=True)
+    idempotency_key = Column(String, nullable=False, unique=True)  # Sent with every attempt
+    payload = Column(JSON, nullable=False)
+    status = Column(String, nullable=False, default="pending")  # pending, delivered, dead
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)  # Also the claim lease
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    delivered_at = Column(DateTime, nullable=True)
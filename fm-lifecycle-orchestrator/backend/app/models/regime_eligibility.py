@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON, ForeignKey, Float, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from ..database import Base
@@ -9,6 +9,10 @@ class RegimeEligibility(Base):
     Tracks client eligibility for different regulatory regimes based on classification rules.
     """
     __tablename__ = "regime_eligibilities"
+    __table_args__ = (
+        # Latest evaluation per client (clients changed since their last CX sync)
+        Index("ix_regime_eligibilities_client_evaluated", "client_id", "last_evaluated_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     client_id = Column(Integer, ForeignKey("clients.id"), nullable=False, index=True)
@@ -30,7 +30,7 @@ class RegulatoryClassification(Base):
     classification = Column(String, nullable=False)
     classification_date = Column(DateTime, default=datetime.utcnow)
     last_review_date = Column(DateTime, nullable=True)
-    next_review_date = Column(DateTime, nullable=True)
+    next_review_date = Column(DateTime, nullable=True, index=True)
     validation_status = Column(SQLEnum(ValidationStatus), default=ValidationStatus.PENDING)
     validation_notes = Column(Text, nullable=True)
     additional_data = Column(JSON, nullable=True)  # For additional framework-specific data
@@ -0,0 +1,73 @@
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Float, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from ..database import Base
+
+
+class StageEvent(Base):
+    """
+    Append-only log of onboarding stage SLA transitions (started, completed, reopened, rescheduled).
+    """
+    __tablename__ = "stage_events"
+    __table_args__ = (
+        Index("ix_stage_events_stage_occurred", "stage_id", "occurred_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    stage_id = Column(Integer, ForeignKey("onboarding_stages.id"), nullable=False)
+    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False, index=True)
+    stage_name = Column(String, nullable=False)
+    event_type = Column(String, nullable=False)  # started, completed, reopened, rescheduled
+    occurred_at = Column(DateTime, nullable=False)
+    recorded_at = Column(DateTime, default=datetime.utcnow)
+
+    client = relationship("Client", back_populates="stage_events")
+
+
+class StageSlaClock(Base):
+    """
+    Current SLA clock of a started onboarding stage. deadline = started_at + target TAT, so
+    "breaching within N hours" is an index range on (completed_at IS NULL, deadline).
+    """
+    __tablename__ = "stage_sla_clocks"
+    __table_args__ = (
+        # Open clocks (completed_at IS NULL) ordered by deadline
+        Index("ix_stage_sla_clocks_open_deadline", "completed_at", "deadline"),
+        # Covers the per-stage report: open clocks grouped by stage, completed clocks by date range
+        Index(
+            "ix_stage_sla_clocks_report", "completed_at", "stage_name", "deadline",
+            "started_epoch_hours", "tat_hours", "breached"
+        ),
+    )
+
+    stage_id = Column(Integer, ForeignKey("onboarding_stages.id"), primary_key=True)
+    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False, index=True)
+    stage_name = Column(String, nullable=False)
+    assigned_team = Column(String, nullable=True)
+    started_at = Column(DateTime, nullable=False)
+    started_epoch_hours = Column(Float, nullable=False)  # started_at as hours since 1970 (running totals)
+    completed_at = Column(DateTime, nullable=True)
+    target_tat_hours = Column(Float, nullable=True)
+    deadline = Column(DateTime, nullable=True)  # None without a target TAT
+    tat_hours = Column(Float, nullable=True)  # Final TAT once completed
+    breached = Column(Boolean, nullable=True)  # Completed after the deadline
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    client = relationship("Client", back_populates="stage_sla_clocks")
+
+
+class ClientTatTotal(Base):
+    """
+    Running TAT totals per client, maintained on every stage transition. Cumulative TAT at time
+    t (in epoch hours) is completed_tat_hours + open_stages * t - open_started_epoch_hours.
+    """
+    __tablename__ = "client_tat_totals"
+
+    client_id = Column(Integer, ForeignKey("clients.id"), primary_key=True)
+    completed_tat_hours = Column(Float, nullable=False, default=0.0)
+    completed_stages = Column(Integer, nullable=False, default=0)
+    open_stages = Column(Integer, nullable=False, default=0)
+    open_started_epoch_hours = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    client = relationship("Client", back_populates="tat_total")
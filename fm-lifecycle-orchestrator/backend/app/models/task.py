@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum as SQLEnum, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum as SQLEnum, Text, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -17,12 +17,29 @@ class TaskType(str, enum.Enum):
     REVIEW = "review"
 
 
+# Open (not completed) tasks; a literal so SQLite can match queries to the partial index
+OPEN_TASK_CONDITION = "status != 'COMPLETED'"
+
+
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Open-task lookups per client (review sweep deduplication)
+        Index("ix_tasks_client_type_status", "client_id", "task_type", "status"),
+        # Task inbox keyset order (due_date, id), overall and per status / team
+        Index("ix_tasks_due_id", "due_date", "id"),
+        Index("ix_tasks_status_due_id", "status", "due_date", "id"),
+        Index("ix_tasks_team_due_id", "assigned_team", "due_date", "id"),
+        # Overdue / due this week / due this month only look at open tasks
+        Index(
+            "ix_tasks_open_due_id", "due_date", "id",
+            sqlite_where=text(OPEN_TASK_CONDITION), postgresql_where=text(OPEN_TASK_CONDITION)
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
-    onboarding_stage_id = Column(Integer, ForeignKey("onboarding_stages.id"), nullable=True)
+    onboarding_stage_id = Column(Integer, ForeignKey("onboarding_stages.id"), nullable=True, index=True)
     title = Column(String, nullable=False)
     description = Column(Text, nullable=True)
     assigned_to = Column(String, nullable=True)
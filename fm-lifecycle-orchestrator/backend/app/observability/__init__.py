@@ -0,0 +1,18 @@
+from .context import request_id_var, get_request_id
+from .logging import configure_logging, get_logger, kv, log_sampled
+from .tracing import tracer
+from .metrics import metrics
+from .instrumentation import request_context_middleware, instrument_engine
+
+__all__ = [
+    "request_id_var",
+    "get_request_id",
+    "configure_logging",
+    "get_logger",
+    "kv",
+    "log_sampled",
+    "tracer",
+    "metrics",
+    "request_context_middleware",
+    "instrument_engine"
+]
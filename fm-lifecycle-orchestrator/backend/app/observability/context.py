@@ -0,0 +1,13 @@
+"""
+Request-scoped observability context (correlation ID and current span).
+Context variables follow the request into threadpool-run sync endpoints.
+"""
+from contextvars import ContextVar
+from typing import Optional
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+current_span_var: ContextVar[Optional[object]] = ContextVar("current_span", default=None)
+
+
+def get_request_id() -> Optional[str]:
+    return request_id_var.get()
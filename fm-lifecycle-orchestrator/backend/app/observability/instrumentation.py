@@ -0,0 +1,148 @@
+"""
+Instrumentation hooks: per-request correlation ID, root span and latency metrics, and
+SQLAlchemy query spans and metrics (including per-request query counts).
+"""
+import logging
+import time
+import uuid
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from ..config import settings
+from .context import request_id_var
+from .logging import get_logger, log_sampled
+from .metrics import (
+    metrics,
+    RequestStats,
+    request_stats_var,
+    http_requests_total,
+    http_request_duration_seconds,
+    http_requests_in_progress,
+    db_queries_total,
+    db_query_duration_seconds,
+    db_queries_per_request,
+    db_time_per_request_seconds
+)
+from .tracing import tracer
+
+logger = get_logger(__name__)
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+
+async def request_context_middleware(request: Request, call_next):
+    """
+    Assign a correlation ID (reusing an incoming X-Request-ID), wrap the request in a root
+    span, record route latency and SQL counts, and emit a sampled access log line.
+    """
+    request_id = request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+    token = request_id_var.set(request_id)
+    stats = RequestStats()
+    stats_token = request_stats_var.set(stats)
+    http_requests_in_progress.inc()
+    start = time.perf_counter()
+    status = 500
+    try:
+        with tracer.span(
+            f"{request.method} {request.url.path}",
+            **{"http.method": request.method, "http.target": request.url.path, "request.id": request_id}
+        ) as span:
+            response = await call_next(request)
+            status = response.status_code
+            span.set_attribute("http.status_code", status)
+            span.set_attribute("db.query_count", stats.db_queries)
+            route = request.scope.get("route")
+            if route is not None:
+                span.set_attribute("http.route", route.path)
+
+            response.headers[REQUEST_ID_HEADER] = request_id
+            log_sampled(
+                logger, logging.INFO, "request completed",
+                sample_rate=settings.log_access_sample_rate,
+                method=request.method,
+                path=request.url.path,
+                status=status,
+                duration_ms=round((time.perf_counter() - start) * 1000, 2),
+                db_queries=stats.db_queries
+            )
+            return response
+    finally:
+        if metrics.enabled:
+            _record_request_metrics(request, status, time.perf_counter() - start, stats)
+        request_stats_var.reset(stats_token)
+        request_id_var.reset(token)
+
+
+def _record_request_metrics(request: Request, status: int, duration: float, stats: RequestStats):
+    # Label by route template, not the raw path, so IDs do not explode series cardinality
+    route = request.scope.get("route")
+    route_path = route.path if route is not None else "unmatched"
+    http_requests_in_progress.dec()
+    http_requests_total.inc(method=request.method, route=route_path, status=status)
+    http_request_duration_seconds.observe(duration, method=request.method, route=route_path)
+    db_queries_per_request.observe(stats.db_queries, route=route_path)
+    db_time_per_request_seconds.observe(stats.db_seconds, route=route_path)
+
+
+def instrument_engine(engine: Engine):
+    """Attach SQL metrics hooks (when metrics are enabled) and a span per statement (when tracing is)."""
+    if metrics.enabled:
+        _instrument_engine_metrics(engine)
+    if tracer.enabled:
+        _instrument_engine_tracing(engine)
+
+
+def _statement_operation(statement: str) -> str:
+    return statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+
+
+def _instrument_engine_metrics(engine: Engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "_metrics_start", None)
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+        operation = _statement_operation(statement)
+        db_queries_total.inc(operation=operation)
+        db_query_duration_seconds.observe(elapsed, operation=operation)
+        stats = request_stats_var.get()
+        if stats is not None:
+            stats.db_queries += 1
+            stats.db_seconds += elapsed
+
+
+def _instrument_engine_tracing(engine: Engine):
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._observability_span = tracer.start_span(
+            "db.query",
+            require_parent=True,
+            **{
+                "db.system": engine.dialect.name,
+                "db.statement": statement[:500],
+                "db.executemany": executemany
+            }
+        )
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        span = getattr(context, "_observability_span", None)
+        if span is not None:
+            span.set_attribute("db.rowcount", cursor.rowcount)
+            span.end()
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        context = exception_context.execution_context
+        span = getattr(context, "_observability_span", None) if context is not None else None
+        if span is not None:
+            span.record_exception(exception_context.original_exception)
+            span.end()
@@ -0,0 +1,103 @@
+"""
+Structured Logging
+JSON (or plain text) log records carrying the request correlation ID and trace/span IDs,
+with sampling for high-volume events. Loggers are standard library loggers under "app",
+so disabled levels cost one isEnabledFor check.
+"""
+import json
+import logging
+import random
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from ..config import settings
+from .context import request_id_var, current_span_var
+
+LOGGER_ROOT = "app"
+
+
+def kv(**values: Any) -> Dict[str, Any]:
+    """Structured fields for a log call: logger.info("message", extra=kv(client_id=1))"""
+    return {"fields": values}
+
+
+class ContextFilter(logging.Filter):
+    """Attach the request ID and current trace/span IDs to every record"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        span = current_span_var.get()
+        record.trace_id = getattr(span, "trace_id", None)
+        record.span_id = getattr(span, "span_id", None)
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "trace_id": getattr(record, "trace_id", None),
+            "span_id": getattr(record, "span_id", None)
+        }
+        payload.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        line = (
+            f"{self.formatTime(record)} {record.levelname:<7} {record.name} "
+            f"[{getattr(record, 'request_id', None) or '-'}] {record.getMessage()}"
+        )
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+def configure_logging():
+    """Install the configured handler on the "app" logger (idempotent)"""
+    logger = logging.getLogger(LOGGER_ROOT)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+
+    handler = logging.FileHandler(settings.log_file) if settings.log_file else logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JSONFormatter() if settings.log_format == "json" else TextFormatter())
+    handler.addFilter(ContextFilter())
+
+    logger.addHandler(handler)
+    logger.setLevel(settings.log_level.upper())
+    logger.propagate = False
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger for a module; pass __name__ (app.* modules share the configured handler)"""
+    return logging.getLogger(name)
+
+
+def log_sampled(
+    logger: logging.Logger,
+    level: int,
+    message: str,
+    sample_rate: Optional[float] = None,
+    **fields: Any
+):
+    """
+    Log a high-volume event for only a fraction of occurrences.
+    The kept records carry sample_rate so counts can be scaled back up.
+    """
+    if not logger.isEnabledFor(level):
+        return
+    rate = settings.log_sample_rate if sample_rate is None else sample_rate
+    if rate < 1.0 and random.random() >= rate:
+        return
+    logger.log(level, message, extra=kv(sample_rate=rate, **fields))
@@ -0,0 +1,303 @@
+"""
+Metrics
+Counters, gauges and histograms rendered in the Prometheus text exposition format (0.0.4)
+for the /metrics endpoint. Kept dependency-free: each series is a dict entry guarded by a
+per-metric lock, so recording is cheap enough for the request and SQL hot paths.
+
+When metrics are disabled, recording calls return immediately.
+"""
+import math
+import threading
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..config import settings
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; spans fast SQL statements up to slow LLM completions
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, registry: "MetricsRegistry", name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: object):
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0.0) + amount
+
+    def value(self, **labels: object) -> float:
+        return self._series.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            series = list(self._series.items())
+        for key, value in series:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def set(self, value: float, **labels: object):
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: object):
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: object):
+        self.inc(-amount, **labels)
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            series = list(self._series.items())
+        for key, value in series:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, registry: "MetricsRegistry", name: str, documentation: str,
+                 labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: object):
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket (non-cumulative) counts, then sum and count
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            series = [(key, list(values)) for key, values in self._series.items()]
+        for key, values in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key, ("le", "+Inf"))
+            yield f"{self.name}_bucket{labels} {values[-1]}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(values[-2])}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {values[-1]}"
+
+
+class MetricsRegistry:
+    """Owns the metric families and renders them for scraping"""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._metrics: List[_Metric] = []
+
+    def _register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(self, name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(self, name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(self, name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+class RequestStats:
+    """Per-request SQL counters, shared by reference with threadpool-run endpoint code"""
+    __slots__ = ("db_queries", "db_seconds")
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+
+
+request_stats_var: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+# Singleton instance
+metrics = MetricsRegistry(enabled=settings.metrics_enabled)
+
+# HTTP
+http_requests_total = metrics.counter(
+    "http_requests_total", "HTTP requests by route template and status", ("method", "route", "status")
+)
+http_request_duration_seconds = metrics.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route")
+)
+http_requests_in_progress = metrics.gauge("http_requests_in_progress", "HTTP requests currently being served")
+
+# Database
+db_queries_total = metrics.counter("db_queries_total", "SQL statements executed", ("operation",))
+db_query_duration_seconds = metrics.histogram(
+    "db_query_duration_seconds", "SQL statement latency", ("operation",)
+)
+db_queries_per_request = metrics.histogram(
+    "db_queries_per_request", "SQL statements issued while serving one request (N+1 detector)",
+    ("route",), COUNT_BUCKETS
+)
+db_time_per_request_seconds = metrics.histogram(
+    "db_time_per_request_seconds", "Time spent in SQL while serving one request", ("route",)
+)
+
+# LLM
+llm_requests_total = metrics.counter(
+    "llm_requests_total", "LLM completions by priority lane and outcome", ("priority", "outcome")
+)
+llm_request_duration_seconds = metrics.histogram(
+    "llm_request_duration_seconds", "LLM completion latency including retries", ("priority",)
+)
+llm_time_to_first_token_seconds = metrics.histogram(
+    "llm_time_to_first_token_seconds", "Time from request to first content delta", ("priority",)
+)
+llm_queue_wait_seconds = metrics.histogram(
+    "llm_queue_wait_seconds", "Time waiting for scheduler admission", ("priority",)
+)
+llm_tokens_total = metrics.counter(
+    "llm_tokens_total", "LLM tokens (provider usage, or estimated from characters when not reported)",
+    ("priority", "kind")
+)
+llm_errors_total = metrics.counter("llm_errors_total", "LLM call failures by error type", ("priority", "error"))
+llm_retries_total = metrics.counter("llm_retries_total", "LLM attempts retried by the scheduler", ("priority",))
+
+# Classification
+classification_evaluations_total = metrics.counter(
+    "classification_evaluations_total", "Client eligibility evaluations by regime and result", ("regime", "result")
+)
+classification_evaluation_duration_seconds = metrics.histogram(
+    "classification_evaluation_duration_seconds", "Latency of a single client/regime evaluation", ("regime",)
+)
+classification_decision_cache_total = metrics.counter(
+    "classification_decision_cache_total", "Eligibility decision cache lookups by result (hit, miss, stale)",
+    ("result",)
+)
+classification_eligibility_writes_total = metrics.counter(
+    "classification_eligibility_writes_total",
+    "RegimeEligibility rows after an evaluation: written, or skipped because nothing changed", ("outcome",)
+)
+
+# Background sweeps
+sweep_items_total = metrics.counter("sweep_items_total", "Rows processed by background sweeps", ("sweep",))
+sweep_duration_seconds = metrics.histogram("sweep_duration_seconds", "Duration of one background sweep", ("sweep",))
+
+# Onboarding stage workflow
+stage_transitions_total = metrics.counter(
+    "stage_transitions_total", "Onboarding stage transitions applied by target status", ("to_status",)
+)
+
+# CX publication
+cx_publication_clients_total = metrics.counter(
+    "cx_publication_clients_total", "Clients published to CX by outcome (synced, failed)", ("outcome",)
+)
+
+# Integration outbox
+outbox_messages_total = metrics.counter(
+    "outbox_messages_total", "Outbox delivery attempts by destination and outcome (delivered, failed, dead)",
+    ("destination", "outcome")
+)
+outbox_batch_duration_seconds = metrics.histogram(
+    "outbox_batch_duration_seconds", "Duration of one outbox batch send", ("destination",)
+)
+
+# Integration lookups
+integration_lookups_total = metrics.counter(
+    "integration_lookups_total", "SX/CX/WX/EX lookups by outcome (hit, revalidated, miss, stale, error)",
+    ("system", "outcome")
+)
+integration_lookup_duration_seconds = metrics.histogram(
+    "integration_lookup_duration_seconds", "Duration of integration lookup calls that reached the network", ("system",)
+)
+
+# Document import
+document_import_documents_total = metrics.counter(
+    "document_import_documents_total", "Imported documents by source and outcome (fetched, fetch_failed, processed, failed)",
+    ("source", "outcome")
+)
+document_import_fetch_duration_seconds = metrics.histogram(
+    "document_import_fetch_duration_seconds", "Duration of fetching one document from an internal system", ("source",)
+)
+
+# Document campaigns
+document_campaign_emails_total = metrics.counter(
+    "document_campaign_emails_total", "Document campaign emails by outcome (queued, skipped_no_recipient)", ("outcome",)
+)
+document_campaign_batch_duration_seconds = metrics.histogram(
+    "document_campaign_batch_duration_seconds", "Duration of rendering, updating and queueing one campaign batch"
+)
+
+# Client search
+client_search_duration_seconds = metrics.histogram(
+    "client_search_duration_seconds", "Client search page latency by mode (fts, like)", ("mode",)
+)
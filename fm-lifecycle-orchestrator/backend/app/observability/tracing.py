@@ -0,0 +1,234 @@
+"""
+Tracing
+Spans around request, DB, extraction and LLM phases, in the OpenTelemetry data model
+(trace/span IDs, parent links, start/end nanoseconds, attributes, status).
+
+Exporters:
+- "file": built-in, appends OTLP-style JSON spans to a local JSONL file from a background thread
+- "otlp": delegates to the OpenTelemetry SDK and OTLP/HTTP exporter when they are installed
+
+When tracing is disabled, span() returns a shared no-op object, so instrumented code pays
+only an attribute check.
+"""
+import json
+import os
+import queue
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from ..config import settings
+from .context import current_span_var
+
+
+class _NoopSpan:
+    """Stand-in used when tracing is disabled or the trace is not sampled"""
+    sampled = False
+    trace_id = None
+    span_id = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def record_exception(self, error: BaseException):
+        pass
+
+    def end(self):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _UnsampledSpan(_NoopSpan):
+    """Marks a request as not sampled so its child spans are skipped too"""
+
+    def __enter__(self):
+        self._token = current_span_var.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        current_span_var.reset(self._token)
+        return False
+
+
+class Span:
+    __slots__ = ("tracer", "name", "trace_id", "span_id", "parent_span_id", "start_ns", "end_ns",
+                 "attributes", "status", "status_message", "_token")
+
+    sampled = True
+
+    def __init__(self, tracer: "Tracer", name: str, trace_id: str, parent_span_id: Optional[str],
+                 attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent_span_id
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes
+        self.status = "UNSET"
+        self.status_message = None
+        self._token = None
+
+    def __enter__(self):
+        self._token = current_span_var.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self.record_exception(exc)
+        current_span_var.reset(self._token)
+        self.end()
+        return False
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def record_exception(self, error: BaseException):
+        self.status = "ERROR"
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self.tracer.exporter.export(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id,
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "durationMs": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "status": {"code": self.status, "message": self.status_message},
+            "resource": {"service.name": self.tracer.service_name}
+        }
+
+
+class FileSpanExporter:
+    """Writes finished spans as JSON lines from a background thread, off the request path"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._queue: "queue.SimpleQueue[Optional[Span]]" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, span: Span):
+        self._queue.put(span)
+
+    def _run(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a") as f:
+            while True:
+                span = self._queue.get()
+                if span is None:
+                    break
+                f.write(json.dumps(span.to_dict(), default=str) + "\n")
+                if self._queue.empty():
+                    f.flush()
+
+    def shutdown(self):
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+
+class Tracer:
+    """Creates spans under the current span (from context) or starts a new sampled trace"""
+
+    def __init__(self, enabled: bool, sample_rate: float, exporter=None, service_name: str = "fm-lifecycle-orchestrator"):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.exporter = exporter
+        self.service_name = service_name
+
+    def _new(self, name: str, attributes: Dict[str, Any]):
+        parent = current_span_var.get()
+        if parent is None:
+            if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+                return _UnsampledSpan()
+            return Span(self, name, os.urandom(16).hex(), None, attributes)
+        if not parent.sampled:
+            return NOOP_SPAN
+        return Span(self, name, parent.trace_id, parent.span_id, attributes)
+
+    def span(self, name: str, **attributes: Any):
+        """Context manager span that becomes the current span while active"""
+        if not self.enabled:
+            return NOOP_SPAN
+        return self._new(name, attributes)
+
+    def start_span(self, name: str, require_parent: bool = False, **attributes: Any):
+        """
+        Span that is not made current; call end() when done (for callback-style hooks).
+        With require_parent, nothing is recorded outside an active trace.
+        """
+        if not self.enabled or (require_parent and current_span_var.get() is None):
+            return NOOP_SPAN
+        span = self._new(name, attributes)
+        return NOOP_SPAN if isinstance(span, _UnsampledSpan) else span
+
+
+class OpenTelemetryTracer:
+    """Adapter exposing the same span()/start_span() interface over the OpenTelemetry SDK"""
+
+    enabled = True
+
+    def __init__(self, endpoint: str, sample_rate: float, service_name: str = "fm-lifecycle-orchestrator"):
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        provider = TracerProvider(
+            resource=Resource.create({"service.name": service_name}),
+            sampler=ParentBased(TraceIdRatioBased(sample_rate))
+        )
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=endpoint)))
+        self._tracer = provider.get_tracer("app")
+
+    def span(self, name: str, **attributes: Any):
+        return self._tracer.start_as_current_span(name, attributes=attributes)
+
+    def start_span(self, name: str, require_parent: bool = False, **attributes: Any):
+        from opentelemetry import trace
+        if require_parent and not trace.get_current_span().get_span_context().is_valid:
+            return NOOP_SPAN
+        return self._tracer.start_span(name, attributes=attributes)
+
+
+def _build_tracer():
+    if not settings.tracing_enabled:
+        return Tracer(enabled=False, sample_rate=0.0)
+
+    if settings.tracing_exporter == "otlp":
+        try:
+            return OpenTelemetryTracer(settings.tracing_otlp_endpoint, settings.tracing_sample_rate)
+        except ImportError:
+            # Optional dependency: fall back to the local file exporter
+            pass
+
+    return Tracer(
+        enabled=True,
+        sample_rate=settings.tracing_sample_rate,
+        exporter=FileSpanExporter(settings.tracing_file)
+    )
+
+
+# Singleton instance
+tracer = _build_tracer()
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 
@@ -116,6 +116,43 @@ class RetriggerResult(BaseModel):
     results_by_regime: Dict[str, Dict[str, int]]
 
 
+# Rule Simulation Schemas (dry-run "what if" over all clients)
+class RuleSimulationChange(BaseModel):
+    rule_id: Optional[int] = None  # Existing rule to modify; omit to propose a new rule
+    rule_type: Optional[str] = None  # Required for new rules
+    rule_name: Optional[str] = None
+    rule_config: Optional[Dict[str, Any]] = None
+    is_active: Optional[bool] = None
+
+
+class RuleSimulationRequest(BaseModel):
+    changes: List[RuleSimulationChange]
+    sample_size: int = Field(default=10, ge=0, le=1000)
+
+
+class RuleSimulationImpact(BaseModel):
+    rule_id: Optional[int] = None
+    rule_name: str
+    rule_type: str
+    status: str  # unchanged, modified, added, deactivated
+    current_matches: Optional[int] = None
+    proposed_matches: Optional[int] = None
+
+
+class RuleSimulationResult(BaseModel):
+    regime: str
+    total_clients: int
+    currently_eligible: int
+    proposed_eligible: int
+    newly_eligible: int
+    newly_ineligible: int
+    sample_newly_eligible_client_ids: List[int]
+    sample_newly_ineligible_client_ids: List[int]
+    rules: List[RuleSimulationImpact]
+    frame_cached: bool
+    elapsed_ms: float
+
+
 # Client Attributes Schemas (for classification)
 class ClientAttributesUpdate(BaseModel):
     account_type: Optional[str] = None
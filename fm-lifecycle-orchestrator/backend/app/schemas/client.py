@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 from ..models.client import OnboardingStatus
@@ -10,6 +10,7 @@ class ClientBase(BaseModel):
     country_of_incorporation: Optional[str] = None
     entity_type: Optional[str] = None
     assigned_rm: Optional[str] = None
+    contact_email: Optional[EmailStr] = None  # Document contact for requests and reminders
 
 
 class ClientCreate(ClientBase):
@@ -22,10 +23,12 @@ class ClientUpdate(BaseModel):
     entity_type: Optional[str] = None
     onboarding_status: Optional[OnboardingStatus] = None
     assigned_rm: Optional[str] = None
+    contact_email: Optional[EmailStr] = None
 
 
 class ClientResponse(ClientBase):
     id: int
+    contact_email: Optional[str] = None
     onboarding_status: OnboardingStatus
     created_date: datetime
     last_updated: datetime
@@ -47,3 +50,37 @@ class ClientListResponse(ClientResponse):
     pending_documents_count: int = 0
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class ClientSearchRequest(BaseModel):
+    query: str = ""
+    cursor: Optional[str] = None  # next_cursor of the previous page
+    limit: Optional[int] = Field(None, ge=1)
+
+
+class ClientSearchHit(ClientListResponse):
+    score: Optional[float] = None  # bm25 rank, lower is better; None when not ranked
+    snippet: Optional[str] = None  # Matched text with <mark> highlights
+
+
+class SearchSpan(BaseModel):
+    """Part of the query the parser understood (character offsets into original_query)"""
+    start: int
+    end: int
+    text: str
+    filter: str
+    value: str
+
+
+class ClientSearchResponse(BaseModel):
+    """Parsed query (as before) plus one ranked page of matching clients"""
+    original_query: str
+    filters: Dict[str, List[str]]
+    spans: List[SearchSpan]
+    interpretation: str
+    parsed_at: str
+    applied_filters: List[str]
+    ignored_filters: List[str]
+    text_terms: List[str]
+    results: List[ClientSearchHit]
+    next_cursor: Optional[str] = None
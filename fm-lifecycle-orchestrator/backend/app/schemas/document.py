@@ -1,6 +1,6 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Literal
 from ..models.document import DocumentCategory, OCRStatus
 
 
@@ -76,3 +76,74 @@ class DocumentVerifyRequest(BaseModel):
     """Request to verify AI-extracted data"""
     verified_by: str
     notes: Optional[str] = None
+
+
+class AnnotationEntity(BaseModel):
+    """One entity returned by LLM extraction for document annotation"""
+    value: Optional[str] = None
+    confidence: float = Field(ge=0.0, le=1.0)
+
+    @field_validator("value", mode="before")
+    @classmethod
+    def coerce_value(cls, value):
+        # Registration numbers and dates sometimes come back as numbers
+        return str(value) if isinstance(value, (int, float)) else value
+
+
+class AnnotationExtractionResult(BaseModel):
+    """Schema the LLM must return for document annotation: all seven entities"""
+    legal_name: AnnotationEntity
+    jurisdiction: AnnotationEntity
+    entity_type: AnnotationEntity
+    registration_date: AnnotationEntity
+    expiry_date: AnnotationEntity
+    registration_number: AnnotationEntity
+    registered_address: AnnotationEntity
+
+
+class DocumentImportSource(BaseModel):
+    """One document held by an internal system, as listed by its documents lookup"""
+    source_system: Literal["SX", "CX", "WX"]
+    document_url: str
+    document_type: str
+    document_name: str
+
+
+class DocumentImportRequest(BaseModel):
+    """Bulk import request; without documents, everything SX, CX and WX list for the entity is imported"""
+    documents: Optional[List[DocumentImportSource]] = None
+    uploaded_by: Optional[str] = None
+
+
+class DocumentImportItemResponse(BaseModel):
+    id: int
+    source_system: str
+    document_url: str
+    document_type: str
+    document_name: str
+    status: str
+    document_id: Optional[int] = None
+    bytes_fetched: Optional[int] = None
+    fetch_ms: Optional[float] = None
+    error: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class DocumentImportBatchResponse(BaseModel):
+    id: int
+    client_id: int
+    status: str
+    uploaded_by: Optional[str] = None
+    documents_requested: int
+    documents_fetched: int
+    documents_processed: int
+    documents_failed: int
+    fetch_seconds: Optional[float] = None
+    error: Optional[str] = None
+    created_at: datetime
+    fetched_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    items: List[DocumentImportItemResponse] = []
+
+    model_config = ConfigDict(from_attributes=True)
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from ..models.onboarding_stage import StageStatus, StageName
 
 
@@ -32,3 +32,79 @@ class OnboardingStageResponse(OnboardingStageBase):
     is_overdue: Optional[bool] = None
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class SlaBreachItem(BaseModel):
+    """Open stage whose SLA deadline is near or past"""
+    stage_id: int
+    client_id: int
+    client_name: str
+    stage_name: str
+    assigned_team: Optional[str] = None
+    started_at: datetime
+    deadline: datetime
+    target_tat_hours: Optional[float] = None
+    elapsed_hours: float
+    hours_remaining: float  # Negative once breached
+    breached: bool
+
+
+class StageSlaClockResponse(BaseModel):
+    stage_id: int
+    stage_name: str
+    assigned_team: Optional[str] = None
+    started_at: datetime
+    completed_at: Optional[datetime] = None
+    target_tat_hours: Optional[float] = None
+    deadline: Optional[datetime] = None
+    tat_hours: Optional[float] = None
+    breached: Optional[bool] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class StageEventResponse(BaseModel):
+    stage_id: int
+    stage_name: str
+    event_type: str
+    occurred_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ClientSlaResponse(BaseModel):
+    client_id: int
+    cumulative_tat_hours: Optional[float] = None
+    completed_tat_hours: float = 0.0
+    completed_stages: int = 0
+    open_stages: int = 0
+    clocks: List[StageSlaClockResponse]
+    events: List[StageEventResponse]
+
+
+class StageTransitionRequest(BaseModel):
+    """Bulk stage move for many clients: a named workflow step and/or explicit stage -> status changes"""
+    client_ids: List[int] = Field(min_length=1, max_length=5000)
+    step: Optional[str] = None  # Key of stage_workflow.WORKFLOW_STEPS, e.g. "cx_product_approved"
+    changes: Dict[StageName, StageStatus] = Field(default_factory=dict)
+    notes: Optional[str] = None
+    skip_invalid: bool = False  # Leave disallowed stages untouched instead of rejecting the request
+    reopen: bool = False  # Allow completed stages to move back to in progress
+    evaluate_classification: bool = False  # Evaluate regimes of clients whose classification stage started
+
+
+class StageTransitionItem(BaseModel):
+    stage_id: int
+    client_id: int
+    stage_name: StageName
+    from_status: StageStatus
+    to_status: StageStatus
+
+
+class StageTransitionResult(BaseModel):
+    transitions: List[StageTransitionItem]
+    unchanged: int
+    skipped: List[StageTransitionItem]
+    missing_client_ids: List[int] = []  # Clients without any of the requested stages
+    consumers: Dict[str, Dict[str, Any]]
+    eligible_regimes: Dict[int, List[str]] = {}  # Per evaluated client
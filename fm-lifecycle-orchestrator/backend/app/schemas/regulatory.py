@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 from ..models.regulatory_classification import RegulatoryFramework, ValidationStatus
@@ -30,3 +30,25 @@ class RegulatoryClassificationResponse(RegulatoryClassificationBase):
     document_count: int = 0
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class CxPublicationRequest(BaseModel):
+    """Bulk CX publication: the given clients, or every client changed since its last sync"""
+    client_ids: Optional[List[int]] = Field(default=None, max_length=5000)
+    limit: Optional[int] = Field(default=None, ge=1)
+    background: bool = True  # Return immediately and publish in a background job
+
+
+class CxPublicationRunResponse(BaseModel):
+    id: int
+    status: str
+    transport: str
+    batch_reference: Optional[str] = None
+    clients_selected: int
+    clients_published: int
+    clients_failed: int
+    error: Optional[str] = None
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
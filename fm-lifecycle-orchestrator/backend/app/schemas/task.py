@@ -1,6 +1,6 @@
 from pydantic import BaseModel, ConfigDict
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from ..models.task import TaskStatus, TaskType
 
 
@@ -48,3 +48,9 @@ class TaskWithClientResponse(TaskResponse):
     days_until_due: Optional[int] = None
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class TaskInboxPage(BaseModel):
+    """One page of the task inbox; pass next_cursor back as cursor for the next page"""
+    items: List[TaskWithClientResponse]
+    next_cursor: Optional[str] = None
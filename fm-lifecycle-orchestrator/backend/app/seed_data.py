@@ -73,6 +73,7 @@ def seed_data():
             entity_type="Limited Liability Partnership",
             onboarding_status=OnboardingStatus.COMPLETED,
             assigned_rm="Sarah Johnson",
+            contact_email="documents@aldgatecapital.example.com",
             created_date=datetime.now() - timedelta(days=90),
             client_attributes={
                 "account_type": "subfund",
@@ -314,6 +315,7 @@ def seed_data():
             entity_type="Corporate Pension Fund",
             onboarding_status=OnboardingStatus.IN_PROGRESS,
             assigned_rm="Michael Chen",
+            contact_email="onboarding@americanretirementtrust.example.com",
             created_date=datetime.now() - timedelta(days=45),
             client_attributes={
                 "account_type": "trading_entity",
@@ -499,6 +501,7 @@ def seed_data():
             entity_type="Asset Management Company",
             onboarding_status=OnboardingStatus.BLOCKED,
             assigned_rm="Emma Schmidt",
+            contact_email="compliance@globalstructuredfinance.example.de",
             created_date=datetime.now() - timedelta(days=30)
         )
         db.add(client3)
@@ -566,6 +569,7 @@ def seed_data():
             entity_type="Special Purpose Vehicle",
             onboarding_status=OnboardingStatus.INITIATED,
             assigned_rm="James Liu",
+            contact_email="operations@caymaninvestment.example.ky",
             created_date=datetime.now() - timedelta(days=3)
         )
         db.add(client4)
@@ -598,6 +602,7 @@ def seed_data():
             entity_type="Credit Institution",
             onboarding_status=OnboardingStatus.IN_PROGRESS,
             assigned_rm="Yuki Tanaka",
+            contact_email="documents@tokyointernationalbank.example.jp",
             created_date=datetime.now() - timedelta(days=60),
             client_attributes={
                 "account_type": "trading_entity",
@@ -842,6 +847,7 @@ def seed_data():
             entity_type="Family Office",
             onboarding_status=OnboardingStatus.IN_PROGRESS,
             assigned_rm="Anna Müller",
+            contact_email="office@zurichfamilyoffice.example.ch",
             created_date=datetime.now() - timedelta(days=180),
             client_attributes={
                 "account_type": "subfund",
@@ -915,6 +921,7 @@ def seed_data():
             entity_type="Sovereign Wealth Fund",
             onboarding_status=OnboardingStatus.COMPLETED,
             assigned_rm="David Wong",
+            contact_email="onboarding@sgstrategicfund.example.sg",
             created_date=datetime.now() - timedelta(days=120),
             client_attributes={
                 "account_type": "trading_entity",
@@ -1260,6 +1267,7 @@ def seed_data():
             entity_type="Superannuation Fund",
             onboarding_status=OnboardingStatus.IN_PROGRESS,
             assigned_rm="Sophie Anderson",
+            contact_email="compliance@melbournesuper.example.com.au",
             created_date=datetime.now() - timedelta(days=25),
             client_attributes={
                 "account_type": "subfund",
@@ -1395,6 +1403,7 @@ def seed_data():
             entity_type="SICAV",
             onboarding_status=OnboardingStatus.IN_PROGRESS,
             assigned_rm="Pierre Dubois",
+            contact_email="documents@europeangrowthfund.example.lu",
             created_date=datetime.now() - timedelta(days=40),
             client_attributes={
                 "account_type": "subfund",
@@ -1594,6 +1603,7 @@ def seed_data():
             entity_type="Insurance Company",
             onboarding_status=OnboardingStatus.INITIATED,
             assigned_rm="Robert MacDonald",
+            contact_email="onboarding@torontolife.example.ca",
             created_date=datetime.now() - timedelta(days=7),
             client_attributes={
                 "account_type": "trading_entity",
@@ -1759,6 +1769,7 @@ def seed_data():
             entity_type="Private Limited Company",
             onboarding_status=OnboardingStatus.IN_PROGRESS,
             assigned_rm="Rajesh Kumar",
+            contact_email="compliance@mumbaifinancial.example.in",
             created_date=datetime.now() - timedelta(days=15),
             client_attributes={
                 "account_type": "trading_entity",
@@ -1795,6 +1806,7 @@ def seed_data():
             entity_type="Investment Fund",
             onboarding_status=OnboardingStatus.IN_PROGRESS,
             assigned_rm="Priya Sharma",
+            contact_email="documents@delhiinvestmentfund.example.in",
             created_date=datetime.now() - timedelta(days=20),
             client_attributes={
                 "account_type": "subfund",
@@ -1830,6 +1842,7 @@ def seed_data():
             entity_type="Private Banking",
             onboarding_status=OnboardingStatus.BLOCKED,
             assigned_rm="Anil Verma",
+            contact_email="onboarding@bangalorewealth.example.in",
             created_date=datetime.now() - timedelta(days=10),
             client_attributes={
                 "account_type": "private_banking",  # Out of scope!
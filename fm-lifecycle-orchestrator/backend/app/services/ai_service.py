@@ -1,10 +1,13 @@
+import logging
 import os
 import random
 import time
 import json
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable, Iterable
 from datetime import datetime, timedelta
+import openai
 from openai import OpenAI
+from pydantic import ValidationError
 import httpx
 # import PyPDF2
 # import pdfplumber
@@ -12,6 +15,77 @@ import httpx
 # import pytesseract
 # from docx import Document as DocxDocument
 from ..config import settings
+from .chat_sessions import ConversationState, CONTEXT_UPDATE_PREFIX
+from .single_flight import SingleFlight, fingerprint
+from .llm_scheduler import llm_scheduler, LLMPriority, estimate_tokens
+from .json_stream import JSONStreamError, parse_json_object_stream
+from .search_query_parser import search_query_parser
+from ..schemas.document import AnnotationExtractionResult
+from ..observability import get_logger, kv, log_sampled, tracer
+from ..observability.metrics import (
+    llm_requests_total,
+    llm_request_duration_seconds,
+    llm_time_to_first_token_seconds,
+    llm_tokens_total,
+    llm_errors_total
+)
+logger = get_logger(__name__)
+
+# Chat system prompts are kept byte-identical across clients and turns so the prompt prefix
+# can be served from the provider's prompt cache; client data follows in its own message.
+CLIENT_CHAT_SYSTEM_PROMPT = """You are an AI assistant for a Financial Markets Client Lifecycle Orchestrator system.
+You help users with client onboarding, document validation, compliance risk assessment, and data quality analysis.
+
+You have access to complete information about the client through the CLIENT DATA CONTEXT message.
+Later CLIENT DATA UPDATE messages replace the matching sections of that context.
+Use this information to provide specific, accurate, and helpful responses.
+
+When answering:
+- Be specific and reference actual data from the context
+- Provide actionable insights and recommendations
+- Keep responses concise but informative (2-3 sentences usually)
+- Use professional, friendly language
+- If asked about data not in the context, say so clearly
+- Format your responses using markdown for better readability:
+  * Use **bold** for important terms or values
+  * Use bullet points (- or *) for lists
+  * Use numbered lists (1., 2., etc.) for sequential steps
+  * Use `code formatting` for technical terms, IDs, or values
+  * Use headings (## or ###) to organize longer responses
+  * Use tables for comparing multiple items
+"""
+
+GENERAL_CHAT_SYSTEM_PROMPT = """You are an AI assistant for a Financial Markets Client Lifecycle Orchestrator system.
+You help users with questions about client onboarding, document validation, compliance risk assessment, and data quality analysis.
+
+Since no specific client context is available, provide general guidance and information about the system's capabilities.
+
+When answering:
+- Provide helpful, professional responses
+- Explain system features and capabilities when asked
+- Keep responses concise but informative (2-3 sentences usually)
+- If asked about a specific client, mention that you need client context to provide specific information
+- Format your responses using markdown for better readability:
+  * Use **bold** for important terms or features
+  * Use bullet points (- or *) for lists
+  * Use numbered lists (1., 2., etc.) for sequential steps
+  * Use `code formatting` for technical terms
+  * Use headings (## or ###) to organize longer responses
+"""
+
+
+class EntityExtractionError(Exception):
+    """The LLM kept returning output that does not match the entity extraction schema"""
+
+
+def _record_llm_tokens(priority: LLMPriority, usage: Any, prompt_chars: int, completion_chars: int):
+    """Count tokens from the provider's usage block, or estimate them (~4 chars/token) for streams"""
+    if usage is not None:
+        prompt_tokens, completion_tokens = usage.prompt_tokens, usage.completion_tokens
+    else:
+        prompt_tokens, completion_tokens = prompt_chars // 4, completion_chars // 4
+    llm_tokens_total.inc(prompt_tokens, priority=priority.name, kind="prompt")
+    llm_tokens_total.inc(completion_tokens, priority=priority.name, kind="completion")
 
 
 class AIService:
@@ -23,36 +97,165 @@ class AIService:
 
         if self.llm_enabled and settings.llm_api_key:
             try:
-                print(f"🔧 Initializing LLM client...")
-                print(f"   Endpoint: {settings.llm_api_endpoint}")
-                print(f"   Model: {settings.llm_model}")
-                print(f"   API Key length: {len(settings.llm_api_key)} chars")
-                print(f"   API Key (first 10 chars): {settings.llm_api_key[:10]}...")
-                print(f"   SSL Verify: {settings.llm_verify_ssl}")
-
                 # Create custom HTTP client if SSL verification is disabled
                 http_client = None
                 if not settings.llm_verify_ssl:
                     http_client = httpx.Client(verify=False)
-                    print("⚠️ SSL verification disabled for LLM API")
+                    logger.warning("SSL verification disabled for LLM API")
 
                 self.client = OpenAI(
                     api_key=settings.llm_api_key,
                     base_url=settings.llm_api_endpoint,
-                    http_client=http_client
+                    http_client=http_client,
+                    max_retries=0  # Retries are handled by the LLM scheduler
                 )
                 self.model = settings.llm_model
-                stream_mode = "streaming" if self.llm_stream else "non-streaming"
-                print(f"✅ LLM client initialized ({stream_mode}): {settings.llm_api_endpoint} | Model: {self.model}")
-            except Exception as e:
-                print(f"⚠️ Failed to initialize LLM client: {type(e).__name__}: {str(e)}")
-                import traceback
-                print(f"   Traceback:\n{traceback.format_exc()}")
+                logger.info(
+                    "LLM client initialized",
+                    extra=kv(endpoint=settings.llm_api_endpoint, model=self.model, stream=self.llm_stream,
+                             verify_ssl=settings.llm_verify_ssl)
+                )
+            except Exception:
+                logger.exception("Failed to initialize LLM client")
                 self.client = None
                 self.llm_enabled = False
         else:
             self.model = settings.openai_model
-            print("ℹ️ LLM integration disabled - using simulation mode")
+            logger.info("LLM integration disabled - using simulation mode")
+
+        self.json_mode_supported = settings.llm_json_mode
+        self.llm_flight = SingleFlight(
+            cache_ttl_seconds=settings.llm_result_cache_ttl_seconds,
+            cache_max_entries=settings.llm_result_cache_max_entries
+        )
+
+    def _complete(
+        self,
+        messages: list[Dict[str, str]],
+        temperature: float,
+        max_tokens: Optional[int] = None,
+        response_format: Optional[Dict[str, str]] = None,
+        stream: Optional[bool] = None,
+        priority: LLMPriority = LLMPriority.STANDARD
+    ) -> str:
+        """
+        Run a chat completion and return the message content.
+        Identical concurrent requests are coalesced into one LLM call (see SingleFlight),
+        which is admitted, rate limited and retried by the LLM scheduler in its priority lane.
+        """
+        return self._run_completion(messages, temperature, max_tokens, response_format, stream, priority, "".join)
+
+    def _complete_json(
+        self,
+        messages: list[Dict[str, str]],
+        temperature: float,
+        max_tokens: Optional[int] = None,
+        stream: Optional[bool] = None,
+        priority: LLMPriority = LLMPriority.STANDARD
+    ) -> Dict[str, Any]:
+        """
+        Run a chat completion that must answer with a JSON object and return it parsed.
+        Uses the provider's JSON mode when available; streamed output is parsed incrementally
+        and the stream is closed as soon as the object is complete.
+
+        Raises:
+            JSONStreamError: The response did not contain a well-formed JSON object
+        """
+        if self.json_mode_supported:
+            try:
+                return self._run_completion(
+                    messages, temperature, max_tokens, {"type": "json_object"}, stream, priority,
+                    parse_json_object_stream
+                )
+            except openai.BadRequestError as e:
+                if "response_format" not in str(e):
+                    raise
+                # Endpoint rejects JSON mode; rely on prompting and the stream parser from now on
+                logger.warning("LLM endpoint does not support JSON mode, falling back to prompted JSON")
+                self.json_mode_supported = False
+
+        return self._run_completion(messages, temperature, max_tokens, None, stream, priority, parse_json_object_stream)
+
+    def _run_completion(
+        self,
+        messages: list[Dict[str, str]],
+        temperature: float,
+        max_tokens: Optional[int],
+        response_format: Optional[Dict[str, str]],
+        stream: Optional[bool],
+        priority: LLMPriority,
+        consume: Callable[[Iterable[str]], Any]
+    ) -> Any:
+        """Shared completion path; consume turns the content deltas into the result"""
+        stream = self.llm_stream if stream is None else stream
+        params = {"model": self.model, "messages": messages, "temperature": temperature}
+        if max_tokens is not None:
+            params["max_tokens"] = max_tokens
+        if response_format is not None:
+            params["response_format"] = response_format
+
+        prompt_chars = sum(len(m.get("content") or "") for m in messages)
+
+        def attempt(timeout: float) -> Any:
+            started = time.perf_counter()
+            with tracer.span("llm.attempt", **{"llm.timeout_s": round(timeout, 2)}):
+                if not stream:
+                    response = self.client.chat.completions.create(timeout=timeout, **params)
+                    content = response.choices[0].message.content or ""
+                    llm_time_to_first_token_seconds.observe(time.perf_counter() - started, priority=priority.name)
+                    _record_llm_tokens(priority, response.usage, prompt_chars, len(content))
+                    return consume([content])
+
+                # Streaming mode - consume deltas as they arrive; the consumer may stop early
+                response_stream = self.client.chat.completions.create(stream=True, timeout=timeout, **params)
+                completion_chars = 0
+
+                def deltas() -> Iterable[str]:
+                    nonlocal completion_chars
+                    for chunk in response_stream:
+                        if not (chunk.choices and chunk.choices[0].delta.content):
+                            continue
+                        if not completion_chars:
+                            llm_time_to_first_token_seconds.observe(
+                                time.perf_counter() - started, priority=priority.name
+                            )
+                        completion_chars += len(chunk.choices[0].delta.content)
+                        yield chunk.choices[0].delta.content
+
+                try:
+                    return consume(deltas())
+                finally:
+                    response_stream.close()
+                    _record_llm_tokens(priority, None, prompt_chars, completion_chars)
+
+        def call() -> Any:
+            started = time.perf_counter()
+            with tracer.span(
+                "llm.completion",
+                **{
+                    "llm.model": self.model,
+                    "llm.priority": priority.name,
+                    "llm.stream": stream,
+                    "llm.json_mode": response_format is not None,
+                    "llm.prompt_chars": prompt_chars
+                }
+            ):
+                try:
+                    result = llm_scheduler.run(attempt, priority, estimate_tokens(messages, max_tokens))
+                except Exception as e:
+                    llm_requests_total.inc(priority=priority.name, outcome="error")
+                    llm_errors_total.inc(priority=priority.name, error=type(e).__name__)
+                    raise
+                finally:
+                    llm_request_duration_seconds.observe(time.perf_counter() - started, priority=priority.name)
+                llm_requests_total.inc(priority=priority.name, outcome="success")
+                return result
+
+        if not settings.llm_coalesce_requests:
+            return call()
+        # Streaming is a transport detail; the result depends only on the request and the consumer.
+        # The priority is part of the key so an interactive call never waits in a batch lane.
+        return self.llm_flight.do(fingerprint(params, consume.__name__, priority.name), call)
 
     def extract_text_from_pdf(self, file_path: str) -> str:
         """Extract text from PDF using pdfplumber"""
@@ -157,26 +360,22 @@ Respond in JSON format with keys: extracted_entities, validation_checks, recomme
 """
 
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
+            result = self._complete_json(
                 messages=[
                     {"role": "system", "content": "You are a financial regulatory compliance expert. Analyze documents and extract key information for regulatory classification validation. Always respond with valid JSON."},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.3,
-                response_format={"type": "json_object"}
+                stream=False
             )
 
-            import json
-            result = json.loads(response.choices[0].message.content)
-
             # Add extracted text preview
             result['extracted_text_preview'] = extracted_text[:500]
 
             return result
 
         except Exception as e:
-            print(f"AI validation error: {str(e)}")
+            logger.warning("AI validation failed, using mock validation", extra=kv(error=f"{type(e).__name__}: {e}"))
             return self._mock_validation(extracted_text, client_name)
 
     def _mock_validation(self, extracted_text: str, client_name: str) -> Dict[str, Any]:
@@ -499,7 +698,7 @@ Respond in JSON format with keys: extracted_entities, validation_checks, recomme
             "calculated_at": datetime.now().isoformat()
         }
 
-    def build_rag_context(self, client_data: Dict[str, Any]) -> str:
+    def build_rag_context(self, client_data: Dict[str, Any], include_passages: bool = True) -> str:
         """
         Build RAG context from client data for LLM.
         Converts client data into a structured text format for the LLM.
@@ -566,110 +765,125 @@ Respond in JSON format with keys: extracted_entities, validation_checks, recomme
                 if task.get('due_date'):
                     context_parts.append(f"  Due: {task['due_date']}")
 
+        # Passages retrieved from extracted document text for the current question
+        if include_passages and client_data.get('relevant_passages'):
+            context_parts.append("\n" + self.build_passage_context(client_data['relevant_passages']))
+
+        return "\n".join(context_parts)
+
+    def build_passage_context(self, passages: Optional[list]) -> str:
+        """Format retrieved document passages as a cited excerpt block"""
+        if not passages:
+            return ""
+
+        context_parts = ["=== RELEVANT DOCUMENT EXCERPTS ==="]
+        for passage in passages:
+            metadata = passage.get('metadata') or {}
+            context_parts.append(
+                f"\n[Document {passage.get('document_id')}: {metadata.get('filename', 'Unknown')}"
+                f" ({metadata.get('document_category', 'N/A')})]"
+            )
+            context_parts.append(passage.get('text', ''))
         return "\n".join(context_parts)
 
+    def _build_chat_messages(
+        self,
+        system_prompt: str,
+        user_content: str,
+        session: Optional[ConversationState] = None,
+        rag_context: Optional[str] = None
+    ) -> list[Dict[str, str]]:
+        """
+        Assemble chat messages in cache-friendly order: static system prompt, client context
+        snapshot, conversation summary and recent turns, then the current question.
+        Within a session the context snapshot is sent unchanged on every turn; changes to the
+        client data are appended to the history as a delta of only the changed sections.
+        """
+        messages = [{"role": "system", "content": system_prompt}]
+
+        if session is None:
+            if rag_context:
+                messages.append({"role": "system", "content": f"CLIENT DATA CONTEXT:\n{rag_context}"})
+        else:
+            if rag_context is not None:
+                delta = session.sync_context(rag_context)
+                if delta:
+                    session.add_message("system", f"{CONTEXT_UPDATE_PREFIX}\n{delta}")
+            if session.context_snapshot:
+                messages.append({"role": "system", "content": f"CLIENT DATA CONTEXT:\n{session.context_snapshot}"})
+            messages.extend(session.history())
+
+        messages.append({"role": "user", "content": user_content})
+        return messages
+
     def chat_with_assistant(
         self,
         message: str,
         context: Dict[str, Any] = None,
-        full_client_data: Dict[str, Any] = None
+        full_client_data: Dict[str, Any] = None,
+        session: Optional[ConversationState] = None
     ) -> Dict[str, Any]:
         """
         AI chat assistant with support for both simulation and real LLM integration.
         When LLM is enabled, uses RAG with full client context.
         Otherwise, uses pattern-matching canned responses.
+        When a session is given, the exchange is recorded in its history.
         """
-        # Debug logging
-        print(f"🔍 chat_with_assistant called:")
-        print(f"   - LLM enabled: {self.llm_enabled}")
-        print(f"   - Client initialized: {self.client is not None}")
-        print(f"   - Full client data provided: {full_client_data is not None}")
-        if full_client_data:
-            print(f"   - Client: {full_client_data.get('name', 'Unknown')}")
+        response = self._chat_response(message, context, full_client_data, session)
+
+        if session is not None:
+            session.add_message("user", message)
+            session.add_message("assistant", response["message"])
+            session.compact(settings.chat_session_max_turns, settings.chat_session_summary_chars)
+
+        return response
 
+    def _chat_response(
+        self,
+        message: str,
+        context: Optional[Dict[str, Any]],
+        full_client_data: Optional[Dict[str, Any]],
+        session: Optional[ConversationState]
+    ) -> Dict[str, Any]:
         # If LLM is enabled and client is initialized, use real LLM
         # Allow LLM mode even without client data (for general queries and testing)
         if self.llm_enabled and self.client:
-            if full_client_data:
-                print("✅ Using LLM mode with RAG (client context)")
-                return self._chat_with_llm(message, full_client_data)
-            else:
-                print("✅ Using LLM mode without client context (general mode)")
-                return self._chat_with_llm_general(message)
+            mode = "llm_rag" if full_client_data else "llm_general"
+        else:
+            mode = "simulation"
+        log_sampled(
+            logger, logging.DEBUG, "chat mode selected",
+            mode=mode, client_id=(full_client_data or {}).get("id")
+        )
+
+        if mode == "llm_rag":
+            return self._chat_with_llm(message, full_client_data, session)
+        if mode == "llm_general":
+            return self._chat_with_llm_general(message, session)
 
         # Otherwise, use simulation mode
-        print("⚠️ Using simulation mode")
         return self._chat_simulation(message, context)
 
     def _chat_with_llm(
         self,
         message: str,
-        full_client_data: Dict[str, Any]
+        full_client_data: Dict[str, Any],
+        session: Optional[ConversationState] = None
     ) -> Dict[str, Any]:
         """
         Chat using real LLM with RAG context.
         """
         try:
-            # Build RAG context
-            rag_context = self.build_rag_context(full_client_data)
-            client_name = full_client_data.get('name', 'the client')
-
-            # Build system prompt
-            system_prompt = f"""You are an AI assistant for a Financial Markets Client Lifecycle Orchestrator system.
-You help users with client onboarding, document validation, compliance risk assessment, and data quality analysis.
-
-You have access to complete information about {client_name} through the context below.
-Use this information to provide specific, accurate, and helpful responses.
-
-When answering:
-- Be specific and reference actual data from the context
-- Provide actionable insights and recommendations
-- Keep responses concise but informative (2-3 sentences usually)
-- Use professional, friendly language
-- If asked about data not in the context, say so clearly
-- Format your responses using markdown for better readability:
-  * Use **bold** for important terms or values
-  * Use bullet points (- or *) for lists
-  * Use numbered lists (1., 2., etc.) for sequential steps
-  * Use `code formatting` for technical terms, IDs, or values
-  * Use headings (## or ###) to organize longer responses
-  * Use tables for comparing multiple items
-
-CLIENT DATA CONTEXT:
-{rag_context}
-"""
-
-            # Call LLM (with or without streaming)
-            if self.llm_stream:
-                # Streaming mode - collect all chunks
-                stream = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": message}
-                    ],
-                    temperature=0.7,
-                    max_tokens=500,
-                    stream=True
-                )
-
-                # Collect streamed chunks
-                assistant_message = ""
-                for chunk in stream:
-                    if chunk.choices[0].delta.content:
-                        assistant_message += chunk.choices[0].delta.content
-            else:
-                # Non-streaming mode
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": message}
-                    ],
-                    temperature=0.7,
-                    max_tokens=500
-                )
-                assistant_message = response.choices[0].message.content
+            # Passages are specific to this question, so they travel with the user message
+            # instead of the cached client context
+            rag_context = self.build_rag_context(full_client_data, include_passages=False)
+            passages = self.build_passage_context(full_client_data.get('relevant_passages'))
+            user_content = f"{message}\n\n{passages}" if passages else message
+            messages = self._build_chat_messages(CLIENT_CHAT_SYSTEM_PROMPT, user_content, session, rag_context)
+
+            assistant_message = self._complete(
+                messages, temperature=0.7, max_tokens=500, priority=LLMPriority.INTERACTIVE
+            )
 
             # Generate contextual suggestions based on the response
             suggestions = self._generate_llm_suggestions(message, full_client_data)
@@ -686,76 +900,27 @@ CLIENT DATA CONTEXT:
             }
 
         except Exception as e:
-            print(f"❌ LLM chat error: {str(e)}")
-            # Fallback to simulation
-            return self._chat_simulation(message, {"client_name": full_client_data.get('name', 'the client')})
+            logger.error("LLM chat failed, falling back to simulation", extra=kv(error=f"{type(e).__name__}: {e}"))
+            # Fallback to simulation, flagged so the answer is not mistaken for an LLM response
+            response = self._chat_simulation(message, {"client_name": full_client_data.get('name', 'the client')})
+            response["source"] = "simulation_fallback"
+            return response
 
     def _chat_with_llm_general(
         self,
-        message: str
+        message: str,
+        session: Optional[ConversationState] = None
     ) -> Dict[str, Any]:
         """
         Chat using real LLM without client context (general mode).
         Used for testing or general queries without specific client data.
         """
         try:
-            # Build general system prompt without client context
-            system_prompt = """You are an AI assistant for a Financial Markets Client Lifecycle Orchestrator system.
-You help users with questions about client onboarding, document validation, compliance risk assessment, and data quality analysis.
-
-Since no specific client context is available, provide general guidance and information about the system's capabilities.
-
-When answering:
-- Provide helpful, professional responses
-- Explain system features and capabilities when asked
-- Keep responses concise but informative (2-3 sentences usually)
-- If asked about a specific client, mention that you need client context to provide specific information
-- Format your responses using markdown for better readability:
-  * Use **bold** for important terms or features
-  * Use bullet points (- or *) for lists
-  * Use numbered lists (1., 2., etc.) for sequential steps
-  * Use `code formatting` for technical terms
-  * Use headings (## or ###) to organize longer responses
-"""
-
-            print(f"📤 Sending to LLM (general mode): {message[:50]}...")
-
-            # Call LLM (with or without streaming)
-            if self.llm_stream:
-                # Streaming mode - collect all chunks
-                stream = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": message}
-                    ],
-                    temperature=0.7,
-                    max_tokens=500,
-                    stream=True
-                )
-
-                # Collect streamed chunks
-                assistant_message = ""
-                for chunk in stream:
-                    if chunk.choices[0].delta.content:
-                        content = chunk.choices[0].delta.content
-                        assistant_message += content
-                        print(f"📥 Chunk: {content}", end='', flush=True)
-                print()  # New line after streaming
-            else:
-                # Non-streaming mode
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": message}
-                    ],
-                    temperature=0.7,
-                    max_tokens=500
-                )
-                assistant_message = response.choices[0].message.content
+            messages = self._build_chat_messages(GENERAL_CHAT_SYSTEM_PROMPT, message, session)
 
-            print(f"✅ LLM response received: {assistant_message[:100]}...")
+            assistant_message = self._complete(
+                messages, temperature=0.7, max_tokens=500, priority=LLMPriority.INTERACTIVE
+            )
 
             # Generate general suggestions
             suggestions = [
@@ -775,11 +940,11 @@ When answering:
             }
 
         except Exception as e:
-            print(f"❌ LLM chat error (general mode): {str(e)}")
-            import traceback
-            traceback.print_exc()
-            # Fallback to simulation
-            return self._chat_simulation(message, {})
+            logger.exception("LLM chat failed (general mode), falling back to simulation")
+            # Fallback to simulation, flagged so the answer is not mistaken for an LLM response
+            response = self._chat_simulation(message, {})
+            response["source"] = "simulation_fallback"
+            return response
 
     def _generate_llm_suggestions(self, last_message: str, client_data: Dict[str, Any]) -> list[str]:
         """Generate contextual suggestions based on client data and last message."""
@@ -1160,46 +1325,18 @@ Provide 3-5 specific, actionable recommendations as a simple numbered or bullete
 
                 system_prompt = "You are an expert compliance analyst. Provide 3-5 specific, actionable recommendations in a simple numbered or bulleted list format. Keep each recommendation concise (one sentence)."
 
-                print(f"🤖 Requesting LLM recommendations...")
-                print(f"   - Streaming mode: {self.llm_stream}")
-
-                # Use the same streaming/non-streaming pattern as working chat code
-                llm_content = ""
-                if self.llm_stream:
-                    # Streaming mode - collect all chunks (same as chat)
-                    stream = self.client.chat.completions.create(
-                        model=self.model,
-                        messages=[
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": summary_text}
-                        ],
-                        temperature=0.7,
-                        max_tokens=500,
-                        stream=True
-                    )
-
-                    # Collect streamed chunks
-                    for chunk in stream:
-                        if chunk.choices[0].delta.content:
-                            llm_content += chunk.choices[0].delta.content
-                else:
-                    # Non-streaming mode (same as chat)
-                    response = self.client.chat.completions.create(
-                        model=self.model,
-                        messages=[
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": summary_text}
-                        ],
-                        temperature=0.7,
-                        max_tokens=500
-                    )
-                    llm_content = response.choices[0].message.content
+                llm_content = self._complete(
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": summary_text}
+                    ],
+                    temperature=0.7,
+                    max_tokens=500,
+                    priority=LLMPriority.BATCH
+                )
 
                 # Parse recommendations
                 if llm_content:
-                    print(f"✅ LLM response received: {len(llm_content)} chars")
-                    print(f"   First 100 chars: {llm_content[:100]}...")
-
                     lines = llm_content.strip().split('\n')
                     recommendations = []
 
@@ -1216,17 +1353,14 @@ Provide 3-5 specific, actionable recommendations as a simple numbered or bullete
                             recommendations.append(cleaned)
 
                     if recommendations:
-                        print(f"✅ Parsed {len(recommendations)} recommendations from LLM")
                         return recommendations[:5]
-                    else:
-                        print(f"⚠️ No valid recommendations parsed from LLM response")
+                    logger.warning("No valid recommendations parsed from LLM response",
+                                   extra=kv(response_chars=len(llm_content)))
                 else:
-                    print(f"⚠️ Empty LLM response")
+                    logger.warning("Empty LLM response for recommendations")
 
-            except Exception as e:
-                print(f"⚠️ LLM recommendations failed: {type(e).__name__}: {str(e)}")
-                import traceback
-                print(traceback.format_exc())
+            except Exception:
+                logger.exception("LLM recommendations failed, using heuristic recommendations")
 
         # Fallback to heuristic-based recommendations
         if pending_docs > 5:
@@ -1310,67 +1444,8 @@ Provide 3-5 specific, actionable recommendations as a simple numbered or bullete
         Parse natural language search query into structured filters.
         Extracts entities, statuses, and keywords for search.
         """
-        query_lower = query.lower()
-
-        # Initialize filters
-        filters = {
-            "onboarding_status": [],
-            "risk_level": [],
-            "jurisdictions": [],
-            "entity_types": [],
-            "keywords": [],
-            "time_filters": []
-        }
-
-        # Extract onboarding status
-        status_map = {
-            "initiated": ["initiated", "new", "started"],
-            "in_progress": ["in progress", "progressing", "ongoing", "active"],
-            "blocked": ["blocked", "stuck", "issues"],
-            "completed": ["completed", "done", "finished"]
-        }
-
-        for status, keywords in status_map.items():
-            if any(kw in query_lower for kw in keywords):
-                filters["onboarding_status"].append(status)
-
-        # Extract risk levels
-        if any(word in query_lower for word in ["high risk", "risky", "dangerous"]):
-            filters["risk_level"].append("high")
-        if any(word in query_lower for word in ["medium risk", "moderate"]):
-            filters["risk_level"].append("medium")
-        if any(word in query_lower for word in ["low risk", "safe"]):
-            filters["risk_level"].append("low")
-
-        # Extract common jurisdictions
-        jurisdictions = [
-            "United States", "UK", "United Kingdom", "Luxembourg", "Ireland",
-            "Cayman Islands", "Singapore", "Hong Kong", "Switzerland", "Germany"
-        ]
-        for jurisdiction in jurisdictions:
-            if jurisdiction.lower() in query_lower:
-                filters["jurisdictions"].append(jurisdiction)
-
-        # Extract entity types
-        entity_types = [
-            "hedge fund", "private equity", "corporation", "partnership", "spv"
-        ]
-        for entity_type in entity_types:
-            if entity_type in query_lower:
-                filters["entity_types"].append(entity_type)
-
-        # Extract time filters
-        if any(word in query_lower for word in ["recent", "recently", "latest", "new"]):
-            filters["time_filters"].append("recent")
-        if any(word in query_lower for word in ["pending", "waiting"]):
-            filters["time_filters"].append("pending")
-
-        # Extract general keywords (simple word extraction)
-        # Remove common words and extract meaningful terms
-        stop_words = {"show", "me", "all", "the", "with", "that", "have", "are", "is", "in", "at", "to", "for", "of", "a", "an"}
-        words = query_lower.split()
-        keywords = [word for word in words if word not in stop_words and len(word) > 3]
-        filters["keywords"] = keywords[:5]  # Limit to 5 keywords
+        parsed = search_query_parser.parse(query)
+        filters = parsed["filters"]
 
         # Generate query interpretation
         interpretation = self._generate_search_interpretation(filters, query)
@@ -1378,6 +1453,7 @@ Provide 3-5 specific, actionable recommendations as a simple numbered or bullete
         return {
             "original_query": query,
             "filters": filters,
+            "spans": parsed["spans"],
             "interpretation": interpretation,
             "parsed_at": datetime.now().isoformat()
         }
@@ -1402,6 +1478,10 @@ Provide 3-5 specific, actionable recommendations as a simple numbered or bullete
             types = ", ".join(filters["entity_types"])
             parts.append(f"entity type: {types}")
 
+        if filters.get("relationship_managers"):
+            managers = ", ".join(filters["relationship_managers"])
+            parts.append(f"managed by {managers}")
+
         if filters["time_filters"]:
             time = filters["time_filters"][0]
             if time == "recent":
@@ -1433,6 +1513,9 @@ Provide 3-5 specific, actionable recommendations as a simple numbered or bullete
 
         Returns:
             Dictionary with entity_type as keys and {value, confidence} as values
+
+        Raises:
+            EntityExtractionError: The LLM output still failed the schema after repair attempts
         """
 
         if not self.client or not self.llm_enabled:
@@ -1482,144 +1565,60 @@ Return confidence scores based on:
 
 If an entity cannot be found, set value to null and confidence to 0.0."""
 
-        try:
-            print("🔍 === LLM Entity Extraction Debug ===")
-            print(f"   Model: {self.model}")
-            print(f"   Endpoint: {settings.llm_api_endpoint}")
-            print(f"   API Key (first 10 chars): {settings.llm_api_key[:10]}..." if settings.llm_api_key else "   API Key: (empty)")
-            print(f"   SSL Verify: {settings.llm_verify_ssl}")
-            print(f"   Stream: {self.llm_stream}")
-            print(f"   Prompt length: {len(prompt)} chars")
-
-            print("📤 Sending request to LLM API...")
-
-            # For entity extraction with custom LLM wrapper, we use streaming mode
-            # to collect delta chunks (your wrapper always returns streaming format)
-            print(f"   Stream mode: True (collecting chunks for custom LLM wrapper)")
-
-            # Your LLM wrapper always returns streaming format, so we need to handle it
-            # We'll use streaming mode to collect delta chunks
-            request_params = {
-                "model": self.model,
-                "messages": [
-                    {"role": "system", "content": "You are a document analysis AI that extracts structured data from KYC documents. Always respond with valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                "temperature": 0.2,
-                "stream": True  # Your wrapper always streams, so we use streaming mode
-            }
-
-            print(f"   🚀 Sending request with stream=True (custom LLM wrapper behavior)")
-
-            stream = self.client.chat.completions.create(**request_params)
-
-            print("📥 Collecting streaming chunks from LLM API...")
-            message_content = ""
-            chunk_count = 0
-
-            for chunk in stream:
-                chunk_count += 1
-                print(f"   Chunk {chunk_count}: {chunk}")
-
-                if hasattr(chunk, 'choices') and len(chunk.choices) > 0:
-                    choice = chunk.choices[0]
-                    if hasattr(choice, 'delta') and hasattr(choice.delta, 'content'):
-                        delta_content = choice.delta.content
-                        if delta_content:
-                            print(f"   → Delta content: '{delta_content[:100]}'...")
-                            message_content += delta_content
-
-            print(f"   ✅ Collected {chunk_count} chunks")
-            print(f"\n   ==========================================")
-            print(f"   === FULL MESSAGE CONTENT START ===")
-            print(f"   ==========================================")
-            if message_content:
-                print(message_content)
-            else:
-                print("   (empty or None)")
-            print(f"   ==========================================")
-            print(f"   === FULL MESSAGE CONTENT END ===")
-            print(f"   ==========================================\n")
-
-            if not message_content:
-                raise ValueError("LLM returned empty content")
-
-            print("🔄 Attempting to parse JSON...")
-
-            # Try to extract JSON if it's wrapped in markdown code blocks or has extra text
-            content_to_parse = message_content.strip()
-            print(f"   Original content starts with: '{content_to_parse[:50]}'")
-            print(f"   Original content ends with: '{content_to_parse[-50:]}'")
-
-            # Check if content is wrapped in markdown code blocks
-            if content_to_parse.startswith("```"):
-                print("   ✂️ Detected markdown code block, extracting JSON...")
-                # Remove ```json or ``` from start and ``` from end
-                lines = content_to_parse.split('\n')
-                if lines[0].startswith("```"):
-                    lines = lines[1:]  # Remove first line
-                if lines and lines[-1].strip() == "```":
-                    lines = lines[:-1]  # Remove last line
-                content_to_parse = '\n'.join(lines).strip()
-                print(f"   ✂️ After markdown removal: '{content_to_parse[:100]}'...")
-
-            # Try to find JSON object if content has extra text
-            if not content_to_parse.startswith('{'):
-                print("   🔍 Content doesn't start with '{', searching for JSON object...")
-                start_idx = content_to_parse.find('{')
-                if start_idx != -1:
-                    end_idx = content_to_parse.rfind('}')
-                    if end_idx != -1 and end_idx > start_idx:
-                        content_to_parse = content_to_parse[start_idx:end_idx+1]
-                        print(f"   ✂️ Extracted JSON substring from position {start_idx} to {end_idx}")
-                        print(f"   ✂️ Extracted content: '{content_to_parse[:100]}'...")
-                    else:
-                        print(f"   ❌ Could not find matching closing brace (start={start_idx}, end={end_idx})")
-                else:
-                    print(f"   ❌ Could not find opening brace in content")
-
-            # Final check before parsing
-            print(f"   📝 Content to parse (length={len(content_to_parse)}):")
-            print(f"   === CONTENT TO PARSE START ===")
-            print(content_to_parse)
-            print(f"   === CONTENT TO PARSE END ===")
+        messages = [
+            {"role": "system", "content": "You are a document analysis AI that extracts structured data from KYC documents. Always respond with valid JSON."},
+            {"role": "user", "content": prompt}
+        ]
 
+        with tracer.span("ai.extract_entities", **{"llm.model": self.model, "prompt_chars": len(prompt)}) as span:
             try:
-                entities = json.loads(content_to_parse)
-                print(f"   ✅ JSON parsed successfully, keys: {list(entities.keys())}")
-            except json.JSONDecodeError as parse_error:
-                print(f"   ❌ JSON parsing failed!")
-                print(f"      Error: {parse_error}")
-                print(f"      Position: line {parse_error.lineno}, column {parse_error.colno}")
-                print(f"      Character at error: '{content_to_parse[parse_error.pos:parse_error.pos+20] if parse_error.pos < len(content_to_parse) else '(end of content)'}'")
-                raise
-
-            print(f"✅ LLM entity extraction successful")
-            return entities
+                # Malformed or incomplete output is retried with a targeted correction request
+                # rather than silently replaced by simulated entities
+                for attempt in range(settings.llm_json_repair_attempts + 1):
+                    try:
+                        # The custom LLM wrapper always returns streaming format, so stream and
+                        # stop reading as soon as the JSON object closes
+                        raw_entities = self._complete_json(
+                            messages,
+                            temperature=0.2,
+                            stream=True,
+                            priority=LLMPriority.BATCH
+                        )
+                        entities = AnnotationExtractionResult.model_validate(raw_entities).model_dump()
+                        span.set_attribute("extraction.attempts", attempt + 1)
+                        return entities
+                    except JSONStreamError as e:
+                        problem = str(e)
+                        previous_output = e.content
+                    except ValidationError as e:
+                        problem = "; ".join(
+                            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                            for error in e.errors()
+                        )
+                        previous_output = json.dumps(raw_entities)
+
+                    logger.warning("Entity extraction output rejected", extra=kv(attempt=attempt + 1, problem=problem))
+                    messages = messages[:2] + [
+                        {"role": "assistant", "content": previous_output[:4000]},
+                        {"role": "user", "content": (
+                            f"Your previous reply could not be used: {problem}. "
+                            "Reply with only the corrected JSON object containing all seven entities, "
+                            "each with a string or null value and a confidence between 0.0 and 1.0."
+                        )}
+                    ]
+
+                raise EntityExtractionError(
+                    f"LLM returned malformed entities after {settings.llm_json_repair_attempts + 1} attempts: {problem}"
+                )
 
-        except json.JSONDecodeError as e:
-            print(f"❌ JSON Decode Error: {str(e)}")
-            print(f"   Error at: line {e.lineno}, column {e.colno}, position {e.pos}")
-            print(f"   Failed to parse: {e.doc[:500] if hasattr(e, 'doc') and e.doc else '(no doc)'}")
-            print("   Falling back to simulated entity extraction")
-            return self._simulate_entity_extraction(extracted_text, client_name, country, entity_type)
-        except ValueError as e:
-            print(f"❌ Value Error: {str(e)}")
-            print("   Falling back to simulated entity extraction")
-            return self._simulate_entity_extraction(extracted_text, client_name, country, entity_type)
-        except AttributeError as e:
-            print(f"❌ Attribute Error: {str(e)}")
-            import traceback
-            print(f"   Traceback:\n{traceback.format_exc()}")
-            print("   This usually means the LLM response structure is unexpected")
-            print("   Falling back to simulated entity extraction")
-            return self._simulate_entity_extraction(extracted_text, client_name, country, entity_type)
-        except Exception as e:
-            print(f"❌ LLM entity extraction error: {type(e).__name__}: {str(e)}")
-            import traceback
-            print(f"   Traceback:\n{traceback.format_exc()}")
-            print("   Falling back to simulated entity extraction")
-            return self._simulate_entity_extraction(extracted_text, client_name, country, entity_type)
+            except EntityExtractionError:
+                raise
+            except Exception as e:
+                logger.error(
+                    "LLM entity extraction failed, falling back to simulated extraction",
+                    extra=kv(error=f"{type(e).__name__}: {e}")
+                )
+                return self._simulate_entity_extraction(extracted_text, client_name, country, entity_type)
 
     def _simulate_entity_extraction(
         self,
@@ -1632,7 +1631,7 @@ If an entity cannot be found, set value to null and confidence to 0.0."""
         Simulate entity extraction for demo when LLM is not available.
         Attempts basic text matching and returns simulated confidence scores.
         """
-        print("ℹ️ Using simulated entity extraction")
+        logger.debug("Using simulated entity extraction")
 
         # Try to find entities in the extracted text
         text_upper = extracted_text.upper()
@@ -0,0 +1,224 @@
+"""
+Chat Session Store
+Keeps multi-turn chat state keyed by session ID: recent turns, a rolling summary of older
+turns, and a fingerprint of the client context already sent, so follow-up questions keep
+their context and only changed context sections are re-sent.
+"""
+import hashlib
+import re
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Any
+
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models.chat_session import ChatSession
+
+SECTION_PATTERN = re.compile(r"^=== (.+?) ===$", re.MULTILINE)
+
+CONTEXT_UPDATE_PREFIX = "CLIENT DATA UPDATE (only the sections that changed since the last message):"
+
+
+def split_context_sections(context: str) -> Dict[str, str]:
+    """Split a RAG context string into its '=== SECTION ===' blocks"""
+    matches = list(SECTION_PATTERN.finditer(context))
+    sections = {}
+    for position, match in enumerate(matches):
+        end = matches[position + 1].start() if position + 1 < len(matches) else len(context)
+        sections[match.group(1)] = context[match.start():end].strip()
+    return sections
+
+
+def _first_sentence(text: str, limit: int = 200) -> str:
+    sentence = re.split(r"(?<=[.!?])\s", text.strip(), maxsplit=1)[0]
+    sentence = " ".join(sentence.split())
+    return sentence if len(sentence) <= limit else sentence[:limit - 3] + "..."
+
+
+class ConversationState:
+    """Mutable state of one chat conversation"""
+
+    def __init__(self, session_id: str, client_id: Optional[int] = None):
+        self.session_id = session_id
+        self.client_id = client_id
+        self.summary = ""
+        self.turns: List[Dict[str, str]] = []
+        self.context_snapshot: Optional[str] = None
+        self.context_sections: Dict[str, str] = {}
+        self.created_date = datetime.utcnow()
+        self.updated_date = self.created_date
+
+    def sync_context(self, context: str) -> Optional[str]:
+        """
+        Compare the current client context with what this session has already sent.
+
+        The first call stores the context as the session's stable snapshot. Later calls
+        return only the sections whose content changed (or None when nothing changed).
+        """
+        sections = split_context_sections(context)
+        hashes = {name: hashlib.sha1(body.encode("utf-8")).hexdigest() for name, body in sections.items()}
+
+        if self.context_snapshot is None:
+            self.context_snapshot = context
+            self.context_sections = hashes
+            return None
+
+        changed = [name for name, digest in hashes.items() if self.context_sections.get(name) != digest]
+        removed = [name for name in self.context_sections if name not in hashes]
+        if not changed and not removed:
+            return None
+
+        self.context_sections = hashes
+        parts = [sections[name] for name in changed]
+        parts.extend(f"=== {name} ===\n(no longer present)" for name in removed)
+        return "\n\n".join(parts)
+
+    def add_message(self, role: str, content: str):
+        self.turns.append({"role": role, "content": content})
+        self.updated_date = datetime.utcnow()
+
+    def compact(self, max_turns: int, summary_chars: int):
+        """Fold the oldest turns into the rolling summary until at most max_turns remain"""
+        folded = []
+        while len(self.turns) > max_turns:
+            turn = self.turns.pop(0)
+            if turn["role"] == "user":
+                folded.append(f"- User asked: {_first_sentence(turn['content'])}")
+            elif turn["role"] == "assistant":
+                folded.append(f"- Assistant answered: {_first_sentence(turn['content'])}")
+            else:
+                # A context update leaving the window is merged into the snapshot so it is not lost
+                self._merge_into_snapshot(turn["content"])
+
+        if not folded:
+            return
+
+        summary = "\n".join(filter(None, [self.summary] + folded))
+        if len(summary) > summary_chars:
+            # Keep the most recent history, cut at a line boundary
+            summary = summary[-summary_chars:]
+            summary = summary[summary.find("\n") + 1:] if "\n" in summary else summary
+        self.summary = summary
+
+    def _merge_into_snapshot(self, update: str):
+        sections = split_context_sections(self.context_snapshot or "")
+        for name, body in split_context_sections(update).items():
+            if body.endswith("(no longer present)"):
+                sections.pop(name, None)
+            else:
+                sections[name] = body
+        self.context_snapshot = "\n\n".join(sections.values())
+
+    def history(self) -> List[Dict[str, str]]:
+        """Messages to send after the stable prompt prefix (summary first, then recent turns)"""
+        messages = []
+        if self.summary:
+            messages.append({"role": "system", "content": f"SUMMARY OF EARLIER CONVERSATION:\n{self.summary}"})
+        messages.extend({"role": turn["role"], "content": turn["content"]} for turn in self.turns)
+        return messages
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "client_id": self.client_id,
+            "summary": self.summary,
+            "turns": self.turns,
+            "created_date": self.created_date.isoformat(),
+            "updated_date": self.updated_date.isoformat()
+        }
+
+
+class ChatSessionStore:
+    """
+    In-process LRU of conversation states, optionally backed by the chat_sessions table
+    so conversations survive restarts and are shared by workers.
+    """
+
+    def __init__(self, max_sessions: int, persist: bool = False):
+        self.max_sessions = max_sessions
+        self.persist = persist
+        self._sessions: "OrderedDict[str, ConversationState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str, db: Optional[Session] = None) -> Optional[ConversationState]:
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is not None:
+                self._sessions.move_to_end(session_id)
+                return state
+
+        if self.persist and db is not None:
+            row = db.query(ChatSession).filter(ChatSession.session_id == session_id).first()
+            if row:
+                state = self._from_row(row)
+                self._remember(state)
+                return state
+
+        return None
+
+    def get_or_create(
+        self,
+        session_id: Optional[str],
+        client_id: Optional[int],
+        db: Optional[Session] = None
+    ) -> ConversationState:
+        """
+        Return the conversation for session_id, creating a new one when the ID is unknown.
+        A session switched to a different client starts over, since its history no longer applies.
+        """
+        state = self.get(session_id, db) if session_id else None
+        if state is None or state.client_id != client_id:
+            state = ConversationState(session_id or uuid.uuid4().hex, client_id)
+            self._remember(state)
+        return state
+
+    def save(self, state: ConversationState, db: Optional[Session] = None):
+        self._remember(state)
+        if not (self.persist and db is not None):
+            return
+
+        row = db.query(ChatSession).filter(ChatSession.session_id == state.session_id).first()
+        if row is None:
+            row = ChatSession(session_id=state.session_id, created_date=state.created_date)
+            db.add(row)
+        row.client_id = state.client_id
+        row.summary = state.summary
+        row.turns = list(state.turns)
+        row.context_snapshot = state.context_snapshot
+        row.context_sections = dict(state.context_sections)
+        db.commit()
+
+    def delete(self, session_id: str, db: Optional[Session] = None) -> bool:
+        with self._lock:
+            removed = self._sessions.pop(session_id, None) is not None
+
+        if self.persist and db is not None:
+            removed = db.query(ChatSession).filter(ChatSession.session_id == session_id).delete() > 0 or removed
+            db.commit()
+
+        return removed
+
+    def _remember(self, state: ConversationState):
+        with self._lock:
+            self._sessions[state.session_id] = state
+            self._sessions.move_to_end(state.session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    @staticmethod
+    def _from_row(row: ChatSession) -> ConversationState:
+        state = ConversationState(row.session_id, row.client_id)
+        state.summary = row.summary or ""
+        state.turns = list(row.turns or [])
+        state.context_snapshot = row.context_snapshot
+        state.context_sections = dict(row.context_sections or {})
+        state.created_date = row.created_date or state.created_date
+        state.updated_date = row.updated_date or state.updated_date
+        return state
+
+
+# Singleton instance
+chat_session_store = ChatSessionStore(settings.chat_session_max_sessions, settings.chat_session_persist)
@@ -2,15 +2,25 @@
 Classification Engine Service
 Evaluates client eligibility against regulatory regime classification rules
 """
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, Iterable, List, Optional, Any, Set, Tuple
 from sqlalchemy.orm import Session
 from datetime import datetime
+import time
 
 from ..models.classification_rule import ClassificationRule
 from ..models.regime_eligibility import RegimeEligibility
 from ..models.client import Client
 from ..models.mandatory_evidence import MandatoryEvidence
 from ..models.document import Document
+from ..observability.metrics import (
+    classification_evaluations_total,
+    classification_evaluation_duration_seconds,
+    classification_eligibility_writes_total
+)
+from .decision_cache import decision_cache
+
+# Bound on bound parameters per IN (...) query (SQLite's default limit is 999 on older builds)
+IN_CLAUSE_CHUNK = 900
 
 
 class ClassificationEngine:
@@ -24,7 +34,9 @@ class ClassificationEngine:
     def evaluate_client_eligibility(
         self,
         client_id: int,
-        regime: str
+        regime: str,
+        mandatory_evidences: Optional[List[MandatoryEvidence]] = None,
+        doc_categories: Optional[Set[str]] = None
     ) -> Dict[str, Any]:
         """
         Evaluate a client's eligibility for a specific regulatory regime
@@ -32,10 +44,32 @@ class ClassificationEngine:
         Args:
             client_id: The client ID to evaluate
             regime: The regulatory regime (e.g., "RBI", "MAS", "HKMA")
+            mandatory_evidences: Preloaded mandatory evidences for the regime (see load_data_quality_inputs)
+            doc_categories: Preloaded document categories of the client
 
         Returns:
             Dict containing eligibility result, matched/unmatched rules, and recommendations
         """
+        start = time.perf_counter()
+        try:
+            result = self._evaluate_client_eligibility(client_id, regime, mandatory_evidences, doc_categories)
+        except Exception:
+            classification_evaluations_total.inc(regime=regime, result="error")
+            raise
+        finally:
+            classification_evaluation_duration_seconds.observe(time.perf_counter() - start, regime=regime)
+        classification_evaluations_total.inc(
+            regime=regime, result="eligible" if result["is_eligible"] else "ineligible"
+        )
+        return result
+
+    def _evaluate_client_eligibility(
+        self,
+        client_id: int,
+        regime: str,
+        mandatory_evidences: Optional[List[MandatoryEvidence]],
+        doc_categories: Optional[Set[str]]
+    ) -> Dict[str, Any]:
         # Get client
         client = self.db.query(Client).filter(Client.id == client_id).first()
         if not client:
@@ -45,43 +79,129 @@ class ClassificationEngine:
         rules = self.db.query(ClassificationRule).filter(
             ClassificationRule.regime == regime,
             ClassificationRule.is_active == True
-        ).all()
+        ).order_by(ClassificationRule.id).all()
+
+        if rules:
+            if mandatory_evidences is None:
+                mandatory_evidences = self._load_mandatory_evidences(regime)
+            if doc_categories is None:
+                doc_categories = self._load_document_categories(client_id)
+
+        decision = self._decide(
+            client,
+            regime,
+            rules,
+            mandatory_evidences or [],
+            doc_categories or set(),
+            lambda: self.db.query(RegimeEligibility).filter(
+                RegimeEligibility.client_id == client_id,
+                RegimeEligibility.regime == regime
+            ).first()
+        )
+        return self._finalize([decision])[0]
+
+    def evaluate_regimes(
+        self,
+        client_id: int,
+        regimes: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Evaluate a client against several regimes in one pass
 
+        The client, the active rules of every regime, the evidences, the client's documents and
+        the existing eligibility rows are each loaded with one query, and all changed
+        RegimeEligibility rows are written in a single transaction.
+
+        Returns:
+            Dict mapping regime to the same result as evaluate_client_eligibility, or to
+            {"error": ..., "is_eligible": False} when that regime failed to evaluate
+        """
+        client = self.db.query(Client).filter(Client.id == client_id).first()
+        if not client:
+            raise ValueError(f"Client {client_id} not found")
+
+        regimes = list(dict.fromkeys(regimes))
+        rules_by_regime: Dict[str, List[ClassificationRule]] = {}
+        eligibility_by_regime: Dict[str, RegimeEligibility] = {}
+        if regimes:
+            for rule in self.db.query(ClassificationRule).filter(
+                ClassificationRule.regime.in_(regimes),
+                ClassificationRule.is_active == True
+            ).order_by(ClassificationRule.id):
+                rules_by_regime.setdefault(rule.regime, []).append(rule)
+            for eligibility in self.db.query(RegimeEligibility).filter(
+                RegimeEligibility.client_id == client_id,
+                RegimeEligibility.regime.in_(regimes)
+            ):
+                eligibility_by_regime.setdefault(eligibility.regime, eligibility)
+        evidences_by_regime, categories_by_client = self.load_data_quality_inputs([client_id], regimes)
+        doc_categories = categories_by_client.get(client_id, set())
+
+        decisions = []
+        results: Dict[str, Dict[str, Any]] = {}
+        for regime in regimes:
+            start = time.perf_counter()
+            try:
+                decisions.append(self._decide(
+                    client,
+                    regime,
+                    rules_by_regime.get(regime, []),
+                    evidences_by_regime.get(regime, []),
+                    doc_categories,
+                    lambda regime=regime: eligibility_by_regime.get(regime)
+                ))
+            except Exception as e:
+                classification_evaluations_total.inc(regime=regime, result="error")
+                results[regime] = {"error": str(e), "is_eligible": False}
+            finally:
+                classification_evaluation_duration_seconds.observe(time.perf_counter() - start, regime=regime)
+
+        for decision, result in zip(decisions, self._finalize(decisions)):
+            classification_evaluations_total.inc(
+                regime=decision[0], result="eligible" if result["is_eligible"] else "ineligible"
+            )
+            results[decision[0]] = result
+
+        return {regime: results[regime] for regime in regimes}
+
+    def _decide(
+        self,
+        client: Client,
+        regime: str,
+        rules: List[ClassificationRule],
+        mandatory_evidences: List[MandatoryEvidence],
+        doc_categories: Set[str],
+        load_eligibility: Callable[[], Optional[RegimeEligibility]]
+    ) -> Tuple[str, Dict[str, Any], Optional[RegimeEligibility], Optional[str]]:
+        """
+        Evaluate one regime from loaded inputs and stage its RegimeEligibility row (no commit)
+
+        Returns:
+            (regime, result, eligibility, decision_key). eligibility is None when the result is
+            already final (no active rules, or a decision cache hit); otherwise _finalize fills in
+            eligibility_id and evaluated_at.
+        """
+        client_attrs = client.client_attributes or {}
         if not rules:
-            return {
+            return regime, {
                 "is_eligible": False,
                 "reason": f"No active classification rules found for regime {regime}",
                 "matched_rules": [],
                 "unmatched_rules": [],
-                "client_attributes": client.client_attributes or {}
-            }
-
-        # Evaluate each rule
-        matched_rules = []
-        unmatched_rules = []
-
-        client_attrs = client.client_attributes or {}
+                "client_attributes": client_attrs
+            }, None, None
 
-        for rule in rules:
-            is_match = self._evaluate_rule(rule, client_attrs)
+        # Unchanged attributes, rules and documents: reuse the previous decision as is
+        decision_key = decision_cache.decision_key(client_attrs, rules, mandatory_evidences, doc_categories)
+        cached = decision_cache.get(client.id, regime, decision_key)
+        if cached is not None:
+            return regime, cached, None, None
 
-            if is_match:
-                matched_rules.append({
-                    "rule_id": rule.id,
-                    "rule_type": rule.rule_type,
-                    "rule_name": rule.rule_name
-                })
-            else:
-                unmatched_rules.append({
-                    "rule_id": rule.id,
-                    "rule_type": rule.rule_type,
-                    "rule_name": rule.rule_name,
-                    "expected": rule.rule_config,
-                    "actual": client_attrs.get(rule.rule_type)
-                })
+        # Evaluate each rule
+        matched_rules, unmatched_rules = self.match_rules(rules, client_attrs)
 
         # Calculate data quality score
-        data_quality_info = self.calculate_data_quality_score(client_id, regime)
+        data_quality_info = self.score_data_quality(mandatory_evidences, doc_categories)
         data_quality_score = data_quality_info["quality_score"]
 
         # Flag data quality exceptions
@@ -98,46 +218,44 @@ class ClassificationEngine:
         can_publish_to_cx = True
 
         # Generate eligibility reason
-        if rules_eligible and not data_quality_exceptions:
-            reason = f"Client meets all {len(matched_rules)} classification rules for {regime}"
-        elif rules_eligible and data_quality_exceptions:
-            reason = f"Client meets all classification rules but has data quality exceptions"
-        elif len(matched_rules) == 0:
-            reason = f"Client does not match any classification rules for {regime}"
-        else:
-            reason = f"Client matches {len(matched_rules)}/{len(rules)} rules. Missing: {', '.join([r['rule_name'] for r in unmatched_rules])}"
+        reason = self.eligibility_reason(regime, matched_rules, unmatched_rules, len(rules), bool(data_quality_exceptions))
 
         # Save or update regime eligibility
-        eligibility = self.db.query(RegimeEligibility).filter(
-            RegimeEligibility.client_id == client_id,
-            RegimeEligibility.regime == regime
-        ).first()
-
-        if eligibility:
-            eligibility.is_eligible = rules_eligible
-            eligibility.eligibility_reason = reason
-            eligibility.matched_rules = matched_rules
-            eligibility.unmatched_rules = unmatched_rules
-            eligibility.client_attributes = client_attrs
-            eligibility.last_evaluated_date = datetime.utcnow()
+        eligibility = load_eligibility()
+
+        if eligibility and (
+            eligibility.is_eligible == rules_eligible
+            and eligibility.eligibility_reason == reason
+            and eligibility.matched_rules == matched_rules
+            and eligibility.unmatched_rules == unmatched_rules
+            and eligibility.client_attributes == client_attrs
+        ):
+            # Same decision as stored: leave the row (and its timestamp) untouched
+            classification_eligibility_writes_total.inc(outcome="unchanged")
         else:
-            eligibility = RegimeEligibility(
-                client_id=client_id,
-                regime=regime,
-                is_eligible=rules_eligible,
-                eligibility_reason=reason,
-                matched_rules=matched_rules,
-                unmatched_rules=unmatched_rules,
-                client_attributes=client_attrs,
-                last_evaluated_date=datetime.utcnow()
-            )
-            self.db.add(eligibility)
-
-        self.db.commit()
-        self.db.refresh(eligibility)
-
-        return {
-            "eligibility_id": eligibility.id,
+            if eligibility:
+                eligibility.is_eligible = rules_eligible
+                eligibility.eligibility_reason = reason
+                eligibility.matched_rules = matched_rules
+                eligibility.unmatched_rules = unmatched_rules
+                eligibility.client_attributes = client_attrs
+                eligibility.last_evaluated_date = datetime.utcnow()
+            else:
+                eligibility = RegimeEligibility(
+                    client_id=client.id,
+                    regime=regime,
+                    is_eligible=rules_eligible,
+                    eligibility_reason=reason,
+                    matched_rules=matched_rules,
+                    unmatched_rules=unmatched_rules,
+                    client_attributes=client_attrs,
+                    last_evaluated_date=datetime.utcnow()
+                )
+                self.db.add(eligibility)
+            classification_eligibility_writes_total.inc(outcome="written")
+
+        return regime, {
+            "eligibility_id": None,
             "is_eligible": rules_eligible,
             "reason": reason,
             "matched_rules": matched_rules,
@@ -146,8 +264,81 @@ class ClassificationEngine:
             "data_quality_score": data_quality_score,
             "data_quality_exceptions": data_quality_exceptions,
             "can_publish_to_cx": can_publish_to_cx,
-            "evaluated_at": eligibility.last_evaluated_date.isoformat()
-        }
+            "evaluated_at": None
+        }, eligibility, decision_key
+
+    def _finalize(
+        self,
+        decisions: List[Tuple[str, Dict[str, Any], Optional[RegimeEligibility], Optional[str]]]
+    ) -> List[Dict[str, Any]]:
+        """Write all staged eligibility rows in one transaction and complete their results"""
+        staged = [decision for decision in decisions if decision[2] is not None]
+        if staged:
+            try:
+                if self.db.new or self.db.dirty:
+                    self.db.flush()  # Assigns IDs to new rows
+                for _, result, eligibility, _ in staged:
+                    result["eligibility_id"] = eligibility.id
+                    result["evaluated_at"] = eligibility.last_evaluated_date.isoformat()
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
+            for regime, result, eligibility, decision_key in staged:
+                decision_cache.put(eligibility.client_id, regime, decision_key, result)
+        return [decision[1] for decision in decisions]
+
+    def match_rules(
+        self,
+        rules: List[ClassificationRule],
+        client_attrs: Dict[str, Any]
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Split rules into matched and unmatched entries for a set of client attributes
+
+        Returns:
+            (matched_rules, unmatched_rules) in the shape stored on RegimeEligibility
+        """
+        matched_rules = []
+        unmatched_rules = []
+
+        for rule in rules:
+            if self._evaluate_rule(rule, client_attrs):
+                matched_rules.append({
+                    "rule_id": rule.id,
+                    "rule_type": rule.rule_type,
+                    "rule_name": rule.rule_name
+                })
+            else:
+                unmatched_rules.append({
+                    "rule_id": rule.id,
+                    "rule_type": rule.rule_type,
+                    "rule_name": rule.rule_name,
+                    "expected": rule.rule_config,
+                    "actual": client_attrs.get(rule.rule_type)
+                })
+
+        return matched_rules, unmatched_rules
+
+    @staticmethod
+    def eligibility_reason(
+        regime: str,
+        matched_rules: List[Dict[str, Any]],
+        unmatched_rules: List[Dict[str, Any]],
+        total_rules: int,
+        has_data_quality_exceptions: bool
+    ) -> str:
+        """Human-readable eligibility reason stored with the evaluation"""
+        rules_eligible = len(unmatched_rules) == 0 and len(matched_rules) > 0
+
+        if rules_eligible and not has_data_quality_exceptions:
+            return f"Client meets all {len(matched_rules)} classification rules for {regime}"
+        elif rules_eligible and has_data_quality_exceptions:
+            return f"Client meets all classification rules but has data quality exceptions"
+        elif len(matched_rules) == 0:
+            return f"Client does not match any classification rules for {regime}"
+        else:
+            return f"Client matches {len(matched_rules)}/{total_rules} rules. Missing: {', '.join([r['rule_name'] for r in unmatched_rules])}"
 
     def _evaluate_rule(
         self,
@@ -270,17 +461,7 @@ class ClassificationEngine:
         regimes = self.db.query(ClassificationRule.regime).distinct().all()
         regimes = [r[0] for r in regimes]
 
-        results = {}
-        for regime in regimes:
-            try:
-                results[regime] = self.evaluate_client_eligibility(client_id, regime)
-            except Exception as e:
-                results[regime] = {
-                    "error": str(e),
-                    "is_eligible": False
-                }
-
-        return results
+        return self.evaluate_regimes(client_id, regimes)
 
     def calculate_data_quality_score(
         self,
@@ -297,13 +478,112 @@ class ClassificationEngine:
         Returns:
             Dict with quality score, missing evidences, and warnings
         """
-        # Get mandatory evidences for this regime
-        mandatory_evidences = self.db.query(MandatoryEvidence).filter(
+        return self.score_data_quality(
+            self._load_mandatory_evidences(regime),
+            self._load_document_categories(client_id)
+        )
+
+    def calculate_data_quality_scores(
+        self,
+        pairs: Iterable[Tuple[int, str]]
+    ) -> Dict[Tuple[int, str], Dict[str, Any]]:
+        """
+        Data quality scores for many (client_id, regime) pairs at once
+
+        Evidences are loaded once per regime and document categories once per client (two
+        queries in total), and pairs whose client has the same relevant categories share the
+        scoring work.
+
+        Returns:
+            Dict mapping (client_id, regime) to the same structure as calculate_data_quality_score
+        """
+        pairs = list(dict.fromkeys(pairs))
+        evidences_by_regime, categories_by_client = self.load_data_quality_inputs(
+            {client_id for client_id, _ in pairs},
+            {regime for _, regime in pairs}
+        )
+
+        required_by_regime = {
+            regime: frozenset(evidence.evidence_type for evidence in evidences)
+            for regime, evidences in evidences_by_regime.items()
+        }
+        scored: Dict[Tuple[str, frozenset], Dict[str, Any]] = {}
+        results = {}
+        for client_id, regime in pairs:
+            required = required_by_regime.get(regime, frozenset())
+            # Only the categories this regime asks for can change its score
+            present = required & categories_by_client.get(client_id, set())
+            score = scored.get((regime, present))
+            if score is None:
+                score = scored[(regime, present)] = self.score_data_quality(
+                    evidences_by_regime.get(regime, []), present
+                )
+            results[(client_id, regime)] = {
+                **score,
+                "missing_evidences": list(score["missing_evidences"]),
+                "warnings": list(score["warnings"])
+            }
+        return results
+
+    def load_data_quality_inputs(
+        self,
+        client_ids: Iterable[int],
+        regimes: Iterable[str]
+    ) -> Tuple[Dict[str, List[MandatoryEvidence]], Dict[int, Set[str]]]:
+        """
+        Mandatory evidences per regime and document categories per client, one query each
+
+        Returns:
+            (regime -> evidences, client_id -> document categories); absent keys mean none
+        """
+        regimes = list(set(regimes))
+        evidences_by_regime: Dict[str, List[MandatoryEvidence]] = {}
+        if regimes:
+            for evidence in self.db.query(MandatoryEvidence).filter(
+                MandatoryEvidence.regime.in_(regimes),
+                MandatoryEvidence.is_mandatory == True,
+                MandatoryEvidence.is_active == True
+            ).order_by(MandatoryEvidence.id):
+                evidences_by_regime.setdefault(evidence.regime, []).append(evidence)
+
+        categories_by_client: Dict[int, Set[str]] = {}
+        client_ids = list(set(client_ids))
+        for start in range(0, len(client_ids), IN_CLAUSE_CHUNK):
+            rows = self.db.query(Document.client_id, Document.document_category).filter(
+                Document.client_id.in_(client_ids[start:start + IN_CLAUSE_CHUNK])
+            ).distinct().all()
+            for client_id, category in rows:
+                if category is not None:
+                    categories_by_client.setdefault(client_id, set()).add(category.value)
+
+        return evidences_by_regime, categories_by_client
+
+    def _load_mandatory_evidences(self, regime: str) -> List[MandatoryEvidence]:
+        """Active mandatory evidences for a regime, in a stable order"""
+        return self.db.query(MandatoryEvidence).filter(
             MandatoryEvidence.regime == regime,
             MandatoryEvidence.is_mandatory == True,
             MandatoryEvidence.is_active == True
-        ).all()
+        ).order_by(MandatoryEvidence.id).all()
+
+    def _load_document_categories(self, client_id: int) -> Set[str]:
+        """Categories of the documents a client has uploaded"""
+        rows = self.db.query(Document.document_category).filter(
+            Document.client_id == client_id
+        ).distinct().all()
+        return {row[0].value for row in rows if row[0] is not None}
+
+    @staticmethod
+    def score_data_quality(
+        mandatory_evidences: List[MandatoryEvidence],
+        doc_categories: Set[str]
+    ) -> Dict[str, Any]:
+        """
+        Data quality score for already loaded evidences and document categories
 
+        Returns:
+            Dict with quality score, missing evidences, and warnings
+        """
         if not mandatory_evidences:
             return {
                 "quality_score": 100.0,
@@ -313,31 +593,22 @@ class ClassificationEngine:
                 "warnings": []
             }
 
-        # Get client documents
-        client_docs = self.db.query(Document).filter(
-            Document.client_id == client_id
-        ).all()
-
-        # Map documents by category
-        doc_categories = {doc.document_category.value for doc in client_docs}
-
-        missing_evidences = []
-        warnings = []
-
-        for evidence in mandatory_evidences:
-            # Check if document exists for this evidence type
-            # In a real system, you'd have a more sophisticated mapping
-            has_document = evidence.evidence_type in doc_categories
-
-            if not has_document:
-                missing_evidences.append({
-                    "evidence_id": evidence.id,
-                    "evidence_type": evidence.evidence_type,
-                    "evidence_name": evidence.evidence_name,
-                    "category": evidence.category.value,
-                    "description": evidence.description
-                })
-                warnings.append(f"Missing mandatory evidence: {evidence.evidence_name}")
+        # Check if document exists for each evidence type
+        # In a real system, you'd have a more sophisticated mapping
+        missing_types = {evidence.evidence_type for evidence in mandatory_evidences} - doc_categories
+        missing = [evidence for evidence in mandatory_evidences if evidence.evidence_type in missing_types]
+
+        missing_evidences = [
+            {
+                "evidence_id": evidence.id,
+                "evidence_type": evidence.evidence_type,
+                "evidence_name": evidence.evidence_name,
+                "category": evidence.category.value,
+                "description": evidence.description
+            }
+            for evidence in missing
+        ]
+        warnings = [f"Missing mandatory evidence: {evidence.evidence_name}" for evidence in missing]
 
         total_count = len(mandatory_evidences)
         completed_count = total_count - len(missing_evidences)
@@ -374,6 +645,10 @@ class ClassificationEngine:
         else:
             regimes = [r[0] for r in self.db.query(ClassificationRule.regime).distinct().all()]
 
+        evidences_by_regime, categories_by_client = self.load_data_quality_inputs(
+            [client.id for client in clients], regimes
+        )
+
         results = {
             "total_clients": len(clients),
             "regimes_evaluated": regimes,
@@ -387,7 +662,12 @@ class ClassificationEngine:
 
             for client in clients:
                 try:
-                    result = self.evaluate_client_eligibility(client.id, reg)
+                    result = self.evaluate_client_eligibility(
+                        client.id,
+                        reg,
+                        evidences_by_regime.get(reg, []),
+                        categories_by_client.get(client.id, set())
+                    )
                     if result["is_eligible"]:
                         eligible_count += 1
                     else:
@@ -0,0 +1,271 @@
+"""
+Client Search
+Server-side natural-language client search. On SQLite the clients are indexed in an FTS5 table
+(client_search_fts) with one row per client: name, LEI, RM, jurisdiction (country of
+incorporation plus booking location), entity type and the extracted text of the client's
+documents. Triggers on clients and documents keep the index in sync with every write, including
+bulk inserts that bypass the ORM; ensure_index() creates the table and triggers at startup and
+rebuilds the index when it is new or may have missed writes.
+
+Parsed filters become predicates instead of post-filtering: jurisdictions, entity types and RMs
+are FTS column phrase filters, onboarding status and "recent" use indexed client columns and
+"pending" is an EXISTS on the client's tasks. Matches are ordered by bm25 rank (then id) and
+paginated with an opaque keyset cursor, so a page never repeats or skips clients while the
+index is unchanged. Other dialects fall back to LIKE predicates with the same API (no ranking).
+"""
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, exists, func, literal_column, or_
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models.client import Client, OnboardingStatus
+from ..models.task import Task, TaskStatus
+from ..observability import get_logger, tracer
+from ..observability.metrics import client_search_duration_seconds
+from .search_query_parser import SEARCH_STOP_WORDS
+from .fts import FullTextIndex, TOKEN_PATTERN, decode_cursor, encode_cursor, prefix_match
+from .single_flight import fingerprint
+
+logger = get_logger(__name__)
+
+FTS_TABLE = "client_search_fts"
+FTS_COLUMNS = ("name", "legal_entity_id", "assigned_rm", "jurisdiction", "entity_type", "document_text")
+# bm25 column weights, in FTS_COLUMNS order: a name or LEI hit outranks a mention in a document
+FTS_WEIGHTS = (10.0, 8.0, 4.0, 2.0, 2.0, 1.0)
+
+# Words that describe the search itself rather than what to look for
+SEARCH_NOISE_WORDS = {"client", "clients", "find", "list", "search", "any", "which", "who", "where", "and", "or"}
+MAX_TEXT_TERMS = 8
+
+# Indexed values of a client (aliased c); document_text is added by the statement using them
+_ROW_COLUMNS = """c.id, c.name, c.legal_entity_id, c.assigned_rm,
+    trim(coalesce(c.country_of_incorporation, '') || ' ' || coalesce(
+        CASE WHEN json_valid(c.client_attributes)
+             THEN json_extract(c.client_attributes, '$.booking_location') END, '')),
+    c.entity_type"""
+_INSERT = f"INSERT INTO {FTS_TABLE}(rowid, {', '.join(FTS_COLUMNS)})"
+
+
+def _refresh(client_id: str) -> str:
+    return (
+        f"DELETE FROM {FTS_TABLE} WHERE rowid = {client_id}; "
+        f"{_INSERT} SELECT {_ROW_COLUMNS}, (SELECT group_concat(d.extracted_text, ' ') "
+        f"FROM documents d WHERE d.client_id = c.id) FROM clients c WHERE c.id = {client_id};"
+    )
+
+
+_TRIGGERS = {
+    "client_search_client_insert": f"AFTER INSERT ON clients BEGIN {_refresh('NEW.id')} END",
+    "client_search_client_update": (
+        "AFTER UPDATE OF name, legal_entity_id, assigned_rm, country_of_incorporation, entity_type, "
+        f"client_attributes ON clients BEGIN DELETE FROM {FTS_TABLE} WHERE rowid = OLD.id; "
+        f"{_refresh('NEW.id')} END"
+    ),
+    "client_search_client_delete": f"AFTER DELETE ON clients BEGIN DELETE FROM {FTS_TABLE} WHERE rowid = OLD.id; END",
+    "client_search_document_insert": f"AFTER INSERT ON documents BEGIN {_refresh('NEW.client_id')} END",
+    "client_search_document_update": (
+        "AFTER UPDATE OF extracted_text, client_id ON documents BEGIN "
+        f"{_refresh('OLD.client_id')} {_refresh('NEW.client_id')} END"
+    ),
+    "client_search_document_delete": f"AFTER DELETE ON documents BEGIN {_refresh('OLD.client_id')} END",
+}
+
+
+class ClientSearchQuery:
+    """A parsed natural-language query turned into an FTS match expression and SQL predicates"""
+
+    def __init__(
+        self,
+        query: str,
+        filters: Dict[str, List[str]],
+        spans: List[Dict[str, Any]],
+        now: datetime,
+        recent_days: int
+    ):
+        self.query = query
+        self.filters = filters
+        self.applied: List[str] = []
+        self.ignored: List[str] = []
+        self.text_terms = self._free_text_terms(query, spans)
+
+        groups = []
+        if filters.get("jurisdictions"):
+            groups.append(self._any_phrase("jurisdiction", filters["jurisdictions"]))
+            self.applied.append("jurisdictions")
+        if filters.get("entity_types"):
+            # Entity type words often only appear in the name ("... Hedge Fund LP")
+            groups.append(self._any_phrase("{name entity_type}", filters["entity_types"]))
+            self.applied.append("entity_types")
+        if filters.get("relationship_managers"):
+            groups.append(self._any_phrase("assigned_rm", filters["relationship_managers"]))
+            self.applied.append("relationship_managers")
+        if self.text_terms:
+            groups.append("(" + " OR ".join(f'"{term}"*' for term in self.text_terms) + ")")
+            self.applied.append("keywords")
+        self.match = " AND ".join(groups)
+
+        self.predicates = []
+        statuses = [OnboardingStatus(status) for status in filters.get("onboarding_status", [])]
+        if statuses:
+            self.predicates.append(Client.onboarding_status.in_(statuses))
+            self.applied.append("onboarding_status")
+        time_filters = filters.get("time_filters", [])
+        if "recent" in time_filters:
+            self.predicates.append(Client.last_updated >= now - timedelta(days=recent_days))
+        if "pending" in time_filters:
+            self.predicates.append(exists().where(and_(
+                Task.client_id == Client.id,
+                Task.status == TaskStatus.PENDING
+            )))
+        if time_filters:
+            self.applied.append("time_filters")
+        if filters.get("risk_level"):
+            # Risk is scored on demand (ai_service.calculate_compliance_risk_score), not stored
+            self.ignored.append("risk_level")
+
+    @staticmethod
+    def _any_phrase(columns: str, phrases: List[str]) -> str:
+        alternatives = []
+        for phrase in phrases:
+            tokens = TOKEN_PATTERN.findall(phrase.lower())
+            if tokens:
+                alternatives.append(f'{columns} : "{" ".join(tokens)}"')
+        return "(" + " OR ".join(alternatives) + ")"
+
+    @staticmethod
+    def _free_text_terms(query: str, spans: List[Dict[str, Any]]) -> List[str]:
+        """Query words outside the spans the parser understood, e.g. a name or LEI"""
+        remaining = list(query)
+        for span in spans:
+            remaining[span["start"]:span["end"]] = " " * (span["end"] - span["start"])
+        ignored = SEARCH_STOP_WORDS | SEARCH_NOISE_WORDS
+        terms = [token for token in TOKEN_PATTERN.findall("".join(remaining).lower()) if token not in ignored and len(token) > 1]
+        return list(dict.fromkeys(terms))[:MAX_TEXT_TERMS]
+
+    @property
+    def key(self) -> str:
+        """Identifies the result ordering a cursor belongs to"""
+        return fingerprint(self.match, self.filters)[:16]
+
+
+class ClientSearchService:
+    """Owns the full-text index and runs ranked, cursor-paginated client searches"""
+
+    def __init__(self, page_size: int = 20, max_page_size: int = 100, recent_days: int = 30):
+        self.page_size = page_size
+        self.max_page_size = max_page_size
+        self.recent_days = recent_days
+        self.index = FullTextIndex(
+            FTS_TABLE, FTS_COLUMNS, "clients", _TRIGGERS,
+            [
+                f"DELETE FROM {FTS_TABLE}",
+                # Aggregate documents in one grouped pass instead of a correlated subquery per client
+                f"{_INSERT} SELECT {_ROW_COLUMNS}, docs.text FROM clients c LEFT JOIN ("
+                "SELECT client_id, group_concat(extracted_text, ' ') AS text FROM documents GROUP BY client_id"
+                ") docs ON docs.client_id = c.id"
+            ]
+        )
+
+    @property
+    def fts_enabled(self) -> bool:
+        return self.index.enabled
+
+    def ensure_index(self, engine: Engine):
+        """Create the FTS table and sync triggers; rebuild the index when it may be stale"""
+        self.index.ensure(engine)
+
+    def text_filter(self, db: Session, text: str):
+        """Predicate for a plain name / LEI search box (token prefix match)"""
+        match = prefix_match(text, ("name", "legal_entity_id"))
+        if not self.fts_enabled or not match:
+            return or_(Client.name.ilike(f"%{text}%"), Client.legal_entity_id.ilike(f"%{text}%"))
+        return Client.id.in_(self.index.matching_ids(db, match))
+
+    def search(
+        self,
+        db: Session,
+        query: str,
+        filters: Dict[str, List[str]],
+        spans: List[Dict[str, Any]],
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Ranked page of clients matching a parsed natural-language query.
+
+        Returns:
+            Dict with "hits" [(client, score, snippet)], "next_cursor", "applied_filters",
+            "ignored_filters" and "text_terms"
+        """
+        limit = min(limit or self.page_size, self.max_page_size)
+        parsed = ClientSearchQuery(query, filters, spans, datetime.utcnow(), self.recent_days)
+        after = decode_cursor(cursor, parsed.key, ["s", "id"]) if cursor else None
+        mode = "fts" if self.fts_enabled else "like"
+
+        start = time.perf_counter()
+        with tracer.span("client_search.query", mode=mode, ranked=bool(parsed.match)):
+            if self.fts_enabled and parsed.match:
+                rows = self._ranked_page(db, parsed, after, limit)
+            else:
+                rows = self._unranked_page(db, parsed, after, limit)
+        client_search_duration_seconds.observe(time.perf_counter() - start, mode=mode)
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last_client, last_score, _ = rows[-1]
+            next_cursor = encode_cursor(parsed.key, {"s": last_score, "id": last_client.id})
+        return {
+            "hits": rows,
+            "next_cursor": next_cursor,
+            "applied_filters": parsed.applied,
+            "ignored_filters": parsed.ignored,
+            "text_terms": parsed.text_terms,
+        }
+
+    def _ranked_page(self, db: Session, parsed: ClientSearchQuery, after, limit: int) -> List[Tuple]:
+        fts_table = literal_column(FTS_TABLE)
+        score = func.bm25(fts_table, *FTS_WEIGHTS)
+        snippet = func.snippet(fts_table, -1, "<mark>", "</mark>", "…", 12)
+        query = db.query(Client, score, snippet).join(
+            self.index.table, self.index.table.c.rowid == Client.id
+        ).filter(self.index.match(parsed.match), *parsed.predicates)
+        if after is not None:
+            last_score, last_id = after["s"], after["id"]
+            query = query.filter(or_(score > last_score, and_(score == last_score, Client.id > last_id)))
+        return [tuple(row) for row in query.order_by(score, Client.id).limit(limit + 1)]
+
+    def _unranked_page(self, db: Session, parsed: ClientSearchQuery, after, limit: int) -> List[Tuple]:
+        """Newest clients first; LIKE stands in for the match expression without FTS"""
+        query = db.query(Client).filter(*parsed.predicates)
+        if not self.fts_enabled:
+            if parsed.filters.get("relationship_managers"):
+                query = query.filter(Client.assigned_rm.in_(parsed.filters["relationship_managers"]))
+            for phrases in (parsed.filters.get("jurisdictions"), parsed.filters.get("entity_types")):
+                if phrases:
+                    query = query.filter(or_(*[
+                        Client.country_of_incorporation.ilike(f"%{p}%") | Client.entity_type.ilike(f"%{p}%")
+                        | Client.name.ilike(f"%{p}%")
+                        for p in phrases
+                    ]))
+            if parsed.text_terms:
+                query = query.filter(or_(*[
+                    Client.name.ilike(f"%{term}%") | Client.legal_entity_id.ilike(f"%{term}%")
+                    | Client.assigned_rm.ilike(f"%{term}%")
+                    for term in parsed.text_terms
+                ]))
+        if after is not None:
+            query = query.filter(Client.id < after["id"])
+        return [(client, None, None) for client in query.order_by(Client.id.desc()).limit(limit + 1)]
+
+
+# Singleton instance
+client_search = ClientSearchService(
+    page_size=settings.client_search_page_size,
+    max_page_size=settings.client_search_max_page_size,
+    recent_days=settings.client_search_recent_days
+)
@@ -0,0 +1,232 @@
+"""
+CX Publication
+Bulk publication of classification results to CX ("publish every client whose eligibility
+changed since its last sync") as one job instead of one HTTP call per client:
+- pending clients are those never synced, whose last sync failed, or with a RegimeEligibility
+  row evaluated after their cx_sync_date (eligibility rows are only rewritten when a decision
+  changes, so last_evaluated_date marks a change)
+- payloads are built from one joined client x eligibility query read in batches and grouped by
+  client, and streamed as NDJSON to the configured CX transport (a local file stub by default)
+- per-client outcomes are written afterwards in one batched UPDATE of the client sync columns
+  plus one batched insert of publication items
+"""
+from datetime import datetime
+from itertools import groupby
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from sqlalchemy import func, or_, update
+from sqlalchemy.orm import Query, Session
+
+from ..config import settings
+from ..database import SessionLocal
+from ..integrations.cx_transport import CXTransport, cx_transport, ndjson_lines
+from ..models.client import Client
+from ..models.cx_publication import CxPublicationItem, CxPublicationRun
+from ..models.regime_eligibility import RegimeEligibility
+from ..observability import get_logger, kv, tracer
+from ..observability.metrics import cx_publication_clients_total
+
+logger = get_logger(__name__)
+
+DEFAULT_DATA_QUALITY_SCORE = 85.0
+DATA_QUALITY_WARNING_BELOW = 90
+
+_CLIENT_COLUMNS = (Client.id, Client.name, Client.country_of_incorporation, Client.entity_type)
+_ELIGIBILITY_COLUMNS = (
+    RegimeEligibility.regime, RegimeEligibility.is_eligible, RegimeEligibility.eligibility_reason,
+    RegimeEligibility.matched_rules, RegimeEligibility.unmatched_rules,
+    RegimeEligibility.data_quality_score, RegimeEligibility.last_evaluated_date
+)
+
+
+class CxPublicationService:
+    """Selects changed clients, streams their payloads to CX and records the outcomes"""
+
+    def __init__(
+        self,
+        transport: CXTransport = cx_transport,
+        batch_size: int = 1000,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        self.transport = transport
+        self.batch_size = batch_size
+        self.session_factory = session_factory
+
+    @staticmethod
+    def pending_query(db: Session, client_ids: Optional[Sequence[int]] = None) -> Query:
+        """
+        Ids of clients with eligibility results to publish: all of client_ids when given,
+        otherwise those changed since their last successful sync
+        """
+        # Walks clients in id order with index seeks per client, so a limited run stops early
+        # instead of aggregating every eligibility row first
+        has_results = db.query(RegimeEligibility.id).filter(RegimeEligibility.client_id == Client.id).exists()
+        query = db.query(Client.id).filter(has_results)
+        if client_ids is not None:
+            return query.filter(Client.id.in_(client_ids))
+        last_evaluated = db.query(func.max(RegimeEligibility.last_evaluated_date)).filter(
+            RegimeEligibility.client_id == Client.id
+        ).correlate(Client).scalar_subquery()
+        return query.filter(or_(
+            Client.cx_sync_date.is_(None),
+            Client.cx_sync_status != "synced",
+            last_evaluated > Client.cx_sync_date
+        ))
+
+    def payloads(
+        self,
+        db: Session,
+        client_ids: Optional[Sequence[int]] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """CX payload per pending client, in client id order, from one joined query"""
+        targets = self.pending_query(db, client_ids).order_by(Client.id).limit(
+            limit or settings.cx_publication_max_clients
+        ).subquery()
+        rows = db.query(*_CLIENT_COLUMNS, *_ELIGIBILITY_COLUMNS).join(
+            targets, targets.c.id == Client.id
+        ).join(
+            RegimeEligibility, RegimeEligibility.client_id == Client.id
+        ).order_by(Client.id, RegimeEligibility.regime).yield_per(self.batch_size)
+
+        published_at = datetime.utcnow().isoformat()
+        for (client_id, name, country, entity_type), regimes in groupby(rows, key=lambda row: tuple(row[:4])):
+            classification_results = []
+            data_quality_warnings = []
+            for row in regimes:
+                regime, is_eligible, reason, matched, unmatched, quality, evaluated_at = row[4:]
+                quality = quality or DEFAULT_DATA_QUALITY_SCORE
+                if quality < DATA_QUALITY_WARNING_BELOW:
+                    data_quality_warnings.append(f"{regime}: Data quality {quality}%")
+                classification_results.append({
+                    "regime": regime,
+                    "is_eligible": is_eligible,
+                    "eligibility_reason": reason,
+                    "matched_rules": matched,
+                    "unmatched_rules": unmatched,
+                    "data_quality_score": quality,
+                    "last_evaluated": evaluated_at.isoformat() if evaluated_at else None
+                })
+            yield {
+                "client_id": client_id,
+                "client_name": name,
+                "country_of_incorporation": country,
+                "entity_type": entity_type,
+                "classification_results": classification_results,
+                "data_quality_warnings": data_quality_warnings,
+                "published_at": published_at,
+                "published_by": "FM Lifecycle Orchestrator",
+                "publication_version": "1.0"
+            }
+
+    def export(self, client_ids: Optional[Sequence[int]] = None, limit: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Pending payloads as NDJSON, without publishing or recording anything. Reads in its own
+        session, which outlives the request's, so a streaming response can consume it.
+        """
+        db = self.session_factory()
+        try:
+            yield from ndjson_lines(self.payloads(db, client_ids, limit))
+        finally:
+            db.close()
+
+    def start_run(self, db: Session) -> CxPublicationRun:
+        run = CxPublicationRun(status="running", transport=self.transport.name)
+        db.add(run)
+        db.commit()
+        db.refresh(run)
+        return run
+
+    def publish(
+        self,
+        db: Session,
+        client_ids: Optional[Sequence[int]] = None,
+        limit: Optional[int] = None,
+        run: Optional[CxPublicationRun] = None
+    ) -> CxPublicationRun:
+        """Publish pending (or the given) clients in one transport call and record every outcome"""
+        run = run or self.start_run(db)
+        regimes_by_client: Dict[int, int] = {}
+
+        def counted(payloads: Iterator[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+            for payload in payloads:
+                regimes_by_client[payload["client_id"]] = len(payload["classification_results"])
+                yield payload
+
+        error: Optional[str] = None
+        results: Dict[int, Dict[str, Any]] = {}
+        with tracer.span("cx.publish", run_id=run.id, transport=self.transport.name):
+            try:
+                response = self.transport.publish(counted(self.payloads(db, client_ids, limit)))
+                results = response["results"]
+                run.batch_reference = response.get("batch_reference")
+            except Exception as exc:
+                logger.exception("CX publication failed", extra=kv(run_id=run.id))
+                error = str(exc)
+
+        self._record(db, run, regimes_by_client, results, error)
+        return run
+
+    def _record(
+        self,
+        db: Session,
+        run: CxPublicationRun,
+        regimes_by_client: Dict[int, int],
+        results: Dict[int, Dict[str, Any]],
+        error: Optional[str]
+    ):
+        now = datetime.utcnow()
+        client_rows: List[Dict[str, Any]] = []
+        item_rows: List[Dict[str, Any]] = []
+        for client_id, regimes in regimes_by_client.items():
+            result = results.get(client_id) or {
+                "status": "failed", "reference_id": None, "error": error or "Not acknowledged by CX"
+            }
+            status = "synced" if result["status"] == "synced" else "failed"
+            row = {"id": client_id, "cx_sync_status": status, "cx_sync_date": now}
+            if status == "synced":
+                row["cx_reference_id"] = result["reference_id"]
+            client_rows.append(row)
+            item_rows.append({
+                "run_id": run.id, "client_id": client_id, "status": status,
+                "reference_id": result.get("reference_id"), "regimes_published": regimes,
+                "error": result.get("error"), "published_at": now
+            })
+
+        # Synced and failed rows update different column sets, so they are two executemany batches
+        for synced in (True, False):
+            batch = [row for row in client_rows if (row["cx_sync_status"] == "synced") is synced]
+            if batch:
+                db.execute(update(Client), batch)
+        if item_rows:
+            db.bulk_insert_mappings(CxPublicationItem, item_rows)
+
+        published = sum(1 for row in client_rows if row["cx_sync_status"] == "synced")
+        run.clients_selected = len(client_rows)
+        run.clients_published = published
+        run.clients_failed = len(client_rows) - published
+        run.status = "failed" if error else "completed"
+        run.error = error
+        run.finished_at = now
+        db.commit()
+
+        cx_publication_clients_total.inc(published, outcome="synced")
+        cx_publication_clients_total.inc(len(client_rows) - published, outcome="failed")
+        logger.info("CX publication finished", extra=kv(
+            run_id=run.id, status=run.status, published=published, failed=run.clients_failed,
+            batch_reference=run.batch_reference
+        ))
+
+    def run_in_background(self, run_id: int, client_ids: Optional[Sequence[int]] = None, limit: Optional[int] = None):
+        """Entry point for a BackgroundTasks job: publishes in its own session"""
+        db = self.session_factory()
+        try:
+            run = db.get(CxPublicationRun, run_id)
+            if run is not None:
+                self.publish(db, client_ids, limit, run=run)
+        finally:
+            db.close()
+
+
+# Singleton instance
+cx_publication = CxPublicationService(batch_size=settings.cx_publication_batch_size)
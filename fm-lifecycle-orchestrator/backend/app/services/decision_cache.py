@@ -0,0 +1,95 @@
+"""
+Eligibility Decision Cache
+Remembers the last eligibility decision per (client, regime) together with a fingerprint of
+everything the decision depends on: the client's attributes, the regime's active rules
+(id, version and config) and the evidence/document set used for data quality. A lookup whose
+fingerprint still matches returns the stored decision, so the engine skips rule evaluation and
+the RegimeEligibility write. Any input change produces a different fingerprint, which makes the
+entry stale and forces a fresh evaluation; no explicit invalidation calls are needed.
+"""
+import copy
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from ..config import settings
+from ..observability.metrics import classification_decision_cache_total
+from .single_flight import fingerprint
+
+
+class EligibilityDecisionCache:
+    """LRU of eligibility results keyed by (client_id, regime), validated by input fingerprint"""
+
+    def __init__(self, max_entries: int = 50000, enabled: bool = True):
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[int, str], Tuple[str, Dict[str, Any]]]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "stale": 0}
+
+    @staticmethod
+    def decision_key(
+        client_attrs: Dict[str, Any],
+        rules: Iterable[Any],
+        evidences: Iterable[Any],
+        doc_categories: Iterable[str]
+    ) -> str:
+        """Fingerprint of the inputs an eligibility decision depends on"""
+        return fingerprint(
+            client_attrs,
+            sorted((rule.id, rule.version, rule.rule_config) for rule in rules),
+            sorted(
+                (e.id, e.evidence_type, e.evidence_name, e.category.value, e.description) for e in evidences
+            ),
+            sorted(doc_categories)
+        )
+
+    def get(self, client_id: int, regime: str, key: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get((client_id, regime))
+            if entry is not None and entry[0] == key:
+                self._entries.move_to_end((client_id, regime))
+                self.stats["hits"] += 1
+                outcome = "hit"
+            else:
+                self.stats["stale" if entry is not None else "misses"] += 1
+                outcome = "stale" if entry is not None else "miss"
+        classification_decision_cache_total.inc(result=outcome)
+        return dict(entry[1]) if outcome == "hit" else None
+
+    def put(self, client_id: int, regime: str, key: str, result: Dict[str, Any]):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[(client_id, regime)] = (key, copy.deepcopy(result))
+            self._entries.move_to_end((client_id, regime))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters plus hit ratio (stale entries count as misses)"""
+        with self._lock:
+            stats = dict(self.stats)
+            entries = len(self._entries)
+        lookups = stats["hits"] + stats["misses"] + stats["stale"]
+        return {
+            "enabled": self.enabled,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            **stats,
+            "lookups": lookups,
+            "hit_ratio": round(stats["hits"] / lookups, 4) if lookups else 0.0
+        }
+
+
+# Singleton instance
+decision_cache = EligibilityDecisionCache(
+    max_entries=settings.classification_decision_cache_max_entries,
+    enabled=settings.classification_decision_cache_enabled
+)
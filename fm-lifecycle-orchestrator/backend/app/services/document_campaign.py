@@ -0,0 +1,343 @@
+"""
+Document Campaigns
+Bulk missing-document request emails ("quarterly refresh: ask every in-progress client for what
+is still missing") as one job instead of one request per client from the UI:
+- the clients and their open mandatory requirements are selected together by one joined query
+  per batch, walked in (client_id, id) order with a keyset on client_id, at most
+  campaign_batch_size rows per batch; a client cut off by the row limit moves whole to the
+  next batch
+- emails are rendered from the precompiled document request templates, one per client
+- each batch marks its requirements requested with one UPDATE ... WHERE id IN (...), queues its
+  emails in the integration outbox with one batched insert, and commits; the outbox dispatcher
+  then delivers them through the configured mail transport
+- campaigns record counts and wall time, and the report adds throughput and delivery progress
+"""
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, or_, update
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models.client import Client, OnboardingStatus
+from ..models.document_campaign import DocumentCampaign
+from ..models.document_requirement import DocumentRequirement
+from ..models.mandatory_evidence import MandatoryEvidence
+from ..models.outbox import OutboxMessage
+from ..observability import get_logger, kv, tracer
+from ..observability.metrics import document_campaign_emails_total, document_campaign_batch_duration_seconds
+from .email_templates import render_document_request
+from .outbox import outbox
+
+logger = get_logger(__name__)
+
+CAMPAIGN_TOPIC = "document.campaign"
+CAMPAIGN_AGGREGATE = "document_campaign"
+REQUESTABLE_STATUSES = ("missing", "expired")
+
+_ROW_COLUMNS = (
+    DocumentRequirement.id, DocumentRequirement.client_id, DocumentRequirement.regime,
+    MandatoryEvidence.evidence_name, MandatoryEvidence.category, MandatoryEvidence.description,
+    Client.name, Client.assigned_rm, Client.contact_email
+)
+
+
+def client_contact_email(contact_email: Optional[str]) -> Optional[str]:
+    """The client's document contact (Client.contact_email), or None when it has none"""
+    return (contact_email or "").strip() or None
+
+
+class DocumentCampaignService:
+    """Selects clients with open mandatory requirements, marks them requested and queues the emails"""
+
+    def __init__(
+        self,
+        batch_size: int = 2000,
+        max_clients: int = 50000,
+        min_days_between_requests: int = 7,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        self.batch_size = batch_size
+        self.max_clients = max_clients
+        self.min_days_between_requests = min_days_between_requests
+        self.session_factory = session_factory
+
+    # Selection
+
+    def conditions(self, filters: Dict[str, Any], now: datetime) -> List[Any]:
+        """
+        WHERE clauses for the requirements a campaign requests; filters are the stored campaign
+        filters (statuses, client_ids, onboarding_status, country, assigned_rm, regimes,
+        min_days_between_requests, max_reminder_count)
+        """
+        conditions = [
+            DocumentRequirement.status.in_(filters.get("statuses") or ["missing"]),
+            MandatoryEvidence.is_mandatory == True
+        ]
+        min_days = filters.get("min_days_between_requests")
+        if min_days is None:
+            min_days = self.min_days_between_requests
+        if min_days > 0:
+            conditions.append(or_(
+                DocumentRequirement.last_reminder_date.is_(None),
+                DocumentRequirement.last_reminder_date <= now - timedelta(days=min_days)
+            ))
+        if filters.get("max_reminder_count") is not None:
+            conditions.append(func.coalesce(DocumentRequirement.reminder_count, 0) < filters["max_reminder_count"])
+        if filters.get("client_ids"):
+            conditions.append(DocumentRequirement.client_id.in_(filters["client_ids"]))
+        if filters.get("regimes"):
+            conditions.append(DocumentRequirement.regime.in_(filters["regimes"]))
+        if filters.get("onboarding_status"):
+            conditions.append(Client.onboarding_status == OnboardingStatus(filters["onboarding_status"]))
+        if filters.get("country"):
+            conditions.append(Client.country_of_incorporation == filters["country"])
+        if filters.get("assigned_rm"):
+            conditions.append(Client.assigned_rm == filters["assigned_rm"])
+        return conditions
+
+    def _rows(self, db: Session, conditions: List[Any], limit: Optional[int]) -> List[Tuple]:
+        query = db.query(*_ROW_COLUMNS).join(
+            MandatoryEvidence, DocumentRequirement.evidence_id == MandatoryEvidence.id
+        ).join(
+            Client, DocumentRequirement.client_id == Client.id
+        ).filter(*conditions).order_by(DocumentRequirement.client_id, DocumentRequirement.id)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    def select_batch(
+        self, db: Session, conditions: List[Any], after_client_id: int, max_clients: int
+    ) -> Dict[int, List[Tuple]]:
+        """Requirement rows of the next clients after after_client_id, grouped by client in id order"""
+        rows = self._rows(db, conditions + [DocumentRequirement.client_id > after_client_id], self.batch_size)
+        by_client: Dict[int, List[Tuple]] = {}
+        for row in rows:
+            by_client.setdefault(row[1], []).append(row)
+        if len(rows) == self.batch_size:
+            if len(by_client) > 1:
+                # The row limit may have cut the last client's list short; it starts the next batch
+                by_client.popitem()
+            else:
+                # One client with more open requirements than a batch holds: take all of them
+                client_id = rows[0][1]
+                by_client[client_id] = self._rows(db, conditions + [DocumentRequirement.client_id == client_id], None)
+        while len(by_client) > max_clients:
+            by_client.popitem()
+        return by_client
+
+    # Rendering
+
+    @staticmethod
+    def render(rows: List[Tuple]) -> Dict[str, str]:
+        _, _, _, _, _, _, client_name, assigned_rm, _ = rows[0]
+        return render_document_request(client_name, assigned_rm, (
+            {
+                "evidence_name": evidence_name,
+                "category": category.value if hasattr(category, "value") else category,
+                "description": description or f"Required for {regime}"
+            }
+            for _, _, regime, evidence_name, category, description, _, _, _ in rows
+        ))
+
+    # Running
+
+    def create(self, db: Session, filters: Dict[str, Any], name: Optional[str] = None,
+               requested_by: Optional[str] = None) -> DocumentCampaign:
+        campaign = DocumentCampaign(name=name, status="pending", filters=filters, requested_by=requested_by)
+        db.add(campaign)
+        db.commit()
+        db.refresh(campaign)
+        return campaign
+
+    def run(
+        self,
+        db: Session,
+        campaign: DocumentCampaign,
+        recipients: Optional[Dict[int, str]] = None,
+        cc_emails: Optional[List[str]] = None
+    ) -> DocumentCampaign:
+        """
+        Select, mark requested and queue every email of the campaign, one transaction per batch.
+        recipients overrides the contact address per client id; clients without any address are
+        skipped and their requirements left untouched.
+        """
+        recipients = recipients or {}
+        filters = campaign.filters or {}
+        now = datetime.utcnow()
+        conditions = self.conditions(filters, now)
+        max_clients = min(filters.get("max_clients") or self.max_clients, self.max_clients)
+        campaign.status = "running"
+        campaign.started_at = now
+        db.commit()
+
+        started = time.perf_counter()
+        after_client_id = 0
+        with tracer.span("document_campaign.run", campaign_id=campaign.id):
+            try:
+                while campaign.clients_selected < max_clients:
+                    by_client = self.select_batch(
+                        db, conditions, after_client_id, max_clients - campaign.clients_selected
+                    )
+                    if not by_client:
+                        break
+                    self._process_batch(db, campaign, by_client, recipients, cc_emails or [], now)
+                    after_client_id = next(reversed(by_client))
+                campaign.status = "completed"
+            except Exception as exc:
+                logger.exception("Document campaign failed", extra=kv(campaign_id=campaign.id))
+                db.rollback()
+                campaign.status = "failed"
+                campaign.error = str(exc)
+
+        campaign.seconds = round(time.perf_counter() - started, 3)
+        campaign.finished_at = datetime.utcnow()
+        db.commit()
+        logger.info("Document campaign finished", extra=kv(
+            campaign_id=campaign.id, status=campaign.status, clients=campaign.clients_selected,
+            emails=campaign.emails_queued, requirements=campaign.requirements_requested, seconds=campaign.seconds
+        ))
+        return campaign
+
+    def _process_batch(
+        self,
+        db: Session,
+        campaign: DocumentCampaign,
+        by_client: Dict[int, List[Tuple]],
+        recipients: Dict[int, str],
+        cc_emails: List[str],
+        now: datetime
+    ):
+        started = time.perf_counter()
+        requirement_ids: List[int] = []
+        emails: List[Dict[str, Any]] = []
+        skipped = 0
+        for client_id, rows in by_client.items():
+            to = recipients.get(client_id) or client_contact_email(rows[0][8])
+            if not to:
+                skipped += 1
+                continue
+            ids = [row[0] for row in rows]
+            requirement_ids.extend(ids)
+            emails.append({
+                "destination": "email", "topic": CAMPAIGN_TOPIC,
+                "aggregate_type": CAMPAIGN_AGGREGATE, "aggregate_id": campaign.id,
+                "idempotency_key": f"{CAMPAIGN_TOPIC}:{campaign.id}:{client_id}",
+                "payload": {
+                    "to": to, "cc": cc_emails, **self.render(rows),
+                    "client_id": client_id, "requirement_ids": ids, "queued_at": now.isoformat()
+                }
+            })
+
+        if requirement_ids:
+            db.execute(
+                update(DocumentRequirement).where(DocumentRequirement.id.in_(requirement_ids)).values(
+                    requested_date=now, last_reminder_date=now,
+                    reminder_count=func.coalesce(DocumentRequirement.reminder_count, 0) + 1
+                ).execution_options(synchronize_session=False)
+            )
+        outbox.enqueue_many(db, emails)
+        campaign.batches += 1
+        campaign.clients_selected += len(by_client)
+        campaign.clients_skipped_no_recipient += skipped
+        campaign.requirements_requested += len(requirement_ids)
+        campaign.emails_queued += len(emails)
+        db.commit()
+
+        document_campaign_emails_total.inc(len(emails), outcome="queued")
+        document_campaign_emails_total.inc(skipped, outcome="skipped_no_recipient")
+        document_campaign_batch_duration_seconds.observe(time.perf_counter() - started)
+
+    def preview(
+        self,
+        db: Session,
+        filters: Dict[str, Any],
+        recipients: Optional[Dict[int, str]] = None,
+        cc_emails: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """What run() would do for these filters, without updating or queueing anything"""
+        recipients = recipients or {}
+        conditions = self.conditions(filters, datetime.utcnow())
+        max_clients = min(filters.get("max_clients") or self.max_clients, self.max_clients)
+        selected = skipped = requirements = 0
+        sample: Optional[Dict[str, Any]] = None
+        after_client_id = 0
+        while selected < max_clients:
+            by_client = self.select_batch(db, conditions, after_client_id, max_clients - selected)
+            if not by_client:
+                break
+            for client_id, rows in by_client.items():
+                to = recipients.get(client_id) or client_contact_email(rows[0][8])
+                if not to:
+                    skipped += 1
+                    continue
+                requirements += len(rows)
+                if sample is None:
+                    sample = {"client_id": client_id, "to": to, "cc": cc_emails or [], **self.render(rows)}
+            selected += len(by_client)
+            after_client_id = next(reversed(by_client))
+        return {
+            "dry_run": True,
+            "clients_selected": selected,
+            "clients_skipped_no_recipient": skipped,
+            "emails": selected - skipped,
+            "requirements_requested": requirements,
+            "sample_email": sample
+        }
+
+    def run_in_background(
+        self, campaign_id: int, recipients: Optional[Dict[int, str]] = None, cc_emails: Optional[List[str]] = None
+    ):
+        """Entry point for a BackgroundTasks job: runs the campaign in its own session"""
+        db = self.session_factory()
+        try:
+            campaign = db.get(DocumentCampaign, campaign_id)
+            if campaign is not None:
+                self.run(db, campaign, recipients, cc_emails)
+        finally:
+            db.close()
+
+    # Reporting
+
+    @staticmethod
+    def report(db: Session, campaign: DocumentCampaign) -> Dict[str, Any]:
+        """Campaign counts with throughput and outbox delivery progress of its emails"""
+        delivery = {"pending": 0, "delivered": 0, "dead": 0}
+        delivery.update(dict(db.query(OutboxMessage.status, func.count(OutboxMessage.id)).filter(
+            OutboxMessage.aggregate_type == CAMPAIGN_AGGREGATE,
+            OutboxMessage.aggregate_id == campaign.id
+        ).group_by(OutboxMessage.status).all()))
+        seconds = campaign.seconds or 0
+        return {
+            "id": campaign.id,
+            "name": campaign.name,
+            "status": campaign.status,
+            "filters": campaign.filters,
+            "requested_by": campaign.requested_by,
+            "clients_selected": campaign.clients_selected,
+            "clients_skipped_no_recipient": campaign.clients_skipped_no_recipient,
+            "requirements_requested": campaign.requirements_requested,
+            "emails_queued": campaign.emails_queued,
+            "batches": campaign.batches,
+            "seconds": campaign.seconds,
+            "throughput": {
+                "clients_per_second": round(campaign.clients_selected / seconds, 1) if seconds else None,
+                "emails_per_second": round(campaign.emails_queued / seconds, 1) if seconds else None,
+                "requirements_per_second": round(campaign.requirements_requested / seconds, 1) if seconds else None
+            },
+            "delivery": delivery,
+            "error": campaign.error,
+            "created_at": campaign.created_at,
+            "started_at": campaign.started_at,
+            "finished_at": campaign.finished_at
+        }
+
+
+# Singleton instance
+document_campaign = DocumentCampaignService(
+    batch_size=settings.campaign_batch_size,
+    max_clients=settings.campaign_max_clients,
+    min_days_between_requests=settings.campaign_min_days_between_requests
+)
@@ -0,0 +1,400 @@
+"""
+Document Import
+Bulk import of a client's documents from the internal systems (SX, CX, WX):
+- the sources are the given references, or every document SX, CX and WX list for the entity
+- all documents are fetched concurrently over the shared integration HTTP client, at most
+  document_import_concurrency_per_source at a time per system, and each response body is
+  streamed in chunks into the upload store, so a batch takes about as long as its slowest fetch
+- text extraction and AI validation then run on a small worker pool, off the request, and the
+  batch is polled for progress
+
+Systems without a configured integration URL are simulated: a PDF with the client's details is
+generated instead of fetched, as the single internal-system upload always did.
+"""
+import asyncio
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+import fitz  # PyMuPDF
+import httpx
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database import SessionLocal
+from ..integrations.async_clients import IntegrationGateway, integration_gateway
+from ..models.client import Client
+from ..models.document import Document, DocumentCategory, OCRStatus
+from ..models.document_import import DocumentImportBatch, DocumentImportItem
+from ..observability import get_logger, kv, tracer
+from ..observability.metrics import document_import_documents_total, document_import_fetch_duration_seconds
+from .ai_service import ai_service
+from .document_index import document_index, document_index_metadata
+
+logger = get_logger(__name__)
+
+DOCUMENT_SOURCE_SYSTEMS = ("SX", "CX", "WX")
+
+# Internal system document types -> document category
+CATEGORY_BY_DOCUMENT_TYPE = {
+    "registration_certificate": DocumentCategory.REGISTRATION_CERTIFICATE,
+    "articles_of_incorporation": DocumentCategory.ARTICLES_OF_INCORPORATION,
+    "board_resolution": DocumentCategory.BOARD_RESOLUTION,
+    "kyc_documentation": DocumentCategory.KYC_DOCUMENTATION,
+    "client_confirmation": DocumentCategory.CLIENT_CONFIRMATION,
+    "product_agreement": DocumentCategory.PRODUCT_AGREEMENT,
+    "due_diligence_report": DocumentCategory.DUE_DILIGENCE_REPORT,
+    "financial_statements": DocumentCategory.FINANCIAL_STATEMENTS,
+    "compliance_certificate": DocumentCategory.COMPLIANCE_CERTIFICATE,
+    "risk_assessment": DocumentCategory.RISK_ASSESSMENT
+}
+
+_UNSAFE_FILENAME = re.compile(r"[^A-Za-z0-9._ -]+")
+
+
+def refresh_document_index(document: Document):
+    """Re-index a document's extracted text so chat answers can cite its content"""
+    try:
+        document_index.index_document(
+            document.client_id,
+            document.id,
+            document.extracted_text,
+            document_index_metadata(document)
+        )
+    except Exception as e:
+        # Indexing is best-effort - never fail document processing because of it
+        logger.warning("Failed to index document", extra=kv(document_id=document.id, error=f"{type(e).__name__}: {e}"))
+
+
+def client_context(client: Client) -> Dict[str, Any]:
+    """Client fields a simulated document needs, detached from the session (usable on any thread)"""
+    return {
+        "name": client.name,
+        "country_of_incorporation": client.country_of_incorporation,
+        "entity_type": client.entity_type
+    }
+
+
+def simulated_internal_document(
+    client: Dict[str, Any], source_system: str, document_type: str, document_url: str
+) -> bytes:
+    """PDF standing in for a document fetched from an internal system without a configured URL"""
+    text = f"""INTERNAL DOCUMENT FROM {source_system}
+
+Document Type: {document_type}
+Source System: {source_system}
+Client: {client['name']}
+Generated: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+
+This is a simulated document fetched from the {source_system} system.
+In production, this would be the actual document content retrieved from {document_url}.
+
+Legal Entity Name: {client['name']}
+Country of Incorporation: {client['country_of_incorporation'] or 'Not specified'}
+Entity Type: {client['entity_type'] or 'Not specified'}"""
+    pdf = fitz.open()
+    try:
+        pdf.new_page().insert_textbox(fitz.Rect(50, 50, 550, 800), text, fontsize=10)
+        return pdf.tobytes()
+    finally:
+        pdf.close()
+
+
+def extract_text(file_path: str, file_type: str) -> str:
+    """Text of an imported document: PDFs with PyMuPDF (as annotation does), other types via the AI service"""
+    if file_type.lower() == "pdf" or file_path.lower().endswith(".pdf"):
+        with fitz.open(file_path) as pdf:
+            return "\n".join(page.get_text() for page in pdf).strip()
+    return ai_service.extract_text(file_path, file_type)
+
+
+def process_document(db: Session, document: Document, client: Client):
+    """Extract text and run enhanced AI validation; failures leave the document FAILED"""
+    try:
+        extracted_text = extract_text(document.file_path, document.file_type or "pdf")
+        document.extracted_text = extracted_text
+        document.ai_validation_result = ai_service.enhanced_validate_document(
+            extracted_text=extracted_text,
+            client_data={
+                "legal_entity_name": client.name,
+                "jurisdiction": client.country_of_incorporation or "Not specified",
+                "entity_type": client.entity_type or "Not specified"
+            },
+            document_category=document.document_category.value
+        )
+        document.ocr_status = OCRStatus.COMPLETED
+        db.commit()
+        db.refresh(document)
+        refresh_document_index(document)
+    except Exception as e:
+        logger.warning("Document processing failed", extra=kv(document_id=document.id, error=f"{type(e).__name__}: {e}"))
+        db.rollback()
+        document.ocr_status = OCRStatus.FAILED
+        db.commit()
+
+
+def document_filename(client_id: int, reference: str, document_name: str, document_url: str) -> str:
+    """Upload store file name, with the source file's extension (PDF when the URL has none)"""
+    name = _UNSAFE_FILENAME.sub("_", os.path.basename(document_name)).strip() or "document"
+    extension = os.path.splitext(urlparse(document_url).path)[1].lower() or ".pdf"
+    if not name.lower().endswith(extension):
+        name += extension
+    return f"{client_id}_{reference}_{name}"
+
+
+class DocumentImportService:
+    """Creates import batches, fetches their documents concurrently and processes them in the background"""
+
+    def __init__(
+        self,
+        gateway: IntegrationGateway = integration_gateway,
+        upload_dir: str = "./uploads",
+        concurrency_per_source: int = 4,
+        processing_workers: int = 4,
+        chunk_bytes: int = 65536,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        self.gateway = gateway
+        self.upload_dir = upload_dir
+        self.concurrency_per_source = concurrency_per_source
+        self.processing_workers = processing_workers
+        self.chunk_bytes = chunk_bytes
+        self.session_factory = session_factory
+
+    async def discover(self, client: Client) -> List[Dict[str, str]]:
+        """Every document SX, CX and WX list for the client's legal entity"""
+        found = await self.gateway.gather_documents(client.legal_entity_id)
+        return [
+            {
+                "source_system": document["source_system"],
+                "document_url": document["document_url"],
+                "document_type": document["document_type"],
+                "document_name": document["document_name"]
+            }
+            for document in found["documents"]
+        ]
+
+    @staticmethod
+    def create_batch(
+        db: Session, client: Client, sources: List[Dict[str, str]], uploaded_by: Optional[str]
+    ) -> DocumentImportBatch:
+        batch = DocumentImportBatch(
+            client_id=client.id, uploaded_by=uploaded_by, documents_requested=len(sources),
+            items=[DocumentImportItem(**source) for source in sources]
+        )
+        db.add(batch)
+        db.commit()
+        db.refresh(batch)
+        return batch
+
+    # Fetching
+
+    def _remote_url(self, system: str, document_url: str) -> str:
+        """sx://documents/<entity>/<file> -> <SX base URL>/documents/<entity>/<file>; http(s) URLs as given"""
+        parsed = urlparse(document_url)
+        if parsed.scheme in ("http", "https"):
+            return document_url
+        return f"{self.gateway.base_urls[system]}/{parsed.netloc}{parsed.path}"
+
+    async def fetch_to_file(self, client: Dict[str, Any], source: Dict[str, str], file_path: str) -> int:
+        """Fetch one source document into file_path, streaming the body in chunks; returns its size"""
+        system = source["source_system"].lower()
+        if system in self.gateway.mocked:
+            content = await asyncio.to_thread(
+                simulated_internal_document,
+                client, source["source_system"], source["document_type"], source["document_url"]
+            )
+            with open(file_path, "wb") as blob:
+                blob.write(content)
+            return len(content)
+
+        breaker = self.gateway.breakers[system]
+        if not breaker.allow():
+            raise RuntimeError(f"{source['source_system']} circuit open")
+        trial = breaker.state == "half_open"
+        size = 0
+        try:
+            async with self.gateway.http.stream("GET", self._remote_url(system, source["document_url"])) as response:
+                if response.status_code >= 500:
+                    breaker.record_failure()
+                    response.raise_for_status()
+                # Any other answer, even a 4xx for this one document, means the system is up
+                breaker.record_success()
+                response.raise_for_status()
+                with open(file_path, "wb") as blob:
+                    async for chunk in response.aiter_bytes(self.chunk_bytes):
+                        blob.write(chunk)
+                        size += len(chunk)
+        except Exception as e:
+            # Connection errors, timeouts and broken streams count against the system
+            if isinstance(e, httpx.HTTPError) and not isinstance(e, httpx.HTTPStatusError):
+                breaker.record_failure()
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            raise
+        finally:
+            # A trial that ended without an outcome (cancelled, unexpected error) must not hold the breaker
+            if trial:
+                breaker.release_trial()
+        return size
+
+    async def fetch_all(
+        self, client: Dict[str, Any], sources: List[Dict[str, Any]], file_paths: List[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch every source concurrently with at most concurrency_per_source in flight per system.
+        Returns one {"bytes", "fetch_ms", "error"} per source, in order.
+        """
+        semaphores = {system: asyncio.Semaphore(self.concurrency_per_source) for system in DOCUMENT_SOURCE_SYSTEMS}
+
+        async def fetch(source: Dict[str, Any], file_path: str) -> Dict[str, Any]:
+            system = source["source_system"]
+            async with semaphores[system]:
+                start = time.perf_counter()
+                try:
+                    size = await self.fetch_to_file(client, source, file_path)
+                    outcome = {"bytes": size, "error": None}
+                except Exception as e:
+                    outcome = {"bytes": None, "error": f"{type(e).__name__}: {e}"}
+                elapsed = time.perf_counter() - start
+            document_import_fetch_duration_seconds.observe(elapsed, source=system)
+            document_import_documents_total.inc(source=system, outcome="fetched" if outcome["error"] is None else "fetch_failed")
+            return {**outcome, "fetch_ms": round(elapsed * 1000, 2)}
+
+        return await asyncio.gather(*(fetch(source, path) for source, path in zip(sources, file_paths)))
+
+    async def run(self, batch_id: int):
+        """Entry point for a BackgroundTasks job: fetch every item, then process the fetched documents"""
+        db = self.session_factory()
+        try:
+            batch = db.get(DocumentImportBatch, batch_id)
+            if batch is None:
+                return
+            client = db.get(Client, batch.client_id)
+            batch.status = "fetching"
+            db.commit()
+
+            os.makedirs(self.upload_dir, exist_ok=True)
+            items = list(batch.items)
+            file_paths = [
+                os.path.join(self.upload_dir, document_filename(
+                    client.id, f"import{batch.id}-{item.id}", item.document_name, item.document_url
+                ))
+                for item in items
+            ]
+            sources = [
+                {"source_system": item.source_system, "document_url": item.document_url,
+                 "document_type": item.document_type, "document_name": item.document_name}
+                for item in items
+            ]
+            start = time.perf_counter()
+            with tracer.span("document_import.fetch", batch_id=batch.id, documents=len(items)):
+                outcomes = await self.fetch_all(client_context(client), sources, file_paths)
+            batch.fetch_seconds = round(time.perf_counter() - start, 4)
+
+            for item, file_path, outcome in zip(items, file_paths, outcomes):
+                item.bytes_fetched = outcome["bytes"]
+                item.fetch_ms = outcome["fetch_ms"]
+                if outcome["error"] is not None:
+                    item.status = "failed"
+                    item.error = outcome["error"]
+                    continue
+                document = Document(
+                    client_id=client.id,
+                    filename=item.document_name,
+                    file_path=file_path,
+                    file_type=os.path.splitext(file_path)[1].lstrip(".").lower(),
+                    uploaded_by=batch.uploaded_by,
+                    document_category=CATEGORY_BY_DOCUMENT_TYPE.get(item.document_type, DocumentCategory.OTHER),
+                    ocr_status=OCRStatus.PROCESSING
+                )
+                db.add(document)
+                db.flush()
+                item.document_id = document.id
+                item.status = "fetched"
+            batch.documents_fetched = sum(1 for item in items if item.status == "fetched")
+            batch.documents_failed = len(items) - batch.documents_fetched
+            batch.fetched_at = datetime.utcnow()
+            batch.status = "processing"
+            db.commit()
+            logger.info("Document import fetched", extra=kv(
+                batch_id=batch.id, fetched=batch.documents_fetched, failed=batch.documents_failed,
+                fetch_seconds=batch.fetch_seconds, slowest_fetch_ms=max((o["fetch_ms"] for o in outcomes), default=0)
+            ))
+        except Exception as e:
+            logger.exception("Document import failed", extra=kv(batch_id=batch_id))
+            db.rollback()
+            self._finish(db, batch_id, error=f"{type(e).__name__}: {e}")
+            return
+        finally:
+            db.close()
+
+        # Extraction and validation are blocking (PDF parsing, LLM calls): run them on worker threads
+        await asyncio.to_thread(self.process_batch, batch_id)
+
+    # Processing
+
+    def _process_item(self, item_id: int) -> bool:
+        db = self.session_factory()
+        try:
+            item = db.get(DocumentImportItem, item_id)
+            document = db.get(Document, item.document_id)
+            process_document(db, document, db.get(Client, document.client_id))
+            item.status = "processed" if document.ocr_status == OCRStatus.COMPLETED else "failed"
+            if item.status == "failed":
+                item.error = "Extraction or validation failed"
+            db.commit()
+            document_import_documents_total.inc(source=item.source_system, outcome=item.status)
+            return item.status == "processed"
+        finally:
+            db.close()
+
+    def process_batch(self, batch_id: int):
+        """Extract and validate every fetched document of a batch on processing_workers threads"""
+        db = self.session_factory()
+        try:
+            item_ids = [
+                item_id for (item_id,) in db.query(DocumentImportItem.id).filter(
+                    DocumentImportItem.batch_id == batch_id, DocumentImportItem.status == "fetched"
+                )
+            ]
+        finally:
+            db.close()
+        with ThreadPoolExecutor(max_workers=self.processing_workers, thread_name_prefix="document-import") as pool:
+            processed = sum(1 for ok in pool.map(self._process_item, item_ids) if ok)
+        db = self.session_factory()
+        try:
+            self._finish(db, batch_id, processed=processed, processing_failed=len(item_ids) - processed)
+        finally:
+            db.close()
+
+    @staticmethod
+    def _finish(db: Session, batch_id: int, processed: int = 0, processing_failed: int = 0, error: Optional[str] = None):
+        batch = db.get(DocumentImportBatch, batch_id)
+        if batch is None:
+            return
+        batch.documents_processed = processed
+        batch.documents_failed += processing_failed
+        batch.error = error
+        if error is not None or (batch.documents_requested and not processed):
+            batch.status = "failed"
+        else:
+            batch.status = "completed_with_errors" if batch.documents_failed else "completed"
+        batch.finished_at = datetime.utcnow()
+        db.commit()
+        logger.info("Document import finished", extra=kv(
+            batch_id=batch_id, status=batch.status, processed=processed, failed=batch.documents_failed
+        ))
+
+
+# Singleton instance
+document_import = DocumentImportService(
+    upload_dir=settings.upload_dir,
+    concurrency_per_source=settings.document_import_concurrency_per_source,
+    processing_workers=settings.document_import_processing_workers,
+    chunk_bytes=settings.document_import_chunk_bytes
+)
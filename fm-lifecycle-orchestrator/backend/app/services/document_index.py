@@ -0,0 +1,374 @@
+"""
+Document Retrieval Index
+Per-client BM25 index over chunked Document.extracted_text, used to ground chat answers
+in actual document content. Runs fully offline: indexes are JSON files on local disk and
+the optional embedding re-ranker only loads a model from a local path.
+"""
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Any
+
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models.document import Document
+from ..observability import get_logger, kv
+
+logger = get_logger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOP_WORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in",
+    "is", "it", "its", "of", "on", "or", "that", "the", "this", "to", "was", "were", "will", "with"
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase and split text into index terms, dropping stop words"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+def chunk_text(text: str, chunk_words: int, overlap: int) -> List[str]:
+    """Split text into overlapping word windows"""
+    words = text.split()
+    if not words:
+        return []
+
+    step = max(1, chunk_words - overlap)
+    chunks = []
+    for start in range(0, len(words), step):
+        chunks.append(" ".join(words[start:start + chunk_words]))
+        if start + chunk_words >= len(words):
+            break
+    return chunks
+
+
+class ClientIndex:
+    """
+    In-memory BM25 index over the document chunks of a single client.
+    Supports replacing or removing one document's chunks without a full rebuild.
+    """
+
+    K1 = 1.5
+    B = 0.75
+
+    def __init__(self):
+        self.chunks: Dict[int, Dict[str, Any]] = {}  # chunk_id -> {document_id, position, text, terms}
+        self.lengths: Dict[int, int] = {}  # chunk_id -> number of terms
+        self.postings: Dict[str, Dict[int, int]] = {}  # term -> {chunk_id: term frequency}
+        self.document_chunks: Dict[int, List[int]] = {}  # document_id -> chunk ids
+        self.document_metadata: Dict[int, Dict[str, Any]] = {}
+        self.total_length = 0
+        self.next_chunk_id = 0
+
+    def add_document(
+        self,
+        document_id: int,
+        chunks: List[str],
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        """Index the chunks of a document, replacing any previously indexed version"""
+        entries = []
+        for position, text in enumerate(chunks):
+            term_counts = dict(Counter(tokenize(text)))
+            if term_counts:
+                entries.append({"position": position, "text": text, "terms": term_counts})
+        self.add_tokenized_document(document_id, entries, metadata)
+
+    def add_tokenized_document(
+        self,
+        document_id: int,
+        entries: List[Dict[str, Any]],
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        """Index pre-tokenized chunk entries ({position, text, terms}) for a document"""
+        self.remove_document(document_id)
+
+        chunk_ids = []
+        for entry in entries:
+            chunk_id = self.next_chunk_id
+            self.next_chunk_id += 1
+
+            term_counts = entry["terms"]
+            length = sum(term_counts.values())
+            self.chunks[chunk_id] = {
+                "document_id": document_id,
+                "position": entry["position"],
+                "text": entry["text"],
+                "terms": term_counts
+            }
+            self.lengths[chunk_id] = length
+            for term, count in term_counts.items():
+                self.postings.setdefault(term, {})[chunk_id] = count
+
+            self.total_length += length
+            chunk_ids.append(chunk_id)
+
+        self.document_chunks[document_id] = chunk_ids
+        self.document_metadata[document_id] = metadata or {}
+
+    def remove_document(self, document_id: int):
+        """Remove all chunks belonging to a document"""
+        self.document_metadata.pop(document_id, None)
+        for chunk_id in self.document_chunks.pop(document_id, []):
+            chunk = self.chunks.pop(chunk_id)
+            self.total_length -= self.lengths.pop(chunk_id)
+            for term in chunk["terms"]:
+                term_postings = self.postings.get(term)
+                if term_postings is not None:
+                    term_postings.pop(chunk_id, None)
+                    if not term_postings:
+                        del self.postings[term]
+
+    def document_entries(self, document_id: int) -> List[Dict[str, Any]]:
+        """Serializable chunk entries for one document"""
+        return [
+            {
+                "position": self.chunks[chunk_id]["position"],
+                "text": self.chunks[chunk_id]["text"],
+                "terms": self.chunks[chunk_id]["terms"]
+            }
+            for chunk_id in self.document_chunks.get(document_id, [])
+        ]
+
+    def search(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+        """Return the top_k chunks ranked by BM25 score for the query"""
+        chunk_count = len(self.chunks)
+        if chunk_count == 0:
+            return []
+
+        k1 = self.K1
+        lengths = self.lengths
+        # Fold the length normalisation constants so the inner loop is one multiply-add
+        norm_base = k1 * (1 - self.B)
+        norm_scale = k1 * self.B / (self.total_length / chunk_count)
+        scores: Dict[int, float] = {}
+
+        for term in set(tokenize(query)):
+            term_postings = self.postings.get(term)
+            if not term_postings:
+                continue
+
+            doc_freq = len(term_postings)
+            idf = math.log(1 + (chunk_count - doc_freq + 0.5) / (doc_freq + 0.5))
+            weight = idf * (k1 + 1)
+            get_score = scores.get
+            for chunk_id, freq in term_postings.items():
+                scores[chunk_id] = get_score(chunk_id, 0.0) + weight * freq / (freq + norm_base + norm_scale * lengths[chunk_id])
+
+        best = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+        return [
+            {
+                "chunk_id": chunk_id,
+                "document_id": self.chunks[chunk_id]["document_id"],
+                "position": self.chunks[chunk_id]["position"],
+                "text": self.chunks[chunk_id]["text"],
+                "score": round(score, 4),
+                "metadata": self.document_metadata.get(self.chunks[chunk_id]["document_id"], {})
+            }
+            for chunk_id, score in best
+        ]
+
+
+class DocumentIndex:
+    """
+    Manages per-client retrieval indexes stored on local disk.
+    Each client has a directory with one segment file per document, so re-indexing a
+    document rewrites only that document's segment. Indexes are loaded lazily and kept in memory.
+    """
+
+    def __init__(self, index_dir: str):
+        self.index_dir = index_dir
+        self._indexes: Dict[int, ClientIndex] = {}
+        self._lock = threading.RLock()
+        self._embedder = None
+        self._embedder_loaded = False
+
+    def _client_dir(self, client_id: int) -> str:
+        return os.path.join(self.index_dir, f"client_{client_id}")
+
+    def _segment_path(self, client_id: int, document_id: int) -> str:
+        return os.path.join(self._client_dir(client_id), f"document_{document_id}.json")
+
+    def _get_index(self, client_id: int) -> Optional[ClientIndex]:
+        """Return the cached index for a client, loading its segments from disk if needed"""
+        index = self._indexes.get(client_id)
+        if index is None:
+            client_dir = self._client_dir(client_id)
+            if not os.path.isdir(client_dir):
+                return None
+
+            index = ClientIndex()
+            for filename in sorted(os.listdir(client_dir)):
+                if not filename.endswith(".json"):
+                    continue
+                with open(os.path.join(client_dir, filename), "r") as f:
+                    segment = json.load(f)
+                index.add_tokenized_document(segment["document_id"], segment["chunks"], segment.get("metadata"))
+            self._indexes[client_id] = index
+        return index
+
+    def _persist_document(self, client_id: int, index: ClientIndex, document_id: int):
+        """Write one document segment atomically (or remove it if the document has no chunks)"""
+        client_dir = self._client_dir(client_id)
+        os.makedirs(client_dir, exist_ok=True)
+        path = self._segment_path(client_id, document_id)
+
+        if document_id not in index.document_chunks:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "document_id": document_id,
+                "metadata": index.document_metadata.get(document_id, {}),
+                "chunks": index.document_entries(document_id)
+            }, f)
+        os.replace(tmp_path, path)
+
+    def index_document(
+        self,
+        client_id: int,
+        document_id: int,
+        text: Optional[str],
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """
+        Chunk and (re)index a document's extracted text.
+
+        Returns:
+            Number of chunks indexed for the document
+        """
+        chunks = chunk_text(
+            text or "",
+            settings.document_index_chunk_words,
+            settings.document_index_chunk_overlap
+        )
+
+        with self._lock:
+            index = self._get_index(client_id) or ClientIndex()
+            index.add_document(document_id, chunks, metadata)
+            self._indexes[client_id] = index
+            self._persist_document(client_id, index, document_id)
+            return len(index.document_chunks[document_id])
+
+    def remove_document(self, client_id: int, document_id: int):
+        """Drop a deleted document from its client's index"""
+        with self._lock:
+            index = self._get_index(client_id)
+            if index is None or document_id not in index.document_chunks:
+                return
+            index.remove_document(document_id)
+            self._persist_document(client_id, index, document_id)
+
+    def rebuild_client(self, db: Session, client_id: int) -> int:
+        """
+        Build a client's index from scratch from all documents with extracted text.
+        Used to bootstrap indexes for documents processed before the index existed.
+
+        Returns:
+            Number of documents indexed
+        """
+        documents = db.query(Document).filter(
+            Document.client_id == client_id,
+            Document.extracted_text.isnot(None)
+        ).all()
+
+        index = ClientIndex()
+        for document in documents:
+            chunks = chunk_text(
+                document.extracted_text,
+                settings.document_index_chunk_words,
+                settings.document_index_chunk_overlap
+            )
+            index.add_document(document.id, chunks, document_index_metadata(document))
+
+        with self._lock:
+            client_dir = self._client_dir(client_id)
+            if os.path.isdir(client_dir):
+                for filename in os.listdir(client_dir):
+                    os.remove(os.path.join(client_dir, filename))
+            os.makedirs(client_dir, exist_ok=True)
+            for document in documents:
+                self._persist_document(client_id, index, document.id)
+            self._indexes[client_id] = index
+
+        return len(documents)
+
+    def search(
+        self,
+        client_id: int,
+        query: str,
+        top_k: Optional[int] = None,
+        db: Optional[Session] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Return the most relevant passages for a question.
+        If the client has no index yet and a session is given, the index is built first.
+        """
+        top_k = top_k or settings.document_index_top_k
+
+        with self._lock:
+            index = self._get_index(client_id)
+        if index is None:
+            if db is None:
+                return []
+            self.rebuild_client(db, client_id)
+
+        embedder = self._get_embedder()
+        candidate_count = top_k if embedder is None else top_k * 4
+
+        with self._lock:
+            candidates = self._indexes[client_id].search(query, candidate_count)
+
+        if embedder is None or not candidates:
+            return candidates
+
+        # Re-rank the wider BM25 candidate set with the local embedding model
+        vectors = embedder.encode([query] + [c["text"] for c in candidates], normalize_embeddings=True)
+        query_vector = vectors[0]
+        for candidate, vector in zip(candidates, vectors[1:]):
+            candidate["similarity"] = round(float((query_vector * vector).sum()), 4)
+        candidates.sort(key=lambda c: c["similarity"], reverse=True)
+        return candidates[:top_k]
+
+    def _get_embedder(self):
+        """Load the optional local embedding model once; None when not configured or unavailable"""
+        if self._embedder_loaded:
+            return self._embedder
+
+        self._embedder_loaded = True
+        model_path = settings.document_index_embedding_model
+        if not model_path:
+            return None
+
+        try:
+            # Never reach out to a model hub - the model must already be on local disk
+            os.environ.setdefault("HF_HUB_OFFLINE", "1")
+            from sentence_transformers import SentenceTransformer
+            self._embedder = SentenceTransformer(model_path)
+        except Exception as e:
+            logger.warning("Embedding re-ranker unavailable, using BM25 only", extra=kv(error=f"{type(e).__name__}: {e}"))
+            self._embedder = None
+
+        return self._embedder
+
+
+def document_index_metadata(document: Document) -> Dict[str, Any]:
+    """Metadata stored alongside each chunk so passages can be cited in chat answers"""
+    return {
+        "filename": document.filename,
+        "document_category": document.document_category.value if document.document_category else None
+    }
+
+
+# Singleton instance
+document_index = DocumentIndex(settings.document_index_dir)
@@ -0,0 +1,262 @@
+"""
+Eligibility Simulator
+Dry-run "what if" evaluation of proposed classification rule changes across every client.
+
+Client attributes are held in a columnar frame: one categorical column per attribute, where each
+client stores a small integer code and the distinct values are kept once. A rule config is
+evaluated once per distinct value (with the engine's own rule semantics) into a lookup table,
+and the table is applied to the code column in bulk (bytes.translate), giving a per-client
+0/1 mask. Masks are combined and counted as big integers, so the per-client work runs in C and
+100k clients evaluate in milliseconds. Nothing is written to the database.
+"""
+import json
+import threading
+import time
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..models.client import Client
+from ..models.classification_rule import ClassificationRule
+from ..observability import get_logger, kv, tracer
+from .classification_engine import ClassificationEngine
+
+logger = get_logger(__name__)
+
+
+def _category_key(value: Any) -> Any:
+    """Hashable identity for an attribute value (dicts and lists compare by content)"""
+    if isinstance(value, (dict, list)):
+        return ("json", json.dumps(value, sort_keys=True))
+    return value
+
+
+class CategoricalColumn:
+    """Per-client codes into a list of distinct values; code 0 is the missing value"""
+    __slots__ = ("categories", "codes")
+
+    def __init__(self, values: List[Any]):
+        self.categories: List[Any] = [None]
+        index: Dict[Any, int] = {None: 0}
+        codes = array("I")
+        for value in values:
+            key = _category_key(value)
+            code = index.get(key)
+            if code is None:
+                code = index[key] = len(self.categories)
+                self.categories.append(value)
+            codes.append(code)
+        # One byte per client when there are few distinct values (bytes.translate path)
+        self.codes = bytes(codes.tolist()) if len(self.categories) <= 256 else codes
+
+    def mask(self, predicate) -> int:
+        """Evaluate predicate once per distinct value and expand to a 0/1-per-byte mask integer"""
+        table = bytes(1 if predicate(value) else 0 for value in self.categories)
+        if isinstance(self.codes, bytes):
+            flags = self.codes.translate(table.ljust(256, b"\x00"))
+        else:
+            flags = bytes(map(table.__getitem__, self.codes))
+        return int.from_bytes(flags, "big")
+
+
+class ClientAttributeFrame:
+    """Columnar snapshot of client_attributes for all clients, columns built on first use"""
+
+    def __init__(self, client_ids: List[int], attributes: List[Dict[str, Any]], version: Tuple):
+        self.client_ids = client_ids
+        self.version = version
+        self._attributes = attributes
+        self._columns: Dict[str, CategoricalColumn] = {}
+        self._lock = threading.Lock()
+        self.size = len(client_ids)
+        self.all_ones = int.from_bytes(b"\x01" * self.size, "big") if self.size else 0
+
+    def column(self, attribute: str) -> CategoricalColumn:
+        column = self._columns.get(attribute)
+        if column is None:
+            with self._lock:
+                column = self._columns.get(attribute)
+                if column is None:
+                    column = CategoricalColumn([attrs.get(attribute) for attrs in self._attributes])
+                    self._columns[attribute] = column
+        return column
+
+    def ids_for(self, mask: int, limit: int) -> List[int]:
+        """First `limit` client IDs whose mask byte is set"""
+        if not mask or limit <= 0:
+            return []
+        flags = mask.to_bytes(self.size, "big")
+        ids = []
+        position = flags.find(1)
+        while position != -1 and len(ids) < limit:
+            ids.append(self.client_ids[position])
+            position = flags.find(1, position + 1)
+        return ids
+
+
+class EligibilitySimulator:
+    """Evaluates current and proposed rule sets for a regime over the cached client frame"""
+
+    def __init__(self):
+        self._frame: Optional[ClientAttributeFrame] = None
+        self._lock = threading.Lock()
+        self._engine = ClassificationEngine(db=None)  # Rule predicates only; no session access
+
+    def get_frame(self, db: Session) -> Tuple[ClientAttributeFrame, bool]:
+        """
+        Client frame, rebuilt only when clients were added, removed or updated.
+
+        Returns:
+            (frame, cached)
+        """
+        version = tuple(db.query(func.count(Client.id), func.max(Client.id), func.max(Client.last_updated)).one())
+        frame = self._frame
+        if frame is not None and frame.version == version:
+            return frame, True
+
+        with self._lock:
+            frame = self._frame
+            if frame is not None and frame.version == version:
+                return frame, True
+            rows = db.query(Client.id, Client.client_attributes).order_by(Client.id).all()
+            frame = ClientAttributeFrame(
+                [row[0] for row in rows],
+                [row[1] if isinstance(row[1], dict) else {} for row in rows],
+                version
+            )
+            self._frame = frame
+            return frame, False
+
+    def rule_mask(self, frame: ClientAttributeFrame, rule_type: str, rule_config: Dict[str, Any]) -> int:
+        rule = ClassificationRule(rule_type=rule_type, rule_config=rule_config or {})
+        return frame.column(rule_type).mask(lambda value: self._engine._evaluate_rule(rule, {rule_type: value}))
+
+    @staticmethod
+    def _eligible(frame: ClientAttributeFrame, masks: List[int]) -> int:
+        # Same as the engine: eligible when there is at least one rule and every rule matches
+        if not masks:
+            return 0
+        eligible = frame.all_ones
+        for mask in masks:
+            eligible &= mask
+        return eligible
+
+    def simulate(
+        self,
+        db: Session,
+        regime: str,
+        rules: List[ClassificationRule],
+        changes: List[Dict[str, Any]],
+        sample_size: int = 10
+    ) -> Dict[str, Any]:
+        """
+        Compare eligibility under the regime's current rules with the rules after `changes`.
+
+        Args:
+            rules: All rules of the regime (active and inactive)
+            changes: Dicts with rule_id (existing rule) or rule_type (new rule), and optional
+                     rule_name, rule_config and is_active
+            sample_size: Client IDs returned per flip direction
+
+        Raises:
+            ValueError: A change references a rule outside the regime or a new rule lacks rule_type
+        """
+        start = time.perf_counter()
+        with tracer.span("classification.simulate", **{"regime": regime, "changes": len(changes)}):
+            frame, cached = self.get_frame(db)
+            rules_by_id = {rule.id: rule for rule in rules}
+
+            # (rule_id, rule_name, rule_type, current config or None, proposed config or None)
+            entries: Dict[Any, Dict[str, Any]] = {
+                rule.id: {
+                    "rule_id": rule.id,
+                    "rule_name": rule.rule_name,
+                    "rule_type": rule.rule_type,
+                    "current": rule.rule_config if rule.is_active else None,
+                    "proposed": rule.rule_config if rule.is_active else None,
+                    "status": "unchanged"
+                }
+                for rule in rules
+            }
+            for position, change in enumerate(changes):
+                rule_id = change.get("rule_id")
+                if rule_id is not None:
+                    if rule_id not in rules_by_id:
+                        raise ValueError(f"Rule {rule_id} does not belong to regime {regime}")
+                    entry = entries[rule_id]
+                    active = change.get("is_active")
+                    if active is None:
+                        active = rules_by_id[rule_id].is_active
+                    config = change.get("rule_config") or rules_by_id[rule_id].rule_config
+                    entry["proposed"] = config if active else None
+                else:
+                    if not change.get("rule_type"):
+                        raise ValueError("New rules need a rule_type")
+                    entry = entries[f"new-{position}"] = {
+                        "rule_id": None,
+                        "rule_name": change.get("rule_name") or f"Proposed {change['rule_type']} rule",
+                        "rule_type": change["rule_type"],
+                        "current": None,
+                        "proposed": (change.get("rule_config") or {}) if change.get("is_active", True) else None,
+                        "status": "unchanged"  # A new rule proposed inactive changes nothing
+                    }
+                if entry["current"] != entry["proposed"]:
+                    entry["status"] = (
+                        "added" if entry["current"] is None else
+                        "deactivated" if entry["proposed"] is None else "modified"
+                    )
+
+            current_masks, proposed_masks, impacts = [], [], []
+            for entry in entries.values():
+                current_mask = proposed_mask = None
+                if entry["current"] is not None:
+                    current_mask = self.rule_mask(frame, entry["rule_type"], entry["current"])
+                    current_masks.append(current_mask)
+                if entry["proposed"] is not None:
+                    proposed_mask = (
+                        current_mask if entry["proposed"] == entry["current"]
+                        else self.rule_mask(frame, entry["rule_type"], entry["proposed"])
+                    )
+                    proposed_masks.append(proposed_mask)
+                if entry["status"] == "unchanged" and current_mask is None:
+                    continue  # Inactive and untouched
+                impacts.append({
+                    "rule_id": entry["rule_id"],
+                    "rule_name": entry["rule_name"],
+                    "rule_type": entry["rule_type"],
+                    "status": entry["status"],
+                    "current_matches": current_mask.bit_count() if current_mask is not None else None,
+                    "proposed_matches": proposed_mask.bit_count() if proposed_mask is not None else None
+                })
+
+            current = self._eligible(frame, current_masks)
+            proposed = self._eligible(frame, proposed_masks)
+            gained = proposed & (frame.all_ones ^ current)
+            lost = current & (frame.all_ones ^ proposed)
+
+        result = {
+            "regime": regime,
+            "total_clients": frame.size,
+            "currently_eligible": current.bit_count(),
+            "proposed_eligible": proposed.bit_count(),
+            "newly_eligible": gained.bit_count(),
+            "newly_ineligible": lost.bit_count(),
+            "sample_newly_eligible_client_ids": frame.ids_for(gained, sample_size),
+            "sample_newly_ineligible_client_ids": frame.ids_for(lost, sample_size),
+            "rules": impacts,
+            "frame_cached": cached,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 2)
+        }
+        logger.info(
+            "Rule simulation completed",
+            extra=kv(regime=regime, clients=frame.size, newly_eligible=result["newly_eligible"],
+                     newly_ineligible=result["newly_ineligible"], frame_cached=cached,
+                     elapsed_ms=result["elapsed_ms"])
+        )
+        return result
+
+
+# Singleton instance
+eligibility_simulator = EligibilitySimulator()
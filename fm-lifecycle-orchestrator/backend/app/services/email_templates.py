@@ -0,0 +1,108 @@
+"""
+Email Templates
+Document request emails are rendered from templates compiled once at import: a template is
+parsed into literal text and field lookups up front, so rendering an email is a single join
+instead of re-parsing format strings for every client of a campaign.
+
+Placeholders use str.format syntax ({client_name}, {evidence_name}); repeated sections such as
+the document list are a separate line template rendered per item and joined into one field.
+"""
+from string import Formatter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+_FORMATTER = Formatter()
+
+
+class CompiledTemplate:
+    """A str.format template parsed once into (literal, field, format spec) parts"""
+
+    def __init__(self, source: str):
+        self.source = source
+        self._parts: List[Tuple[str, Optional[str], str]] = []
+        for literal, field, spec, conversion in _FORMATTER.parse(source):
+            if conversion:
+                raise ValueError(f"Conversions are not supported in email templates: {{{field}!{conversion}}}")
+            if field is not None and not field.isidentifier():
+                raise ValueError(f"Template fields must be plain names: {{{field}}}")
+            self._parts.append((literal, field, spec or ""))
+        self.fields = frozenset(field for _, field, _ in self._parts if field)
+
+    def render(self, values: Dict[str, Any]) -> str:
+        out = []
+        for literal, field, spec in self._parts:
+            out.append(literal)
+            if field is not None:
+                value = values[field]
+                out.append(format(value, spec) if spec else str(value))
+        return "".join(out)
+
+    def render_each(self, items: Iterable[Dict[str, Any]], separator: str = "\n") -> str:
+        return separator.join(self.render(item) for item in items)
+
+
+DOCUMENT_REQUEST_SUBJECT = CompiledTemplate(
+    "Action Required: Missing Regulatory Documents for {client_name}"
+)
+
+DOCUMENT_REQUEST_LINE = CompiledTemplate(
+    "  - {evidence_name} ({category}) - {description}"
+)
+
+DOCUMENT_REQUEST_BODY = CompiledTemplate("""Dear {client_name} Team,
+
+As part of your onboarding process, we require the following mandatory documents to comply with regulatory requirements:
+
+{document_list}
+
+Please upload these documents at your earliest convenience to avoid any delays in account activation.
+
+If you have any questions, please contact your Relationship Manager: {assigned_rm}
+
+Best regards,
+FM Client Readiness Team""")
+
+
+DOCUMENT_REMINDER_SUBJECT = CompiledTemplate(
+    "Reminder: Outstanding Regulatory Documents for {client_name}"
+)
+
+DOCUMENT_REMINDER_LINE = CompiledTemplate("  - {evidence_name}")
+
+DOCUMENT_REMINDER_BODY = CompiledTemplate("""Dear {client_name} Team,
+
+This is a reminder that we are still waiting for the following documents:
+
+{document_list}
+
+Please upload them as soon as possible so your onboarding can continue.
+
+If you have any questions, please contact your Relationship Manager: {assigned_rm}
+
+Best regards,
+FM Client Readiness Team""")
+
+
+def render_document_request(
+    client_name: str, assigned_rm: Optional[str], documents: Iterable[Dict[str, Any]]
+) -> Dict[str, str]:
+    """
+    Subject and body of a document request email; documents are dicts with evidence_name,
+    category and description
+    """
+    values = {"client_name": client_name, "assigned_rm": assigned_rm}
+    return {
+        "subject": DOCUMENT_REQUEST_SUBJECT.render(values),
+        "body": DOCUMENT_REQUEST_BODY.render({**values, "document_list": DOCUMENT_REQUEST_LINE.render_each(documents)})
+    }
+
+
+def render_document_reminder(client_name: str, assigned_rm: Optional[str], evidence_names: Iterable[str]) -> Dict[str, str]:
+    """Subject and body of a reminder for documents that were requested or expired"""
+    values = {"client_name": client_name, "assigned_rm": assigned_rm}
+    return {
+        "subject": DOCUMENT_REMINDER_SUBJECT.render(values),
+        "body": DOCUMENT_REMINDER_BODY.render({
+            **values,
+            "document_list": DOCUMENT_REMINDER_LINE.render_each({"evidence_name": name} for name in evidence_names)
+        })
+    }
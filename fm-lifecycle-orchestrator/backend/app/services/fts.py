@@ -0,0 +1,120 @@
+"""
+Full-Text Indexes
+SQLite FTS5 tables kept in sync with their source tables by triggers, plus the opaque keyset
+cursors used by the search and inbox endpoints.
+
+ensure() creates the virtual table and its triggers and rebuilds the index when the table is
+new, a trigger was missing (writes made meanwhile are not indexed; seed_data drops the source
+tables and their triggers with them) or the indexed row count differs from the source table.
+"""
+import base64
+import json
+import re
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import column, literal_column, table
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from ..observability import get_logger, kv
+
+logger = get_logger(__name__)
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def prefix_match(text: str, columns: Optional[Sequence[str]] = None) -> str:
+    """FTS5 expression requiring every word of text as a (quoted) prefix, optionally per column set"""
+    scope = f"{{{' '.join(columns)}}} : " if columns else ""
+    return " AND ".join(f'{scope}"{token}"*' for token in TOKEN_PATTERN.findall(text.lower()))
+
+
+class FullTextIndex:
+    """One FTS5 table, its sync triggers and the statements that repopulate it"""
+
+    def __init__(
+        self,
+        name: str,
+        columns: Sequence[str],
+        source_table: str,
+        triggers: Dict[str, str],
+        rebuild_sql: Sequence[str],
+        options: str = "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'"
+    ):
+        self.name = name
+        self.columns = tuple(columns)
+        self.source_table = source_table
+        self.triggers = triggers
+        self.rebuild_sql = rebuild_sql
+        self.options = options
+        self.enabled = False
+        self.table = table(name, column("rowid"))
+
+    def ensure(self, engine: Engine) -> bool:
+        """Create the table and triggers, rebuilding when the index may be stale"""
+        if engine.dialect.name != "sqlite":
+            return False
+        with engine.begin() as connection:
+            try:
+                existing = {
+                    row[0] for row in connection.exec_driver_sql(
+                        "SELECT name FROM sqlite_master WHERE name = ? OR type = 'trigger'", (self.name,)
+                    )
+                }
+                created = self.name not in existing
+                connection.exec_driver_sql(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.name} USING fts5("
+                    f"{', '.join(self.columns)}, {self.options})"
+                )
+            except Exception:
+                logger.exception("SQLite FTS5 unavailable; falling back to LIKE", extra=kv(index=self.name))
+                return False
+
+            missing = [name for name in self.triggers if name not in existing]
+            for name in missing:
+                connection.exec_driver_sql(f"CREATE TRIGGER IF NOT EXISTS {name} {self.triggers[name]}")
+            # The docsize shadow table has one row per indexed row, also for external content tables
+            indexed = connection.exec_driver_sql(f"SELECT count(*) FROM {self.name}_docsize").scalar()
+            rows = connection.exec_driver_sql(f"SELECT count(*) FROM {self.source_table}").scalar()
+            if created or missing or indexed != rows:
+                self._rebuild(connection)
+        self.enabled = True
+        return True
+
+    def _rebuild(self, connection):
+        start = time.perf_counter()
+        for statement in self.rebuild_sql:
+            connection.exec_driver_sql(statement)
+        connection.exec_driver_sql(f"INSERT INTO {self.name}({self.name}) VALUES ('optimize')")
+        logger.info("Full-text index rebuilt", extra=kv(
+            index=self.name,
+            rows=connection.exec_driver_sql(f"SELECT count(*) FROM {self.name}_docsize").scalar(),
+            duration_ms=round((time.perf_counter() - start) * 1000, 1)
+        ))
+
+    def match(self, expression: str):
+        """WHERE clause for a query that joins self.table"""
+        return literal_column(self.name).op("MATCH")(expression)
+
+    def matching_ids(self, db: Session, expression: str):
+        """Subquery of source row ids matching expression, for IN predicates"""
+        return db.query(self.table.c.rowid).filter(self.match(expression))
+
+
+def encode_cursor(query_key: str, position: Dict[str, Any]) -> str:
+    payload = json.dumps({"q": query_key, **position}, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, query_key: str, fields: List[str]) -> Dict[str, Any]:
+    """Position stored in a cursor; ValueError when it is malformed or from another query"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        position = {field: payload[field] for field in fields}
+        key = payload["q"]
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+    if key != query_key:
+        raise ValueError("Cursor belongs to a different query")
+    return position
@@ -0,0 +1,99 @@
+"""
+Incremental JSON Object Parser
+Consumes LLM output deltas as they stream in and completes as soon as the first top-level
+JSON object closes, so the caller can stop reading the stream. Text before the object
+(markdown fences, preambles) and anything after it is ignored.
+"""
+import json
+from typing import Any, Dict, Iterable, Optional
+
+
+class JSONStreamError(ValueError):
+    """The stream ended without a complete JSON object, or the object did not parse"""
+
+    def __init__(self, message: str, content: str):
+        super().__init__(message)
+        self.content = content
+
+
+class IncrementalJSONObjectParser:
+    """
+    Tracks string/escape state and brace depth across deltas. Each character is scanned once,
+    so total work is linear in the output length regardless of how it is chunked.
+    """
+
+    def __init__(self):
+        self._parts = []
+        self._length = 0
+        self._start: Optional[int] = None  # Offset of the opening brace
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self.result: Optional[Dict[str, Any]] = None
+
+    @property
+    def content(self) -> str:
+        return "".join(self._parts)
+
+    @property
+    def started(self) -> bool:
+        return self._start is not None
+
+    def feed(self, delta: str) -> bool:
+        """Consume a delta; returns True once the object is complete (result is set)"""
+        if self.result is not None or not delta:
+            return self.result is not None
+
+        offset = self._length
+        self._parts.append(delta)
+        self._length += len(delta)
+
+        position = 0
+        if self._start is None:
+            position = delta.find("{")
+            if position == -1:
+                return False
+            self._start = offset + position
+
+        in_string, escaped, depth = self._in_string, self._escaped, self._depth
+        for index in range(position, len(delta)):
+            char = delta[index]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+                if depth == 0:
+                    self._finish(offset + index + 1)
+                    return True
+        self._in_string, self._escaped, self._depth = in_string, escaped, depth
+        return False
+
+    def _finish(self, end: int):
+        content = self.content
+        try:
+            value = json.loads(content[self._start:end])
+        except json.JSONDecodeError as e:
+            raise JSONStreamError(f"Malformed JSON object: {e.msg} at position {e.pos}", content) from e
+        self.result = value
+
+
+def parse_json_object_stream(deltas: Iterable[str]) -> Dict[str, Any]:
+    """Parse the first JSON object from an iterable of text deltas, stopping as soon as it closes"""
+    parser = IncrementalJSONObjectParser()
+    for delta in deltas:
+        if parser.feed(delta):
+            return parser.result
+
+    content = parser.content
+    if not parser.started:
+        raise JSONStreamError("Response contained no JSON object", content)
+    raise JSONStreamError("Response ended before the JSON object was closed", content)
@@ -0,0 +1,238 @@
+"""
+LLM Request Scheduler
+Admits LLM calls under requests-per-minute and tokens-per-minute budgets (token buckets),
+orders waiting calls by priority lane so interactive chat goes ahead of batch work, retries
+429/5xx/connection failures with exponential backoff and full jitter, and enforces a deadline
+per call that also bounds each HTTP attempt.
+"""
+import random
+import threading
+import time
+from enum import IntEnum
+from typing import Any, Callable, Dict, List, Optional
+
+import openai
+
+from ..config import settings
+from ..observability.metrics import llm_queue_wait_seconds, llm_retries_total
+
+
+class LLMPriority(IntEnum):
+    """Priority lanes, lower value is served first"""
+    INTERACTIVE = 0  # Chat
+    STANDARD = 1  # Single-document validation
+    BATCH = 2  # Annotation, insights, bulk work
+
+
+class LLMDeadlineExceeded(Exception):
+    """The call could not be admitted or completed before its deadline"""
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at rate_per_minute. Capacity is burst_seconds worth of
+    budget, so a burst plus a minute of steady traffic stays within a provider's per-minute limit.
+    """
+
+    def __init__(self, rate_per_minute: float, burst_seconds: float):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount can be taken (0 when available now)"""
+        self._refill(now)
+        # Requests larger than the whole bucket are admitted once it is full
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+
+class _Waiter:
+    __slots__ = ("priority", "sequence", "enqueued", "tokens")
+
+    def __init__(self, priority: LLMPriority, sequence: int, tokens: int):
+        self.priority = priority
+        self.sequence = sequence
+        self.enqueued = time.monotonic()
+        self.tokens = tokens
+
+
+class LLMScheduler:
+    """
+    Blocking scheduler shared by all LLM callers in the process.
+
+    Callers wait in priority order for a concurrency slot and rate budget. A waiting call's
+    effective priority improves by one lane per aging period so batch work is never starved.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        burst_seconds: float,
+        max_concurrency: int,
+        max_retries: int,
+        backoff_base_seconds: float,
+        backoff_max_seconds: float,
+        aging_seconds: float,
+        deadlines: Dict[LLMPriority, float]
+    ):
+        self.request_bucket = TokenBucket(requests_per_minute, burst_seconds)
+        self.token_bucket = TokenBucket(tokens_per_minute, burst_seconds)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.aging_seconds = aging_seconds
+        self.deadlines = deadlines
+
+        self._condition = threading.Condition()
+        self._waiters: List[_Waiter] = []
+        self._sequence = 0
+        self._in_flight = 0
+        self._pause_until = 0.0  # Set from Retry-After so every caller backs off together
+        self.stats = {"admitted": 0, "retries": 0, "rate_limited": 0, "deadline_exceeded": 0}
+
+    def run(
+        self,
+        call: Callable[[float], Any],
+        priority: LLMPriority = LLMPriority.STANDARD,
+        estimated_tokens: int = 0,
+        deadline: Optional[float] = None
+    ) -> Any:
+        """
+        Run call(timeout) once admitted, retrying transient failures until the deadline.
+
+        Args:
+            call: Performs one LLM request; receives the seconds left before the deadline
+            priority: Lane the call waits in
+            estimated_tokens: Prompt plus completion tokens charged against the TPM budget
+            deadline: Absolute time.monotonic() deadline (defaults to the lane's deadline)
+        """
+        if deadline is None:
+            deadline = time.monotonic() + self.deadlines[priority]
+
+        attempt = 0
+        while True:
+            self._acquire(priority, estimated_tokens, deadline)
+            try:
+                return call(max(0.1, deadline - time.monotonic()))
+            except Exception as e:
+                if isinstance(e, openai.RateLimitError):
+                    self.stats["rate_limited"] += 1
+                retry_after = self._retry_after(e)
+                if retry_after is None or attempt >= self.max_retries:
+                    raise
+            finally:
+                self._release()
+
+            # Full jitter keeps retrying callers from synchronising on the gateway
+            backoff = random.uniform(0, min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** attempt))
+            backoff = max(backoff, retry_after)
+            if time.monotonic() + backoff >= deadline:
+                self.stats["deadline_exceeded"] += 1
+                raise LLMDeadlineExceeded(f"LLM call gave up after {attempt + 1} attempts: deadline reached")
+
+            if retry_after:
+                with self._condition:
+                    self._pause_until = max(self._pause_until, time.monotonic() + retry_after)
+            attempt += 1
+            self.stats["retries"] += 1
+            llm_retries_total.inc(priority=priority.name)
+            time.sleep(backoff)
+
+    def _acquire(self, priority: LLMPriority, tokens: int, deadline: float):
+        enqueued = time.monotonic()
+        with self._condition:
+            self._sequence += 1
+            waiter = _Waiter(priority, self._sequence, tokens)
+            self._waiters.append(waiter)
+            try:
+                while True:
+                    now = time.monotonic()
+                    if now >= deadline:
+                        self.stats["deadline_exceeded"] += 1
+                        raise LLMDeadlineExceeded("LLM call was not admitted before its deadline")
+
+                    wait = None
+                    if self._next_waiter(now) is waiter and self._in_flight < self.max_concurrency:
+                        wait = max(
+                            self._pause_until - now,
+                            self.request_bucket.wait_time(1, now),
+                            self.token_bucket.wait_time(tokens, now)
+                        )
+                        if wait <= 0:
+                            self.request_bucket.take(1)
+                            self.token_bucket.take(tokens)
+                            self._in_flight += 1
+                            self.stats["admitted"] += 1
+                            llm_queue_wait_seconds.observe(now - enqueued, priority=priority.name)
+                            return
+
+                    self._condition.wait(timeout=min(wait or 1.0, deadline - now))
+            finally:
+                self._waiters.remove(waiter)
+                # The head of the queue changed, let the next waiter re-check
+                self._condition.notify_all()
+
+    def _release(self):
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def _next_waiter(self, now: float) -> Optional[_Waiter]:
+        """Waiter with the best effective priority (aged by time waited), FIFO within a lane"""
+        return min(
+            self._waiters,
+            key=lambda w: (w.priority - (now - w.enqueued) / self.aging_seconds, w.sequence),
+            default=None
+        )
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        """Seconds the server asked us to wait for a retryable error (0 if unspecified), None if not retryable"""
+        if isinstance(error, (openai.APIConnectionError, openai.APITimeoutError)):
+            return 0.0
+        if isinstance(error, openai.APIStatusError):
+            if error.status_code != 429 and error.status_code < 500:
+                return None
+            header = error.response.headers.get("retry-after") if error.response is not None else None
+            try:
+                return float(header) if header else 0.0
+            except ValueError:
+                return 0.0
+        return None
+
+
+def estimate_tokens(messages: List[Dict[str, str]], max_tokens: Optional[int]) -> int:
+    """Rough token estimate (about 4 characters per token) plus the completion budget"""
+    prompt_chars = sum(len(message.get("content") or "") for message in messages)
+    return prompt_chars // 4 + (max_tokens or 500)
+
+
+# Singleton instance
+llm_scheduler = LLMScheduler(
+    requests_per_minute=settings.llm_requests_per_minute,
+    tokens_per_minute=settings.llm_tokens_per_minute,
+    burst_seconds=settings.llm_rate_burst_seconds,
+    max_concurrency=settings.llm_max_concurrency,
+    max_retries=settings.llm_max_retries,
+    backoff_base_seconds=settings.llm_backoff_base_seconds,
+    backoff_max_seconds=settings.llm_backoff_max_seconds,
+    aging_seconds=settings.llm_priority_aging_seconds,
+    deadlines={
+        LLMPriority.INTERACTIVE: settings.llm_interactive_deadline_seconds,
+        LLMPriority.STANDARD: settings.llm_standard_deadline_seconds,
+        LLMPriority.BATCH: settings.llm_batch_deadline_seconds
+    }
+)
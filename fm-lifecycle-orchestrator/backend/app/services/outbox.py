@@ -0,0 +1,317 @@
+"""
+Transactional Outbox
+Integration calls (CX, SX, EX, email) are no longer made inline from request handlers. The
+handler writes an outbox_messages row in the same transaction as the business change, so the
+message exists exactly when the change committed, and the request never waits on the network.
+
+A dispatcher thread then delivers pending messages in batches:
+- a batch is claimed with one UPDATE ... RETURNING that pushes next_attempt_at forward by the
+  lease, so a crashed or concurrent dispatcher never holds messages for longer than the lease
+- claimed messages are sent per destination (destinations in parallel, one call per batch)
+  with their idempotency keys, so redelivery after a timeout or crash is applied once
+- outcomes are written with one executemany UPDATE; failures retry with exponential backoff
+  and jitter until max_attempts, after which the message is dead until retried manually
+"""
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import func, select, text, update
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database import SessionLocal
+from ..integrations.outbox_senders import OutboxSender, build_outbox_senders
+from ..models.outbox import OutboxMessage, OUTBOX_PENDING_CONDITION
+from ..observability import get_logger, kv, tracer
+from ..observability.metrics import outbox_messages_total, outbox_batch_duration_seconds
+
+logger = get_logger(__name__)
+
+_CLAIMED_COLUMNS = (
+    OutboxMessage.id, OutboxMessage.destination, OutboxMessage.topic, OutboxMessage.aggregate_type,
+    OutboxMessage.aggregate_id, OutboxMessage.idempotency_key, OutboxMessage.payload,
+    OutboxMessage.attempts, OutboxMessage.created_at
+)
+
+
+class OutboxService:
+    """Writes outbox messages inside business transactions and dispatches them on a daemon thread"""
+
+    def __init__(
+        self,
+        senders: Optional[Dict[str, OutboxSender]] = None,
+        interval_seconds: float = 1.0,
+        batch_size: int = 200,
+        max_batches_per_tick: int = 50,
+        max_attempts: int = 8,
+        backoff_base_seconds: float = 2.0,
+        backoff_max_seconds: float = 600.0,
+        lease_seconds: float = 60.0,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        self.senders = senders if senders is not None else {}
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.max_batches_per_tick = max_batches_per_tick
+        self.max_attempts = max_attempts
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.lease_seconds = lease_seconds
+        self.session_factory = session_factory
+        self.last_run: Dict[str, Any] = {}
+        self._run_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # Producing
+
+    @staticmethod
+    def _row(
+        destination: str,
+        topic: str,
+        payload: Dict[str, Any],
+        aggregate_type: Optional[str],
+        aggregate_id: Optional[int],
+        idempotency_key: Optional[str],
+        now: datetime
+    ) -> Dict[str, Any]:
+        return {
+            "destination": destination, "topic": topic, "payload": payload,
+            "aggregate_type": aggregate_type, "aggregate_id": aggregate_id,
+            "idempotency_key": idempotency_key or f"{topic}:{uuid.uuid4().hex}",
+            "status": "pending", "attempts": 0, "next_attempt_at": now, "created_at": now
+        }
+
+    def enqueue(
+        self,
+        db: Session,
+        destination: str,
+        topic: str,
+        payload: Dict[str, Any],
+        aggregate_type: Optional[str] = None,
+        aggregate_id: Optional[int] = None,
+        idempotency_key: Optional[str] = None
+    ) -> OutboxMessage:
+        """Add a message to the caller's transaction; it is delivered only once that commits"""
+        message = OutboxMessage(**self._row(
+            destination, topic, payload, aggregate_type, aggregate_id, idempotency_key, datetime.utcnow()
+        ))
+        db.add(message)
+        return message
+
+    def enqueue_many(self, db: Session, messages: List[Dict[str, Any]]):
+        """
+        enqueue() for many messages with one batched insert; each dict has destination, topic,
+        payload and optionally aggregate_type, aggregate_id and idempotency_key
+        """
+        if not messages:
+            return
+        now = datetime.utcnow()
+        db.bulk_insert_mappings(OutboxMessage, [
+            self._row(
+                message["destination"], message["topic"], message["payload"], message.get("aggregate_type"),
+                message.get("aggregate_id"), message.get("idempotency_key"), now
+            )
+            for message in messages
+        ])
+
+    # Dispatching
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.is_running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="outbox-dispatcher", daemon=True)
+        self._thread.start()
+        logger.info("Outbox dispatcher started", extra=kv(
+            interval_seconds=self.interval_seconds, batch_size=self.batch_size, destinations=sorted(self.senders)
+        ))
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        for sender in self.senders.values():
+            sender.close()
+
+    def wake(self):
+        """Dispatch now instead of at the next interval (e.g. right after a large enqueue)"""
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Outbox dispatch tick failed")
+            self._wake.wait(self.interval_seconds)
+            self._wake.clear()
+
+    def run_once(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Deliver due messages, batch after batch, until none are due or max_batches_per_tick.
+        Concurrent calls are skipped rather than queued.
+        """
+        if not self._run_lock.acquire(blocking=False):
+            return {"skipped": "a dispatch tick is already running"}
+        try:
+            totals = {"batches": 0, "delivered": 0, "failed": 0, "dead": 0}
+            start = time.perf_counter()
+            for _ in range(self.max_batches_per_tick):
+                result = self.dispatch_batch(now)
+                if not result["claimed"]:
+                    break
+                totals["batches"] += 1
+                for key in ("delivered", "failed", "dead"):
+                    totals[key] += result[key]
+            totals.update(seconds=round(time.perf_counter() - start, 4), finished_at=datetime.utcnow().isoformat())
+            if totals["batches"]:
+                self.last_run = totals
+                logger.info("Outbox dispatched", extra=kv(**totals))
+            return totals
+        finally:
+            self._run_lock.release()
+
+    def claim(self, db: Session, now: datetime) -> List[Dict[str, Any]]:
+        """Lease up to batch_size due messages to this dispatcher (committed before sending)"""
+        due = select(OutboxMessage.id).where(
+            text(OUTBOX_PENDING_CONDITION), OutboxMessage.next_attempt_at <= now
+        ).order_by(OutboxMessage.next_attempt_at, OutboxMessage.id).limit(self.batch_size)
+        rows = db.execute(
+            update(OutboxMessage).where(
+                OutboxMessage.id.in_(due.scalar_subquery()),
+                # Re-checked, so a message claimed meanwhile by another dispatcher is skipped
+                OutboxMessage.next_attempt_at <= now
+            ).values(next_attempt_at=now + timedelta(seconds=self.lease_seconds)).returning(*_CLAIMED_COLUMNS)
+        ).mappings().all()
+        db.commit()
+        return [dict(row) for row in rows]
+
+    def dispatch_batch(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        now = now or datetime.utcnow()
+        db = self.session_factory()
+        try:
+            claimed = self.claim(db, now)
+            if not claimed:
+                return {"claimed": 0, "delivered": 0, "failed": 0, "dead": 0}
+
+            by_destination: Dict[str, List[Dict[str, Any]]] = {}
+            for message in claimed:
+                by_destination.setdefault(message["destination"], []).append(message)
+            with ThreadPoolExecutor(max_workers=len(by_destination)) as pool:
+                outcomes = dict(zip(by_destination, pool.map(
+                    lambda item: self._send(*item), by_destination.items()
+                )))
+            return self._record(db, claimed, outcomes, datetime.utcnow())
+        finally:
+            db.close()
+
+    def _send(self, destination: str, messages: List[Dict[str, Any]]) -> Dict[str, Optional[str]]:
+        """{idempotency_key: error or None} for one destination's share of the batch"""
+        sender = self.senders.get(destination)
+        if sender is None:
+            return {message["idempotency_key"]: f"No sender for destination {destination}" for message in messages}
+        start = time.perf_counter()
+        try:
+            with tracer.span("outbox.send", destination=destination, messages=len(messages)):
+                results = sender.send([
+                    {
+                        "idempotency_key": message["idempotency_key"], "topic": message["topic"],
+                        "aggregate_type": message["aggregate_type"], "aggregate_id": message["aggregate_id"],
+                        "payload": message["payload"], "created_at": message["created_at"].isoformat()
+                    }
+                    for message in messages
+                ])
+        except Exception as exc:
+            logger.warning("Outbox batch failed", extra=kv(destination=destination, messages=len(messages), error=str(exc)))
+            results = {message["idempotency_key"]: f"{type(exc).__name__}: {exc}" for message in messages}
+        finally:
+            outbox_batch_duration_seconds.observe(time.perf_counter() - start, destination=destination)
+        return {
+            message["idempotency_key"]: results.get(message["idempotency_key"], f"Not acknowledged by {destination}")
+            for message in messages
+        }
+
+    def backoff_seconds(self, attempts: int) -> float:
+        delay = min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _record(
+        self,
+        db: Session,
+        claimed: List[Dict[str, Any]],
+        outcomes: Dict[str, Dict[str, Optional[str]]],
+        now: datetime
+    ) -> Dict[str, int]:
+        rows: List[Dict[str, Any]] = []
+        counts = {"claimed": len(claimed), "delivered": 0, "failed": 0, "dead": 0}
+        for message in claimed:
+            attempts = message["attempts"] + 1
+            error = outcomes[message["destination"]][message["idempotency_key"]]
+            if error is None:
+                rows.append({"id": message["id"], "status": "delivered", "attempts": attempts,
+                             "delivered_at": now, "next_attempt_at": now, "last_error": None})
+                outcome = "delivered"
+            elif attempts >= self.max_attempts:
+                rows.append({"id": message["id"], "status": "dead", "attempts": attempts,
+                             "delivered_at": None, "next_attempt_at": now, "last_error": error})
+                outcome = "dead"
+            else:
+                rows.append({"id": message["id"], "status": "pending", "attempts": attempts, "delivered_at": None,
+                             "next_attempt_at": now + timedelta(seconds=self.backoff_seconds(attempts)),
+                             "last_error": error})
+                outcome = "failed"
+            counts[outcome] += 1
+            outbox_messages_total.inc(destination=message["destination"], outcome=outcome)
+        db.execute(update(OutboxMessage), rows)
+        db.commit()
+        return counts
+
+    # Operations
+
+    @staticmethod
+    def stats(db: Session) -> Dict[str, Any]:
+        counts: Dict[str, Dict[str, int]] = {}
+        for destination, status, count in db.query(
+            OutboxMessage.destination, OutboxMessage.status, func.count()
+        ).group_by(OutboxMessage.destination, OutboxMessage.status):
+            counts.setdefault(destination, {})[status] = count
+        oldest_pending = db.query(func.min(OutboxMessage.created_at)).filter(text(OUTBOX_PENDING_CONDITION)).scalar()
+        return {"by_destination": counts, "oldest_pending_at": oldest_pending}
+
+    @staticmethod
+    def retry_dead(db: Session, destination: Optional[str] = None) -> int:
+        """Return dead messages to pending with a fresh attempt budget"""
+        query = db.query(OutboxMessage).filter(OutboxMessage.status == "dead")
+        if destination:
+            query = query.filter(OutboxMessage.destination == destination)
+        retried = query.update(
+            {OutboxMessage.status: "pending", OutboxMessage.attempts: 0, OutboxMessage.next_attempt_at: datetime.utcnow()},
+            synchronize_session=False
+        )
+        db.commit()
+        return retried
+
+
+# Singleton instance
+outbox = OutboxService(
+    senders=build_outbox_senders(),
+    interval_seconds=settings.outbox_interval_seconds,
+    batch_size=settings.outbox_batch_size,
+    max_attempts=settings.outbox_max_attempts,
+    backoff_base_seconds=settings.outbox_backoff_base_seconds,
+    backoff_max_seconds=settings.outbox_backoff_max_seconds,
+    lease_seconds=settings.outbox_lease_seconds
+)
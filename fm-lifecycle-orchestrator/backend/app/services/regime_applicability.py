@@ -0,0 +1,194 @@
+"""
+Regime Applicability Index
+Decides which regimes are worth evaluating for a client, derived from the active
+booking_location classification rules: exact allowed_locations go into a hash map and
+"prefix*" allowed_patterns into a character trie, so a lookup costs O(length of the location).
+Regimes without a booking_location rule fall back to DEFAULT_REGIME_LOCATIONS, and regimes
+that are in neither apply to every client. The index is rebuilt when the rules table changes,
+so regimes and rules added through the API are picked up without code changes.
+"""
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..models.classification_rule import ClassificationRule
+from ..models.client import Client
+from ..observability import get_logger, kv
+
+logger = get_logger(__name__)
+
+# Booking location prefixes / countries for regimes whose rules do not constrain booking location.
+# "international" means the regime can apply to any client.
+DEFAULT_REGIME_LOCATIONS = {
+    # India regimes
+    "RBI": ["India"],
+    "RBI Variation Margin": ["India"],
+    "India NDDC TR": ["India"],
+
+    # Singapore regimes
+    "MAS Margin": ["Singapore"],
+    "MAS Clearing": ["Singapore"],
+    "MAS Transaction Reporting": ["Singapore"],
+    "MAS FAIR Client Classification": ["Singapore"],
+
+    # Hong Kong regimes
+    "HKMA Margin": ["Hong Kong"],
+    "HKMA Clearing": ["Hong Kong"],
+    "HKMA Transaction Reporting": ["Hong Kong"],
+
+    # US regimes
+    "Dodd Frank (US Person - CFTC)": ["United States", "US"],
+    "Dodd Frank (SEC)": ["United States", "US"],
+    "DF Deemed ISDA": ["United States", "US"],
+
+    # EU regimes (can apply to international clients)
+    "MIFID": ["international"],
+    "EMIR": ["international"],
+    "SFTR": ["international"],
+
+    # Australian regimes
+    "ASIC TR": ["Australia"],
+
+    # Other regimes
+    "Canadian Transaction Reporting(CAD)": ["Canada"],
+    "ZAR MR": ["South Africa"],
+    "Indonesia Margin Classification": ["Indonesia"],
+    "Stays Exempt": ["international"],  # Can apply to any client
+}
+
+
+class PrefixTrie:
+    """Character trie mapping prefixes to regimes; a lookup collects every prefix of the key"""
+
+    def __init__(self):
+        self._root: Dict[str, Any] = {}
+
+    def insert(self, prefix: str, regime: str):
+        node = self._root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node.setdefault(None, set()).add(regime)  # None key holds the regimes ending here
+
+    def match(self, key: str) -> Set[str]:
+        found: Set[str] = set()
+        node = self._root
+        if None in node:
+            found |= node[None]
+        for char in key:
+            node = node.get(char)
+            if node is None:
+                break
+            if None in node:
+                found |= node[None]
+        return found
+
+
+class ApplicabilityIndex:
+    """Immutable snapshot: exact locations, location prefixes, countries and unrestricted regimes"""
+
+    def __init__(self, version: Tuple):
+        self.version = version
+        self.exact_locations: Dict[str, Set[str]] = {}
+        self.countries: Dict[str, Set[str]] = {}
+        self.prefixes = PrefixTrie()
+        self.unrestricted: Set[str] = set()
+        self.order: Dict[str, int] = {}
+
+    def lookup(self, booking_location: str, country: str) -> List[str]:
+        regimes = set(self.unrestricted)
+        if booking_location:
+            regimes |= self.exact_locations.get(booking_location, set())
+            regimes |= self.prefixes.match(booking_location)
+        if country:
+            regimes |= self.countries.get(country, set())
+        return sorted(regimes, key=self.order.__getitem__)
+
+
+class RegimeApplicabilityService:
+    """Holds the current index and rebuilds it when classification rules change"""
+
+    def __init__(self):
+        self._index: Optional[ApplicabilityIndex] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def build(rules: Iterable[ClassificationRule], version: Tuple = ()) -> ApplicabilityIndex:
+        """
+        Index from active rules. Lookups list regimes in DEFAULT_REGIME_LOCATIONS order, then
+        other regimes in the order of their first rule.
+        """
+        index = ApplicabilityIndex(version)
+        location_rules: Dict[str, List[Dict[str, Any]]] = {}
+        first_seen: Dict[str, int] = {}
+        for rule in rules:
+            first_seen.setdefault(rule.regime, len(first_seen))
+            if rule.rule_type == "booking_location":
+                location_rules.setdefault(rule.regime, []).append(rule.rule_config or {})
+        known = {regime: position for position, regime in enumerate(DEFAULT_REGIME_LOCATIONS)}
+        for regime in sorted(first_seen, key=lambda r: (known.get(r, len(known)), first_seen[r])):
+            index.order[regime] = len(index.order)
+
+        for regime in index.order:
+            configs = location_rules.get(regime)
+            if configs:
+                # Several booking_location rules must all match; indexing their union keeps every
+                # candidate and the engine makes the final decision
+                for config in configs:
+                    for location in config.get("allowed_locations", []):
+                        index.exact_locations.setdefault(location, set()).add(regime)
+                    for pattern in config.get("allowed_patterns", []):
+                        if pattern.endswith("*"):
+                            index.prefixes.insert(pattern[:-1], regime)
+                        else:
+                            index.exact_locations.setdefault(pattern, set()).add(regime)
+                continue
+
+            defaults = DEFAULT_REGIME_LOCATIONS.get(regime)
+            if not defaults or "international" in defaults:
+                index.unrestricted.add(regime)
+                continue
+            for location in defaults:
+                index.prefixes.insert(location, regime)
+                index.countries.setdefault(location, set()).add(regime)
+
+        return index
+
+    def get_index(self, db: Session) -> ApplicabilityIndex:
+        """Current index, rebuilt when rules were added, edited or (de)activated"""
+        version = tuple(db.query(
+            func.count(ClassificationRule.id),
+            func.max(ClassificationRule.id),
+            func.max(ClassificationRule.updated_date)
+        ).one())
+        index = self._index
+        if index is not None and index.version == version:
+            return index
+
+        with self._lock:
+            index = self._index
+            if index is None or index.version != version:
+                rules = db.query(ClassificationRule).filter(
+                    ClassificationRule.is_active == True
+                ).order_by(ClassificationRule.id).all()
+                index = self._index = self.build(rules, version)
+                logger.info(
+                    "Regime applicability index rebuilt",
+                    extra=kv(regimes=len(index.order), exact_locations=len(index.exact_locations),
+                             unrestricted=len(index.unrestricted))
+                )
+        return index
+
+    def applicable_regimes(self, db: Session, booking_location: str, country: str) -> List[str]:
+        return self.get_index(db).lookup(booking_location or "", country or "")
+
+    def for_client(self, db: Session, client: Client) -> List[str]:
+        """Regimes applicable to a client's booking location and country of incorporation"""
+        return self.applicable_regimes(
+            db, (client.client_attributes or {}).get("booking_location", ""), client.country_of_incorporation
+        )
+
+
+# Singleton instance
+regime_applicability = RegimeApplicabilityService()
@@ -0,0 +1,186 @@
+"""
+Search Query Parser
+Compiled matcher for natural-language client searches. Every vocabulary phrase (statuses, risk
+levels, jurisdictions, entity types, time words) plus the countries, entity types and
+relationship managers that exist in the clients table is folded into one case-insensitive regex
+shaped like a character trie, so a query is scanned once instead of once per phrase.
+Each match is reported as a span so the frontend can highlight what was understood.
+
+The database part of the vocabulary is re-read at most every refresh interval, only when the
+clients table changed, and the regex is recompiled only when the vocabulary itself changed.
+"""
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models.client import Client
+from ..observability import get_logger, kv
+
+logger = get_logger(__name__)
+
+# Natural-language client search vocabularies
+SEARCH_STATUS_KEYWORDS = {
+    "initiated": ["initiated", "new", "started"],
+    "in_progress": ["in progress", "progressing", "ongoing", "active"],
+    "blocked": ["blocked", "stuck", "issues"],
+    "completed": ["completed", "done", "finished"]
+}
+SEARCH_RISK_KEYWORDS = {
+    "high": ["high risk", "risky", "dangerous"],
+    "medium": ["medium risk", "moderate"],
+    "low": ["low risk", "safe"]
+}
+SEARCH_JURISDICTIONS = [
+    "United States", "UK", "United Kingdom", "Luxembourg", "Ireland",
+    "Cayman Islands", "Singapore", "Hong Kong", "Switzerland", "Germany"
+]
+SEARCH_ENTITY_TYPES = [
+    "hedge fund", "private equity", "corporation", "partnership", "spv"
+]
+SEARCH_TIME_KEYWORDS = {
+    "recent": ["recent", "recently", "latest", "new"],
+    "pending": ["pending", "waiting"]
+}
+SEARCH_STOP_WORDS = {"show", "me", "all", "the", "with", "that", "have", "are", "is", "in", "at", "to", "for", "of", "a", "an"}
+
+FILTER_KEYS = (
+    "onboarding_status", "risk_level", "jurisdictions", "entity_types", "relationship_managers",
+    "keywords", "time_filters"
+)
+
+# (phrase, filter key, filter value)
+VocabularyEntry = Tuple[str, str, str]
+
+
+def static_vocabulary() -> List[VocabularyEntry]:
+    entries: List[VocabularyEntry] = []
+    for status, phrases in SEARCH_STATUS_KEYWORDS.items():
+        entries.extend((phrase, "onboarding_status", status) for phrase in phrases)
+    for level, phrases in SEARCH_RISK_KEYWORDS.items():
+        entries.extend((phrase, "risk_level", level) for phrase in phrases)
+    entries.extend((jurisdiction, "jurisdictions", jurisdiction) for jurisdiction in SEARCH_JURISDICTIONS)
+    entries.extend((entity_type, "entity_types", entity_type) for entity_type in SEARCH_ENTITY_TYPES)
+    for time_filter, phrases in SEARCH_TIME_KEYWORDS.items():
+        entries.extend((phrase, "time_filters", time_filter) for phrase in phrases)
+    return entries
+
+
+def _normalize(phrase: str) -> str:
+    return " ".join(phrase.lower().split())
+
+
+class CompiledSearchMatcher:
+    """One trie-shaped regex over all vocabulary phrases; a phrase may feed several filters"""
+
+    def __init__(self, entries: List[VocabularyEntry]):
+        self.targets: Dict[str, List[Tuple[str, str]]] = {}
+        for phrase, key, value in entries:
+            targets = self.targets.setdefault(_normalize(phrase), [])
+            # First value wins per filter, e.g. the static "United Kingdom" over a DB duplicate
+            if all(existing_key != key for existing_key, _ in targets):
+                targets.append((key, value))
+        trie: Dict[str, Any] = {}
+        for phrase in self.targets:
+            node = trie
+            for char in phrase:
+                node = node.setdefault(char, {})
+            node[""] = {}  # End of a phrase
+        # Whole words only, optional plural "s"; the trie-shaped pattern tries each query position
+        # once per character instead of once per phrase, and prefers the longest phrase
+        self.pattern = re.compile(
+            r"(?<!\w)(?P<phrase>" + self._trie_pattern(trie) + r")s?(?!\w)", re.IGNORECASE
+        )
+
+    @classmethod
+    def _trie_pattern(cls, node: Dict[str, Any]) -> str:
+        branches = [
+            (r"\s+" if char == " " else re.escape(char)) + cls._trie_pattern(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # A phrase ending here is also a match; greedy "?" still tries the longer phrases first
+        return "(?:" + pattern + ")?" if "" in node else pattern
+
+    def parse(self, query: str) -> Dict[str, Any]:
+        filters: Dict[str, List[str]] = {key: [] for key in FILTER_KEYS}
+        spans: List[Dict[str, Any]] = []
+        for match in self.pattern.finditer(query):
+            for key, value in self.targets[_normalize(match.group("phrase"))]:
+                if value not in filters[key]:
+                    filters[key].append(value)
+                spans.append({
+                    "start": match.start(), "end": match.end(), "text": match.group(0),
+                    "filter": key, "value": value
+                })
+
+        # General keywords (simple word extraction)
+        words = query.lower().split()
+        keywords = [word for word in words if word not in SEARCH_STOP_WORDS and len(word) > 3]
+        filters["keywords"] = keywords[:5]  # Limit to 5 keywords
+        return {"filters": filters, "spans": spans}
+
+
+class SearchQueryParser:
+    """Holds the compiled matcher and refreshes its database vocabulary when clients change"""
+
+    def __init__(self, refresh_seconds: float = 60.0):
+        self.refresh_seconds = refresh_seconds
+        self._static = static_vocabulary()
+        self._vocabulary: List[VocabularyEntry] = list(self._static)
+        self._matcher = CompiledSearchMatcher(self._vocabulary)
+        self._version: Optional[Tuple] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self, db: Session, force: bool = False):
+        """Reload countries, entity types and RMs when the clients table changed since last time"""
+        if not force and time.monotonic() - self._checked_at < self.refresh_seconds:
+            return
+        # A refresh already in progress keeps serving the current matcher
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._checked_at = time.monotonic()
+            version = tuple(db.query(func.count(Client.id), func.max(Client.last_updated)).one())
+            if version == self._version:
+                return
+            self._version = version
+
+            vocabulary = list(self._static)
+            for column, key in (
+                (Client.country_of_incorporation, "jurisdictions"),
+                (Client.entity_type, "entity_types"),
+                (Client.assigned_rm, "relationship_managers")
+            ):
+                values = sorted(row[0] for row in db.query(column).filter(column.isnot(None)).distinct())
+                vocabulary.extend((value, key, value) for value in values if value.strip())
+            if vocabulary != self._vocabulary:
+                self._matcher = CompiledSearchMatcher(vocabulary)
+                self._vocabulary = vocabulary
+                logger.info("Search vocabulary recompiled", extra=kv(
+                    phrases=len(self._matcher.targets), database_entries=len(vocabulary) - len(self._static)
+                ))
+        finally:
+            self._lock.release()
+
+    def parse(self, query: str) -> Dict[str, Any]:
+        """
+        Parse a query into filters and the spans that produced them.
+
+        Returns:
+            {"filters": {onboarding_status, risk_level, jurisdictions, entity_types,
+            relationship_managers, keywords, time_filters}, "spans": [{start, end, text, filter, value}]}
+        """
+        return self._matcher.parse(query)
+
+
+# Singleton instance
+search_query_parser = SearchQueryParser(refresh_seconds=settings.search_vocabulary_refresh_seconds)
@@ -0,0 +1,87 @@
+"""
+Single-Flight Request Coalescing
+Concurrent callers asking for the same work (same fingerprint) wait on one in-flight
+execution and share its result, optionally followed by a short-lived result cache.
+Every caller gets its own deep copy of the result, so one caller's edits never leak into
+another caller's (or the cache's) copy.
+Used to collapse duplicate LLM calls, e.g. several reviewers opening the same dashboard.
+"""
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+def fingerprint(*parts: Any) -> str:
+    """Stable hash of JSON-serializable request parts"""
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls by key. Errors are shared with callers already waiting
+    but never cached, so the next caller retries.
+    """
+
+    def __init__(self, cache_ttl_seconds: float = 0.0, cache_max_entries: int = 256):
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.cache_max_entries = cache_max_entries
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._results: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.stats = {"executed": 0, "coalesced": 0, "cache_hits": 0}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Run fn for key, or wait for the identical call already in flight"""
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None:
+                if cached[0] > time.monotonic():
+                    self.stats["cache_hits"] += 1
+                    return copy.deepcopy(cached[1])
+                del self._results[key]
+
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.stats["executed"] += 1
+            else:
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = fn()
+            return copy.deepcopy(call.result)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                if call.error is None and self.cache_ttl_seconds > 0:
+                    self._results[key] = (time.monotonic() + self.cache_ttl_seconds, call.result)
+                    while len(self._results) > self.cache_max_entries:
+                        self._results.popitem(last=False)
+            call.done.set()
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
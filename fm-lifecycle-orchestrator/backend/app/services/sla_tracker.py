@@ -0,0 +1,346 @@
+"""
+SLA Tracker
+Maintains onboarding TAT and SLA state incrementally instead of recomputing it from every stage:
+- stage_events: append-only started / completed / reopened / rescheduled events
+- stage_sla_clocks: one clock per started stage with its deadline (started_at + target TAT)
+- client_tat_totals: per-client running totals; the cumulative TAT at any moment is
+  completed hours + open stages * now - sum of open start times, so it needs no stage rows
+
+record() reconciles a stage's clock with its current dates and target after every change and
+applies only the difference to the client's totals; record_many() does the same for a batch of
+stages (the stage workflow's transition consumer) with one query per table. Reports are SQL aggregates over the clocks,
+and "breaching within N hours" is an index range on open clocks ordered by deadline.
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..models.client import Client
+from ..models.onboarding_stage import OnboardingStage
+from ..models.stage_sla import ClientTatTotal, StageEvent, StageSlaClock
+from ..observability import get_logger, kv
+
+logger = get_logger(__name__)
+
+EPOCH = datetime(1970, 1, 1)
+BACKFILL_BATCH = 5000
+
+
+def epoch_hours(moment: datetime) -> float:
+    return (moment - EPOCH).total_seconds() / 3600
+
+
+def _hours_between(start: datetime, end: datetime) -> float:
+    return round((end - start).total_seconds() / 3600, 2)
+
+
+def _deadline(started_at: datetime, target_tat_hours: Optional[float]) -> Optional[datetime]:
+    return started_at + timedelta(hours=target_tat_hours) if target_tat_hours is not None else None
+
+
+class SlaTracker:
+    """Keeps stage clocks, events and client running totals in step with onboarding stages"""
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+
+    @staticmethod
+    def _apply(totals: ClientTatTotal, clock: StageSlaClock, sign: int):
+        """Add (sign=1) or remove (sign=-1) a clock's contribution to the client totals"""
+        if clock.completed_at is None:
+            totals.open_stages += sign
+            totals.open_started_epoch_hours += sign * clock.started_epoch_hours
+        else:
+            totals.completed_stages += sign
+            totals.completed_tat_hours += sign * clock.tat_hours
+
+    @staticmethod
+    def cumulative_tat_hours(totals: Optional[ClientTatTotal], now: Optional[datetime] = None) -> Optional[float]:
+        if totals is None or (totals.open_stages == 0 and totals.completed_stages == 0):
+            return None
+        running = totals.open_stages * epoch_hours(now or datetime.utcnow()) - totals.open_started_epoch_hours
+        return round(totals.completed_tat_hours + running, 2)
+
+    def record(self, db: Session, stage: OnboardingStage, now: Optional[datetime] = None) -> Optional[StageSlaClock]:
+        """
+        Reconcile the stage's SLA clock after its status, dates or target changed. Updates the
+        stage's tat_hours and the client's cumulative_tat_hours; the caller commits.
+        """
+        return self.record_many(db, [stage], now)[0]
+
+    def record_many(
+        self,
+        db: Session,
+        stages: Sequence[OnboardingStage],
+        now: Optional[datetime] = None
+    ) -> List[Optional[StageSlaClock]]:
+        """record() for a batch of stages: clocks, totals and clients are loaded with one query each"""
+        if not stages:
+            return []
+        now = now or datetime.utcnow()
+        if any(stage.id is None for stage in stages):
+            db.flush()
+        client_ids = {stage.client_id for stage in stages}
+        clocks = {
+            clock.stage_id: clock for clock in
+            db.query(StageSlaClock).filter(StageSlaClock.stage_id.in_([stage.id for stage in stages]))
+        }
+        totals = {
+            total.client_id: total for total in
+            db.query(ClientTatTotal).filter(ClientTatTotal.client_id.in_(client_ids))
+        }
+        for client_id in client_ids - totals.keys():
+            totals[client_id] = ClientTatTotal(
+                client_id=client_id, completed_tat_hours=0.0, completed_stages=0,
+                open_stages=0, open_started_epoch_hours=0.0
+            )
+            db.add(totals[client_id])
+
+        reconciled = [
+            self._reconcile(db, stage, clocks.get(stage.id), totals[stage.client_id], now) for stage in stages
+        ]
+        for client in db.query(Client).filter(Client.id.in_(client_ids)):
+            client.cumulative_tat_hours = self.cumulative_tat_hours(totals[client.id], now)
+        db.flush()
+        return reconciled
+
+    def _reconcile(
+        self,
+        db: Session,
+        stage: OnboardingStage,
+        clock: Optional[StageSlaClock],
+        totals: ClientTatTotal,
+        now: datetime
+    ) -> Optional[StageSlaClock]:
+        stage_name = stage.stage_name.value if stage.stage_name else ""
+        events: List[str] = []
+
+        if stage.started_date is None:
+            if clock is not None:
+                # Start date cleared: the stage is back to not started
+                self._apply(totals, clock, -1)
+                db.delete(clock)
+                events.append("reopened")
+            clock = None
+        else:
+            if clock is None:
+                clock = StageSlaClock(
+                    stage_id=stage.id, client_id=stage.client_id, stage_name=stage_name,
+                    started_at=stage.started_date, started_epoch_hours=epoch_hours(stage.started_date)
+                )
+                db.add(clock)
+                events.append("started")
+            else:
+                self._apply(totals, clock, -1)
+                if clock.started_at != stage.started_date or clock.target_tat_hours != stage.target_tat_hours:
+                    events.append("rescheduled")
+                if clock.completed_at is not None and stage.completed_date is None:
+                    events.append("reopened")
+
+            was_completed = clock.completed_at is not None
+            clock.stage_name = stage_name
+            clock.assigned_team = stage.assigned_team
+            clock.started_at = stage.started_date
+            clock.started_epoch_hours = epoch_hours(stage.started_date)
+            clock.target_tat_hours = stage.target_tat_hours
+            clock.deadline = _deadline(stage.started_date, stage.target_tat_hours)
+            clock.completed_at = stage.completed_date
+            if stage.completed_date is not None:
+                clock.tat_hours = _hours_between(stage.started_date, stage.completed_date)
+                clock.breached = clock.deadline is not None and stage.completed_date > clock.deadline
+                if not was_completed:
+                    events.append("completed")
+            else:
+                clock.tat_hours = None
+                clock.breached = None
+            self._apply(totals, clock, 1)
+
+            # Stage TAT as before: final once completed, elapsed so far otherwise
+            stage.tat_hours = clock.tat_hours if clock.tat_hours is not None else _hours_between(stage.started_date, now)
+
+        for event_type in events:
+            occurred_at = stage.completed_date if event_type == "completed" and stage.completed_date else (
+                stage.started_date if event_type == "started" else now
+            )
+            db.add(StageEvent(
+                stage_id=stage.id, client_id=stage.client_id, stage_name=stage_name,
+                event_type=event_type, occurred_at=occurred_at
+            ))
+
+        return clock
+
+    def breaching(
+        self,
+        db: Session,
+        within_hours: float,
+        include_breached: bool = False,
+        limit: int = 100,
+        now: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """Open stages whose deadline falls within the next within_hours, soonest first"""
+        now = now or datetime.utcnow()
+        query = db.query(StageSlaClock, Client.name).join(Client, StageSlaClock.client_id == Client.id).filter(
+            StageSlaClock.completed_at.is_(None),
+            StageSlaClock.deadline <= now + timedelta(hours=within_hours)
+        )
+        if not include_breached:
+            query = query.filter(StageSlaClock.deadline > now)
+        rows = query.order_by(StageSlaClock.deadline).limit(limit).all()
+        return [
+            {
+                "stage_id": clock.stage_id,
+                "client_id": clock.client_id,
+                "client_name": client_name,
+                "stage_name": clock.stage_name,
+                "assigned_team": clock.assigned_team,
+                "started_at": clock.started_at,
+                "deadline": clock.deadline,
+                "target_tat_hours": clock.target_tat_hours,
+                "elapsed_hours": _hours_between(clock.started_at, now),
+                "hours_remaining": _hours_between(now, clock.deadline),
+                "breached": clock.deadline <= now
+            }
+            for clock, client_name in rows
+        ]
+
+    def report(
+        self,
+        db: Session,
+        within_hours: float,
+        completed_since_days: float = 30.0,
+        now: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Operations-wide SLA position per stage, computed by the database. Open clocks are all
+        counted; completed clocks only when completed within the last completed_since_days, so
+        both aggregates stay index range scans as history grows.
+        """
+        now = now or datetime.utcnow()
+        soon = now + timedelta(hours=within_hours)
+        completed_since = now - timedelta(days=completed_since_days)
+        is_open = StageSlaClock.completed_at.is_(None)
+        open_rows = db.query(
+            StageSlaClock.stage_name,
+            func.count(),
+            func.sum(case((StageSlaClock.deadline <= now, 1), else_=0)),
+            func.sum(case(((StageSlaClock.deadline > now) & (StageSlaClock.deadline <= soon), 1), else_=0)),
+            func.sum(StageSlaClock.started_epoch_hours)
+        ).filter(is_open).group_by(StageSlaClock.stage_name).all()
+        completed_rows = db.query(
+            StageSlaClock.stage_name,
+            func.count(),
+            func.sum(case((StageSlaClock.breached == True, 1), else_=0)),
+            func.avg(StageSlaClock.tat_hours)
+        ).filter(StageSlaClock.completed_at >= completed_since).group_by(StageSlaClock.stage_name).all()
+
+        now_hours = epoch_hours(now)
+        stages: Dict[str, Dict[str, Any]] = {}
+        for stage_name, count, breached, breaching, started_sum in open_rows:
+            stages[stage_name] = {
+                "open": count,
+                "breached_open": int(breached or 0),
+                "breaching_within_window": int(breaching or 0),
+                "avg_open_elapsed_hours": round(now_hours - (started_sum or 0) / count, 2) if count else None
+            }
+        for stage_name, count, breached, avg_tat in completed_rows:
+            stages.setdefault(stage_name, {}).update({
+                "completed": count,
+                "completed_late": int(breached or 0),
+                "avg_completed_tat_hours": round(avg_tat, 2) if avg_tat is not None else None
+            })
+
+        totals = db.query(
+            func.sum(ClientTatTotal.completed_tat_hours),
+            func.sum(ClientTatTotal.open_stages),
+            func.sum(ClientTatTotal.open_started_epoch_hours),
+            func.count()
+        ).one()
+        completed_hours, open_stages, open_started, clients = totals
+        return {
+            "generated_at": now,
+            "window_hours": within_hours,
+            "completed_since": completed_since,
+            "stages": stages,
+            "clients_tracked": clients,
+            "total_tat_hours": round(
+                (completed_hours or 0) + (open_stages or 0) * now_hours - (open_started or 0), 2
+            )
+        }
+
+    def ensure_backfilled(self):
+        """Build clocks and totals from onboarding_stages when they are missing or out of step"""
+        db = self.session_factory()
+        try:
+            clocks = db.query(func.count(StageSlaClock.stage_id)).scalar()
+            started = db.query(func.count(OnboardingStage.id)).filter(OnboardingStage.started_date.isnot(None)).scalar()
+            if clocks != started:
+                self.backfill(db)
+        finally:
+            db.close()
+
+    def backfill(self, db: Session):
+        """Rebuild clocks, start/completion events and totals from the current stages"""
+        db.query(StageSlaClock).delete()
+        db.query(StageEvent).delete()
+        db.query(ClientTatTotal).delete()
+
+        clock_rows: List[Dict[str, Any]] = []
+        event_rows: List[Dict[str, Any]] = []
+        columns = (
+            OnboardingStage.id, OnboardingStage.client_id, OnboardingStage.stage_name,
+            OnboardingStage.assigned_team, OnboardingStage.started_date, OnboardingStage.completed_date,
+            OnboardingStage.target_tat_hours
+        )
+
+        def flush():
+            if clock_rows:
+                db.bulk_insert_mappings(StageSlaClock, clock_rows)
+                db.bulk_insert_mappings(StageEvent, event_rows)
+                clock_rows.clear()
+                event_rows.clear()
+
+        for stage_id, client_id, stage_name, team, started, completed, target in db.query(*columns).filter(
+            OnboardingStage.started_date.isnot(None)
+        ).order_by(OnboardingStage.id).yield_per(BACKFILL_BATCH):
+            name = stage_name.value if stage_name else ""
+            deadline = _deadline(started, target)
+            tat = _hours_between(started, completed) if completed else None
+            clock_rows.append({
+                "stage_id": stage_id, "client_id": client_id, "stage_name": name, "assigned_team": team,
+                "started_at": started, "started_epoch_hours": epoch_hours(started), "completed_at": completed,
+                "target_tat_hours": target, "deadline": deadline, "tat_hours": tat,
+                "breached": (deadline is not None and completed > deadline) if completed else None
+            })
+            event_rows.append({"stage_id": stage_id, "client_id": client_id, "stage_name": name,
+                               "event_type": "started", "occurred_at": started})
+            if completed:
+                event_rows.append({"stage_id": stage_id, "client_id": client_id, "stage_name": name,
+                                   "event_type": "completed", "occurred_at": completed})
+            if len(clock_rows) >= BACKFILL_BATCH:
+                flush()
+        flush()
+
+        # Totals are plain aggregates over the clocks
+        is_open = StageSlaClock.completed_at.is_(None)
+        totals = db.query(
+            StageSlaClock.client_id,
+            func.sum(case((~is_open, StageSlaClock.tat_hours), else_=0.0)),
+            func.sum(case((~is_open, 1), else_=0)),
+            func.sum(case((is_open, 1), else_=0)),
+            func.sum(case((is_open, StageSlaClock.started_epoch_hours), else_=0.0))
+        ).group_by(StageSlaClock.client_id).all()
+        db.bulk_insert_mappings(ClientTatTotal, [
+            {"client_id": client_id, "completed_tat_hours": completed_hours or 0.0,
+             "completed_stages": completed_count or 0, "open_stages": open_count or 0,
+             "open_started_epoch_hours": open_started or 0.0}
+            for client_id, completed_hours, completed_count, open_count, open_started in totals
+        ])
+        db.commit()
+        logger.info("SLA clocks backfilled", extra=kv(clients=len(totals)))
+
+
+# Singleton instance
+sla_tracker = SlaTracker()
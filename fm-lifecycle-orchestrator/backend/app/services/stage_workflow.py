@@ -0,0 +1,248 @@
+"""
+Stage Workflow
+Declarative state machine for onboarding stages:
+- STAGE_TRANSITIONS: the status changes a stage may make (the same status again is a no-op)
+- STATUS_DATE_EFFECTS: what entering a status does to the stage's started/completed dates
+- WORKFLOW_STEPS: named multi-stage moves, e.g. a CX product approval completes Legal Entity
+  Setup and starts Regulatory Classification (stages already completed stay completed)
+
+apply() moves stages of one or many clients in one transaction: the affected stages are loaded
+with one query, every change is validated before any is made, and the resulting transitions are
+handed as one batch to each subscribed consumer:
+- sla: reconciles stage clocks and client running TAT totals
+- tasks: completes the open tasks of stages that were completed
+- clients: initiated clients with a started or completed stage move to in progress
+- classification: reports the clients whose Regulatory Classification stage started, for the
+  caller to evaluate once the transaction is committed
+- integrations: queues one stage.transitioned message per transition for EX in the outbox
+Consumers only flush; the caller commits.
+"""
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..models.client import Client, OnboardingStatus
+from ..models.onboarding_stage import OnboardingStage, StageName, StageStatus
+from ..models.task import Task, TaskStatus
+from ..observability import get_logger, kv
+from ..observability.metrics import stage_transitions_total
+from .outbox import outbox
+from .sla_tracker import sla_tracker
+
+logger = get_logger(__name__)
+
+# Allowed status changes per current status; a stage is only completed once it was started
+STAGE_TRANSITIONS: Dict[StageStatus, frozenset] = {
+    StageStatus.NOT_STARTED: frozenset({StageStatus.IN_PROGRESS, StageStatus.BLOCKED}),
+    StageStatus.IN_PROGRESS: frozenset({StageStatus.COMPLETED, StageStatus.BLOCKED, StageStatus.NOT_STARTED}),
+    StageStatus.BLOCKED: frozenset({StageStatus.IN_PROGRESS, StageStatus.COMPLETED, StageStatus.NOT_STARTED}),
+    StageStatus.COMPLETED: frozenset({StageStatus.IN_PROGRESS}),  # Reopen
+}
+
+# Date fields on entering a status: "set" fills an empty date with now, "clear" empties it
+STATUS_DATE_EFFECTS: Dict[StageStatus, Dict[str, str]] = {
+    StageStatus.NOT_STARTED: {"started_date": "clear", "completed_date": "clear"},
+    StageStatus.IN_PROGRESS: {"started_date": "set", "completed_date": "clear"},
+    StageStatus.BLOCKED: {},
+    StageStatus.COMPLETED: {"completed_date": "set"},
+}
+
+
+def _handoff(done: StageName, following: Optional[StageName] = None) -> Dict[StageName, StageStatus]:
+    changes = {done: StageStatus.COMPLETED}
+    if following is not None:
+        changes[following] = StageStatus.IN_PROGRESS
+    return changes
+
+
+# Named multi-stage moves (stage -> target status)
+WORKFLOW_STEPS: Dict[str, Dict[StageName, StageStatus]] = {
+    "cx_product_approved": _handoff(StageName.LEGAL_ENTITY_SETUP, StageName.REG_CLASSIFICATION),
+    "classification_completed": _handoff(StageName.REG_CLASSIFICATION, StageName.FM_ACCOUNT_REQUEST),
+    "account_opened": _handoff(StageName.FM_ACCOUNT_REQUEST, StageName.STATIC_DATA_ENRICHMENT),
+    "static_data_enriched": _handoff(StageName.STATIC_DATA_ENRICHMENT, StageName.SSI_VALIDATION),
+    "ssi_validated": _handoff(StageName.SSI_VALIDATION, StageName.VALUATION_SETUP),
+    "valuation_setup_completed": _handoff(StageName.VALUATION_SETUP),
+}
+
+# Transition event: {"stage", "stage_id", "client_id", "stage_name", "from_status", "to_status"}
+Transition = Dict[str, Any]
+TransitionConsumer = Callable[[Session, List[Transition], datetime], Optional[Dict[str, Any]]]
+
+
+class InvalidStageTransition(ValueError):
+    """Raised when requested stage changes are not allowed by STAGE_TRANSITIONS"""
+
+    def __init__(self, errors: List[Dict[str, Any]]):
+        self.errors = errors
+        super().__init__(f"{len(errors)} stage transition(s) not allowed")
+
+
+class StageWorkflow:
+    """Validates and applies stage transitions and dispatches them to the consumers"""
+
+    def __init__(self):
+        self._consumers: List[Tuple[str, TransitionConsumer]] = []
+
+    def subscribe(self, name: str, consumer: TransitionConsumer):
+        self._consumers.append((name, consumer))
+
+    @staticmethod
+    def is_allowed(current: StageStatus, target: StageStatus) -> bool:
+        return current == target or target in STAGE_TRANSITIONS[current]
+
+    def apply(
+        self,
+        db: Session,
+        client_ids: Iterable[int],
+        changes: Dict[StageName, StageStatus],
+        notes: Optional[str] = None,
+        skip_invalid: bool = False,
+        reopen: bool = False,
+        now: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """Move the given stages of every client to their target status (one query loads them all)"""
+        client_ids = sorted(set(client_ids))
+        stages = db.query(OnboardingStage).filter(
+            OnboardingStage.client_id.in_(client_ids),
+            OnboardingStage.stage_name.in_(list(changes))
+        ).order_by(OnboardingStage.client_id, OnboardingStage.order).all()
+        result = self.transition(
+            db, [(stage, changes[stage.stage_name]) for stage in stages],
+            notes=notes, skip_invalid=skip_invalid, reopen=reopen, now=now
+        )
+        found = {stage.client_id for stage in stages}
+        result["missing_client_ids"] = [client_id for client_id in client_ids if client_id not in found]
+        return result
+
+    def transition(
+        self,
+        db: Session,
+        moves: Sequence[Tuple[OnboardingStage, StageStatus]],
+        notes: Optional[str] = None,
+        skip_invalid: bool = False,
+        reopen: bool = True,
+        now: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Apply (stage, target status) moves. Raises InvalidStageTransition before changing anything
+        when a move is not allowed, unless skip_invalid, which leaves those stages untouched.
+        Without reopen, starting an already completed stage (e.g. the next stage of a workflow
+        step for a client that is further along) leaves it completed.
+
+        Returns:
+            {"transitions": [...], "unchanged": int, "skipped": [...], "consumers": {name: summary}}
+        """
+        now = now or datetime.utcnow()
+        allowed: List[Tuple[OnboardingStage, StageStatus, StageStatus]] = []
+        invalid: List[Dict[str, Any]] = []
+        unchanged = 0
+        for stage, target in moves:
+            current = stage.status or StageStatus.NOT_STARTED
+            if current == target or (
+                not reopen and current == StageStatus.COMPLETED and target == StageStatus.IN_PROGRESS
+            ):
+                unchanged += 1
+            elif self.is_allowed(current, target):
+                allowed.append((stage, current, target))
+            else:
+                invalid.append({
+                    "stage_id": stage.id, "client_id": stage.client_id, "stage_name": stage.stage_name,
+                    "from_status": current, "to_status": target
+                })
+        if invalid and not skip_invalid:
+            raise InvalidStageTransition(invalid)
+
+        transitions: List[Transition] = []
+        for stage, current, target in allowed:
+            stage.status = target
+            for field, effect in STATUS_DATE_EFFECTS[target].items():
+                if effect == "clear":
+                    setattr(stage, field, None)
+                elif getattr(stage, field) is None:
+                    setattr(stage, field, now)
+            if notes is not None:
+                stage.notes = notes
+            transitions.append({
+                "stage": stage, "stage_id": stage.id, "client_id": stage.client_id,
+                "stage_name": stage.stage_name, "from_status": current, "to_status": target
+            })
+            stage_transitions_total.inc(to_status=target.value)
+
+        summaries: Dict[str, Any] = {}
+        if transitions:
+            for name, consumer in self._consumers:
+                summaries[name] = consumer(db, transitions, now) or {}
+            db.flush()
+            logger.info("Stage transitions applied", extra=kv(
+                transitions=len(transitions), clients=len({t["client_id"] for t in transitions}),
+                skipped=len(invalid)
+            ))
+        return {"transitions": transitions, "unchanged": unchanged, "skipped": invalid, "consumers": summaries}
+
+
+def _record_sla(db: Session, transitions: List[Transition], now: datetime) -> Dict[str, Any]:
+    sla_tracker.record_many(db, [transition["stage"] for transition in transitions], now)
+    return {"stages": len(transitions)}
+
+
+def _complete_stage_tasks(db: Session, transitions: List[Transition], now: datetime) -> Dict[str, Any]:
+    """Open tasks of a completed stage are completed with it"""
+    stage_ids = [t["stage_id"] for t in transitions if t["to_status"] == StageStatus.COMPLETED]
+    if not stage_ids:
+        return {"tasks_completed": 0}
+    completed = db.query(Task).filter(
+        Task.onboarding_stage_id.in_(stage_ids),
+        Task.status != TaskStatus.COMPLETED
+    ).update({Task.status: TaskStatus.COMPLETED, Task.completed_date: now})
+    return {"tasks_completed": completed}
+
+
+def _start_clients(db: Session, transitions: List[Transition], now: datetime) -> Dict[str, Any]:
+    """Initiated clients with a started or completed stage are in progress"""
+    client_ids = {
+        t["client_id"] for t in transitions
+        if t["to_status"] in (StageStatus.IN_PROGRESS, StageStatus.COMPLETED)
+    }
+    if not client_ids:
+        return {"clients_started": 0}
+    started = db.query(Client).filter(
+        Client.id.in_(client_ids),
+        Client.onboarding_status == OnboardingStatus.INITIATED
+    ).update({Client.onboarding_status: OnboardingStatus.IN_PROGRESS})
+    return {"clients_started": started}
+
+
+def _classification_due(db: Session, transitions: List[Transition], now: datetime) -> Dict[str, Any]:
+    """Clients whose Regulatory Classification stage started need their regimes evaluated"""
+    return {"client_ids": sorted({
+        t["client_id"] for t in transitions
+        if t["stage_name"] == StageName.REG_CLASSIFICATION and t["to_status"] == StageStatus.IN_PROGRESS
+    })}
+
+
+def _notify_ex(db: Session, transitions: List[Transition], now: datetime) -> Dict[str, Any]:
+    """EX (the operational workflow tool) mirrors stage progress; delivered after commit by the outbox"""
+    outbox.enqueue_many(db, [
+        {
+            "destination": "ex", "topic": "stage.transitioned",
+            "aggregate_type": "onboarding_stage", "aggregate_id": t["stage_id"],
+            "payload": {
+                "client_id": t["client_id"], "stage_name": t["stage_name"].value,
+                "from_status": t["from_status"].value, "to_status": t["to_status"].value,
+                "transitioned_at": now.isoformat()
+            }
+        }
+        for t in transitions
+    ])
+    return {"messages_queued": len(transitions)}
+
+
+# Singleton instance
+stage_workflow = StageWorkflow()
+stage_workflow.subscribe("sla", _record_sla)
+stage_workflow.subscribe("tasks", _complete_stage_tasks)
+stage_workflow.subscribe("clients", _start_clients)
+stage_workflow.subscribe("classification", _classification_due)
+stage_workflow.subscribe("integrations", _notify_ex)
@@ -0,0 +1,296 @@
+"""
+Sweep Scheduler
+In-process background scheduler for time-based lifecycle state:
+- expiry: fills DocumentRequirement.expiry_date from MandatoryEvidence.validity_days and marks
+  requirements past their expiry date as expired
+- reviews: queues one review task per client whose RegulatoryClassification.next_review_date
+  falls inside the review lead time
+- reminders: batches the due document reminders into one email per client, addressed to its
+  contact_email and queued in the integration outbox in the same transaction as the reminder
+  counters; clients without a contact address are left for when one is set
+
+Every sweep selects through an indexed predicate, processes at most sweep_batch_size rows per
+tick and commits in its own short transaction, so a tick never holds the database for long.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import and_, exists, func, or_
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models.client import Client
+from ..models.document_requirement import DocumentRequirement
+from ..models.mandatory_evidence import MandatoryEvidence
+from ..models.regulatory_classification import RegulatoryClassification
+from ..models.task import Task, TaskStatus, TaskType
+from ..observability import get_logger, kv, tracer
+from ..observability.metrics import sweep_items_total, sweep_duration_seconds
+from .document_campaign import client_contact_email
+from .email_templates import render_document_reminder
+from .outbox import outbox
+
+logger = get_logger(__name__)
+
+REVIEW_TASK_TITLE = "Periodic regulatory review"
+
+# Requirement statuses that carry a document (and so can expire)
+LINKED_STATUSES = ("uploaded", "pending_review", "compliant")
+
+
+class SweepScheduler:
+    """Runs the expiry, review and reminder sweeps on a daemon thread every interval"""
+
+    def __init__(
+        self,
+        interval_seconds: float = 300.0,
+        batch_size: int = 500,
+        review_lead_days: int = 30,
+        reminder_interval_days: int = 7,
+        max_reminders: int = 5,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.review_lead_days = review_lead_days
+        self.reminder_interval_days = reminder_interval_days
+        self.max_reminders = max_reminders
+        self.session_factory = session_factory
+        self.sweeps: Dict[str, Callable[[Session, datetime], int]] = {
+            "expiry": self.sweep_expiry,
+            "reviews": self.sweep_reviews,
+            "reminders": self.sweep_reminders,
+        }
+        self.last_run: Dict[str, Dict[str, Any]] = {}
+        self._run_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.is_running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sweep-scheduler", daemon=True)
+        self._thread.start()
+        logger.info("Sweep scheduler started", extra=kv(interval_seconds=self.interval_seconds,
+                                                        batch_size=self.batch_size))
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        # First tick after one interval so startup traffic is not competing with a sweep
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Sweep tick failed")
+
+    def run_once(self, now: Optional[datetime] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Run every sweep once (each capped at batch_size rows). Concurrent calls are skipped
+        rather than queued.
+
+        Returns:
+            Dict mapping sweep name to {"processed", "seconds", "finished_at"} (or "error")
+        """
+        if not self._run_lock.acquire(blocking=False):
+            return {"skipped": {"reason": "a sweep tick is already running"}}
+        try:
+            results = {}
+            for name, sweep in self.sweeps.items():
+                results[name] = self._run_sweep(name, sweep, now or datetime.utcnow())
+            return results
+        finally:
+            self._run_lock.release()
+
+    def _run_sweep(self, name: str, sweep: Callable[[Session, datetime], int], now: datetime) -> Dict[str, Any]:
+        start = time.perf_counter()
+        db = self.session_factory()
+        try:
+            with tracer.span(f"sweep.{name}"):
+                processed = sweep(db, now)
+            result = {"processed": processed}
+        except Exception as e:
+            db.rollback()
+            logger.exception("Sweep failed", extra=kv(sweep=name))
+            result = {"processed": 0, "error": str(e)}
+        finally:
+            db.close()
+
+        elapsed = time.perf_counter() - start
+        sweep_duration_seconds.observe(elapsed, sweep=name)
+        sweep_items_total.inc(result["processed"], sweep=name)
+        result.update(seconds=round(elapsed, 4), finished_at=datetime.utcnow().isoformat())
+        self.last_run[name] = result
+        if result["processed"]:
+            logger.info("Sweep completed", extra=kv(sweep=name, processed=result["processed"],
+                                                    duration_ms=round(elapsed * 1000, 1)))
+        return result
+
+    def sweep_expiry(self, db: Session, now: datetime) -> int:
+        """Derive missing expiry dates from validity_days, then expire requirements past them"""
+        # Linked requirements whose evidence has a validity period but no expiry recorded yet
+        undated = db.query(DocumentRequirement, MandatoryEvidence.validity_days).join(
+            MandatoryEvidence, DocumentRequirement.evidence_id == MandatoryEvidence.id
+        ).filter(
+            DocumentRequirement.status.in_(LINKED_STATUSES),
+            DocumentRequirement.expiry_date.is_(None),
+            DocumentRequirement.received_date.isnot(None),
+            MandatoryEvidence.validity_days.isnot(None)
+        ).limit(self.batch_size).all()
+        for requirement, validity_days in undated:
+            requirement.expiry_date = requirement.received_date + timedelta(days=validity_days)
+        db.flush()
+
+        expired = db.query(DocumentRequirement).filter(
+            DocumentRequirement.status.in_(LINKED_STATUSES),
+            DocumentRequirement.expiry_date <= now
+        ).order_by(DocumentRequirement.expiry_date).limit(self.batch_size).all()
+        for requirement in expired:
+            requirement.status = "expired"
+            note = f"Expired on {requirement.expiry_date.date().isoformat()} (automatic sweep)"
+            requirement.notes = f"{requirement.notes}\n{note}" if requirement.notes else note
+
+        db.commit()
+        return len(undated) + len(expired)
+
+    def sweep_reviews(self, db: Session, now: datetime) -> int:
+        """Queue one review task per client with classifications due for review"""
+        cutoff = now + timedelta(days=self.review_lead_days)
+        # A review is covered by a task still open, or by one created since its due date entered
+        # the lead window (completed reviews do not move next_review_date, so it stays due)
+        review_queued = exists().where(and_(
+            Task.client_id == RegulatoryClassification.client_id,
+            Task.task_type == TaskType.REVIEW,
+            Task.title == REVIEW_TASK_TITLE,
+            or_(
+                Task.status != TaskStatus.COMPLETED,
+                func.julianday(Task.created_date)
+                >= func.julianday(RegulatoryClassification.next_review_date) - self.review_lead_days
+            )
+        ))
+        client_ids = [row[0] for row in db.query(RegulatoryClassification.client_id).filter(
+            RegulatoryClassification.next_review_date.isnot(None),
+            RegulatoryClassification.next_review_date <= cutoff,
+            ~review_queued
+        ).distinct().limit(self.batch_size).all()]
+        if not client_ids:
+            return 0
+
+        due: Dict[int, List[RegulatoryClassification]] = {}
+        for classification in db.query(RegulatoryClassification).filter(
+            RegulatoryClassification.client_id.in_(client_ids),
+            RegulatoryClassification.next_review_date.isnot(None),
+            RegulatoryClassification.next_review_date <= cutoff
+        ).order_by(RegulatoryClassification.next_review_date):
+            due.setdefault(classification.client_id, []).append(classification)
+
+        for client_id, classifications in due.items():
+            lines = [
+                f"- {c.regime or c.framework.value}: {c.classification} (review due "
+                f"{c.next_review_date.date().isoformat()})"
+                for c in classifications
+            ]
+            db.add(Task(
+                client_id=client_id,
+                title=REVIEW_TASK_TITLE,
+                description="Regulatory classifications due for periodic review:\n" + "\n".join(lines),
+                assigned_team="Regulatory Compliance",
+                status=TaskStatus.PENDING,
+                task_type=TaskType.REVIEW,
+                due_date=classifications[0].next_review_date
+            ))
+
+        db.commit()
+        return len(due)
+
+    def sweep_reminders(self, db: Session, now: datetime) -> int:
+        """Send one reminder email per client covering all of its due document requirements"""
+        cutoff = now - timedelta(days=self.reminder_interval_days)
+        # Spelled out per (status, last_reminder_date) range so each branch is an index range scan
+        never_reminded = DocumentRequirement.last_reminder_date.is_(None)
+        reminded_before = DocumentRequirement.last_reminder_date <= cutoff
+        requested = DocumentRequirement.requested_date.isnot(None)
+        due = and_(
+            or_(
+                # Previously provided documents that expired
+                and_(DocumentRequirement.status == "expired", never_reminded),
+                and_(DocumentRequirement.status == "expired", reminded_before),
+                # Requested but still missing
+                and_(DocumentRequirement.status == "missing", never_reminded, requested),
+                and_(DocumentRequirement.status == "missing", reminded_before, requested)
+            ),
+            DocumentRequirement.reminder_count < self.max_reminders
+        )
+        # Pick clients first (status index scan that stops at the limit; no DISTINCT sort over
+        # every due row), then load all of their due requirements. Clients without a contact
+        # address are not picked, so their counters are not spent on emails that cannot be sent.
+        client_ids = list(dict.fromkeys(
+            row[0] for row in db.query(DocumentRequirement.client_id).join(
+                Client, Client.id == DocumentRequirement.client_id
+            ).filter(due, func.trim(Client.contact_email) != "").limit(self.batch_size)
+        ))
+        if not client_ids:
+            return 0
+        rows = db.query(DocumentRequirement, MandatoryEvidence.evidence_name).join(
+            MandatoryEvidence, DocumentRequirement.evidence_id == MandatoryEvidence.id
+        ).filter(
+            DocumentRequirement.client_id.in_(client_ids),
+            due
+        ).order_by(DocumentRequirement.client_id, DocumentRequirement.id).limit(self.batch_size).all()
+
+        by_client: Dict[int, List] = {}
+        for requirement, evidence_name in rows:
+            by_client.setdefault(requirement.client_id, []).append((requirement, evidence_name))
+        if len(rows) == self.batch_size and len(by_client) > 1:
+            # The batch may have cut the last client's list short; send it whole next tick
+            by_client.popitem()
+        clients = {
+            client.id: client
+            for client in db.query(Client).filter(Client.id.in_(list(by_client)))
+        }
+
+        emails: List[Dict[str, Any]] = []
+        for client_id, items in by_client.items():
+            client = clients[client_id]
+            for requirement, _ in items:
+                requirement.last_reminder_date = now
+                requirement.reminder_count = (requirement.reminder_count or 0) + 1
+            evidences = [name for _, name in items]
+            emails.append({
+                "destination": "email", "topic": "document.reminder",
+                "aggregate_type": "client", "aggregate_id": client_id,
+                "payload": {
+                    "to": client_contact_email(client.contact_email),
+                    **render_document_reminder(client.name, client.assigned_rm, evidences),
+                    "client_name": client.name,
+                    "rm": client.assigned_rm,
+                    "requirement_ids": [requirement.id for requirement, _ in items],
+                    "evidences": evidences
+                }
+            })
+        outbox.enqueue_many(db, emails)
+
+        db.commit()
+        return sum(len(items) for items in by_client.values())
+
+
+# Singleton instance
+sweep_scheduler = SweepScheduler(
+    interval_seconds=settings.sweep_interval_seconds,
+    batch_size=settings.sweep_batch_size,
+    review_lead_days=settings.sweep_review_lead_days,
+    reminder_interval_days=settings.sweep_reminder_interval_days,
+    max_reminders=settings.sweep_max_reminders
+)
@@ -0,0 +1,159 @@
+"""
+Task Inbox
+Cross-client task listing ordered by due date (undated tasks last, then id). Pages are keyset
+paginated on (due_date, id), so page N costs the same index range scan as page one:
+- dated tasks are read with a row-value range (due_date, id) > cursor on an index that already
+  has that order, then undated tasks by id once the dated ones run out
+- each due_date_filter mode uses the partial index over open tasks (status != 'COMPLETED'),
+  status and team filters use their (column, due_date, id) indexes
+- search matches title/description through the task_search_fts index and client names through
+  the client search index instead of leading-wildcard LIKEs
+Client columns are selected in the same query, so building a page issues no per-row loads.
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import or_, text, tuple_
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Query, Session
+
+from ..models.client import Client
+from ..models.task import Task, TaskStatus, TaskType, OPEN_TASK_CONDITION
+from .client_search import client_search
+from .fts import FullTextIndex, decode_cursor, encode_cursor, prefix_match
+from .single_flight import fingerprint
+
+TASK_FTS_TABLE = "task_search_fts"
+
+# External content table: the FTS index stores only tokens and reads title/description from tasks
+_TRIGGERS = {
+    "task_search_insert": (
+        f"AFTER INSERT ON tasks BEGIN INSERT INTO {TASK_FTS_TABLE}(rowid, title, description) "
+        "VALUES (NEW.id, NEW.title, NEW.description); END"
+    ),
+    "task_search_update": (
+        f"AFTER UPDATE OF title, description ON tasks BEGIN "
+        f"INSERT INTO {TASK_FTS_TABLE}({TASK_FTS_TABLE}, rowid, title, description) "
+        "VALUES ('delete', OLD.id, OLD.title, OLD.description); "
+        f"INSERT INTO {TASK_FTS_TABLE}(rowid, title, description) VALUES (NEW.id, NEW.title, NEW.description); END"
+    ),
+    "task_search_delete": (
+        f"AFTER DELETE ON tasks BEGIN INSERT INTO {TASK_FTS_TABLE}({TASK_FTS_TABLE}, rowid, title, description) "
+        "VALUES ('delete', OLD.id, OLD.title, OLD.description); END"
+    ),
+}
+
+# Days ahead covered by each due_date_filter mode (overdue: before now)
+DUE_DATE_WINDOWS = {"overdue": 0, "due_this_week": 7, "due_this_month": 30}
+
+
+class TaskInboxService:
+    """Builds filtered task queries and keyset-paginated inbox pages"""
+
+    def __init__(self):
+        self.index = FullTextIndex(
+            TASK_FTS_TABLE, ("title", "description"), "tasks", _TRIGGERS,
+            [f"INSERT INTO {TASK_FTS_TABLE}({TASK_FTS_TABLE}) VALUES ('rebuild')"],
+            options="content = 'tasks', content_rowid = 'id', "
+                    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'"
+        )
+
+    def ensure_index(self, engine: Engine):
+        self.index.ensure(engine)
+
+    def filtered_query(
+        self,
+        db: Session,
+        now: datetime,
+        status: Optional[TaskStatus] = None,
+        assigned_team: Optional[str] = None,
+        assigned_to: Optional[str] = None,
+        task_type: Optional[TaskType] = None,
+        due_date_filter: Optional[str] = None,
+        search: Optional[str] = None
+    ) -> Query:
+        """Tasks with their client's name, LEI and country, filtered but not ordered"""
+        query = db.query(
+            Task, Client.name, Client.legal_entity_id, Client.country_of_incorporation
+        ).join(Client, Task.client_id == Client.id)
+
+        if status:
+            query = query.filter(Task.status == status)
+        if assigned_team:
+            query = query.filter(Task.assigned_team == assigned_team)
+        if assigned_to:
+            query = query.filter(Task.assigned_to.ilike(f"%{assigned_to}%"))
+        if task_type:
+            query = query.filter(Task.task_type == task_type)
+
+        if due_date_filter in DUE_DATE_WINDOWS:
+            days = DUE_DATE_WINDOWS[due_date_filter]
+            due = Task.due_date < now if days == 0 else Task.due_date <= now + timedelta(days=days)
+            # Literal condition, so SQLite can prove the partial open-task index applies
+            query = query.filter(due, text(OPEN_TASK_CONDITION))
+
+        # Search across task title, description, and client name
+        if search:
+            match = prefix_match(search)
+            if self.index.enabled and match:
+                query = query.filter(or_(
+                    Task.id.in_(self.index.matching_ids(db, match)),
+                    client_search.text_filter(db, search)
+                ))
+            else:
+                query = query.filter(
+                    (Task.title.ilike(f"%{search}%")) |
+                    (Task.description.ilike(f"%{search}%")) |
+                    (Client.name.ilike(f"%{search}%"))
+                )
+        return query
+
+    @staticmethod
+    def query_key(filters: Dict[str, Any]) -> str:
+        return fingerprint(filters)[:16]
+
+    def page(
+        self,
+        db: Session,
+        filters: Dict[str, Any],
+        cursor: Optional[str] = None,
+        limit: int = 50
+    ) -> Tuple[List[Tuple], Optional[str]]:
+        """
+        One inbox page in (due_date, id) order, undated tasks last.
+
+        Returns:
+            ([(task, client_name, client_lei, client_country)], next_cursor)
+        """
+        now = datetime.utcnow()
+        key = self.query_key(filters)
+        after = decode_cursor(cursor, key, ["due", "id"]) if cursor else {"due": None, "id": None}
+        after_due = datetime.fromisoformat(after["due"]) if after["due"] else None
+        query = self.filtered_query(db, now, **filters)
+
+        rows: List[Tuple] = []
+        if after_due is not None or after["id"] is None:
+            # Dated section: index range scan from the cursor
+            dated = query.filter(Task.due_date.isnot(None))
+            if after_due is not None:
+                dated = dated.filter(tuple_(Task.due_date, Task.id) > tuple_(after_due, after["id"]))
+            rows = dated.order_by(Task.due_date, Task.id).limit(limit + 1).all()
+        if len(rows) <= limit:
+            # Undated section (empty under a due_date_filter)
+            undated = query.filter(Task.due_date.is_(None))
+            if after_due is None and after["id"] is not None:
+                undated = undated.filter(Task.id > after["id"])
+            rows += undated.order_by(Task.id).limit(limit + 1 - len(rows)).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1][0]
+            next_cursor = encode_cursor(key, {
+                "due": last.due_date.isoformat() if last.due_date else None, "id": last.id
+            })
+        return rows, next_cursor
+
+
+# Singleton instance
+task_inbox = TaskInboxService()
@@ -0,0 +1 @@
+"""Performance benchmarks for the FM Lifecycle Orchestrator backend"""
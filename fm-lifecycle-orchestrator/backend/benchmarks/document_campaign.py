@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Benchmark for document request campaigns.
+On a scratch copy of a benchmark database (or a freshly generated one), gives every client a
+contact email and compares:
+- per_client: the previous per-client flow (join query, f-string email, ORM update of each
+  requirement, one enqueue and commit per client), as a UI loop over clients would run it
+- campaign: the campaign service (batched selection, precompiled templates, one UPDATE and one
+  outbox insert per batch)
+then delivers the queued campaign emails through the outbox over SMTP to the local stand-in
+(benchmarks/stub_smtp.py) and reports throughput of each stage as JSON.
+
+Usage:
+    python -m benchmarks.synthetic_data --database /tmp/bench.db --clients 20000
+    python -m benchmarks.document_campaign --database /tmp/bench.db --max-clients 20000 --baseline-clients 1000
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def per_client_baseline(db, client_ids, outbox) -> int:
+    """The pre-campaign flow of POST /clients/{id}/send-bulk-document-request, one client at a time"""
+    from app.models.client import Client
+    from app.models.document_requirement import DocumentRequirement
+    from app.models.mandatory_evidence import MandatoryEvidence
+
+    emails = 0
+    for client_id in client_ids:
+        client = db.query(Client).filter(Client.id == client_id).first()
+        missing = db.query(DocumentRequirement, MandatoryEvidence).join(
+            MandatoryEvidence, DocumentRequirement.evidence_id == MandatoryEvidence.id
+        ).filter(
+            DocumentRequirement.client_id == client_id,
+            DocumentRequirement.status == "missing",
+            MandatoryEvidence.is_mandatory == True
+        ).all()
+        if not missing:
+            continue
+        doc_list = [
+            f"  - {evidence.evidence_name} ({evidence.category.value}) - {evidence.description or 'Required for ' + req.regime}"
+            for req, evidence in missing
+        ]
+        body = f"Dear {client.name} Team,\n\n{chr(10).join(doc_list)}\n\nRM: {client.assigned_rm}"
+        for req, _ in missing:
+            req.requested_date = datetime.utcnow()
+            req.last_reminder_date = datetime.utcnow()
+            req.reminder_count += 1
+        outbox.enqueue(db, "email", "document.requested", {
+            "to": client.contact_email, "subject": f"Missing documents for {client.name}",
+            "body": body
+        }, aggregate_type="client", aggregate_id=client_id)
+        db.commit()
+        emails += 1
+    return emails
+
+
+def run(database: str, clients: int, max_clients: int, baseline_clients: int, batch_size: int,
+        outbox_batch_size: int, smtp_latency_ms: float, timeout_seconds: float) -> dict:
+    workdir = tempfile.mkdtemp(prefix="campaign-bench-")
+    path = os.path.join(workdir, "campaign.db")
+    result = {"benchmark": "document_campaign"}
+    if database and os.path.exists(database):
+        shutil.copyfile(database, path)
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    else:
+        from benchmarks.synthetic_data import generate
+        generate(f"sqlite:///{path}", clients, seed=42)
+    os.environ.setdefault("METRICS_ENABLED", "false")
+
+    from sqlalchemy import func, text
+    from app.database import Base, SessionLocal, create_missing_columns, engine
+    from app.integrations.mail_transport import SmtpMailTransport
+    from app.integrations.outbox_senders import MailOutboxSender
+    from app.models.outbox import OutboxMessage
+    from app.services.document_campaign import DocumentCampaignService
+    from app.services.outbox import OutboxService
+    from benchmarks.stub_smtp import StubSmtpState, start_stub_server
+
+    Base.metadata.create_all(bind=engine)
+    create_missing_columns()
+    db = SessionLocal()
+    db.execute(text("UPDATE clients SET contact_email = 'documents+' || id || '@client.example.com'"))
+    db.commit()
+    result["clients_in_database"] = db.execute(text("SELECT count(*) FROM clients")).scalar()
+    result["open_requirements"] = db.execute(
+        text("SELECT count(*) FROM document_requirements WHERE status = 'missing'")
+    ).scalar()
+
+    # Previous flow, on the first baseline_clients clients with missing requirements
+    baseline_outbox = OutboxService(session_factory=SessionLocal)
+    baseline_ids = [row[0] for row in db.execute(text(
+        "SELECT DISTINCT client_id FROM document_requirements WHERE status = 'missing' "
+        "ORDER BY client_id LIMIT :limit"
+    ), {"limit": baseline_clients})]
+    start = time.perf_counter()
+    baseline_emails = per_client_baseline(db, baseline_ids, baseline_outbox)
+    baseline_seconds = time.perf_counter() - start
+    result["per_client"] = {
+        "clients": len(baseline_ids),
+        "emails": baseline_emails,
+        "seconds": round(baseline_seconds, 3),
+        "emails_per_second": round(baseline_emails / baseline_seconds, 1) if baseline_seconds else None
+    }
+    db.execute(text("DELETE FROM outbox_messages"))
+    db.commit()
+
+    # Campaign over everything not just requested by the baseline
+    service = DocumentCampaignService(
+        batch_size=batch_size, max_clients=max_clients, min_days_between_requests=1, session_factory=SessionLocal
+    )
+    campaign = service.create(db, {"statuses": ["missing"]}, name="benchmark")
+    service.run(db, campaign)
+    report = service.report(db, campaign)
+    result["campaign"] = {key: report[key] for key in (
+        "status", "clients_selected", "clients_skipped_no_recipient", "requirements_requested",
+        "emails_queued", "batches", "seconds", "throughput"
+    )}
+
+    # Delivery through the outbox over SMTP
+    state = StubSmtpState(latency_ms=smtp_latency_ms)
+    server = start_stub_server(state)
+    transport = SmtpMailTransport("127.0.0.1", server.server_address[1], sender="fm-client-readiness@example.com")
+    dispatcher = OutboxService(
+        senders={"email": MailOutboxSender(transport)}, interval_seconds=0.05, batch_size=outbox_batch_size,
+        max_batches_per_tick=1000, backoff_base_seconds=0.1, backoff_max_seconds=1.0, session_factory=SessionLocal
+    )
+    start = time.perf_counter()
+    deadline = start + timeout_seconds
+    while time.perf_counter() < deadline:
+        dispatcher.run_once()
+        if not db.query(func.count(OutboxMessage.id)).filter(OutboxMessage.status == "pending").scalar():
+            break
+        time.sleep(0.05)
+    delivery_seconds = time.perf_counter() - start
+    delivery = service.report(db, campaign)["delivery"]
+    stub = state.stats()
+    result["delivery"] = {
+        "by_status": delivery,
+        "seconds": round(delivery_seconds, 3),
+        "emails_per_second": round(delivery["delivered"] / delivery_seconds, 1) if delivery_seconds else None,
+        "smtp": stub,
+        # Every queued email reached the SMTP server exactly once
+        "delivered_once": stub["distinct_messages"] == delivery["delivered"] == campaign.emails_queued
+    }
+    db.close()
+    dispatcher.stop()
+    server.shutdown()
+    shutil.rmtree(workdir, ignore_errors=True)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bulk document request campaigns")
+    parser.add_argument("--database", default="", help="Benchmark database to copy (generated when missing)")
+    parser.add_argument("--clients", type=int, default=5000, help="Clients to generate when no database is given")
+    parser.add_argument("--max-clients", type=int, default=50000)
+    parser.add_argument("--baseline-clients", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=2000, help="Campaign requirement rows per transaction")
+    parser.add_argument("--outbox-batch-size", type=int, default=200, help="Emails sent per SMTP connection")
+    parser.add_argument("--smtp-latency-ms", type=float, default=0.0)
+    parser.add_argument("--timeout-seconds", type=float, default=600.0)
+    args = parser.parse_args()
+
+    print(json.dumps(run(
+        args.database, args.clients, args.max_clients, args.baseline_clients, args.batch_size,
+        args.outbox_batch_size, args.smtp_latency_ms, args.timeout_seconds
+    ), indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark for concurrent document imports against the local SX/CX/WX stand-in server.
+Fetches the same set of documents (spread over the three systems, each with its own latency)
+once one at a time and once through the import service's concurrent, per-source capped fetch,
+streaming every body into a scratch upload directory. Reports wall time against the sum and
+the maximum of the individual fetch times as JSON.
+
+Usage:
+    python -m benchmarks.document_import --documents 30 --latency-ms 100 --jitter-ms 300 --concurrency-per-source 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.integrations.async_clients import IntegrationGateway
+from app.services.document_import import DocumentImportService, document_filename
+from benchmarks.stub_integrations import StubIntegrationState, start_stub_server
+
+CLIENT = {"name": "Benchmark Holdings Ltd", "country_of_incorporation": "Singapore", "entity_type": "Corporate"}
+
+
+async def timed_import(service: DocumentImportService, sources, upload_dir: str) -> dict:
+    paths = [
+        os.path.join(upload_dir, document_filename(1, f"bench-{index}", source["document_name"], source["document_url"]))
+        for index, source in enumerate(sources)
+    ]
+    start = time.perf_counter()
+    outcomes = await service.fetch_all(CLIENT, sources, paths)
+    wall_ms = (time.perf_counter() - start) * 1000
+    fetch_ms = [outcome["fetch_ms"] for outcome in outcomes]
+    return {
+        "wall_ms": round(wall_ms, 1),
+        "sum_fetch_ms": round(sum(fetch_ms), 1),
+        "max_fetch_ms": round(max(fetch_ms), 1),
+        "failed": sum(1 for outcome in outcomes if outcome["error"]),
+        "bytes": sum(outcome["bytes"] or 0 for outcome in outcomes)
+    }
+
+
+async def run(documents: int, latency_ms: float, jitter_ms: float, document_kb: int, concurrency_per_source: int) -> dict:
+    state = StubIntegrationState(latency_ms=latency_ms, document_bytes=document_kb * 1024, document_jitter_ms=jitter_ms)
+    server = start_stub_server(state)
+    base = f"http://127.0.0.1:{server.server_port}"
+    gateway = IntegrationGateway(base_urls={system: f"{base}/{system}" for system in ("sx", "cx", "wx", "ex")})
+    systems = ("SX", "CX", "WX")
+    sources = [
+        {"source_system": systems[index % 3], "document_type": "financial_statements",
+         "document_name": f"Document {index}", "document_url": f"{systems[index % 3].lower()}://documents/E1/doc-{index}.pdf"}
+        for index in range(documents)
+    ]
+
+    upload_dir = tempfile.mkdtemp(prefix="document-import-bench-")
+    try:
+        # Baseline: one document at a time, as one upload request per document does
+        one_at_a_time = DocumentImportService(gateway=gateway, upload_dir=upload_dir, concurrency_per_source=1)
+        await timed_import(one_at_a_time, sources[:1], upload_dir)  # Warm up the connection pool
+        sequential = {"wall_ms": 0.0, "sum_fetch_ms": 0.0, "max_fetch_ms": 0.0, "failed": 0, "bytes": 0}
+        for source in sources:
+            result = await timed_import(one_at_a_time, [source], upload_dir)
+            sequential["wall_ms"] += result["wall_ms"]
+            sequential["sum_fetch_ms"] += result["sum_fetch_ms"]
+            sequential["max_fetch_ms"] = max(sequential["max_fetch_ms"], result["max_fetch_ms"])
+            sequential["failed"] += result["failed"]
+            sequential["bytes"] += result["bytes"]
+        sequential = {key: round(value, 1) if isinstance(value, float) else value for key, value in sequential.items()}
+
+        state.counters["max_concurrent_documents"] = 0
+        concurrent = await timed_import(
+            DocumentImportService(gateway=gateway, upload_dir=upload_dir, concurrency_per_source=concurrency_per_source),
+            sources, upload_dir
+        )
+        concurrent["max_concurrent_fetches"] = state.stats()["max_concurrent_documents"]
+    finally:
+        await gateway.aclose()
+        server.shutdown()
+        shutil.rmtree(upload_dir, ignore_errors=True)
+
+    return {
+        "documents": documents,
+        "latency_ms": latency_ms,
+        "jitter_ms": jitter_ms,
+        "document_kb": document_kb,
+        "concurrency_per_source": concurrency_per_source,
+        "sequential": sequential,
+        "concurrent": concurrent,
+        "speedup": round(sequential["wall_ms"] / concurrent["wall_ms"], 1) if concurrent["wall_ms"] else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent document imports")
+    parser.add_argument("--documents", type=int, default=30)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--jitter-ms", type=float, default=300.0, help="Extra per-document latency, up to this much")
+    parser.add_argument("--document-kb", type=int, default=256)
+    parser.add_argument("--concurrency-per-source", type=int, default=10)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(
+        args.documents, args.latency_ms, args.jitter_ms, args.document_kb, args.concurrency_per_source
+    )), indent=2))
+
+
+if __name__ == "__main__":
+    main()
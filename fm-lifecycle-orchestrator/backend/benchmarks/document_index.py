@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the document retrieval index.
+Builds a synthetic client index of N chunks and reports build, persist, load
+and query latency as JSON.
+
+Usage:
+    python -m benchmarks.document_index --chunks 100000 --queries 200
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.document_index import ClientIndex, DocumentIndex
+
+VOCABULARY = [
+    "certificate", "incorporation", "registered", "address", "jurisdiction", "singapore", "india",
+    "hong", "kong", "london", "luxembourg", "cayman", "director", "shareholder", "board", "resolution",
+    "authorised", "signatory", "kyc", "beneficial", "owner", "passport", "expiry", "issued", "valid",
+    "until", "registration", "number", "private", "limited", "company", "fund", "partnership",
+    "trustee", "custodian", "derivatives", "forward", "swap", "option", "margin", "collateral",
+    "clearing", "reporting", "emir", "mifid", "dodd", "frank", "professional", "client", "retail",
+    "eligible", "counterparty", "financial", "statements", "audited", "revenue", "assets", "net",
+    "liabilities", "compliance", "officer", "attestation", "risk", "assessment", "sanctions",
+    "screening", "pep", "adverse", "media", "due", "diligence", "enhanced", "simplified"
+]
+
+QUERIES = [
+    "when does the registration certificate expire",
+    "who are the authorised signatories",
+    "what is the registered address",
+    "beneficial owner passport expiry",
+    "audited financial statements net assets",
+    "board resolution for derivatives trading",
+    "sanctions screening and adverse media results",
+    "is the client a professional client under mifid"
+]
+
+
+def synthetic_word(rng: random.Random) -> str:
+    """Draw a word: mostly skewed domain vocabulary, plus rare names and reference numbers"""
+    roll = rng.random()
+    if roll < 0.55:
+        return VOCABULARY[min(int(rng.paretovariate(1.2)) - 1, len(VOCABULARY) - 1)]
+    if roll < 0.85:
+        return rng.choice(VOCABULARY)
+    if roll < 0.95:
+        return f"entity{rng.randint(0, 20000)}"
+    return f"RC-{rng.randint(2000, 2025)}-{rng.randint(10000, 99999)}"
+
+
+def synthetic_chunk(rng: random.Random, words: int) -> str:
+    """Generate one chunk of pseudo-document text"""
+    return " ".join(synthetic_word(rng) for _ in range(words))
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def run(chunk_count: int, chunks_per_document: int, chunk_words: int, query_count: int, top_k: int, seed: int):
+    rng = random.Random(seed)
+    chunks = [synthetic_chunk(rng, chunk_words) for _ in range(chunk_count)]
+
+    # Build: incremental per-document adds, as happens when documents are validated
+    index = ClientIndex()
+    start = time.perf_counter()
+    document_ids = []
+    for document_id, offset in enumerate(range(0, chunk_count, chunks_per_document)):
+        index.add_document(document_id, chunks[offset:offset + chunks_per_document], {"filename": f"doc_{document_id}.pdf"})
+        document_ids.append(document_id)
+    build_seconds = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as index_dir:
+        store = DocumentIndex(index_dir)
+
+        start = time.perf_counter()
+        for document_id in document_ids:
+            store._persist_document(1, index, document_id)
+        persist_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        loaded = store._get_index(1)
+        load_seconds = time.perf_counter() - start
+
+        # Incremental re-index of a single document, including its on-disk segment
+        start = time.perf_counter()
+        loaded.add_document(0, chunks[:chunks_per_document], {"filename": "doc_0.pdf"})
+        store._persist_document(1, loaded, 0)
+        update_ms = (time.perf_counter() - start) * 1000
+
+    latencies_ms = []
+    for i in range(query_count):
+        query = QUERIES[i % len(QUERIES)]
+        start = time.perf_counter()
+        loaded.search(query, top_k)
+        latencies_ms.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "benchmark": "document_index",
+        "chunks": len(loaded.chunks),
+        "terms": len(loaded.postings),
+        "chunk_words": chunk_words,
+        "build_seconds": round(build_seconds, 3),
+        "persist_seconds": round(persist_seconds, 3),
+        "load_seconds": round(load_seconds, 3),
+        "single_document_update_ms": round(update_ms, 3),
+        "query": {
+            "count": query_count,
+            "top_k": top_k,
+            "mean_ms": round(statistics.mean(latencies_ms), 3),
+            "p50_ms": round(percentile(latencies_ms, 0.50), 3),
+            "p95_ms": round(percentile(latencies_ms, 0.95), 3),
+            "p99_ms": round(percentile(latencies_ms, 0.99), 3)
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the document retrieval index")
+    parser.add_argument("--chunks", type=int, default=100_000)
+    parser.add_argument("--chunks-per-document", type=int, default=20)
+    parser.add_argument("--chunk-words", type=int, default=120)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    result = run(args.chunks, args.chunks_per_document, args.chunk_words, args.queries, args.top_k, args.seed)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
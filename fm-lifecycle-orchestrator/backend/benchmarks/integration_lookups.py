@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the async integration gateway against the local SX/CX/WX stand-in server.
+Measures cold fan-out versus sequential document lookups, warm page views served from cache,
+ETag revalidation after the TTL, and behaviour through an outage (stale responses, circuit
+breaker fail-fast and recovery). Results are printed as JSON. The stub runs in this process, so
+at high concurrency it competes with the client for the GIL; keep --concurrency modest.
+
+Usage:
+    python -m benchmarks.integration_lookups --entities 200 --latency-ms 50 --concurrency 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from app.integrations.async_clients import IntegrationGateway, IntegrationUnavailable
+from benchmarks.stub_integrations import StubIntegrationState, start_stub_server
+
+
+def summary(samples_ms) -> dict:
+    ordered = sorted(samples_ms)
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.mean(ordered), 2) if ordered else 0.0,
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2) if ordered else 0.0
+    }
+
+
+async def timed(samples, call):
+    start = time.perf_counter()
+    try:
+        return await call
+    finally:
+        samples.append((time.perf_counter() - start) * 1000)
+
+
+async def bounded(concurrency: int, calls):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(call):
+        async with semaphore:
+            return await call
+    return await asyncio.gather(*(run(call) for call in calls), return_exceptions=True)
+
+
+async def run(entities: int, latency_ms: float, concurrency: int, ttl_seconds: float, outage_seconds: float) -> dict:
+    state = StubIntegrationState(latency_ms=latency_ms)
+    server = start_stub_server(state)
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    def gateway(cache_ttl_seconds: float) -> IntegrationGateway:
+        return IntegrationGateway(
+            base_urls={system: f"{base}/{system}" for system in ("sx", "cx", "wx", "ex")},
+            max_connections=concurrency * 3, max_keepalive_connections=concurrency * 3,
+            cache_ttl_seconds=cache_ttl_seconds, breaker_failure_threshold=5, breaker_reset_seconds=outage_seconds / 2
+        )
+
+    ids = [f"E{index:05d}" for index in range(entities)]
+    results = {}
+
+    # Cold lookups without caching: three systems one after another versus gathered
+    uncached = gateway(0.0)
+    sequential_ms, fanout_ms = [], []
+
+    async def sequential(entity_id):
+        await uncached.get_sx_documents(entity_id)
+        await uncached.get_cx_documents(entity_id)
+        await uncached.get_wx_documents(entity_id)
+
+    await bounded(concurrency, [timed(sequential_ms, sequential(entity_id)) for entity_id in ids])
+    await bounded(concurrency, [timed(fanout_ms, uncached.gather_documents(entity_id)) for entity_id in ids])
+    await uncached.aclose()
+    results["cold_sequential"] = summary(sequential_ms)
+    results["cold_fanout"] = summary(fanout_ms)
+
+    # Page views: every entity viewed five times, first views fill the cache
+    cached = gateway(ttl_seconds)
+    lookups_before = state.stats()["lookups"]
+    views_ms = []
+    start = time.perf_counter()
+    await bounded(concurrency, [
+        timed(views_ms, cached.gather_documents(entity_id)) for _ in range(5) for entity_id in ids
+    ])
+    results["page_views"] = {
+        **summary(views_ms),
+        "views_per_second": round(len(views_ms) / (time.perf_counter() - start), 1),
+        "remote_calls": state.stats()["lookups"] - lookups_before,
+        "remote_calls_uncached": len(views_ms) * 3
+    }
+
+    # After the TTL: unchanged entities revalidate with 304, touched ones refetch
+    await asyncio.sleep(ttl_seconds + 0.1)
+    for entity_id in ids[: entities // 4]:
+        await asyncio.to_thread(httpx.post, f"{base}/sx/touch/{entity_id}")
+    not_modified_before = state.stats()["not_modified"]
+    outcomes = await bounded(concurrency, [cached.fetch("sx", f"/entities/{entity_id}/documents") for entity_id in ids])
+    results["revalidation"] = {
+        "outcomes": {outcome: sum(1 for result in outcomes if result["outcome"] == outcome)
+                     for outcome in ("hit", "revalidated", "miss", "stale")},
+        "not_modified_responses": state.stats()["not_modified"] - not_modified_before
+    }
+
+    # Outage: cached entities are served stale, uncached ones fail fast once the breaker opens
+    await asyncio.sleep(ttl_seconds + 0.1)
+    state.start_outage(outage_seconds)
+    outage_ms = []
+    outage_results = await bounded(concurrency, [
+        timed(outage_ms, cached.fetch("sx", f"/entities/{entity_id}{suffix}"))
+        for entity_id in ids for suffix in ("/documents", "")
+    ])
+    results["outage"] = {
+        **summary(outage_ms),
+        "stale": sum(1 for result in outage_results if isinstance(result, dict) and result["outcome"] == "stale"),
+        "unavailable": sum(1 for result in outage_results if isinstance(result, IntegrationUnavailable)),
+        "remote_calls_during_outage": state.stats()["outage_rejections"],
+        "breaker": cached.breakers["sx"].snapshot()
+    }
+
+    # After the outage the first call is the breaker's half-open trial; it closes the breaker
+    await asyncio.sleep(outage_seconds + 0.1)
+    await cached.fetch("sx", f"/entities/{ids[0]}")
+    recovered = await bounded(concurrency, [cached.fetch("sx", f"/entities/{entity_id}") for entity_id in ids])
+    results["recovery"] = {
+        "ok": sum(1 for result in recovered if isinstance(result, dict)),
+        "breaker": cached.breakers["sx"].snapshot()
+    }
+    await cached.aclose()
+    server.shutdown()
+    return {"entities": entities, "latency_ms": latency_ms, "concurrency": concurrency, **results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cached async integration lookups")
+    parser.add_argument("--entities", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--ttl-seconds", type=float, default=5.0)
+    parser.add_argument("--outage-seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(
+        args.entities, args.latency_ms, args.concurrency, args.ttl_seconds, args.outage_seconds
+    )), indent=2))
+
+
+if __name__ == "__main__":
+    main()
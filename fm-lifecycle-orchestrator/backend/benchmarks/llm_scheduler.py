@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the LLM request scheduler against the local stub LLM server.
+Runs a mixed workload (interactive chat users plus saturating batch workers) and reports
+throughput, per-lane latency, failures and 429s as JSON. --mode direct runs the same
+workload without the scheduler for comparison.
+
+Usage:
+    python -m benchmarks.llm_scheduler --seconds 20 --stub-rpm 300 --error-rate 0.02
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openai import OpenAI
+
+from app.services.llm_scheduler import LLMScheduler, LLMPriority
+from benchmarks.stub_llm import StubLLMState, start_stub_server
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))] if ordered else 0.0
+
+
+def lane_summary(latencies_ms, failures: int) -> dict:
+    return {
+        "completed": len(latencies_ms),
+        "failed": failures,
+        "mean_ms": round(statistics.mean(latencies_ms), 1) if latencies_ms else 0.0,
+        "p50_ms": round(percentile(latencies_ms, 0.50), 1),
+        "p95_ms": round(percentile(latencies_ms, 0.95), 1),
+        "max_ms": round(max(latencies_ms), 1) if latencies_ms else 0.0
+    }
+
+
+def run(mode: str, seconds: float, interactive_users: int, batch_workers: int, think_ms: float,
+        stub_rpm: int, scheduler_rpm: int, latency_ms: float, error_rate: float, concurrency: int):
+    state = StubLLMState(rpm=stub_rpm, latency_ms=latency_ms, error_rate=error_rate)
+    server = start_stub_server(state)
+    client = OpenAI(api_key="stub", base_url=f"http://127.0.0.1:{server.server_port}/v1", max_retries=0)
+
+    scheduler = LLMScheduler(
+        requests_per_minute=scheduler_rpm,
+        tokens_per_minute=10_000_000,
+        burst_seconds=5.0,
+        max_concurrency=concurrency,
+        max_retries=6,
+        backoff_base_seconds=0.2,
+        backoff_max_seconds=5.0,
+        aging_seconds=30.0,
+        deadlines={LLMPriority.INTERACTIVE: 30.0, LLMPriority.STANDARD: 60.0, LLMPriority.BATCH: 120.0}
+    )
+
+    results = {lane: {"latencies": [], "failures": 0} for lane in ("interactive", "batch")}
+    results_lock = threading.Lock()
+    stop_at = time.monotonic() + seconds
+
+    def one_call(lane: str, priority: LLMPriority, number: int):
+        messages = [{"role": "user", "content": f"{lane} request {number}"}]
+
+        def attempt(timeout: float):
+            return client.chat.completions.create(model="stub", messages=messages, max_tokens=50, timeout=timeout)
+
+        start = time.perf_counter()
+        try:
+            if mode == "scheduler":
+                scheduler.run(attempt, priority, estimated_tokens=60)
+            else:
+                attempt(30.0)
+            elapsed = (time.perf_counter() - start) * 1000
+            with results_lock:
+                results[lane]["latencies"].append(elapsed)
+        except Exception:
+            with results_lock:
+                results[lane]["failures"] += 1
+
+    def interactive_user(user: int):
+        number = 0
+        while time.monotonic() < stop_at:
+            one_call("interactive", LLMPriority.INTERACTIVE, number)
+            number += 1
+            time.sleep(think_ms / 1000)
+
+    def batch_worker(worker: int):
+        number = 0
+        while time.monotonic() < stop_at:
+            one_call("batch", LLMPriority.BATCH, number)
+            number += 1
+
+    threads = [threading.Thread(target=interactive_user, args=(i,)) for i in range(interactive_users)]
+    threads += [threading.Thread(target=batch_worker, args=(i,)) for i in range(batch_workers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_seconds = time.perf_counter() - started
+    server.shutdown()
+
+    completed = sum(len(lane["latencies"]) for lane in results.values())
+    return {
+        "benchmark": "llm_scheduler",
+        "mode": mode,
+        "seconds": round(wall_seconds, 2),
+        "stub": {"rpm": stub_rpm, "latency_ms": latency_ms, "error_rate": error_rate, **state.counters},
+        "scheduler": dict(scheduler.stats, rpm=scheduler_rpm, max_concurrency=concurrency) if mode == "scheduler" else None,
+        "throughput_rps": round(completed / wall_seconds, 2),
+        "interactive": lane_summary(results["interactive"]["latencies"], results["interactive"]["failures"]),
+        "batch": lane_summary(results["batch"]["latencies"], results["batch"]["failures"])
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the LLM scheduler against the stub LLM server")
+    parser.add_argument("--mode", choices=["scheduler", "direct"], default="scheduler")
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--interactive-users", type=int, default=3)
+    parser.add_argument("--batch-workers", type=int, default=12)
+    parser.add_argument("--think-ms", type=float, default=500.0, help="Pause between an interactive user's questions")
+    parser.add_argument("--stub-rpm", type=int, default=300)
+    parser.add_argument("--scheduler-rpm", type=int, default=270)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    result = run(args.mode, args.seconds, args.interactive_users, args.batch_workers, args.think_ms,
+                 args.stub_rpm, args.scheduler_rpm, args.latency_ms, args.error_rate, args.concurrency)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Load test for the API.
+Starts the app under uvicorn against a copy of a synthetic database (see
+benchmarks.synthetic_data) with the LLM pointed at the stub server, runs scripted scenarios
+at a fixed concurrency and reports throughput, latency percentiles and SQL statements per
+request (from /metrics) as JSON. Pass a previous result with --compare to flag regressions.
+
+Usage:
+    python -m benchmarks.synthetic_data --database /tmp/fm_benchmark.db --clients 1000
+    python -m benchmarks.load_test --database /tmp/fm_benchmark.db --concurrency 8 --output run.json
+    python -m benchmarks.load_test --database /tmp/fm_benchmark.db --compare run.json
+
+The chat scenario runs under the app's LLM rate budget; lift it with
+--app-env LLM_REQUESTS_PER_MINUTE=... --app-env LLM_TOKENS_PER_MINUTE=... to measure the API itself.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import shutil
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.stub_llm import StubLLMState, start_stub_server
+
+CHAT_QUESTIONS = [
+    "What is the current onboarding status?",
+    "Which documents are missing or expired?",
+    "Is this client eligible for MAS Margin?",
+    "Summarise the open tasks for this client",
+    "What is the data quality score and why?"
+]
+DASHBOARD_PATHS = [
+    "/api/tasks?limit=100",
+    "/api/regulatory/compliance-overview",
+    "/api/regulatory/upcoming-reviews",
+    "/api/regulatory/data-quality-alerts",
+    "/api/insights/summary"
+]
+
+
+def _list_clients(ctx, rng):
+    return "GET", "/api/clients", None
+
+
+def _client_detail(ctx, rng):
+    client_id = rng.choice(ctx["client_ids"])
+    return "GET", f"/api/clients/{client_id}/regime-eligibility", None
+
+
+def _dashboard(ctx, rng):
+    return "GET", rng.choice(DASHBOARD_PATHS), None
+
+
+def _retrigger_evaluation(ctx, rng):
+    return "POST", f"/api/regimes/retrigger-evaluation?regime={rng.choice(ctx['regimes'])}", None
+
+
+def _document_requirement_sync(ctx, rng):
+    client_id = rng.choice(ctx["client_ids"])
+    return "POST", f"/api/clients/{client_id}/document-requirements/sync", None
+
+
+def _chat(ctx, rng):
+    return "POST", "/api/chat", {"message": rng.choice(CHAT_QUESTIONS), "client_id": rng.choice(ctx["client_ids"])}
+
+
+# name -> (request builder, share of --requests; heavy scenarios run fewer requests)
+SCENARIOS = {
+    "list_clients": (_list_clients, 0.25),
+    "client_detail": (_client_detail, 1.0),
+    "dashboard": (_dashboard, 0.5),
+    "retrigger_evaluation": (_retrigger_evaluation, 0.05),
+    "document_requirement_sync": (_document_requirement_sync, 1.0),
+    "chat": (_chat, 0.5)
+}
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))] if ordered else 0.0
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def load_context(database_path: str) -> dict:
+    """Client IDs and regimes to draw request parameters from"""
+    conn = sqlite3.connect(database_path)
+    try:
+        client_ids = [row[0] for row in conn.execute("SELECT id FROM clients ORDER BY id")]
+        regimes = [row[0] for row in conn.execute(
+            "SELECT DISTINCT regime FROM classification_rules WHERE is_active = 1 ORDER BY regime"
+        )]
+    finally:
+        conn.close()
+    if not client_ids:
+        raise SystemExit(f"{database_path} has no clients; run benchmarks.synthetic_data first")
+    return {"client_ids": client_ids, "regimes": regimes}
+
+
+def start_app(database_path: str, stub_port: int, workdir: str, workers: int, app_env: dict):
+    port = free_port()
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{database_path}",
+        DOCUMENT_INDEX_DIR=os.path.join(workdir, "document_index"),
+        LLM_ENABLED="true",
+        LLM_API_KEY="stub",
+        LLM_API_ENDPOINT=f"http://127.0.0.1:{stub_port}/v1",
+        LOG_LEVEL="WARNING",
+        TRACING_ENABLED="false",
+        METRICS_ENABLED="true"
+    )
+    env.update(app_env)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit("API server exited during startup")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1.0).status_code == 200:
+                return process, base_url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise SystemExit("API server did not become healthy within 60s")
+
+
+def run_scenario(client: httpx.Client, name: str, ctx: dict, requests: int, concurrency: int,
+                 warmup: int, seed: int) -> dict:
+    build, _ = SCENARIOS[name]
+    rng = random.Random(f"{seed}:{name}")
+    plan = [build(ctx, rng) for _ in range(warmup + requests)]
+    latencies_ms = []
+    errors = {}
+    lock = threading.Lock()
+
+    def one(request, record: bool):
+        method, path, body = request
+        start = time.perf_counter()
+        try:
+            response = client.request(method, path, json=body)
+            outcome = None if response.status_code < 400 else str(response.status_code)
+        except httpx.HTTPError as e:
+            outcome = type(e).__name__
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if record:
+            with lock:
+                if outcome is None:
+                    latencies_ms.append(elapsed_ms)
+                else:
+                    errors[outcome] = errors.get(outcome, 0) + 1
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(lambda request: one(request, False), plan[:warmup]))
+        started = time.perf_counter()
+        list(pool.map(lambda request: one(request, True), plan[warmup:]))
+        wall_seconds = time.perf_counter() - started
+
+    return {
+        "requests": requests,
+        "errors": errors,
+        "seconds": round(wall_seconds, 3),
+        "throughput_rps": round(len(latencies_ms) / wall_seconds, 2) if wall_seconds else 0.0,
+        "mean_ms": round(statistics.mean(latencies_ms), 2) if latencies_ms else 0.0,
+        "p50_ms": round(percentile(latencies_ms, 0.50), 2),
+        "p90_ms": round(percentile(latencies_ms, 0.90), 2),
+        "p95_ms": round(percentile(latencies_ms, 0.95), 2),
+        "p99_ms": round(percentile(latencies_ms, 0.99), 2),
+        "max_ms": round(max(latencies_ms), 2) if latencies_ms else 0.0
+    }
+
+
+def queries_per_request(metrics_text: str) -> dict:
+    """Average SQL statements per request by route, from the db_queries_per_request histogram"""
+    sums, counts = {}, {}
+    for match in re.finditer(r'^db_queries_per_request_(sum|count)\{route="([^"]*)"\} (\S+)$', metrics_text, re.M):
+        kind, route, value = match.groups()
+        (sums if kind == "sum" else counts)[route] = float(value)
+    return {route: round(sums.get(route, 0.0) / count, 1) for route, count in sorted(counts.items()) if count}
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> dict:
+    """p95 and throughput ratios against a previous run; regressions exceed threshold"""
+    report = {"baseline_commit": baseline.get("git_commit"), "threshold": threshold, "scenarios": {}, "regressions": []}
+    for name, result in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before or not before.get("p95_ms") or not before.get("throughput_rps"):
+            continue
+        p95_ratio = result["p95_ms"] / before["p95_ms"]
+        throughput_ratio = result["throughput_rps"] / before["throughput_rps"]
+        report["scenarios"][name] = {"p95_ratio": round(p95_ratio, 3), "throughput_ratio": round(throughput_ratio, 3)}
+        if p95_ratio > 1 + threshold or throughput_ratio < 1 - threshold:
+            report["regressions"].append(name)
+    return report
+
+
+def run(database: str, scenarios, requests: int, concurrency: int, warmup: int, workers: int,
+        stub_latency_ms: float, seed: int, app_env: dict) -> dict:
+    ctx = load_context(database)
+    stub_state = StubLLMState(rpm=0, latency_ms=stub_latency_ms, error_rate=0.0)
+    stub = start_stub_server(stub_state)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # Scenarios write (evaluations, requirements); every run starts from the same data
+        database_copy = os.path.join(workdir, "benchmark.db")
+        shutil.copyfile(database, database_copy)
+        process, base_url = start_app(database_copy, stub.server_port, workdir, workers, app_env)
+        results = {}
+        try:
+            limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+            with httpx.Client(base_url=base_url, timeout=300.0, limits=limits) as client:
+                for name in scenarios:
+                    count = max(1, int(requests * SCENARIOS[name][1]))
+                    results[name] = run_scenario(client, name, ctx, count, concurrency, warmup, seed)
+                metrics_text = client.get("/metrics").text
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+            stub.shutdown()
+
+    return {
+        "benchmark": "load_test",
+        "git_commit": git_commit(),
+        "config": {
+            "clients": len(ctx["client_ids"]),
+            "regimes": len(ctx["regimes"]),
+            "requests": requests,
+            "concurrency": concurrency,
+            "warmup": warmup,
+            "workers": workers,
+            "stub_latency_ms": stub_latency_ms,
+            "seed": seed,
+            "app_env": app_env
+        },
+        "scenarios": results,
+        "queries_per_request": queries_per_request(metrics_text) if workers == 1 else None,
+        "stub_llm": stub_state.counters
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run scripted API scenarios against a synthetic database")
+    parser.add_argument("--database", default="/tmp/fm_benchmark.db", help="Database built by benchmarks.synthetic_data")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"Comma-separated subset of {', '.join(SCENARIOS)}")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario (heavy scenarios run a fraction)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers (/metrics covers one worker only)")
+    parser.add_argument("--stub-latency-ms", type=float, default=50.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--app-env", action="append", default=[], metavar="KEY=VALUE",
+                        help="Extra settings for the API process, e.g. LLM_REQUESTS_PER_MINUTE=600")
+    parser.add_argument("--output", help="Also write the result JSON to this file")
+    parser.add_argument("--compare", help="Previous result JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative p95/throughput change counted as a regression")
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    app_env = dict(item.split("=", 1) for item in args.app_env if "=" in item)
+
+    result = run(os.path.abspath(args.database), scenarios, args.requests, args.concurrency, args.warmup,
+                 args.workers, args.stub_latency_ms, args.seed, app_env)
+    if args.compare:
+        with open(args.compare) as f:
+            result["comparison"] = compare(result, json.load(f), args.threshold)
+
+    output = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+    if args.compare and result["comparison"]["regressions"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
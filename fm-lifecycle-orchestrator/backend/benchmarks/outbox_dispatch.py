@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the integration outbox dispatcher against the local CX/SX stand-in servers.
+Enqueues messages into a scratch SQLite database, delivers them through HTTP senders while the
+stub fails batches, loses responses and goes through an outage, and reports throughput,
+attempts, duplicates absorbed by idempotency keys and messages lost or dead as JSON.
+
+Usage:
+    python -m benchmarks.outbox_dispatch --messages 20000 --batch-size 200 --error-rate 0.05 --outage-seconds 3
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+from app.integrations.outbox_senders import HttpOutboxSender
+from app.models.outbox import OutboxMessage
+from app.services.outbox import OutboxService
+from benchmarks.stub_integrations import StubIntegrationState, start_stub_server
+
+
+def run(messages: int, batch_size: int, latency_ms: float, error_rate: float, lost_response_rate: float,
+        outage_after: float, outage_seconds: float, max_attempts: int, timeout_seconds: float) -> dict:
+    state = StubIntegrationState(latency_ms=latency_ms, error_rate=error_rate, lost_response_rate=lost_response_rate)
+    server = start_stub_server(state)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    workdir = tempfile.mkdtemp(prefix="outbox-bench-")
+    engine = create_engine(f"sqlite:///{os.path.join(workdir, 'outbox.db')}", connect_args={"check_same_thread": False})
+    OutboxMessage.__table__.create(engine)
+    session_factory = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+    service = OutboxService(
+        senders={destination: HttpOutboxSender(f"{base_url}/{destination}/messages", timeout_seconds=10)
+                 for destination in ("cx", "sx")},
+        interval_seconds=0.05,
+        batch_size=batch_size,
+        max_attempts=max_attempts,
+        backoff_base_seconds=0.1,
+        backoff_max_seconds=1.0,
+        lease_seconds=30.0,
+        session_factory=session_factory
+    )
+
+    db = session_factory()
+    start = time.perf_counter()
+    service.enqueue_many(db, [
+        {"destination": "cx" if index % 2 else "sx", "topic": "benchmark.event",
+         "aggregate_type": "client", "aggregate_id": index, "payload": {"sequence": index}}
+        for index in range(messages)
+    ])
+    db.commit()
+    enqueue_seconds = time.perf_counter() - start
+
+    if outage_seconds:
+        threading.Timer(outage_after, state.start_outage, args=(outage_seconds,)).start()
+
+    start = time.perf_counter()
+    deadline = start + timeout_seconds
+    while time.perf_counter() < deadline:
+        service.run_once()
+        pending = db.query(func.count(OutboxMessage.id)).filter(OutboxMessage.status == "pending").scalar()
+        if not pending:
+            break
+        time.sleep(0.05)
+    dispatch_seconds = time.perf_counter() - start
+
+    by_status = dict(db.query(OutboxMessage.status, func.count(OutboxMessage.id)).group_by(OutboxMessage.status).all())
+    attempts = Counter(row[0] for row in db.query(OutboxMessage.attempts).filter(OutboxMessage.status == "delivered"))
+    db.close()
+    service.stop()
+    server.shutdown()
+
+    stub = state.stats()
+    delivered = by_status.get("delivered", 0)
+    return {
+        "messages": messages,
+        "batch_size": batch_size,
+        "enqueue_seconds": round(enqueue_seconds, 3),
+        "dispatch_seconds": round(dispatch_seconds, 3),
+        "delivered_per_second": round(delivered / dispatch_seconds, 1) if dispatch_seconds else 0.0,
+        "by_status": by_status,
+        "delivery_attempts": dict(sorted(attempts.items())),
+        "stub": stub,
+        # Every message applied exactly once downstream despite redeliveries
+        "applied_once": stub["applied"] == delivered and stub["applied"] == messages
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the integration outbox dispatcher")
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.05, help="Fraction of batches failed with 503")
+    parser.add_argument("--lost-response-rate", type=float, default=0.05,
+                        help="Fraction of batches applied but answered with 503 (redelivered)")
+    parser.add_argument("--outage-after", type=float, default=0.5, help="Seconds into dispatch before the outage")
+    parser.add_argument("--outage-seconds", type=float, default=2.0)
+    parser.add_argument("--max-attempts", type=int, default=12)
+    parser.add_argument("--timeout-seconds", type=float, default=120.0)
+    args = parser.parse_args()
+
+    print(json.dumps(run(
+        args.messages, args.batch_size, args.latency_ms, args.error_rate, args.lost_response_rate,
+        args.outage_after, args.outage_seconds, args.max_attempts, args.timeout_seconds
+    ), indent=2))
+
+
+if __name__ == "__main__":
+    main()
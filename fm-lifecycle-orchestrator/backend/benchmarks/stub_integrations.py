@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the SX, CX, WX and EX systems and the email service.
+
+Outbox batches: POST /<destination>/messages takes {"messages": [...]} and answers
+{"results": [...]}, applying each idempotency key once. Simulates latency, failed batches (503),
+batches applied but whose response is lost (503 after applying, so the retry must be
+deduplicated) and outages.
+
+Lookups: GET /sx/entities/<id>[/documents], /cx/clients/<id>[/products|/documents],
+/wx/entities/<id>/documents and /ex/workflows/<id> answer with an ETag and honour
+If-None-Match with 304. POST /<system>/touch/<id> changes an entity so its ETag changes.
+
+Documents: GET /<system>/documents/<path> streams a generated one-page PDF, padded to
+document_bytes, in chunks after latency plus a per-document jitter, so concurrent imports can be
+timed against the slowest and the fetched documents still extract.
+
+Usage:
+    python -m benchmarks.stub_integrations --port 8090 --latency-ms 50 --error-rate 0.05
+    OUTBOX_CX_URL=http://127.0.0.1:8090/cx/messages OUTBOX_SX_URL=http://127.0.0.1:8090/sx/messages \
+    INTEGRATION_SX_URL=http://127.0.0.1:8090/sx INTEGRATION_CX_URL=http://127.0.0.1:8090/cx \
+    INTEGRATION_WX_URL=http://127.0.0.1:8090/wx uvicorn app.main:app
+    curl -X POST 'http://127.0.0.1:8090/outage?seconds=30'   # 503 everything for 30 seconds
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qs, urlparse
+
+import fitz  # PyMuPDF
+
+DESTINATIONS = ("cx", "sx", "ex", "email")
+LOOKUP_SYSTEMS = ("sx", "cx", "wx", "ex")
+
+
+class StubIntegrationState:
+    """Behaviour knobs, applied idempotency keys and counters shared by all request handlers"""
+
+    def __init__(self, latency_ms: float = 20.0, ms_per_message: float = 0.0, error_rate: float = 0.0,
+                 lost_response_rate: float = 0.0, seed: int = 42, document_bytes: int = 256 * 1024,
+                 document_jitter_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self.document_bytes = document_bytes
+        self.document_jitter_ms = document_jitter_ms
+        self.ms_per_message = ms_per_message
+        self.error_rate = error_rate
+        self.lost_response_rate = lost_response_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.outage_until = 0.0
+        self.applied: Dict[str, set] = {destination: set() for destination in DESTINATIONS}
+        self.versions: Dict[str, int] = {}  # "<system>:<id>" -> bumped by /touch
+        self.counters = {"batches": 0, "messages": 0, "applied": 0, "duplicates": 0, "errors": 0,
+                         "lost_responses": 0, "outage_rejections": 0, "lookups": 0, "not_modified": 0,
+                         "documents": 0, "max_concurrent_documents": 0}
+        self.documents_in_flight = 0
+
+    def start_outage(self, seconds: float):
+        with self.lock:
+            self.outage_until = time.monotonic() + seconds
+
+    def admit(self) -> str:
+        """Outcome of a new batch: 'ok', 'outage', 'error' or 'lost' (applied, response lost)"""
+        with self.lock:
+            self.counters["batches"] += 1
+            if time.monotonic() < self.outage_until:
+                self.counters["outage_rejections"] += 1
+                return "outage"
+            roll = self.random.random()
+            if roll < self.error_rate:
+                self.counters["errors"] += 1
+                return "error"
+            if roll < self.error_rate + self.lost_response_rate:
+                self.counters["lost_responses"] += 1
+                return "lost"
+            return "ok"
+
+    def admit_lookup(self) -> str:
+        """Outcome of a lookup: 'ok', 'outage' or 'error'"""
+        with self.lock:
+            self.counters["lookups"] += 1
+            if time.monotonic() < self.outage_until:
+                self.counters["outage_rejections"] += 1
+                return "outage"
+            if self.random.random() < self.error_rate:
+                self.counters["errors"] += 1
+                return "error"
+            return "ok"
+
+    def document_latency(self, path: str) -> float:
+        """Seconds to serve a document: base latency plus a jitter fixed per path"""
+        jitter = random.Random(path).random() * self.document_jitter_ms
+        return (self.latency_ms + jitter) / 1000
+
+    def document_started(self):
+        with self.lock:
+            self.counters["documents"] += 1
+            self.documents_in_flight += 1
+            self.counters["max_concurrent_documents"] = max(
+                self.counters["max_concurrent_documents"], self.documents_in_flight
+            )
+
+    def document_finished(self):
+        with self.lock:
+            self.documents_in_flight -= 1
+
+    def touch(self, system: str, key: str) -> int:
+        with self.lock:
+            version = self.versions.get(f"{system}:{key}", 0) + 1
+            self.versions[f"{system}:{key}"] = version
+            return version
+
+    def lookup(self, system: str, parts: List[str]):
+        """Payload for a lookup path (same shapes as the app's mock clients), or None"""
+        if len(parts) < 2:
+            return None
+        collection, key, rest = parts[0], parts[1], parts[2:]
+        with self.lock:
+            version = self.versions.get(f"{system}:{key}", 0)
+
+        def documents(kinds):
+            return {"documents": [
+                {"document_type": kind, "document_name": f"{kind.replace('_', ' ').title()} - {key}",
+                 "document_url": f"{system}://documents/{key}/{kind}.pdf", "last_updated": "2024-03-01",
+                 "file_size": "250KB", "version": version}
+                for kind in kinds
+            ]}
+
+        if system == "sx" and collection == "entities":
+            if not rest:
+                return {"entity_id": key, "legal_name": f"Entity {key}", "jurisdiction": "United Kingdom",
+                        "entity_type": "Limited Company", "registration_number": f"REG{key}",
+                        "registration_date": "2020-01-15", "status": "Active", "version": version}
+            if rest == ["documents"]:
+                return documents(["registration_certificate", "articles_of_incorporation", "board_resolution"])
+        if system == "cx" and collection == "clients":
+            if not rest:
+                return {"client_id": key, "name": f"Client {key}", "products": ["FX Derivatives"],
+                        "relationship_manager": "John Smith", "risk_rating": "Medium", "kyc_status": "Approved",
+                        "last_updated": "2024-10-01", "version": version}
+            if rest == ["products"]:
+                return {"products": ["FX Derivatives", "Interest Rate Swaps", "Equity Options"]}
+            if rest == ["documents"]:
+                return documents(["kyc_documentation", "client_confirmation", "product_agreement"])
+        if system == "wx" and collection == "entities" and rest == ["documents"]:
+            return documents(["due_diligence_report", "financial_statements", "compliance_certificate",
+                              "risk_assessment"])
+        if system == "ex" and collection == "workflows" and not rest:
+            return {"request_id": key, "workflow_type": "FM Account Opening", "status": "In Progress",
+                    "version": version}
+        return None
+
+    def apply(self, destination: str, messages: List[dict]) -> List[dict]:
+        results = []
+        with self.lock:
+            applied = self.applied[destination]
+            for message in messages:
+                key = message["idempotency_key"]
+                self.counters["messages"] += 1
+                if key in applied:
+                    self.counters["duplicates"] += 1
+                    results.append({"idempotency_key": key, "status": "duplicate"})
+                else:
+                    applied.add(key)
+                    self.counters["applied"] += 1
+                    results.append({"idempotency_key": key, "status": "accepted"})
+        return results
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                **self.counters,
+                "applied_by_destination": {destination: len(keys) for destination, keys in self.applied.items()},
+                "outage_active": time.monotonic() < self.outage_until
+            }
+
+
+def stub_document(path: str, size: int) -> bytes:
+    """
+    One-page PDF naming the path, padded to size with a comment. The trailer is repeated after the
+    padding so readers still find the cross-reference table at the end of the file.
+    """
+    pdf = fitz.open()
+    try:
+        pdf.new_page().insert_textbox(fitz.Rect(50, 50, 550, 800), f"Stub document {path}", fontsize=10)
+        body = pdf.tobytes()
+    finally:
+        pdf.close()
+    trailer = body[body.rindex(b"startxref"):]
+    padding = max(size - len(body) - len(trailer) - 2, 0)
+    return body + b"%" + b"." * padding + b"\n" + trailer
+
+
+def make_handler(state: StubIntegrationState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body are separate writes; with Nagle the body waits for a delayed ACK
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status: int, payload: dict):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            parts = urlparse(self.path).path.strip("/").split("/")
+            if parts == ["stats"]:
+                self._send_json(200, state.stats())
+                return
+            if len(parts) > 2 and parts[0] in LOOKUP_SYSTEMS and parts[1] == "documents":
+                self._send_document("/".join(parts))
+                return
+            payload = state.lookup(parts[0], parts[1:]) if parts[0] in LOOKUP_SYSTEMS else None
+            if payload is None:
+                self._send_json(404, {"error": "not found"})
+                return
+
+            outcome = state.admit_lookup()
+            time.sleep(state.latency_ms / 1000)
+            if outcome != "ok":
+                self._send_json(503, {"error": "Service unavailable"})
+                return
+            body = json.dumps(payload).encode("utf-8")
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                with state.lock:
+                    state.counters["not_modified"] += 1
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_document(self, path: str):
+            state.document_started()
+            try:
+                time.sleep(state.document_latency(path))
+                body = stub_document(path, state.document_bytes)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/pdf")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                for offset in range(0, len(body), 16384):
+                    self.wfile.write(body[offset:offset + 16384])
+            finally:
+                state.document_finished()
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length)
+            url = urlparse(self.path)
+            parts = url.path.strip("/").split("/")
+            if parts == ["outage"]:
+                seconds = float(parse_qs(url.query).get("seconds", ["30"])[0])
+                state.start_outage(seconds)
+                self._send_json(200, {"outage_seconds": seconds})
+                return
+            if len(parts) == 3 and parts[0] in LOOKUP_SYSTEMS and parts[1] == "touch":
+                self._send_json(200, {"version": state.touch(parts[0], parts[2])})
+                return
+            if len(parts) != 2 or parts[0] not in DESTINATIONS or parts[1] != "messages":
+                self._send_json(404, {"error": "not found"})
+                return
+
+            messages = json.loads(body or b"{}").get("messages") or []
+            outcome = state.admit()
+            time.sleep((state.latency_ms + state.ms_per_message * len(messages)) / 1000)
+            if outcome in ("outage", "error"):
+                self._send_json(503, {"error": "Service unavailable"})
+                return
+            results = state.apply(parts[0], messages)
+            if outcome == "lost":
+                self._send_json(503, {"error": "Gateway timeout after processing"})
+                return
+            self._send_json(200, {"results": results})
+
+    return Handler
+
+
+class StubServer(ThreadingHTTPServer):
+    # The default listen backlog of 5 drops connections under concurrent load (1 s SYN retries)
+    request_queue_size = 256
+    daemon_threads = True
+
+
+def start_stub_server(state: StubIntegrationState, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Start the stub in a background thread; returns the server (server.server_port has the port)"""
+    server = StubServer((host, port), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run stub SX/CX/WX/EX lookups and outbox batch endpoints")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--ms-per-message", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of batches answered with 503")
+    parser.add_argument("--lost-response-rate", type=float, default=0.0,
+                        help="Fraction of batches applied but answered with 503")
+    args = parser.parse_args()
+
+    state = StubIntegrationState(args.latency_ms, args.ms_per_message, args.error_rate, args.lost_response_rate)
+    server = StubServer((args.host, args.port), make_handler(state))
+    print(f"Stub integrations listening on http://{args.host}:{args.port} (/<system>/... lookups, /<destination>/messages)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Local stub of an OpenAI-compatible chat completions endpoint.
+Simulates latency, a requests-per-minute limit (429 with Retry-After) and random 5xx
+errors so LLM throughput, retries and fairness can be measured without a real provider.
+
+Usage:
+    python -m benchmarks.stub_llm --port 8088 --rpm 120 --latency-ms 200 --error-rate 0.02
+    LLM_ENABLED=true LLM_API_KEY=stub LLM_API_ENDPOINT=http://127.0.0.1:8088/v1 uvicorn app.main:app
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubLLMState:
+    """Behaviour knobs and counters shared by all request handlers"""
+
+    def __init__(self, rpm: int = 0, latency_ms: float = 100.0, ms_per_token: float = 0.0,
+                 error_rate: float = 0.0, seed: int = 42):
+        self.rpm = rpm  # 0 disables rate limiting
+        self.latency_ms = latency_ms
+        self.ms_per_token = ms_per_token
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.window = deque()  # Accepted request timestamps within the last minute
+        self.counters = {"requests": 0, "completed": 0, "rate_limited": 0, "errors": 0}
+
+    def admit(self) -> str:
+        """Decide the outcome of a new request: 'ok', 'rate_limited' or 'error'"""
+        with self.lock:
+            self.counters["requests"] += 1
+            now = time.monotonic()
+            while self.window and now - self.window[0] >= 60:
+                self.window.popleft()
+            if self.rpm and len(self.window) >= self.rpm:
+                self.counters["rate_limited"] += 1
+                return "rate_limited"
+            self.window.append(now)
+            if self.random.random() < self.error_rate:
+                self.counters["errors"] += 1
+                return "error"
+            self.counters["completed"] += 1
+            return "ok"
+
+    def retry_after(self) -> float:
+        with self.lock:
+            if not self.window:
+                return 1.0
+            return max(0.1, 60 - (time.monotonic() - self.window[0]))
+
+
+STUB_ENTITIES = {
+    "legal_name": {"value": "GLOBAL TRADE SOLUTIONS PTE LTD", "confidence": 0.96},
+    "jurisdiction": {"value": "Singapore", "confidence": 0.94},
+    "entity_type": {"value": "Private Limited Company", "confidence": 0.9},
+    "registration_date": {"value": "2023-06-15", "confidence": 0.92},
+    "expiry_date": {"value": "2026-06-15", "confidence": 0.88},
+    "registration_number": {"value": "RC-2023-45678", "confidence": 0.95},
+    "registered_address": {"value": "123 Marina Boulevard #15-01, Singapore 018989", "confidence": 0.87}
+}
+
+
+def reply_for(request: dict) -> str:
+    """
+    Deterministic reply text. Entity extraction prompts get the seven annotation entities
+    (fenced and followed by commentary unless JSON mode is requested, like many real models);
+    other JSON mode requests get a small JSON object.
+    """
+    messages = request.get("messages") or []
+    question = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+    json_mode = (request.get("response_format") or {}).get("type") == "json_object"
+    if any("legal_name" in (m.get("content") or "") for m in messages):
+        entities = json.dumps(STUB_ENTITIES, indent=2)
+        return entities if json_mode else f"```json\n{entities}\n```\nAll entities were found with high confidence."
+    if json_mode:
+        return json.dumps({"stub": True, "question_chars": len(question)})
+    return f"Stub answer. You asked: {' '.join(question.split())[:80]}"
+
+
+def make_handler(state: StubLLMState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status: int, payload: dict, headers: dict = None):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path.rstrip("/").endswith("/stats"):
+                with state.lock:
+                    self._send_json(200, dict(state.counters))
+            else:
+                self._send_json(404, {"error": {"message": "not found"}})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": "not found"}})
+                return
+
+            outcome = state.admit()
+            if outcome == "rate_limited":
+                self._send_json(
+                    429,
+                    {"error": {"message": "Rate limit exceeded", "type": "rate_limit_error"}},
+                    {"Retry-After": f"{state.retry_after():.2f}"}
+                )
+                return
+            if outcome == "error":
+                self._send_json(503, {"error": {"message": "Upstream overloaded", "type": "server_error"}})
+                return
+
+            content = reply_for(request)
+            completion_tokens = max(1, len(content) // 4)
+            prompt_tokens = sum(len(m.get("content") or "") for m in request.get("messages") or []) // 4
+            time.sleep((state.latency_ms + state.ms_per_token * completion_tokens) / 1000)
+
+            created = int(time.time())
+            model = request.get("model", "stub")
+            if request.get("stream"):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                words = content.split(" ")
+                for position, word in enumerate(words):
+                    delta = {"content": word + (" " if position < len(words) - 1 else "")}
+                    chunk = {
+                        "id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": created, "model": model,
+                        "choices": [{"index": 0, "delta": delta, "finish_reason": None}]
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+                return
+
+            self._send_json(200, {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop"
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens
+                }
+            })
+
+    return Handler
+
+
+def start_stub_server(state: StubLLMState, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Start the stub in a background thread; returns the server (server.server_port has the port)"""
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a stub OpenAI-compatible LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8088)
+    parser.add_argument("--rpm", type=int, default=0, help="Requests per minute before returning 429 (0 = unlimited)")
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--ms-per-token", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    args = parser.parse_args()
+
+    state = StubLLMState(args.rpm, args.latency_ms, args.ms_per_token, args.error_rate)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(state))
+    print(f"Stub LLM listening on http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
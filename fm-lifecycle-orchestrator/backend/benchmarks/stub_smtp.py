@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Local SMTP stand-in for outbox email delivery.
+Speaks enough SMTP (EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP, QUIT) for smtplib, accepts every
+message after an optional per-message latency, counts connections, messages and distinct
+Message-IDs (redeliveries keep theirs), and keeps the last few messages for inspection.
+
+Usage:
+    python -m benchmarks.stub_smtp --port 1025 --latency-ms 2
+    MAIL_TRANSPORT=smtp SMTP_HOST=127.0.0.1 SMTP_PORT=1025 uvicorn app.main:app
+"""
+import argparse
+import random
+import socketserver
+import threading
+import time
+from collections import deque
+from email import message_from_bytes
+
+
+class StubSmtpState:
+    """Behaviour knobs and counters shared by all connections"""
+
+    def __init__(self, latency_ms: float = 0.0, reject_rate: float = 0.0, keep_last: int = 20, seed: int = 42):
+        self.latency_ms = latency_ms
+        self.reject_rate = reject_rate  # Fraction of messages answered 451 at end of DATA
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.message_ids = set()
+        self.last_messages = deque(maxlen=keep_last)
+        self.counters = {"connections": 0, "messages": 0, "rejected": 0, "recipients": 0, "duplicates": 0}
+
+    def accept(self, recipients, data: bytes) -> bool:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        message = message_from_bytes(data)
+        with self.lock:
+            if self.random.random() < self.reject_rate:
+                self.counters["rejected"] += 1
+                return False
+            self.counters["messages"] += 1
+            self.counters["recipients"] += len(recipients)
+            message_id = message.get("Message-ID")
+            if message_id in self.message_ids:
+                self.counters["duplicates"] += 1
+            self.message_ids.add(message_id)
+            self.last_messages.append({
+                "to": message.get("To"), "cc": message.get("Cc"), "subject": message.get("Subject"),
+                "message_id": message_id, "rcpt": list(recipients)
+            })
+        return True
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {**self.counters, "distinct_messages": len(self.message_ids)}
+
+
+def make_handler(state: StubSmtpState):
+    class Handler(socketserver.StreamRequestHandler):
+        def reply(self, line: str):
+            self.wfile.write(line.encode() + b"\r\n")
+            self.wfile.flush()
+
+        def handle(self):
+            with state.lock:
+                state.counters["connections"] += 1
+            self.reply("220 stub-smtp ESMTP ready")
+            recipients = []
+            while True:
+                line = self.rfile.readline()
+                if not line:
+                    return
+                command = line.decode(errors="replace").strip()
+                verb = command[:4].upper()
+                if verb == "EHLO":
+                    self.wfile.write(b"250-stub-smtp\r\n250-8BITMIME\r\n250 SMTPUTF8\r\n")
+                    self.wfile.flush()
+                elif verb == "HELO":
+                    self.reply("250 stub-smtp")
+                elif verb == "MAIL":
+                    recipients = []
+                    self.reply("250 OK")
+                elif verb == "RCPT":
+                    recipients.append(command.split(":", 1)[-1].strip().strip("<>"))
+                    self.reply("250 OK")
+                elif verb == "DATA":
+                    self.reply("354 End data with <CR><LF>.<CR><LF>")
+                    lines = []
+                    while True:
+                        data_line = self.rfile.readline()
+                        if not data_line or data_line in (b".\r\n", b".\n"):
+                            break
+                        lines.append(data_line[1:] if data_line.startswith(b"..") else data_line)
+                    accepted = state.accept(recipients, b"".join(lines))
+                    self.reply("250 OK queued" if accepted else "451 Try again later")
+                    recipients = []
+                elif verb in ("RSET", "NOOP"):
+                    recipients = [] if verb == "RSET" else recipients
+                    self.reply("250 OK")
+                elif verb == "QUIT":
+                    self.reply("221 Bye")
+                    return
+                else:
+                    self.reply("502 Command not implemented")
+
+    return Handler
+
+
+class StubSmtpServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+    request_queue_size = 256
+
+
+def start_stub_server(state: StubSmtpState, host: str = "127.0.0.1", port: int = 0) -> StubSmtpServer:
+    """Start the stub in a background thread; returns the server (server.server_address[1] has the port)"""
+    server = StubSmtpServer((host, port), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local SMTP stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay before accepting each message")
+    parser.add_argument("--reject-rate", type=float, default=0.0, help="Fraction of messages answered 451")
+    args = parser.parse_args()
+
+    state = StubSmtpState(args.latency_ms, args.reject_rate)
+    server = StubSmtpServer((args.host, args.port), make_handler(state))
+    print(f"Stub SMTP listening on {args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(state.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""
+Shared pytest setup for the backend test_*.py scripts.
+Points the app at a scratch SQLite database and output directories, and at the local stub LLM
+server from benchmarks/stub_llm.py, before anything imports app.config.
+"""
+import os
+import tempfile
+
+from benchmarks.stub_llm import StubLLMState, start_stub_server
+
+_workdir = tempfile.mkdtemp(prefix="fm-tests-")
+_stub_llm = start_stub_server(StubLLMState(latency_ms=0))
+
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(_workdir, 'test.db')}",
+    "DOCUMENT_INDEX_DIR": os.path.join(_workdir, "document_index"),
+    "CX_EXPORT_DIR": os.path.join(_workdir, "cx_exports"),
+    "SWEEP_ENABLED": "false",
+    "OUTBOX_ENABLED": "false",
+    "METRICS_ENABLED": "true",
+    "LLM_ENABLED": "true",
+    "LLM_API_KEY": "stub",
+    "LLM_API_ENDPOINT": f"http://127.0.0.1:{_stub_llm.server_port}/v1",
+})
+
+# Manual scripts against a running server or a real LLM provider, not pytest tests
+collect_ignore = ["test_annotation_flow.py", "test_llm.py"]
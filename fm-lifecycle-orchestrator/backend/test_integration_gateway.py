@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Tests for the cached, circuit-broken integration lookups (app/integrations/async_clients.py).
+Runs the gateway against the local SX/CX/WX/EX stand-in from benchmarks/stub_integrations.py
+and checks cache hits, ETag revalidation, stale responses during an outage and breaker recovery,
+for lookups and for document fetches.
+
+Run with: python -m pytest -q test_integration_gateway.py
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import httpx
+import pytest
+
+from app.integrations.async_clients import IntegrationGateway, IntegrationUnavailable
+from app.services.document_import import DocumentImportService
+from benchmarks.stub_integrations import StubIntegrationState, start_stub_server
+
+ENTITY = "/entities/E1"
+
+
+@pytest.fixture
+def stub():
+    state = StubIntegrationState(latency_ms=0)
+    server = start_stub_server(state)
+    yield state, f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def gateway_for(base_url: str, **options) -> IntegrationGateway:
+    return IntegrationGateway(
+        base_urls={system: f"{base_url}/{system}" for system in ("sx", "cx", "wx", "ex")}, **options
+    )
+
+
+def expire(gateway: IntegrationGateway, system: str, path: str):
+    gateway.cache.get((system, path)).expires_at = 0.0
+
+
+def end_outage(state: StubIntegrationState):
+    with state.lock:
+        state.outage_until = 0.0
+
+
+def test_fresh_entry_is_served_from_cache(stub):
+    state, base_url = stub
+    gateway = gateway_for(base_url)
+
+    async def scenario():
+        try:
+            return [await gateway.fetch("sx", ENTITY) for _ in range(3)]
+        finally:
+            await gateway.aclose()
+
+    results = asyncio.run(scenario())
+    assert [result["outcome"] for result in results] == ["miss", "hit", "hit"]
+    assert results[1]["value"] == results[0]["value"]
+    assert state.stats()["lookups"] == 1
+
+
+def test_expired_entry_is_revalidated_with_etag(stub):
+    state, base_url = stub
+    gateway = gateway_for(base_url)
+
+    async def scenario():
+        try:
+            first = await gateway.fetch("sx", ENTITY)
+            expire(gateway, "sx", ENTITY)
+            unchanged = await gateway.fetch("sx", ENTITY)
+            state.touch("sx", "E1")
+            expire(gateway, "sx", ENTITY)
+            changed = await gateway.fetch("sx", ENTITY)
+            return first, unchanged, changed
+        finally:
+            await gateway.aclose()
+
+    first, unchanged, changed = asyncio.run(scenario())
+    assert unchanged["outcome"] == "revalidated"
+    assert unchanged["value"] == first["value"]
+    assert state.stats()["not_modified"] == 1
+    assert changed["outcome"] == "miss"
+    assert changed["value"]["version"] == first["value"]["version"] + 1
+
+
+def test_expired_entry_is_served_stale_during_outage(stub):
+    state, base_url = stub
+    gateway = gateway_for(base_url)
+
+    async def scenario():
+        try:
+            first = await gateway.fetch("cx", "/clients/C1")
+            expire(gateway, "cx", "/clients/C1")
+            state.start_outage(60)
+            stale = await gateway.fetch("cx", "/clients/C1")
+            with pytest.raises(IntegrationUnavailable) as raised:
+                await gateway.fetch("cx", "/clients/C2")
+            return first, stale, raised.value
+        finally:
+            await gateway.aclose()
+
+    first, stale, error = asyncio.run(scenario())
+    assert stale["outcome"] == "stale"
+    assert stale["value"] == first["value"]
+    assert error.status_code == 503
+
+
+def test_breaker_opens_then_recovers(stub):
+    state, base_url = stub
+    gateway = gateway_for(base_url, breaker_failure_threshold=2, breaker_reset_seconds=0.1)
+    breaker = gateway.breakers["sx"]
+
+    async def scenario():
+        try:
+            state.start_outage(60)
+            for _ in range(2):
+                with pytest.raises(IntegrationUnavailable):
+                    await gateway.fetch("sx", ENTITY)
+            assert breaker.state == "open"
+
+            # Open: fails fast without calling the system
+            lookups = state.stats()["lookups"]
+            with pytest.raises(IntegrationUnavailable, match="circuit open"):
+                await gateway.fetch("sx", ENTITY)
+            assert state.stats()["lookups"] == lookups
+
+            # A failed half-open trial reopens it
+            time.sleep(0.15)
+            with pytest.raises(IntegrationUnavailable, match="HTTP 503"):
+                await gateway.fetch("sx", ENTITY)
+            assert breaker.state == "open"
+
+            # Once the system is back, the next trial closes it
+            end_outage(state)
+            time.sleep(0.15)
+            return await gateway.fetch("sx", ENTITY)
+        finally:
+            await gateway.aclose()
+
+    result = asyncio.run(scenario())
+    assert result["outcome"] == "miss"
+    assert breaker.snapshot() == {"state": "closed", "failures": 0}
+
+
+def test_cancelled_trial_does_not_hold_the_breaker(stub):
+    state, base_url = stub
+    gateway = gateway_for(base_url, breaker_failure_threshold=1, breaker_reset_seconds=0.1)
+    breaker = gateway.breakers["sx"]
+
+    async def scenario():
+        try:
+            state.start_outage(60)
+            with pytest.raises(IntegrationUnavailable):
+                await gateway.fetch("sx", ENTITY)
+            end_outage(state)
+            state.latency_ms = 1000
+            await asyncio.sleep(0.15)
+
+            trial = asyncio.create_task(gateway.fetch("sx", ENTITY))
+            await asyncio.sleep(0.05)
+            assert breaker.state == "half_open"
+            trial.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await trial
+
+            state.latency_ms = 0
+            return await gateway.fetch("sx", ENTITY)
+        finally:
+            await gateway.aclose()
+
+    result = asyncio.run(scenario())
+    assert result["outcome"] == "miss"
+    assert breaker.state == "closed"
+
+
+def test_document_fetch_settles_half_open_trial(stub):
+    state, base_url = stub
+    gateway = gateway_for(base_url, breaker_failure_threshold=1, breaker_reset_seconds=0.1)
+    gateway.base_urls["cx"] = "http://127.0.0.1:9/cx"  # Nothing listens on the discard port
+    service = DocumentImportService(gateway=gateway, upload_dir=tempfile.mkdtemp(prefix="fm-import-"))
+    file_path = os.path.join(service.upload_dir, "document.pdf")
+
+    def source(system: str, document_url: str):
+        return {"source_system": system, "document_url": document_url, "document_type": "kyc_documentation"}
+
+    async def scenario():
+        try:
+            # A connection error counts as a failure and reopens the breaker
+            for breaker in gateway.breakers.values():
+                breaker.record_failure()
+            await asyncio.sleep(0.15)
+            with pytest.raises(httpx.ConnectError):
+                await service.fetch_to_file({}, source("CX", "cx://documents/E1/kyc.pdf"), file_path)
+            assert gateway.breakers["cx"].state == "open"
+
+            # A 4xx for one document still shows the system is up
+            with pytest.raises(httpx.HTTPStatusError):
+                await service.fetch_to_file({}, source("SX", f"{base_url}/missing"), file_path)
+            assert gateway.breakers["sx"].state == "closed"
+            assert not os.path.exists(file_path)
+            return await service.fetch_to_file({}, source("SX", "sx://documents/E1/kyc.pdf"), file_path)
+        finally:
+            await gateway.aclose()
+
+    assert asyncio.run(scenario()) == state.document_bytes
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
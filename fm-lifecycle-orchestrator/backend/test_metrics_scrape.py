@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Scrape test for the Prometheus /metrics endpoint.
+Boots the app against a scratch SQLite database (see conftest.py), drives a few requests that
+touch HTTP, SQL, the LLM (local stub server) and the classification engine, then scrapes
+GET /metrics and checks the documented series are exposed with samples.
+
+Run with: python -m pytest -q test_metrics_scrape.py
+"""
+import contextlib
+import io
+import re
+import sys
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def scrape():
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.seed_data import seed_data
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        seed_data()
+
+    with TestClient(app) as client:
+        assert client.get("/api/clients").status_code == 200
+        assert client.post("/api/clients/1/evaluate-eligibility", params={"regime": "EMIR"}).status_code == 200
+        assert client.post("/api/chat", json={"message": "What documents are outstanding?"}).status_code == 200
+        response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    return response.text
+
+
+def samples(text: str, name: str):
+    """Sample lines of one series name (labels included), ignoring HELP/TYPE comments"""
+    return [line for line in text.splitlines() if re.match(rf"{name}(\{{|\s)", line)]
+
+
+def test_http_histograms(scrape):
+    assert "# TYPE http_request_duration_seconds histogram" in scrape
+    assert any('route="/api/clients"' in line for line in samples(scrape, "http_requests_total"))
+    assert samples(scrape, "http_request_duration_seconds_bucket")
+    assert samples(scrape, "http_request_duration_seconds_count")
+    assert "# TYPE http_requests_in_progress gauge" in scrape
+
+
+def test_db_query_series(scrape):
+    assert any('operation="SELECT"' in line for line in samples(scrape, "db_queries_total"))
+    assert samples(scrape, "db_query_duration_seconds_bucket")
+    assert samples(scrape, "db_queries_per_request_count")
+    assert samples(scrape, "db_time_per_request_seconds_count")
+
+
+def test_llm_counters(scrape):
+    requests = samples(scrape, "llm_requests_total")
+    assert any('outcome="success"' in line for line in requests)
+    assert samples(scrape, "llm_request_duration_seconds_count")
+    assert samples(scrape, "llm_tokens_total")
+    for family in ("llm_errors_total", "llm_retries_total"):
+        assert f"# TYPE {family} counter" in scrape
+
+
+def test_classification_counters(scrape):
+    evaluations = samples(scrape, "classification_evaluations_total")
+    assert evaluations and all(float(line.rsplit(" ", 1)[1]) > 0 for line in evaluations)
+    assert samples(scrape, "classification_evaluation_duration_seconds_count")
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
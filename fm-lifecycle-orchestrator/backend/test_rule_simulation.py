@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Tests for POST /api/regimes/{regime}/rules/simulate (app/services/eligibility_simulator.py).
+Seeds the demo data into the scratch database (see conftest.py) and dry-runs rule changes.
+
+Run with: python -m pytest -q test_rule_simulation.py
+"""
+import contextlib
+import io
+import sys
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def client():
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.seed_data import seed_data
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        seed_data()
+    with TestClient(app) as client:
+        yield client
+
+
+def simulate(client, changes, regime="EMIR"):
+    return client.post(f"/api/regimes/{regime}/rules/simulate", json={"changes": changes})
+
+
+def test_no_changes_flip_nobody(client):
+    response = simulate(client, [])
+    assert response.status_code == 200
+    result = response.json()
+    assert result["proposed_eligible"] == result["currently_eligible"]
+    assert result["newly_eligible"] == result["newly_ineligible"] == 0
+
+
+def test_inactive_new_rule_changes_nothing(client):
+    response = simulate(client, [
+        {"rule_type": "account_type", "rule_config": {"in_scope": ["x"]}, "is_active": False}
+    ])
+    assert response.status_code == 200
+    result = response.json()
+    assert result["newly_eligible"] == result["newly_ineligible"] == 0
+    assert result["proposed_eligible"] == result["currently_eligible"]
+    assert all(rule["rule_id"] is not None for rule in result["rules"])
+
+
+def test_active_new_rule_is_reported_as_added(client):
+    response = simulate(client, [{"rule_type": "account_type", "rule_config": {"in_scope": ["x"]}}])
+    assert response.status_code == 200
+    result = response.json()
+    added = [rule for rule in result["rules"] if rule["status"] == "added"]
+    assert len(added) == 1 and added[0]["rule_id"] is None
+    # No client has account type "x", so everyone eligible today would lose eligibility
+    assert result["proposed_eligible"] == 0
+    assert result["newly_ineligible"] == result["currently_eligible"]
+
+
+def test_new_rule_without_type_is_rejected(client):
+    assert simulate(client, [{"rule_config": {"in_scope": ["x"]}}]).status_code == 400
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))